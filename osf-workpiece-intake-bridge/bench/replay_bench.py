@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Replay benchmark for the intake bridge: recorded DPS state messages → ``IntakeBridge._on_message``.
+
+- Input: every message the bridge's wildcard subscription would receive (all module ``state``
+  topics) from ``data/osf-data/sessions/*.log``; non-DPS states exercise the unrouted path
+- In-process fake client (no broker); QoS1 acks are delivered right after each message,
+  like the paho network thread would
+- Dedupe runs on a virtual clock taken from the recorded timestamps, so the 5 s TTL behaves as
+  in the recording although messages are fed at max speed. Sessions (and ``--repeat`` rounds)
+  are laid out back to back on that clock with a gap larger than the TTL.
+- Correctness: published NFCs per session must equal the distinct NFC ids of finished
+  ``RGB_NFC`` actions in the recording (one intake per workpiece read)
+
+Usage:
+    python osf-workpiece-intake-bridge/bench/replay_bench.py
+    python osf-workpiece-intake-bridge/bench/replay_bench.py --repeat 200 --qos 1 --json /tmp/bridge_bench.json
+    python osf-workpiece-intake-bridge/bench/replay_bench.py --min-rate 20000   # exit 1 below 20k msg/s
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+BRIDGE_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = BRIDGE_ROOT.parent
+SESSIONS_DIR = REPO_ROOT / "data/osf-data/sessions"
+sys.path.insert(0, str(BRIDGE_ROOT / "src"))
+
+import paho.mqtt.client as mqtt  # noqa: E402
+from bridge import DEDUP_TTL_SEC, DEFAULT_DPS_SERIAL, LOG, IntakeBridge  # noqa: E402
+from metrics import TtlDedupe, percentile  # noqa: E402
+from routing import build_routes, source_topics, subscription_patterns  # noqa: E402
+
+DEFAULT_REPEAT = 50
+
+
+def _epoch(timestamp: str) -> float:
+    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def load_sessions(paths: list[Path], dps_serial: str = DEFAULT_DPS_SERIAL) -> list[dict[str, Any]]:
+    """Per session: subscribed state messages ``(epoch_s, message)`` and the expected intake NFC ids."""
+    dps_topics = set(source_topics(dps_serial))
+    patterns = subscription_patterns()
+    sessions = []
+    for path in paths:
+        messages = []
+        expected: set[str] = set()
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                if "/state" not in line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                topic = entry.get("topic")
+                if not isinstance(entry.get("payload"), str) or not isinstance(topic, str):
+                    continue
+                if not any(mqtt.topic_matches_sub(pattern, topic) for pattern in patterns):
+                    continue
+                messages.append(
+                    (
+                        _epoch(entry["timestamp"]),
+                        SimpleNamespace(topic=entry["topic"], payload=entry["payload"].encode("utf-8")),
+                    )
+                )
+                if topic in dps_topics:
+                    expected.update(_finished_nfc_reads(entry["payload"]))
+        if messages:
+            sessions.append({"name": path.stem, "messages": messages, "expected": expected})
+    return sessions
+
+
+def _finished_nfc_reads(raw: str) -> list[str]:
+    """Ground truth independent of ``intake.py``: NFC result of a finished RGB_NFC action."""
+    try:
+        payload = json.loads(raw)
+    except json.JSONDecodeError:
+        return []
+    action = payload.get("actionState") if isinstance(payload, dict) else None
+    if not isinstance(action, dict) or action.get("command") != "RGB_NFC":
+        return []
+    if str(action.get("state", "")).upper() != "FINISHED" or not action.get("result"):
+        return []
+    return [str(action["result"]).strip()]
+
+
+class ReplayClient:
+    """Fake paho client: publish always succeeds; QoS>0 mids are queued for an immediate ack."""
+
+    def __init__(self) -> None:
+        self.session = ""
+        self.published: Counter[tuple[str, str]] = Counter()
+        self.unacked: list[int] = []
+        self._mid = 0
+
+    def publish(self, topic: str, body: str, qos: int = 0, retain: bool = False) -> SimpleNamespace:
+        self._mid += 1
+        self.published[(self.session, json.loads(body)["nfc"])] += 1
+        if qos:
+            self.unacked.append(self._mid)
+        return SimpleNamespace(rc=mqtt.MQTT_ERR_SUCCESS, mid=self._mid)
+
+
+def run_replay(
+    sessions: list[dict[str, Any]],
+    repeat: int = DEFAULT_REPEAT,
+    qos: int = 0,
+    dps_serial: str = DEFAULT_DPS_SERIAL,
+) -> dict[str, Any]:
+    """Feed all sessions ``repeat`` times through a fresh bridge; returns throughput, latency, correctness."""
+    bridge = IntakeBridge()
+    bridge.publish_qos = qos
+    bridge._routes = build_routes({dps_serial: "dps"}, bridge.topic_templates)
+    clock = [0.0]
+    bridge._dedupe = TtlDedupe(DEDUP_TTL_SEC, clock=lambda: clock[0])
+    client = ReplayClient()
+    latencies: list[float] = []
+    gap = 2 * DEDUP_TTL_SEC
+    offset = 0.0
+    log_level = LOG.level
+    LOG.setLevel(logging.WARNING)
+    started = time.perf_counter()
+    try:
+        for round_index in range(repeat):
+            for session in sessions:
+                client.session = f"{round_index}:{session['name']}"
+                base = session["messages"][0][0]
+                for epoch, msg in session["messages"]:
+                    clock[0] = offset + epoch - base
+                    t0 = time.perf_counter()
+                    bridge._on_message(client, None, msg)
+                    latencies.append(time.perf_counter() - t0)
+                    while client.unacked:
+                        bridge._on_publish(client, None, client.unacked.pop())
+                offset = clock[0] + gap
+    finally:
+        LOG.setLevel(log_level)
+    elapsed = time.perf_counter() - started
+
+    by_run: dict[str, dict[str, int]] = {}
+    for (run_key, nfc), count in client.published.items():
+        by_run.setdefault(run_key, {})[nfc] = count
+    mismatches = []
+    for round_index in range(repeat):
+        for session in sessions:
+            key = f"{round_index}:{session['name']}"
+            got = by_run.get(key, {})
+            want = dict.fromkeys(session["expected"], 1)
+            if got != want:
+                mismatches.append({"session": key, "expected": want, "published": got})
+    snap = bridge.stats.snapshot()
+    messages = len(latencies)
+    return {
+        "sessions": len(sessions),
+        "repeat": repeat,
+        "qos": qos,
+        "messages": messages,
+        "elapsed_sec": round(elapsed, 4),
+        "messages_per_sec": round(messages / elapsed, 1) if elapsed else None,
+        "published": snap["published"],
+        "expected": repeat * sum(len(s["expected"]) for s in sessions),
+        "deduplicated": snap["deduplicated"],
+        "unrouted": snap["unrouted"],
+        "failed": snap["failed"],
+        "acked": snap["acked"],
+        "pending_acks": snap["pending_acks"],
+        "handling_us_p50": round(percentile(latencies, 50) * 1e6, 2) if latencies else None,
+        "handling_us_p99": round(percentile(latencies, 99) * 1e6, 2) if latencies else None,
+        "handling_us_max": round(max(latencies) * 1e6, 2) if latencies else None,
+        "mismatches": mismatches,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay benchmark for the workpiece intake bridge")
+    parser.add_argument(
+        "paths", nargs="*", type=Path, help="Session .log files (default: all in data/osf-data/sessions)"
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"Corpus rounds (default {DEFAULT_REPEAT})")
+    parser.add_argument("--qos", type=int, choices=(0, 1), default=0, help="Publish QoS (1 = with ack tracking)")
+    parser.add_argument("--dps-serial", default=DEFAULT_DPS_SERIAL)
+    parser.add_argument("--min-rate", type=float, help="Exit 1 if messages/s falls below this value")
+    parser.add_argument("--json", type=Path, help="Write the result as JSON")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(SESSIONS_DIR.glob("*.log"))
+    sessions = load_sessions(paths, args.dps_serial)
+    if not sessions:
+        print("No DPS state messages found.")
+        return 1
+    result = run_replay(sessions, repeat=args.repeat, qos=args.qos, dps_serial=args.dps_serial)
+
+    print(
+        f"{result['messages']} messages ({result['sessions']} sessions x {result['repeat']}) "
+        f"in {result['elapsed_sec']}s → {result['messages_per_sec']} msg/s"
+    )
+    print(
+        f"handling latency p50={result['handling_us_p50']}µs p99={result['handling_us_p99']}µs "
+        f"max={result['handling_us_max']}µs"
+    )
+    print(
+        f"published={result['published']} expected={result['expected']} deduplicated={result['deduplicated']} "
+        f"unrouted={result['unrouted']} failed={result['failed']} acked={result['acked']} "
+        f"pending_acks={result['pending_acks']}"
+    )
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+    status = 0
+    if result["mismatches"]:
+        print(f"❌ Dedupe mismatch in {len(result['mismatches'])} session run(s): {result['mismatches'][:3]}")
+        status = 1
+    else:
+        print("✅ Intake events match the expected NFC reads")
+    if args.min_rate and (result["messages_per_sec"] or 0) < args.min_rate:
+        print(f"❌ Throughput below --min-rate {args.min_rate:g} msg/s")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,18 +7,26 @@ import logging
 import os
 import signal
 import sys
+import threading
 import time
 from typing import Any
 
 import paho.mqtt.client as mqtt
-
-from intake import build_intake_event
+from metrics import BridgeStats, TtlDedupe, iso_to_epoch, start_stats_server
+from routing import (
+    DEFAULT_TOPIC_TEMPLATES,
+    build_routes,
+    parse_stations,
+    parse_templates,
+    subscription_patterns,
+)
 
 LOG = logging.getLogger("osf-workpiece-intake-bridge")
 
 DEFAULT_DPS_SERIAL = "SVR4H73275"
 DEFAULT_PUBLISH_TOPIC = "osf/workpiece/intake"
 DEDUP_TTL_SEC = 5.0
+DEFAULT_STATS_INTERVAL_SEC = 60.0
 
 
 def _env(name: str, default: str) -> str:
@@ -26,25 +34,30 @@ def _env(name: str, default: str) -> str:
     return value if value is not None and value != "" else default
 
 
-def source_topics(dps_serial: str) -> list[str]:
-    """Node-RED enriched state is primary; TXT direct state as fallback."""
-    return [
-        f"module/v1/ff/NodeRed/{dps_serial}/state",
-        f"module/v1/ff/{dps_serial}/state",
-    ]
-
-
 class IntakeBridge:
     def __init__(self) -> None:
         self.host = _env("MQTT_HOST", "mqtt-broker")
         self.port = int(_env("MQTT_PORT", "1883"))
         self.username = _env("MQTT_USER", "default")
         self.password = _env("MQTT_PASS", "default")
-        self.dps_serial = _env("DPS_SERIAL", DEFAULT_DPS_SERIAL)
+        # STATION_SERIALS (comma list, optional ":<extractor>") supersedes the single DPS_SERIAL
+        self.stations = parse_stations(_env("STATION_SERIALS", _env("DPS_SERIAL", DEFAULT_DPS_SERIAL)))
+        self.topic_templates = parse_templates(_env("SOURCE_TOPIC_TEMPLATES", ",".join(DEFAULT_TOPIC_TEMPLATES)))
         self.publish_topic = _env("PUBLISH_TOPIC", DEFAULT_PUBLISH_TOPIC)
         self.client_id = _env("MQTT_CLIENT_ID", "osf-workpiece-intake-bridge")
-        self._topics = source_topics(self.dps_serial)
-        self._last_by_nfc: dict[str, float] = {}
+        self.publish_qos = int(_env("PUBLISH_QOS", "0"))
+        if self.publish_qos not in (0, 1):
+            raise ValueError(f"PUBLISH_QOS must be 0 or 1, got {self.publish_qos}")
+        self.stats_port = int(_env("STATS_PORT", "0"))
+        self.stats_interval_sec = float(_env("STATS_INTERVAL_SEC", str(DEFAULT_STATS_INTERVAL_SEC)))
+        self._topics = subscription_patterns(self.topic_templates)
+        self._routes = build_routes(self.stations, self.topic_templates)
+        self._dedupe = TtlDedupe(DEDUP_TTL_SEC)
+        self.stats = BridgeStats()
+        # QoS1: mid → perf_counter at publish; PUBACKs arrive on the same network thread as
+        # on_message, so an ack can never be handled before its mid is registered.
+        self._pending_acks: dict[int, float] = {}
+        self._stop_stats = threading.Event()
         self._client = mqtt.Client(
             mqtt.CallbackAPIVersion.VERSION2,
             client_id=self.client_id,
@@ -54,6 +67,7 @@ class IntakeBridge:
         self._client.on_connect = self._on_connect
         self._client.on_message = self._on_message
         self._client.on_disconnect = self._on_disconnect
+        self._client.on_publish = self._on_publish
 
     def _on_connect(
         self,
@@ -67,9 +81,9 @@ class IntakeBridge:
         if rc != 0:
             LOG.error("MQTT connect failed rc=%s", reason_code)
             return
-        for topic in self._topics:
-            client.subscribe(topic, qos=0)
-            LOG.info("Subscribed %s", topic)
+        # One SUBSCRIBE for all wildcard patterns, independent of the number of stations
+        client.subscribe([(topic, 0) for topic in self._topics])
+        LOG.info("Subscribed %s", ", ".join(self._topics))
 
     def _on_disconnect(
         self,
@@ -81,17 +95,11 @@ class IntakeBridge:
     ) -> None:
         LOG.warning("MQTT disconnected: %s", reason_code)
 
-    def _should_publish(self, nfc: str) -> bool:
-        now = time.monotonic()
-        cutoff = now - DEDUP_TTL_SEC
-        stale = [k for k, t in self._last_by_nfc.items() if t < cutoff]
-        for k in stale:
-            del self._last_by_nfc[k]
-        last = self._last_by_nfc.get(nfc)
-        if last is not None and now - last < DEDUP_TTL_SEC:
-            return False
-        self._last_by_nfc[nfc] = now
-        return True
+    def _should_publish(self, serial: str, nfc: str) -> bool:
+        return self._dedupe.should_publish(f"{serial}:{nfc}")
+
+    def _update_gauges(self) -> None:
+        self.stats.set_gauges(pending_acks=len(self._pending_acks), dedupe_entries=len(self._dedupe))
 
     def _on_message(
         self,
@@ -99,46 +107,101 @@ class IntakeBridge:
         _userdata: Any,
         msg: mqtt.MQTTMessage,
     ) -> None:
+        received = time.perf_counter()
+        self.stats.incr("received")
+        route = self._routes.get(msg.topic)
+        if route is None:
+            # Wildcard subscription also delivers other modules' state: dropped before decoding
+            self.stats.incr("unrouted")
+            return
         try:
             raw = msg.payload.decode("utf-8")
             payload = json.loads(raw)
         except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            self.stats.incr("failed")
             LOG.warning("Ignore bad payload on %s: %s", msg.topic, exc)
             return
         if not isinstance(payload, dict):
+            self.stats.incr("ignored")
             return
+        self.stats.incr("processed")
 
-        event = build_intake_event(payload)
+        event = route.extract(payload)
         if not event:
+            self.stats.incr("ignored")
             return
         nfc = str(event["nfc"])
-        if not self._should_publish(nfc):
-            LOG.debug("Dedup skip nfc=%s", nfc)
+        if not self._should_publish(route.serial, nfc):
+            self.stats.incr("deduplicated")
+            LOG.debug("Dedup skip station=%s nfc=%s", route.serial, nfc)
             return
+        event["station"] = route.serial
 
         body = json.dumps(event, separators=(",", ":"))
-        info = client.publish(self.publish_topic, body, qos=0, retain=False)
+        info = client.publish(self.publish_topic, body, qos=self.publish_qos, retain=False)
+        published = time.perf_counter()
         if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            self.stats.incr("failed")
             LOG.error("Publish failed rc=%s topic=%s", info.rc, self.publish_topic)
             return
+        self.stats.incr("published")
+        self.stats.observe("handling_latency_ms", (published - received) * 1000)
+        source_epoch = iso_to_epoch(event["timestamp"])
+        if source_epoch is not None:
+            self.stats.observe("source_latency_ms", (time.time() - source_epoch) * 1000)
+        if self.publish_qos:
+            self._pending_acks[info.mid] = published
+        self._update_gauges()
         LOG.info(
-            "Published %s nfc=%s productRaw=%s",
+            "Published %s station=%s nfc=%s productRaw=%s",
             self.publish_topic,
+            route.serial,
             nfc,
             event.get("productRaw"),
         )
 
+    def _on_publish(
+        self,
+        _client: mqtt.Client,
+        _userdata: Any,
+        mid: int,
+        _reason_code: Any = None,
+        _properties: Any = None,
+    ) -> None:
+        sent = self._pending_acks.pop(mid, None)
+        if sent is None:
+            return
+        self.stats.incr("acked")
+        self.stats.observe("ack_latency_ms", (time.perf_counter() - sent) * 1000)
+        self._update_gauges()
+
+    def _log_stats_periodically(self) -> None:
+        while not self._stop_stats.wait(self.stats_interval_sec):
+            LOG.info("Stats %s", self.stats.log_line())
+
     def run(self) -> None:
         LOG.info(
-            "Starting bridge host=%s:%s publish=%s dps=%s",
+            "Starting bridge host=%s:%s publish=%s qos=%s stations=%s subscribe=%s",
             self.host,
             self.port,
             self.publish_topic,
-            self.dps_serial,
+            self.publish_qos,
+            ",".join(self.stations),
+            ",".join(self._topics),
         )
+        if self.stats_port:
+            start_stats_server(self.stats, self.stats_port)
+            LOG.info("Stats endpoint on :%s", self.stats_port)
+        if self.stats_interval_sec > 0:
+            threading.Thread(target=self._log_stats_periodically, name="intake-bridge-stats-log", daemon=True).start()
         self._client.connect(self.host, self.port, keepalive=60)
         self._client.loop_forever()
 
+    def stop(self) -> None:
+        self._stop_stats.set()
+        LOG.info("Stats %s", self.stats.log_line())
+        self._client.disconnect()
+
 
 def main() -> None:
     logging.basicConfig(
@@ -150,7 +213,7 @@ def main() -> None:
 
     def _stop(_signum: int, _frame: Any) -> None:
         LOG.info("Shutting down")
-        bridge._client.disconnect()
+        bridge.stop()
         sys.exit(0)
 
     signal.signal(signal.SIGTERM, _stop)
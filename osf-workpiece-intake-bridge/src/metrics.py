@@ -0,0 +1,149 @@
+"""Bridge runtime metrics: O(1) TTL dedupe, counters, latency samples, text exposition."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+LATENCY_SAMPLES = 1024
+METRIC_PREFIX = "intake_bridge"
+
+
+class TtlDedupe:
+    """
+    NFC → last publish time, oldest first.
+
+    The TTL is constant, so insertion order equals expiry order: expired entries are popped
+    from the front (amortised O(1) per call) instead of scanning the whole map.
+    """
+
+    def __init__(self, ttl_sec: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl_sec = ttl_sec
+        self._clock = clock
+        self._last: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._last)
+
+    def should_publish(self, key: str) -> bool:
+        """True (and remembered) unless ``key`` was accepted within the TTL."""
+        now = self._clock()
+        cutoff = now - self.ttl_sec
+        while self._last:
+            oldest_key, oldest = next(iter(self._last.items()))
+            if oldest > cutoff:
+                break
+            del self._last[oldest_key]
+        if key in self._last:
+            return False
+        self._last[key] = now
+        return True
+
+
+def iso_to_epoch(timestamp: str) -> float | None:
+    try:
+        dt = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def percentile(samples: list[float], q: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round((len(ordered) - 1) * q / 100)))
+    return ordered[index]
+
+
+class BridgeStats:
+    """
+    Thread-safe counters and recent latency samples.
+
+    - ``source_latency_ms``: APS action timestamp → publish (includes clock skew APS ↔ RPi)
+    - ``handling_latency_ms``: message callback entry → publish call returned
+    - ``ack_latency_ms``: publish → PUBACK (QoS1 only)
+    """
+
+    COUNTERS = ("received", "unrouted", "processed", "ignored", "published", "deduplicated", "failed", "acked")
+    LATENCIES = ("source_latency_ms", "handling_latency_ms", "ack_latency_ms")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self._latencies = {name: deque(maxlen=LATENCY_SAMPLES) for name in self.LATENCIES}
+        self.pending_acks = 0
+        self.dedupe_size = 0
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def set_gauges(self, *, pending_acks: int, dedupe_entries: int) -> None:
+        with self._lock:
+            self.pending_acks = pending_acks
+            self.dedupe_size = dedupe_entries
+
+    def observe(self, name: str, value_ms: float) -> None:
+        with self._lock:
+            self._latencies[name].append(value_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            latencies = {name: list(samples) for name, samples in self._latencies.items()}
+            pending, dedupe_size = self.pending_acks, self.dedupe_size
+        uptime = time.monotonic() - self.started
+        snapshot: dict[str, Any] = {
+            "uptime_sec": round(uptime, 1),
+            **counters,
+            "pending_acks": pending,
+            "dedupe_entries": dedupe_size,
+            "published_per_sec": round(counters["published"] / uptime, 3) if uptime > 0 else 0.0,
+        }
+        for name, samples in latencies.items():
+            for q in (50, 99):
+                value = percentile(samples, q)
+                snapshot[f"{name}_p{q}"] = round(value, 2) if value is not None else None
+        return snapshot
+
+    def render_text(self) -> str:
+        """``intake_bridge_<name> <value>`` per line (Prometheus text style; unknown values omitted)."""
+        lines = []
+        for name, value in self.snapshot().items():
+            if value is None:
+                continue
+            suffix = "_total" if name in self.COUNTERS else ""
+            lines.append(f"{METRIC_PREFIX}_{name}{suffix} {value}")
+        return "\n".join(lines) + "\n"
+
+    def log_line(self) -> str:
+        snap = self.snapshot()
+        return " ".join(f"{key}={value}" for key, value in snap.items() if value is not None)
+
+
+def start_stats_server(stats: BridgeStats, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve ``stats.render_text()`` on every GET path from a daemon thread."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 (http.server API)
+            body = stats.render_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, _format: str, *_args: Any) -> None:
+            return
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="intake-bridge-stats", daemon=True).start()
+    return server
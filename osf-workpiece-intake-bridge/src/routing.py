@@ -0,0 +1,69 @@
+"""Station routing: one wildcard subscription, precomputed topic → station map."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, NamedTuple
+
+from intake import build_intake_event
+
+# Node-RED enriched state is primary; TXT direct state as fallback.
+DEFAULT_TOPIC_TEMPLATES = (
+    "module/v1/ff/NodeRed/{serial}/state",
+    "module/v1/ff/{serial}/state",
+)
+
+Extractor = Callable[[dict[str, Any]], "dict[str, Any] | None"]
+
+EXTRACTORS: dict[str, Extractor] = {
+    "dps": build_intake_event,
+}
+DEFAULT_EXTRACTOR = "dps"
+
+
+class Route(NamedTuple):
+    serial: str
+    extract: Extractor
+
+
+def parse_stations(spec: str) -> dict[str, str]:
+    """``"SVR4H73275,SVR4XXXX:dps"`` → ``{serial: extractor_name}`` (extractor defaults to ``dps``)."""
+    stations: dict[str, str] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        serial, _, kind = item.partition(":")
+        kind = kind.strip().lower() or DEFAULT_EXTRACTOR
+        if kind not in EXTRACTORS:
+            raise ValueError(f"Unknown extractor {kind!r} for station {serial!r} (known: {', '.join(EXTRACTORS)})")
+        stations[serial.strip()] = kind
+    if not stations:
+        raise ValueError("No station serials configured")
+    return stations
+
+
+def parse_templates(spec: str) -> tuple[str, ...]:
+    templates = tuple(t.strip() for t in spec.split(",") if t.strip())
+    for template in templates:
+        if template.count("{serial}") != 1 or any(c in template for c in "+#"):
+            raise ValueError(f"Topic template needs exactly one {{serial}} and no wildcards: {template!r}")
+    return templates or DEFAULT_TOPIC_TEMPLATES
+
+
+def source_topics(serial: str, templates: tuple[str, ...] = DEFAULT_TOPIC_TEMPLATES) -> list[str]:
+    return [template.format(serial=serial) for template in templates]
+
+
+def subscription_patterns(templates: tuple[str, ...] = DEFAULT_TOPIC_TEMPLATES) -> list[str]:
+    """One wildcard subscription per template, independent of the number of stations."""
+    return [template.format(serial="+") for template in templates]
+
+
+def build_routes(stations: dict[str, str], templates: tuple[str, ...] = DEFAULT_TOPIC_TEMPLATES) -> dict[str, Route]:
+    """Exact topic → ``Route``; topics matched by the wildcard but not listed here are dropped unparsed."""
+    routes: dict[str, Route] = {}
+    for serial, kind in stations.items():
+        route = Route(serial, EXTRACTORS[kind])
+        for topic in source_topics(serial, templates):
+            routes[topic] = route
+    return routes
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import sys
+import urllib.request
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(ROOT))
+
+import paho.mqtt.client as mqtt  # noqa: E402
+from bridge import IntakeBridge  # noqa: E402
+from metrics import BridgeStats, TtlDedupe, start_stats_server  # noqa: E402
+from routing import parse_stations, parse_templates, source_topics  # noqa: E402
+
+DPS_TOPIC = "module/v1/ff/NodeRed/SVR4H73275/state"
+
+
+class FakeClient:
+    def __init__(self, rc: int = mqtt.MQTT_ERR_SUCCESS) -> None:
+        self.rc = rc
+        self.published: list[tuple[str, dict, int]] = []
+
+    def publish(self, topic: str, body: str, qos: int = 0, retain: bool = False) -> SimpleNamespace:
+        self.published.append((topic, json.loads(body), qos))
+        return SimpleNamespace(rc=self.rc, mid=len(self.published))
+
+
+def _message(nfc: str, state: str = "FINISHED", topic: str = DPS_TOPIC) -> SimpleNamespace:
+    payload = {
+        "actionState": {
+            "command": "RGB_NFC",
+            "state": state,
+            "result": nfc,
+            "metadata": {"type": "WHITE"},
+            "timestamp": "2026-08-07T09:11:46.905Z",
+        }
+    }
+    return SimpleNamespace(topic=topic, payload=json.dumps(payload).encode())
+
+
+def test_ttl_dedupe_expires_oldest_first() -> None:
+    now = [0.0]
+    dedupe = TtlDedupe(5.0, clock=lambda: now[0])
+    assert dedupe.should_publish("a")
+    assert not dedupe.should_publish("a")
+    now[0] = 3.0
+    assert dedupe.should_publish("b")
+    now[0] = 5.0
+    assert dedupe.should_publish("a")
+    assert len(dedupe) == 2
+    now[0] = 20.0
+    assert dedupe.should_publish("c")
+    assert len(dedupe) == 1
+
+
+def test_bridge_counts_and_dedupes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PUBLISH_QOS", "1")
+    bridge = IntakeBridge()
+    client = FakeClient()
+
+    bridge._on_message(client, None, _message("nfc-1"))
+    bridge._on_message(client, None, _message("nfc-1"))
+    bridge._on_message(client, None, _message("nfc-2", state="RUNNING"))
+    bridge._on_message(client, None, SimpleNamespace(topic=DPS_TOPIC, payload=b"{not json"))
+    bridge._on_message(client, None, SimpleNamespace(topic="module/v1/ff/SVR3QA0022/state", payload=b"{}"))
+
+    assert [(topic, body["nfc"], body["station"], qos) for topic, body, qos in client.published] == [
+        ("osf/workpiece/intake", "nfc-1", "SVR4H73275", 1)
+    ]
+    snap = bridge.stats.snapshot()
+    assert snap["received"] == 5
+    assert snap["unrouted"] == 1
+    assert snap["processed"] == 3
+    assert snap["published"] == 1
+    assert snap["deduplicated"] == 1
+    assert snap["ignored"] == 1
+    assert snap["failed"] == 1
+    assert snap["pending_acks"] == 1
+    assert snap["handling_latency_ms_p99"] is not None
+
+    bridge._on_publish(client, None, 1)
+    bridge._on_publish(client, None, 99)
+    snap = bridge.stats.snapshot()
+    assert snap["acked"] == 1
+    assert snap["pending_acks"] == 0
+
+
+def test_publish_failure_is_counted() -> None:
+    bridge = IntakeBridge()
+    bridge._on_message(FakeClient(rc=mqtt.MQTT_ERR_NO_CONN), None, _message("nfc-1"))
+    snap = bridge.stats.snapshot()
+    assert snap["failed"] == 1
+    assert snap["published"] == 0
+
+
+def test_multi_station_routing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("STATION_SERIALS", "SVR4H73275, SVR0000002:dps")
+    bridge = IntakeBridge()
+    assert bridge._topics == ["module/v1/ff/NodeRed/+/state", "module/v1/ff/+/state"]
+    client = FakeClient()
+
+    bridge._on_message(client, None, _message("nfc-1"))
+    bridge._on_message(client, None, _message("nfc-1", topic="module/v1/ff/SVR0000002/state"))
+    bridge._on_message(client, None, _message("nfc-1", topic="module/v1/ff/NodeRed/SVR0000002/state"))
+    bridge._on_message(client, None, _message("nfc-1", topic="module/v1/ff/SVR9999999/state"))
+
+    assert [body["station"] for _topic, body, _qos in client.published] == ["SVR4H73275", "SVR0000002"]
+    snap = bridge.stats.snapshot()
+    assert snap["deduplicated"] == 1
+    assert snap["unrouted"] == 1
+
+
+def test_station_config_validation() -> None:
+    assert parse_stations("A,B:dps") == {"A": "dps", "B": "dps"}
+    assert source_topics("A", parse_templates("x/{serial}/state")) == ["x/A/state"]
+    with pytest.raises(ValueError):
+        parse_stations("A:unknown")
+    with pytest.raises(ValueError):
+        parse_templates("module/+/{serial}/state")
+
+
+def test_invalid_qos_rejected(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PUBLISH_QOS", "2")
+    with pytest.raises(ValueError):
+        IntakeBridge()
+
+
+def test_stats_endpoint_serves_text() -> None:
+    stats = BridgeStats()
+    stats.incr("published", 3)
+    stats.observe("handling_latency_ms", 1.5)
+    server = start_stats_server(stats, 0, host="127.0.0.1")
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics", timeout=5) as response:
+            text = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+    assert "intake_bridge_published_total 3" in text
+    assert "intake_bridge_handling_latency_ms_p50 1.5" in text
+    assert "ack_latency" not in text
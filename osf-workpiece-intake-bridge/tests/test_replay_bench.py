@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCH = Path(__file__).resolve().parents[1] / "bench"
+sys.path.insert(0, str(BENCH))
+
+import replay_bench  # noqa: E402
+
+
+def _line(topic: str, timestamp: str, nfc: str | None, state: str = "FINISHED") -> str:
+    action = {"command": "RGB_NFC", "state": state, "metadata": {"type": "RED"}, "timestamp": timestamp}
+    if nfc:
+        action["result"] = nfc
+    return json.dumps({"topic": topic, "payload": json.dumps({"actionState": action}), "timestamp": timestamp})
+
+
+@pytest.fixture()
+def session_file(tmp_path: Path) -> Path:
+    node_red = "module/v1/ff/NodeRed/SVR4H73275/state"
+    direct = "module/v1/ff/SVR4H73275/state"
+    lines = [
+        _line(node_red, "2026-08-04T10:00:00.000Z", None, state="RUNNING"),
+        _line(node_red, "2026-08-04T10:00:01.000Z", "nfc-a"),
+        _line(direct, "2026-08-04T10:00:02.000Z", "nfc-a"),
+        _line("module/v1/ff/SVR4H76530/state", "2026-08-04T10:00:03.000Z", "nfc-x"),
+        _line(node_red, "2026-08-04T10:01:00.000Z", "nfc-b"),
+        _line(direct, "2026-08-04T10:01:01.000Z", "nfc-b"),
+    ]
+    path = tmp_path / "dps-session.log"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_replay_matches_expected_reads(session_file: Path) -> None:
+    sessions = replay_bench.load_sessions([session_file])
+    assert len(sessions[0]["messages"]) == 6
+    assert sessions[0]["expected"] == {"nfc-a", "nfc-b"}
+
+    result = replay_bench.run_replay(sessions, repeat=3, qos=1)
+    assert result["mismatches"] == []
+    assert result["published"] == result["expected"] == 6
+    assert result["deduplicated"] == 6
+    assert result["unrouted"] == 3
+    assert result["acked"] == 6
+    assert result["handling_us_p99"] is not None
+
+
+def test_replay_detects_broken_dedupe(session_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(replay_bench, "DEDUP_TTL_SEC", 0.0)
+    result = replay_bench.run_replay(replay_bench.load_sessions([session_file]), repeat=1)
+    assert result["mismatches"]
+    assert result["published"] == 4
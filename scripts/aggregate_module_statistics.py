@@ -3,13 +3,23 @@
 Aggregiert Statistiken aus allen Modul-Analysen (HBW, DRILL, MILL, DPS, AIQS)
 
 Erstellt eine Gesamt-Übersicht ähnlich ANALYSIS_SUMMARY.md, aber für alle Module.
+
+Ausgewertet werden die aktuellen Session-Dateien (data/osf-data/sessions/*.log): pro Session der
+Eintrag aus data/osf-data/analysis-cache (siehe analyze_all_sessions.py), sofern er zur Datei passt
+(Größe/mtime bzw. Content-Hash, Analyser-Version); sonst die <session>_metadata.json des
+Analyse-Verzeichnisses. Mit --refresh werden vorher nur neue/geänderte Sessions analysiert.
 """
 
+import argparse
 import json
+import os
 import sys
 from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from analyze_all_sessions import CACHE_DIRNAME, load_cached_summaries, run_incremental
+from session_log_stream import list_session_files
 
 MODULES = {
     "hbw": {"serial": "SVR3QA0022", "analysis_dir": "data/osf-data/hbw-analysis"},
@@ -37,9 +47,39 @@ def load_metadata_files(analysis_dir: Path) -> List[Dict[str, Any]]:
     return metadata_list
 
 
-def aggregate_module_stats(module_name: str, analysis_dir: Path) -> Dict[str, Any]:
-    """Aggregiert Statistiken für ein Modul"""
-    metadata_list = load_metadata_files(analysis_dir)
+def load_session_summaries(
+    module_name: str, analysis_dir: Path, session_paths: List[Path], cache_dir: Optional[Path] = None
+) -> List[Dict[str, Any]]:
+    """Eine Zusammenfassung pro Session: gültiger Cache-Eintrag, sonst <session>_metadata.json"""
+    cached = load_cached_summaries(cache_dir, module_name, session_paths) if cache_dir is not None else {}
+    metadata_list = []
+    for session_path in session_paths:
+        summary = cached.get(session_path.stem)
+        if summary is None:
+            metadata_file = analysis_dir / f"{session_path.stem}_metadata.json"
+            if not metadata_file.exists():
+                continue
+            try:
+                with open(metadata_file, encoding="utf-8") as f:
+                    summary = json.load(f)
+            except Exception as e:
+                print(f"⚠️  Fehler beim Laden von {metadata_file}: {e}", file=sys.stderr)
+                continue
+        metadata_list.append(summary)
+    return metadata_list
+
+
+def aggregate_module_stats(
+    module_name: str,
+    analysis_dir: Path,
+    cache_dir: Optional[Path] = None,
+    session_paths: Optional[List[Path]] = None,
+) -> Dict[str, Any]:
+    """Aggregiert Statistiken für ein Modul über die angegebenen Sessions (ohne Angabe: alle Metadata-Dateien)"""
+    if session_paths:
+        metadata_list = load_session_summaries(module_name, analysis_dir, session_paths, cache_dir)
+    else:
+        metadata_list = load_metadata_files(analysis_dir)
 
     if not metadata_list:
         return {
@@ -105,8 +145,24 @@ def aggregate_module_stats(module_name: str, analysis_dir: Path) -> Dict[str, An
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Aggregiert Statistiken aus allen Modul-Analysen")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Vorher neue/geänderte Sessions analysieren (analyze_all_sessions, inkrementell)",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker-Prozesse für --refresh")
+    args = parser.parse_args()
+
     project_root = Path(__file__).parent.parent
-    output_file = project_root / "data/osf-data/MODULE_ANALYSIS_SUMMARY.md"
+    output_root = project_root / "data/osf-data"
+    output_file = output_root / "MODULE_ANALYSIS_SUMMARY.md"
+    cache_dir = output_root / CACHE_DIRNAME
+
+    session_paths = list_session_files()
+    if args.refresh:
+        result = run_incremental(session_paths, list(MODULES), output_root, jobs=max(1, args.jobs))
+        print(f"♻️  {len(result.cached)} Sessions aus Cache, {len(result.analysed)} neu analysiert\n")
 
     all_stats = {}
 
@@ -114,7 +170,9 @@ def main():
 
     for module_name, config in MODULES.items():
         analysis_dir = project_root / config["analysis_dir"]
-        stats = aggregate_module_stats(module_name, analysis_dir)
+        stats = aggregate_module_stats(
+            module_name, analysis_dir, cache_dir if cache_dir.is_dir() else None, session_paths
+        )
         all_stats[module_name] = stats
 
         print(f"✅ {module_name.upper()}:")
@@ -12,8 +12,11 @@ import json
 import sys
 from collections import Counter, defaultdict
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from session_log_stream import collect_window_context, decode_message_payloads, payload_has_command
 
 # AIQS Serial ID
 AIQS_SERIAL = "SVR4H76530"
@@ -81,6 +84,7 @@ def load_session_log(log_file: Path) -> List[Dict[str, Any]]:
     return messages
 
 
+@lru_cache(maxsize=None)
 def is_aiqs_relevant(topic: str) -> bool:
     """Prüft ob ein Topic AIQS-relevant ist"""
     # Direkte AIQS-Topics
@@ -108,6 +112,7 @@ def is_aiqs_relevant(topic: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=None)
 def categorize_topic(topic: str) -> str:
     """Kategorisiert ein Topic"""
     if f"/{AIQS_SERIAL}/" in topic:
@@ -144,81 +149,37 @@ def categorize_topic(topic: str) -> str:
         return "other"
 
 
-def extract_check_quality_context(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def extract_check_quality_context(
+    messages: List[Dict[str, Any]], payloads: Optional[List[Any]] = None
+) -> List[Dict[str, Any]]:
     """
     Extrahiert Messages im Kontext von CHECK_QUALITY
 
+    Fenster: 30 Messages vor, 50 nach jedem Command (überlappende Fenster zusammengefasst).
+
     Returns:
         Liste von Messages im Kontext von CHECK_QUALITY
     """
-    context_messages = []
-    check_quality_indices = []
+    if payloads is None:
+        payloads = decode_message_payloads(messages)
 
-    # Finde alle CHECK_QUALITY Messages
-    for i, msg in enumerate(messages):
-        try:
-            payload = json.loads(msg["payload"]) if isinstance(msg["payload"], str) else msg["payload"]
-
-            # Prüfe ob es eine CHECK_QUALITY Message ist
-            if isinstance(payload, dict):
-                # Direkt in actionState
-                if "actionState" in payload:
-                    action_state = payload.get("actionState", {})
-                    if isinstance(action_state, dict) and action_state.get("command") == "CHECK_QUALITY":
-                        check_quality_indices.append(i)
-
-                # In actionStates Array
-                if "actionStates" in payload:
-                    for action in payload.get("actionStates", []):
-                        if isinstance(action, dict) and action.get("command") == "CHECK_QUALITY":
-                            check_quality_indices.append(i)
-                            break
-
-                # In CCU Order completed (productionSteps)
-                if "productionSteps" in payload:
-                    for step in payload.get("productionSteps", []):
-                        if isinstance(step, dict) and step.get("command") == "CHECK_QUALITY":
-                            check_quality_indices.append(i)
-                            break
-
-                # In CCU Order completed Array
-                if isinstance(payload, list):
-                    for item in payload:
-                        if isinstance(item, dict) and "productionSteps" in item:
-                            for step in item.get("productionSteps", []):
-                                if isinstance(step, dict) and step.get("command") == "CHECK_QUALITY":
-                                    check_quality_indices.append(i)
-                                    break
-        except (json.JSONDecodeError, TypeError, KeyError):
-            pass
-
-    # Sammle Messages vor und nach CHECK_QUALITY
-    for idx in check_quality_indices:
-        # Vor: 30 Messages, Nach: 50 Messages
-        start_idx = max(0, idx - 30)
-        end_idx = min(len(messages), idx + 50)
-
-        for j in range(start_idx, end_idx):
-            if is_aiqs_relevant(messages[j]["topic"]):
-                context_messages.append(messages[j])
-
-    # Entferne Duplikate (behalte erste Vorkommen)
-    seen = set()
-    unique_messages = []
-    for msg in context_messages:
-        msg_id = (msg["topic"], msg.get("timestamp", ""))
-        if msg_id not in seen:
-            seen.add(msg_id)
-            unique_messages.append(msg)
-
-    return unique_messages
+    check_quality_indices = [
+        i
+        for i, payload in enumerate(payloads)
+        if payload_has_command(payload, ("CHECK_QUALITY",), include_action=False)
+    ]
+    return collect_window_context(messages, check_quality_indices, 30, 50, is_aiqs_relevant)
 
 
 def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Analysiert eine Session und extrahiert AIQS-relevante Informationen"""
 
+    # Payloads einmal dekodieren (Statistik und Kontext-Extraktion)
+    payloads = decode_message_payloads(messages)
+
     # Filtere AIQS-relevante Messages
-    aiqs_messages = [msg for msg in messages if is_aiqs_relevant(msg["topic"])]
+    aiqs_indices = [i for i, msg in enumerate(messages) if is_aiqs_relevant(msg["topic"])]
+    aiqs_messages = [messages[i] for i in aiqs_indices]
 
     # Topic-Statistiken
     topic_counter = Counter(msg["topic"] for msg in aiqs_messages)
@@ -238,9 +199,10 @@ def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
     commands_found = Counter()
     check_quality_results = []
 
-    for msg in aiqs_messages:
+    for i in aiqs_indices:
+        msg = messages[i]
+        payload = payloads[i]
         try:
-            payload = json.loads(msg["payload"]) if isinstance(msg["payload"], str) else msg["payload"]
             if isinstance(payload, dict):
                 # Zähle wichtige Felder
                 if "orderId" in payload:
@@ -286,11 +248,11 @@ def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
                     payload_stats["has_workpieceId"] += 1
                 if "type" in payload:
                     payload_stats["has_type"] += 1
-        except (json.JSONDecodeError, TypeError):
+        except TypeError:
             pass
 
     # Extrahiere CHECK_QUALITY Kontext
-    check_quality_context = extract_check_quality_context(messages)
+    check_quality_context = extract_check_quality_context(messages, payloads=payloads)
 
     return {
         "total_messages": len(messages),
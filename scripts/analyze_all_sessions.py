@@ -0,0 +1,620 @@
+#!/usr/bin/env python3
+"""
+Multi-Modul Session Analyzer (Single-Pass)
+
+Führt die Auswertungen von analyze_{drill,mill,hbw,dps,aiqs,fts}_sessions.py in einem
+Durchlauf aus: jede Session wird einmal gelesen, jede Payload einmal dekodiert und über
+einen kompilierten Topic→Modul-Router an die Modul-Analyser verteilt.
+
+Die Ausgaben (Metadata, Kategorien, Operationen, Kontext-Dateien) sind identisch zu den
+Einzel-Skripten; geschrieben wird über deren save_*_data-Funktionen nach
+data/osf-data/<modul>-analysis.
+
+Sessions werden parallel (ein Prozess pro Session) und inkrementell ausgewertet:
+Zusammenfassungen liegen pro Session in data/osf-data/analysis-cache/<session>.json,
+gekoppelt an Content-Hash der .log-Datei und ANALYSER_VERSION. Unveränderte Sessions werden
+übersprungen; aggregate_module_statistics.py liest diese Einträge.
+
+Usage:
+    python scripts/analyze_all_sessions.py                         # alle Sessions, alle Module
+    python scripts/analyze_all_sessions.py data/osf-data/sessions/auftrag-blau_1.log
+    python scripts/analyze_all_sessions.py --modules drill mill    # nur ausgewählte Module
+    python scripts/analyze_all_sessions.py --jobs 1 --force        # sequentiell, Cache ignorieren
+"""
+
+from __future__ import annotations
+
+import abc
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import analyze_aiqs_sessions as aiqs_script
+import analyze_dps_sessions as dps_script
+import analyze_drill_sessions as drill_script
+import analyze_fts_sessions as fts_script
+import analyze_hbw_sessions as hbw_script
+import analyze_mill_sessions as mill_script
+from session_log_stream import (
+    REPO_ROOT,
+    collect_window_context,
+    decode_payload,
+    iter_session_messages,
+    list_session_files,
+)
+
+DEFAULT_OUTPUT_ROOT = REPO_ROOT / "data/osf-data"
+CACHE_DIRNAME = "analysis-cache"
+
+# Bei Änderungen an Analyse-Logik oder Ausgabeformat erhöhen (invalidiert den Cache)
+ANALYSER_VERSION = 1
+
+# Kontextfenster der Einzel-Skripte (Anzahl Messages vor/nach einem Treffer)
+ORDER_WINDOW = (50, 100)
+COMMAND_WINDOW = (30, 50)
+
+
+@dataclass(frozen=True)
+class PayloadFeatures:
+    """Einmal pro Message berechnete Merkmale für die Kontext-Trefferprüfung."""
+
+    order_type: Any = None
+    state_commands: frozenset = frozenset()
+    action_command: Any = None
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> PayloadFeatures | None:
+        # Wie in den Einzel-Skripten werden nur Dict-Payloads geprüft
+        if not isinstance(payload, dict):
+            return None
+        commands = set()
+        action_state = payload.get("actionState")
+        if isinstance(action_state, dict):
+            commands.add(_hashable(action_state.get("command")))
+        for key in ("actionStates", "productionSteps"):
+            entries = payload.get(key)
+            if isinstance(entries, list):
+                commands.update(_hashable(e.get("command")) for e in entries if isinstance(e, dict))
+        action = payload.get("action")
+        return cls(
+            order_type=_hashable(payload.get("orderType")),
+            state_commands=frozenset(commands),
+            action_command=_hashable(action.get("command")) if isinstance(action, dict) else None,
+        )
+
+
+def _hashable(value: Any) -> Any:
+    return value if isinstance(value, (str, int, float, bool, type(None))) else None
+
+
+@dataclass(frozen=True)
+class ContextSpec:
+    """Kontext-Extraktion: Treffer (Order-Typ oder Command) plus Fenster um den Treffer."""
+
+    key: str
+    order_type: str | None = None
+    commands: frozenset = frozenset()
+    include_action: bool = True
+    window: tuple[int, int] = COMMAND_WINDOW
+
+    def matches(self, features: PayloadFeatures) -> bool:
+        if self.order_type is not None:
+            return features.order_type == self.order_type
+        if features.state_commands & self.commands:
+            return True
+        return self.include_action and features.action_command in self.commands
+
+
+class ModuleAnalyser(abc.ABC):
+    """Basis: Topic-Statistik, Zeitbereich und Kontext-Extraktion für ein Modul."""
+
+    def __init__(
+        self,
+        name: str,
+        relevant: Callable[[str], bool],
+        categorize: Callable[[str], str],
+        contexts: tuple[ContextSpec, ...] = (),
+    ):
+        self.name = name
+        self.relevant = relevant
+        self.categorize = categorize
+        self.contexts = contexts
+        self.relevant_indices: list[int] = []
+        self.topic_counts: Counter = Counter()
+        self.topic_categories: Counter = Counter()
+        self.payload_stats: Counter = Counter()
+        self.start_time: str | None = None
+        self.end_time: str | None = None
+        self.context_hits: dict[str, list[int]] = {spec.key: [] for spec in contexts}
+
+    def observe(self, index: int, message: dict[str, Any], payload: Any) -> None:
+        """Eine modulrelevante Message auswerten."""
+        self.relevant_indices.append(index)
+        topic = message["topic"]
+        self.topic_counts[topic] += 1
+        self.topic_categories[self.categorize(topic)] += 1
+        timestamp = message.get("timestamp")
+        if timestamp is not None:
+            if self.start_time is None or timestamp < self.start_time:
+                self.start_time = timestamp
+            if self.end_time is None or timestamp > self.end_time:
+                self.end_time = timestamp
+        if isinstance(payload, dict):
+            try:
+                self.collect(message, payload)
+            except TypeError:
+                pass
+
+    def scan(self, index: int, features: PayloadFeatures) -> None:
+        """Kontext-Treffer registrieren (wird für jede Message der Session aufgerufen)."""
+        for spec in self.contexts:
+            if spec.matches(features):
+                self.context_hits[spec.key].append(index)
+
+    @abc.abstractmethod
+    def collect(self, message: dict[str, Any], payload: dict[str, Any]) -> None:
+        """Modulspezifische Auswertung einer Dict-Payload."""
+
+    def extract_context(self, spec: ContextSpec, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        before, after = spec.window
+        return collect_window_context(
+            messages, self.context_hits[spec.key], before, after, self.relevant, self.relevant_indices
+        )
+
+    def finish(self, messages: list[dict[str, Any]]) -> dict[str, Any]:
+        """Analyse-Dict im Format von analyze_session() des Einzel-Skripts."""
+        analysis: dict[str, Any] = {
+            "total_messages": len(messages),
+            f"{self.name}_relevant_messages": len(self.relevant_indices),
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "topic_counts": dict(self.topic_counts),
+            "topic_categories": dict(self.topic_categories),
+            "payload_stats": dict(self.payload_stats),
+            "messages": [messages[i] for i in self.relevant_indices],
+        }
+        for spec in self.contexts:
+            context = self.extract_context(spec, messages)
+            analysis[spec.key] = context
+            analysis[f"{spec.key}_count"] = len(context)
+        return analysis
+
+
+class StationAnalyser(ModuleAnalyser):
+    """DRILL, MILL, HBW, DPS, AIQS: Commands, Operationen und Payload-Statistik."""
+
+    def __init__(
+        self,
+        *args: Any,
+        commands: tuple[str, ...],
+        operations_key: str | None = None,
+        operation_duration: bool = False,
+        count_action_commands: bool = False,
+        storage_info: bool = False,
+        check_quality_results: bool = False,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.commands = commands
+        self.operations_key = operations_key
+        self.operation_duration = operation_duration
+        self.count_action_commands = count_action_commands
+        self.storage_info = storage_info
+        self.check_quality = check_quality_results
+        self.commands_found: Counter = Counter()
+        self.operations: list[dict[str, Any]] = []
+        self.check_quality_results: list[dict[str, Any]] = []
+
+    def _record_command(self, message: dict[str, Any], action: dict[str, Any], with_state: bool) -> None:
+        command = action["command"]
+        self.commands_found[command] += 1
+        if self.operations_key and command in self.commands:
+            metadata = action.get("metadata") if isinstance(action.get("metadata"), dict) else None
+            operation = {"timestamp": message.get("timestamp"), "topic": message["topic"], "command": command}
+            if with_state:
+                operation["state"] = action.get("state")
+            operation["id"] = action.get("id")
+            operation["workpieceId"] = metadata.get("workpieceId") if metadata is not None else None
+            operation["type"] = metadata.get("type") if metadata is not None else None
+            if self.operation_duration:
+                operation["duration"] = metadata.get("duration") if metadata is not None else None
+            self.operations.append(operation)
+        if self.check_quality and command == "CHECK_QUALITY":
+            self.check_quality_results.append(
+                {
+                    "timestamp": message.get("timestamp"),
+                    "topic": message["topic"],
+                    "result": action.get("result"),
+                    "state": action.get("state"),
+                    "id": action.get("id"),
+                }
+            )
+
+    def collect(self, message: dict[str, Any], payload: dict[str, Any]) -> None:
+        stats = self.payload_stats
+        if "orderId" in payload:
+            stats["has_orderId"] += 1
+        if "actionState" in payload:
+            stats["has_actionState"] += 1
+            action_state = payload.get("actionState", {})
+            if isinstance(action_state, dict) and "command" in action_state:
+                self._record_command(message, action_state, with_state=True)
+        if "actionStates" in payload:
+            for action in payload.get("actionStates", []):
+                if isinstance(action, dict) and "command" in action:
+                    self._record_command(message, action, with_state=True)
+        if self.count_action_commands and "action" in payload:
+            action = payload.get("action", {})
+            if isinstance(action, dict) and "command" in action:
+                self._record_command(message, action, with_state=False)
+        if "workpieceId" in payload or any("workpieceId" in str(v) for v in payload.values()):
+            stats["has_workpieceId"] += 1
+        if "type" in payload:
+            stats["has_type"] += 1
+        if self.storage_info and ("slots" in payload or "inventory" in payload or "stock" in payload):
+            stats["has_storage_info"] += 1
+
+    def finish(self, messages: list[dict[str, Any]]) -> dict[str, Any]:
+        analysis = super().finish(messages)
+        analysis["commands_found"] = dict(self.commands_found)
+        if self.operations_key:
+            analysis[self.operations_key] = self.operations
+            analysis[f"{self.operations_key}_count"] = len(self.operations)
+        if self.check_quality:
+            analysis["check_quality_results"] = self.check_quality_results
+        return analysis
+
+
+class FtsAnalyser(ModuleAnalyser):
+    """FTS: Topic-Statistik und Payload-Felder (keine Kontext-Extraktion)."""
+
+    def collect(self, message: dict[str, Any], payload: dict[str, Any]) -> None:
+        stats = self.payload_stats
+        if "orderId" in payload:
+            stats["has_orderId"] += 1
+        if "actionState" in payload:
+            stats["has_actionState"] += 1
+        if "batteryState" in payload:
+            stats["has_batteryState"] += 1
+        if "load" in payload:
+            stats["has_load"] += 1
+
+
+def _production_station(name: str, script: Any, commands: list[str]) -> StationAnalyser:
+    command_set = frozenset(commands)
+    return StationAnalyser(
+        name,
+        getattr(script, f"is_{name}_relevant"),
+        script.categorize_topic,
+        contexts=(
+            ContextSpec("production_order_context", order_type="PRODUCTION", window=ORDER_WINDOW),
+            ContextSpec(f"{name}_commands_context", commands=command_set),
+        ),
+        commands=tuple(commands),
+        operations_key=f"{name}_operations",
+        operation_duration=True,
+        count_action_commands=True,
+    )
+
+
+# Pluggable Analyser: Name → Factory (pro Session eine frische Instanz)
+ANALYSER_FACTORIES: dict[str, Callable[[], ModuleAnalyser]] = {
+    "drill": lambda: _production_station("drill", drill_script, drill_script.DRILL_COMMANDS),
+    "mill": lambda: _production_station("mill", mill_script, mill_script.MILL_COMMANDS),
+    "hbw": lambda: StationAnalyser(
+        "hbw",
+        hbw_script.is_hbw_relevant,
+        hbw_script.categorize_topic,
+        contexts=(
+            ContextSpec("storage_order_context", order_type="STORAGE", window=ORDER_WINDOW),
+            ContextSpec("storage_commands_context", commands=frozenset(hbw_script.HBW_COMMANDS)),
+        ),
+        commands=tuple(hbw_script.HBW_COMMANDS),
+        operations_key="storage_operations",
+        count_action_commands=True,
+        storage_info=True,
+    ),
+    "dps": lambda: StationAnalyser(
+        "dps",
+        dps_script.is_dps_relevant,
+        dps_script.categorize_topic,
+        contexts=(
+            ContextSpec("storage_order_context", order_type="STORAGE", window=ORDER_WINDOW),
+            ContextSpec("production_order_context", order_type="PRODUCTION", window=ORDER_WINDOW),
+        ),
+        commands=tuple(dps_script.DPS_COMMANDS),
+    ),
+    "aiqs": lambda: StationAnalyser(
+        "aiqs",
+        aiqs_script.is_aiqs_relevant,
+        aiqs_script.categorize_topic,
+        contexts=(ContextSpec("check_quality_context", commands=frozenset({"CHECK_QUALITY"}), include_action=False),),
+        commands=tuple(aiqs_script.AIQS_COMMANDS),
+        check_quality_results=True,
+    ),
+    "fts": lambda: FtsAnalyser(
+        "fts",
+        fts_script.is_fts_relevant,
+        fts_script.categorize_topic,
+    ),
+}
+
+
+# Ausgabe über die save-Funktionen der Einzel-Skripte (identische Dateien)
+SAVE_FUNCTIONS: dict[str, Callable[[dict[str, Any], Path, str], None]] = {
+    "drill": drill_script.save_drill_data,
+    "mill": mill_script.save_mill_data,
+    "hbw": hbw_script.save_hbw_data,
+    "dps": dps_script.save_dps_data,
+    "aiqs": aiqs_script.save_aiqs_data,
+    "fts": fts_script.save_fts_data,
+}
+
+
+class TopicRouter:
+    """Topic → Tupel der Analyser-Positionen; die Relevanzprüfung läuft einmal pro Topic."""
+
+    def __init__(self, relevance: list[Callable[[str], bool]]):
+        self._relevance = relevance
+        self._routes: dict[str, tuple[int, ...]] = {}
+
+    def route(self, topic: str) -> tuple[int, ...]:
+        route = self._routes.get(topic)
+        if route is None:
+            route = tuple(pos for pos, relevant in enumerate(self._relevance) if relevant(topic))
+            self._routes[topic] = route
+        return route
+
+
+def analyze_session_file(path: Path, module_names: list[str]) -> dict[str, dict[str, Any]]:
+    """Eine Session einmal streamen und für alle gewählten Module analysieren."""
+    analysers = [ANALYSER_FACTORIES[name]() for name in module_names]
+    router = TopicRouter([analyser.relevant for analyser in analysers])
+    scanners = [analyser for analyser in analysers if analyser.contexts]
+    messages: list[dict[str, Any]] = []
+
+    for _line_num, message in iter_session_messages(path):
+        index = len(messages)
+        messages.append(message)
+        payload = decode_payload(message["payload"])
+        for pos in router.route(message["topic"]):
+            analysers[pos].observe(index, message, payload)
+        if scanners:
+            features = PayloadFeatures.from_payload(payload)
+            if features is not None:
+                for analyser in scanners:
+                    analyser.scan(index, features)
+
+    return {analyser.name: analyser.finish(messages) for analyser in analysers}
+
+
+def save_analyses(
+    analyses: dict[str, dict[str, Any]], output_root: Path, session_name: str, quiet: bool = False
+) -> None:
+    """Ergebnisse über die save_*_data-Funktionen der Einzel-Skripte schreiben."""
+    for name, analysis in analyses.items():
+        save = SAVE_FUNCTIONS[name]
+        output_dir = output_root / f"{name}-analysis"
+        if quiet:
+            with contextlib.redirect_stdout(io.StringIO()):
+                save(analysis, output_dir, session_name)
+        else:
+            save(analysis, output_dir, session_name)
+
+
+def summarize_analysis(analysis: dict[str, Any]) -> dict[str, Any]:
+    """Kompakte, cachebare Zusammenfassung (Listen → <key>_count), Grundlage der Aggregation."""
+    summary: dict[str, Any] = {}
+    for key, value in analysis.items():
+        if key == "messages":
+            continue
+        if isinstance(value, list):
+            summary[f"{key}_count"] = len(value)
+        else:
+            summary[key] = value
+    return summary
+
+
+def file_content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_file(cache_dir: Path, session_path: Path) -> Path:
+    return cache_dir / f"{session_path.stem}.json"
+
+
+def load_cache_entry(path: Path) -> dict[str, Any] | None:
+    try:
+        with path.open(encoding="utf-8") as handle:
+            entry = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def write_cache_entry(cache_dir: Path, session_path: Path, entry: dict[str, Any]) -> None:
+    with cache_file(cache_dir, session_path).open("w", encoding="utf-8") as handle:
+        json.dump(entry, handle, indent=2, ensure_ascii=False)
+
+
+def file_stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def cache_entry_matches(entry: dict[str, Any] | None, path: Path) -> bool:
+    """Eintrag passt zur aktuellen Datei: gleiche Analyser-Version und Größe/mtime, sonst gleicher Content-Hash."""
+    if entry is None or entry.get("analyser_version") != ANALYSER_VERSION:
+        return False
+    size, mtime_ns = file_stamp(path)
+    if entry.get("size") == size and entry.get("mtime_ns") == mtime_ns:
+        return True
+    return entry.get("content_hash") == file_content_hash(path)
+
+
+def load_cached_summaries(cache_dir: Path, module_name: str, paths: list[Path]) -> dict[str, dict[str, Any]]:
+    """Gültige Modul-Zusammenfassungen (Session-Stem → Summary) für genau diese Session-Dateien."""
+    summaries: dict[str, dict[str, Any]] = {}
+    for path in paths:
+        entry = load_cache_entry(cache_file(cache_dir, path))
+        if not cache_entry_matches(entry, path):
+            continue
+        summary = entry.get("modules", {}).get(module_name)
+        if isinstance(summary, dict):
+            summaries[path.stem] = summary
+    return summaries
+
+
+def _analyze_job(path: str, module_names: list[str], output_root: str, quiet: bool) -> dict[str, dict[str, Any]]:
+    """Worker: eine Session analysieren, Ausgaben schreiben, Zusammenfassungen zurückgeben."""
+    session_path = Path(path)
+    analyses = analyze_session_file(session_path, module_names)
+    save_analyses(analyses, Path(output_root), session_path.stem, quiet=quiet)
+    return {name: summarize_analysis(analysis) for name, analysis in analyses.items()}
+
+
+@dataclass
+class IncrementalResult:
+    analysed: list[str]
+    cached: list[str]
+    entries: dict[str, dict[str, Any]]
+
+
+def run_incremental(
+    paths: list[Path],
+    module_names: list[str],
+    output_root: Path,
+    jobs: int = 1,
+    force: bool = False,
+    quiet: bool = True,
+) -> IncrementalResult:
+    """
+    Nur neue/geänderte Sessions (Content-Hash) bzw. fehlende Module neu analysieren.
+
+    Pro Session ein Cache-Eintrag unter <output_root>/analysis-cache/<session>.json mit
+    content_hash, size/mtime_ns, analyser_version und den Modul-Zusammenfassungen. Größe und
+    mtime ersparen das Hashen unveränderter Dateien.
+    """
+    cache_dir = output_root / CACHE_DIRNAME
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    result = IncrementalResult(analysed=[], cached=[], entries={})
+    pending: list[tuple[Path, dict[str, Any], list[str]]] = []
+
+    for path in paths:
+        entry = load_cache_entry(cache_file(cache_dir, path))
+        if not cache_entry_matches(entry, path):
+            entry = {
+                "session": path.stem,
+                "path": str(path),
+                "content_hash": file_content_hash(path),
+                "analyser_version": ANALYSER_VERSION,
+                "modules": {},
+            }
+        stamp = file_stamp(path)
+        stamp_changed = (entry.get("size"), entry.get("mtime_ns")) != stamp
+        entry["size"], entry["mtime_ns"] = stamp
+        missing = module_names if force else [name for name in module_names if name not in entry["modules"]]
+        if missing:
+            pending.append((path, entry, missing))
+        else:
+            if stamp_changed:
+                # Inhalt unverändert (Hash), nur Größe/mtime nachtragen
+                write_cache_entry(cache_dir, path, entry)
+            result.cached.append(path.name)
+        result.entries[path.stem] = entry
+
+    def store(path: Path, entry: dict[str, Any], summaries: dict[str, dict[str, Any]]) -> None:
+        entry["modules"].update(summaries)
+        write_cache_entry(cache_dir, path, entry)
+        result.analysed.append(path.name)
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            futures = {
+                pool.submit(_analyze_job, str(path), missing, str(output_root), True): (path, entry)
+                for path, entry, missing in pending
+            }
+            for future in as_completed(futures):
+                path, entry = futures[future]
+                store(path, entry, future.result())
+    else:
+        for path, entry, missing in pending:
+            store(path, entry, _analyze_job(str(path), missing, str(output_root), quiet))
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Analysiert Sessions für alle Module in einem Durchlauf")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="Session-Dateien (.log) oder Verzeichnisse. Ohne Angabe: alle in data/osf-data/sessions",
+    )
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        choices=list(ANALYSER_FACTORIES),
+        default=list(ANALYSER_FACTORIES),
+        help="Auszuwertende Module (Standard: alle)",
+    )
+    parser.add_argument(
+        "--output-root",
+        type=Path,
+        default=DEFAULT_OUTPUT_ROOT,
+        help="Basisverzeichnis für <modul>-analysis und analysis-cache (Standard: data/osf-data)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Parallele Worker-Prozesse, eine Session pro Worker (Standard: CPU-Anzahl)",
+    )
+    parser.add_argument("--force", action="store_true", help="Cache ignorieren, alle Sessions neu analysieren")
+    parser.add_argument("--quiet", action="store_true", help="Keine Einzeldatei-Ausgaben der save-Funktionen")
+    args = parser.parse_args()
+
+    paths = []
+    for path in list_session_files(args.paths):
+        if path.exists():
+            paths.append(path)
+        else:
+            print(f"Überspringe (nicht gefunden): {path}", file=sys.stderr)
+    if not paths:
+        print("Keine Session-Dateien gefunden.")
+        return 1
+
+    print(f"📊 {len(paths)} Session(s), Module: {', '.join(m.upper() for m in args.modules)}")
+    start = time.perf_counter()
+    result = run_incremental(
+        paths, args.modules, args.output_root, jobs=max(1, args.jobs), force=args.force, quiet=args.quiet
+    )
+    elapsed = time.perf_counter() - start
+
+    for name in result.analysed:
+        summaries = result.entries[Path(name).stem]["modules"]
+        relevant = ", ".join(
+            f"{module.upper()} {summaries[module][f'{module}_relevant_messages']}" for module in args.modules
+        )
+        print(f"✅ {name}: {relevant}")
+    print(f"\n♻️  {len(result.cached)} aus Cache, {len(result.analysed)} analysiert ({elapsed:.2f}s)")
+    print(f"📂 Ergebnisse gespeichert unter: {args.output_root}/<modul>-analysis")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -12,8 +12,11 @@ import json
 import sys
 from collections import Counter, defaultdict
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from session_log_stream import collect_window_context, decode_message_payloads
 
 # DPS Serial ID
 DPS_SERIAL = "SVR4H73275"
@@ -82,6 +85,7 @@ def load_session_log(log_file: Path) -> List[Dict[str, Any]]:
     return messages
 
 
+@lru_cache(maxsize=None)
 def is_dps_relevant(topic: str) -> bool:
     """Prüft ob ein Topic DPS-relevant ist"""
     # Direkte DPS-Topics
@@ -109,6 +113,7 @@ def is_dps_relevant(topic: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=None)
 def categorize_topic(topic: str) -> str:
     """Kategorisiert ein Topic"""
     if f"/{DPS_SERIAL}/" in topic:
@@ -145,67 +150,40 @@ def categorize_topic(topic: str) -> str:
         return "other"
 
 
-def extract_order_context(messages: List[Dict[str, Any]], order_type: str) -> List[Dict[str, Any]]:
+def extract_order_context(
+    messages: List[Dict[str, Any]], order_type: str, payloads: Optional[List[Any]] = None
+) -> List[Dict[str, Any]]:
     """
     Extrahiert Messages im Kontext von STORAGE-ORDER oder PRODUCTION-ORDER
 
+    Fenster: 50 Messages vor, 100 nach jeder Order (überlappende Fenster zusammengefasst).
+
     Args:
         messages: Alle Messages
         order_type: "STORAGE" oder "PRODUCTION"
+        payloads: Bereits dekodierte Payloads (parallel zu messages); sonst wird dekodiert
 
     Returns:
         Liste von Messages im Kontext der Order
     """
-    context_messages = []
-
-    for i, msg in enumerate(messages):
-        try:
-            payload = json.loads(msg["payload"]) if isinstance(msg["payload"], str) else msg["payload"]
-
-            # Prüfe ob es eine Order-Message ist
-            if isinstance(payload, dict):
-                # CCU Order Messages
-                if "orderType" in payload and payload["orderType"] == order_type:
-                    # Sammle Messages vor und nach dieser Order
-                    # Vor: 50 Messages, Nach: 100 Messages
-                    start_idx = max(0, i - 50)
-                    end_idx = min(len(messages), i + 100)
-
-                    for j in range(start_idx, end_idx):
-                        if is_dps_relevant(messages[j]["topic"]):
-                            context_messages.append(messages[j])
-
-                # Prüfe auch in Arrays (ccu/order/completed ist ein Array)
-                elif isinstance(payload, list):
-                    for item in payload:
-                        if isinstance(item, dict) and "orderType" in item and item["orderType"] == order_type:
-                            start_idx = max(0, i - 50)
-                            end_idx = min(len(messages), i + 100)
-
-                            for j in range(start_idx, end_idx):
-                                if is_dps_relevant(messages[j]["topic"]):
-                                    context_messages.append(messages[j])
-                            break
-        except (json.JSONDecodeError, TypeError, KeyError):
-            pass
-
-    # Entferne Duplikate (behalte erste Vorkommen)
-    seen = set()
-    unique_messages = []
-    for msg in context_messages:
-        msg_id = (msg["topic"], msg.get("timestamp", ""))
-        if msg_id not in seen:
-            seen.add(msg_id)
-            unique_messages.append(msg)
+    if payloads is None:
+        payloads = decode_message_payloads(messages)
 
-    return unique_messages
+    order_indices = [
+        i for i, payload in enumerate(payloads) if isinstance(payload, dict) and payload.get("orderType") == order_type
+    ]
+    return collect_window_context(messages, order_indices, 50, 100, is_dps_relevant)
 
 
 def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Analysiert eine Session und extrahiert DPS-relevante Informationen"""
 
+    # Payloads einmal dekodieren (Statistik und Kontext-Extraktion)
+    payloads = decode_message_payloads(messages)
+
     # Filtere DPS-relevante Messages
-    dps_messages = [msg for msg in messages if is_dps_relevant(msg["topic"])]
+    dps_indices = [i for i, msg in enumerate(messages) if is_dps_relevant(msg["topic"])]
+    dps_messages = [messages[i] for i in dps_indices]
 
     # Topic-Statistiken
     topic_counter = Counter(msg["topic"] for msg in dps_messages)
@@ -224,9 +202,10 @@ def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
     payload_stats = defaultdict(int)
     commands_found = Counter()
 
-    for msg in dps_messages:
+    for i in dps_indices:
+        msg = messages[i]
+        payload = payloads[i]
         try:
-            payload = json.loads(msg["payload"]) if isinstance(msg["payload"], str) else msg["payload"]
             if isinstance(payload, dict):
                 # Zähle wichtige Felder
                 if "orderId" in payload:
@@ -248,14 +227,14 @@ def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
                     payload_stats["has_workpieceId"] += 1
                 if "type" in payload:
                     payload_stats["has_type"] += 1
-        except (json.JSONDecodeError, TypeError):
+        except TypeError:
             pass
 
     # Extrahiere STORAGE-ORDER Kontext
-    storage_order_context = extract_order_context(messages, "STORAGE")
+    storage_order_context = extract_order_context(messages, "STORAGE", payloads=payloads)
 
     # Extrahiere PRODUCTION-ORDER Kontext
-    production_order_context = extract_order_context(messages, "PRODUCTION")
+    production_order_context = extract_order_context(messages, "PRODUCTION", payloads=payloads)
 
     return {
         "total_messages": len(messages),
@@ -12,8 +12,11 @@ import json
 import sys
 from collections import Counter, defaultdict
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from session_log_stream import collect_window_context, decode_message_payloads, payload_has_command
 
 # DRILL Serial ID
 DRILL_SERIAL = "SVR4H76449"
@@ -79,6 +82,7 @@ def load_session_log(log_file: Path) -> List[Dict[str, Any]]:
     return messages
 
 
+@lru_cache(maxsize=None)
 def is_drill_relevant(topic: str) -> bool:
     """Prüft ob ein Topic DRILL-relevant ist"""
     # Direkte DRILL-Topics
@@ -102,6 +106,7 @@ def is_drill_relevant(topic: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=None)
 def categorize_topic(topic: str) -> str:
     """Kategorisiert ein Topic"""
     if f"/{DRILL_SERIAL}/" in topic:
@@ -136,140 +141,56 @@ def categorize_topic(topic: str) -> str:
         return "other"
 
 
-def extract_production_order_context(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def extract_production_order_context(
+    messages: List[Dict[str, Any]], payloads: Optional[List[Any]] = None
+) -> List[Dict[str, Any]]:
     """
     Extrahiert Messages im Kontext von PRODUCTION-ORDER
     DRILL ist primär für Production-Operationen zuständig
 
+    Fenster: 50 Messages vor, 100 nach jeder Order (überlappende Fenster zusammengefasst).
+
     Returns:
         Liste von Messages im Kontext von PRODUCTION-ORDER
     """
-    context_messages = []
-
-    for i, msg in enumerate(messages):
-        try:
-            payload = json.loads(msg["payload"]) if isinstance(msg["payload"], str) else msg["payload"]
-
-            # Prüfe ob es eine PRODUCTION-ORDER Message ist
-            if isinstance(payload, dict):
-                # CCU Order Messages
-                if "orderType" in payload and payload["orderType"] == "PRODUCTION":
-                    # Sammle Messages vor und nach dieser Order
-                    # Vor: 50 Messages, Nach: 100 Messages
-                    start_idx = max(0, i - 50)
-                    end_idx = min(len(messages), i + 100)
-
-                    for j in range(start_idx, end_idx):
-                        if is_drill_relevant(messages[j]["topic"]):
-                            context_messages.append(messages[j])
-
-                # Prüfe auch in Arrays (ccu/order/completed ist ein Array)
-                elif isinstance(payload, list):
-                    for item in payload:
-                        if isinstance(item, dict) and "orderType" in item and item["orderType"] == "PRODUCTION":
-                            start_idx = max(0, i - 50)
-                            end_idx = min(len(messages), i + 100)
-
-                            for j in range(start_idx, end_idx):
-                                if is_drill_relevant(messages[j]["topic"]):
-                                    context_messages.append(messages[j])
-                            break
-        except (json.JSONDecodeError, TypeError, KeyError):
-            pass
+    if payloads is None:
+        payloads = decode_message_payloads(messages)
 
-    # Entferne Duplikate (behalte erste Vorkommen)
-    seen = set()
-    unique_messages = []
-    for msg in context_messages:
-        msg_id = (msg["topic"], msg.get("timestamp", ""))
-        if msg_id not in seen:
-            seen.add(msg_id)
-            unique_messages.append(msg)
+    order_indices = [
+        i
+        for i, payload in enumerate(payloads)
+        if isinstance(payload, dict) and payload.get("orderType") == "PRODUCTION"
+    ]
+    return collect_window_context(messages, order_indices, 50, 100, is_drill_relevant)
 
-    return unique_messages
 
-
-def extract_drill_commands_context(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def extract_drill_commands_context(
+    messages: List[Dict[str, Any]], payloads: Optional[List[Any]] = None
+) -> List[Dict[str, Any]]:
     """
     Extrahiert Messages im Kontext von DRILL-Commands (PICK, DRILL, DROP)
 
+    Fenster: 30 Messages vor, 50 nach jedem Command (überlappende Fenster zusammengefasst).
+
     Returns:
         Liste von Messages im Kontext von DRILL-Commands
     """
-    context_messages = []
-    drill_command_indices = []
+    if payloads is None:
+        payloads = decode_message_payloads(messages)
 
-    # Finde alle DRILL-Command Messages
-    for i, msg in enumerate(messages):
-        try:
-            payload = json.loads(msg["payload"]) if isinstance(msg["payload"], str) else msg["payload"]
-
-            # Prüfe ob es eine DRILL-Command Message ist
-            if isinstance(payload, dict):
-                # Direkt in actionState
-                if "actionState" in payload:
-                    action_state = payload.get("actionState", {})
-                    if isinstance(action_state, dict) and action_state.get("command") in DRILL_COMMANDS:
-                        drill_command_indices.append(i)
-
-                # In actionStates Array
-                if "actionStates" in payload:
-                    for action in payload.get("actionStates", []):
-                        if isinstance(action, dict) and action.get("command") in DRILL_COMMANDS:
-                            drill_command_indices.append(i)
-                            break
-
-                # In action (order payload)
-                if "action" in payload:
-                    action = payload.get("action", {})
-                    if isinstance(action, dict) and action.get("command") in DRILL_COMMANDS:
-                        drill_command_indices.append(i)
-
-                # In CCU Order completed (productionSteps)
-                if "productionSteps" in payload:
-                    for step in payload.get("productionSteps", []):
-                        if isinstance(step, dict) and step.get("command") in DRILL_COMMANDS:
-                            drill_command_indices.append(i)
-                            break
-
-                # In CCU Order completed Array
-                if isinstance(payload, list):
-                    for item in payload:
-                        if isinstance(item, dict) and "productionSteps" in item:
-                            for step in item.get("productionSteps", []):
-                                if isinstance(step, dict) and step.get("command") in DRILL_COMMANDS:
-                                    drill_command_indices.append(i)
-                                    break
-        except (json.JSONDecodeError, TypeError, KeyError):
-            pass
-
-    # Sammle Messages vor und nach DRILL-Commands
-    for idx in drill_command_indices:
-        # Vor: 30 Messages, Nach: 50 Messages
-        start_idx = max(0, idx - 30)
-        end_idx = min(len(messages), idx + 50)
-
-        for j in range(start_idx, end_idx):
-            if is_drill_relevant(messages[j]["topic"]):
-                context_messages.append(messages[j])
-
-    # Entferne Duplikate (behalte erste Vorkommen)
-    seen = set()
-    unique_messages = []
-    for msg in context_messages:
-        msg_id = (msg["topic"], msg.get("timestamp", ""))
-        if msg_id not in seen:
-            seen.add(msg_id)
-            unique_messages.append(msg)
-
-    return unique_messages
+    drill_command_indices = [i for i, payload in enumerate(payloads) if payload_has_command(payload, DRILL_COMMANDS)]
+    return collect_window_context(messages, drill_command_indices, 30, 50, is_drill_relevant)
 
 
 def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Analysiert eine Session und extrahiert DRILL-relevante Informationen"""
 
+    # Payloads einmal dekodieren (Statistik und Kontext-Extraktion)
+    payloads = decode_message_payloads(messages)
+
     # Filtere DRILL-relevante Messages
-    drill_messages = [msg for msg in messages if is_drill_relevant(msg["topic"])]
+    drill_indices = [i for i, msg in enumerate(messages) if is_drill_relevant(msg["topic"])]
+    drill_messages = [messages[i] for i in drill_indices]
 
     # Topic-Statistiken
     topic_counter = Counter(msg["topic"] for msg in drill_messages)
@@ -289,9 +210,10 @@ def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
     commands_found = Counter()
     drill_operations = []
 
-    for msg in drill_messages:
+    for i in drill_indices:
+        msg = messages[i]
+        payload = payloads[i]
         try:
-            payload = json.loads(msg["payload"]) if isinstance(msg["payload"], str) else msg["payload"]
             if isinstance(payload, dict):
                 # Zähle wichtige Felder
                 if "orderId" in payload:
@@ -397,14 +319,14 @@ def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
                     payload_stats["has_workpieceId"] += 1
                 if "type" in payload:
                     payload_stats["has_type"] += 1
-        except (json.JSONDecodeError, TypeError):
+        except TypeError:
             pass
 
     # Extrahiere PRODUCTION-ORDER Kontext
-    production_order_context = extract_production_order_context(messages)
+    production_order_context = extract_production_order_context(messages, payloads=payloads)
 
     # Extrahiere DRILL-Commands Kontext
-    drill_commands_context = extract_drill_commands_context(messages)
+    drill_commands_context = extract_drill_commands_context(messages, payloads=payloads)
 
     return {
         "total_messages": len(messages),
@@ -11,6 +11,7 @@ import json
 import sys
 from collections import Counter, defaultdict
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -65,6 +66,7 @@ def load_session_log(log_file: Path) -> List[Dict[str, Any]]:
     return messages
 
 
+@lru_cache(maxsize=None)
 def is_fts_relevant(topic: str) -> bool:
     """Prüft ob ein Topic FTS-relevant ist"""
     # Direkte FTS-Topics
@@ -82,6 +84,7 @@ def is_fts_relevant(topic: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=None)
 def categorize_topic(topic: str) -> str:
     """Kategorisiert ein Topic"""
     if topic.startswith("fts/v1/ff/"):
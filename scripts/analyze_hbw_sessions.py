@@ -12,8 +12,11 @@ import json
 import sys
 from collections import Counter, defaultdict
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from session_log_stream import collect_window_context, decode_message_payloads, payload_has_command
 
 # HBW Serial ID
 HBW_SERIAL = "SVR3QA0022"
@@ -79,6 +82,7 @@ def load_session_log(log_file: Path) -> List[Dict[str, Any]]:
     return messages
 
 
+@lru_cache(maxsize=None)
 def is_hbw_relevant(topic: str) -> bool:
     """Prüft ob ein Topic HBW-relevant ist"""
     # Direkte HBW-Topics
@@ -102,6 +106,7 @@ def is_hbw_relevant(topic: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=None)
 def categorize_topic(topic: str) -> str:
     """Kategorisiert ein Topic"""
     if f"/{HBW_SERIAL}/" in topic:
@@ -136,140 +141,54 @@ def categorize_topic(topic: str) -> str:
         return "other"
 
 
-def extract_storage_order_context(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def extract_storage_order_context(
+    messages: List[Dict[str, Any]], payloads: Optional[List[Any]] = None
+) -> List[Dict[str, Any]]:
     """
     Extrahiert Messages im Kontext von STORAGE-ORDER
     HBW ist primär für Storage-Operationen zuständig
 
+    Fenster: 50 Messages vor, 100 nach jeder Order (überlappende Fenster zusammengefasst).
+
     Returns:
         Liste von Messages im Kontext von STORAGE-ORDER
     """
-    context_messages = []
-
-    for i, msg in enumerate(messages):
-        try:
-            payload = json.loads(msg["payload"]) if isinstance(msg["payload"], str) else msg["payload"]
-
-            # Prüfe ob es eine STORAGE-ORDER Message ist
-            if isinstance(payload, dict):
-                # CCU Order Messages
-                if "orderType" in payload and payload["orderType"] == "STORAGE":
-                    # Sammle Messages vor und nach dieser Order
-                    # Vor: 50 Messages, Nach: 100 Messages
-                    start_idx = max(0, i - 50)
-                    end_idx = min(len(messages), i + 100)
-
-                    for j in range(start_idx, end_idx):
-                        if is_hbw_relevant(messages[j]["topic"]):
-                            context_messages.append(messages[j])
-
-                # Prüfe auch in Arrays (ccu/order/completed ist ein Array)
-                elif isinstance(payload, list):
-                    for item in payload:
-                        if isinstance(item, dict) and "orderType" in item and item["orderType"] == "STORAGE":
-                            start_idx = max(0, i - 50)
-                            end_idx = min(len(messages), i + 100)
-
-                            for j in range(start_idx, end_idx):
-                                if is_hbw_relevant(messages[j]["topic"]):
-                                    context_messages.append(messages[j])
-                            break
-        except (json.JSONDecodeError, TypeError, KeyError):
-            pass
+    if payloads is None:
+        payloads = decode_message_payloads(messages)
 
-    # Entferne Duplikate (behalte erste Vorkommen)
-    seen = set()
-    unique_messages = []
-    for msg in context_messages:
-        msg_id = (msg["topic"], msg.get("timestamp", ""))
-        if msg_id not in seen:
-            seen.add(msg_id)
-            unique_messages.append(msg)
+    order_indices = [
+        i for i, payload in enumerate(payloads) if isinstance(payload, dict) and payload.get("orderType") == "STORAGE"
+    ]
+    return collect_window_context(messages, order_indices, 50, 100, is_hbw_relevant)
 
-    return unique_messages
 
-
-def extract_storage_commands_context(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def extract_storage_commands_context(
+    messages: List[Dict[str, Any]], payloads: Optional[List[Any]] = None
+) -> List[Dict[str, Any]]:
     """
     Extrahiert Messages im Kontext von STORE, PICK, DROP Commands
 
+    Fenster: 30 Messages vor, 50 nach jedem Command (überlappende Fenster zusammengefasst).
+
     Returns:
         Liste von Messages im Kontext von Storage-Commands
     """
-    context_messages = []
-    storage_command_indices = []
+    if payloads is None:
+        payloads = decode_message_payloads(messages)
 
-    # Finde alle STORE/PICK/DROP Messages
-    for i, msg in enumerate(messages):
-        try:
-            payload = json.loads(msg["payload"]) if isinstance(msg["payload"], str) else msg["payload"]
-
-            # Prüfe ob es eine Storage-Command Message ist
-            if isinstance(payload, dict):
-                # Direkt in actionState
-                if "actionState" in payload:
-                    action_state = payload.get("actionState", {})
-                    if isinstance(action_state, dict) and action_state.get("command") in HBW_COMMANDS:
-                        storage_command_indices.append(i)
-
-                # In actionStates Array
-                if "actionStates" in payload:
-                    for action in payload.get("actionStates", []):
-                        if isinstance(action, dict) and action.get("command") in HBW_COMMANDS:
-                            storage_command_indices.append(i)
-                            break
-
-                # In action (order payload)
-                if "action" in payload:
-                    action = payload.get("action", {})
-                    if isinstance(action, dict) and action.get("command") in HBW_COMMANDS:
-                        storage_command_indices.append(i)
-
-                # In CCU Order completed (productionSteps)
-                if "productionSteps" in payload:
-                    for step in payload.get("productionSteps", []):
-                        if isinstance(step, dict) and step.get("command") in HBW_COMMANDS:
-                            storage_command_indices.append(i)
-                            break
-
-                # In CCU Order completed Array
-                if isinstance(payload, list):
-                    for item in payload:
-                        if isinstance(item, dict) and "productionSteps" in item:
-                            for step in item.get("productionSteps", []):
-                                if isinstance(step, dict) and step.get("command") in HBW_COMMANDS:
-                                    storage_command_indices.append(i)
-                                    break
-        except (json.JSONDecodeError, TypeError, KeyError):
-            pass
-
-    # Sammle Messages vor und nach Storage-Commands
-    for idx in storage_command_indices:
-        # Vor: 30 Messages, Nach: 50 Messages
-        start_idx = max(0, idx - 30)
-        end_idx = min(len(messages), idx + 50)
-
-        for j in range(start_idx, end_idx):
-            if is_hbw_relevant(messages[j]["topic"]):
-                context_messages.append(messages[j])
-
-    # Entferne Duplikate (behalte erste Vorkommen)
-    seen = set()
-    unique_messages = []
-    for msg in context_messages:
-        msg_id = (msg["topic"], msg.get("timestamp", ""))
-        if msg_id not in seen:
-            seen.add(msg_id)
-            unique_messages.append(msg)
-
-    return unique_messages
+    storage_command_indices = [i for i, payload in enumerate(payloads) if payload_has_command(payload, HBW_COMMANDS)]
+    return collect_window_context(messages, storage_command_indices, 30, 50, is_hbw_relevant)
 
 
 def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Analysiert eine Session und extrahiert HBW-relevante Informationen"""
 
+    # Payloads einmal dekodieren (Statistik und Kontext-Extraktion)
+    payloads = decode_message_payloads(messages)
+
     # Filtere HBW-relevante Messages
-    hbw_messages = [msg for msg in messages if is_hbw_relevant(msg["topic"])]
+    hbw_indices = [i for i, msg in enumerate(messages) if is_hbw_relevant(msg["topic"])]
+    hbw_messages = [messages[i] for i in hbw_indices]
 
     # Topic-Statistiken
     topic_counter = Counter(msg["topic"] for msg in hbw_messages)
@@ -289,9 +208,10 @@ def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
     commands_found = Counter()
     storage_operations = []
 
-    for msg in hbw_messages:
+    for i in hbw_indices:
+        msg = messages[i]
+        payload = payloads[i]
         try:
-            payload = json.loads(msg["payload"]) if isinstance(msg["payload"], str) else msg["payload"]
             if isinstance(payload, dict):
                 # Zähle wichtige Felder
                 if "orderId" in payload:
@@ -385,14 +305,14 @@ def analyze_session(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
                 # Prüfe auf Storage-Slot-Informationen
                 if "slots" in payload or "inventory" in payload or "stock" in payload:
                     payload_stats["has_storage_info"] += 1
-        except (json.JSONDecodeError, TypeError):
+        except TypeError:
             pass
 
     # Extrahiere STORAGE-ORDER Kontext
-    storage_order_context = extract_storage_order_context(messages)
+    storage_order_context = extract_storage_order_context(messages, payloads=payloads)
 
     # Extrahiere Storage-Commands Kontext
-    storage_commands_context = extract_storage_commands_context(messages)
+    storage_commands_context = extract_storage_commands_context(messages, payloads=payloads)
 
     return {
         "total_messages": len(messages),
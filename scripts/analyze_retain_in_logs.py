@@ -10,18 +10,46 @@ kommen. Bestehende Sessions (production_order_*, storage_*, etc.) enthalten KEIN
 qos/retain-Daten – empirische Verifizierung erfordert Neuaufnahme an der echten APS
 mit Session Recorder v1.2+.
 
+Korpus-Modus (--corpus): alle Sessions parallel scannen, pro Topic retained/non-retained,
+Duplikate (gleicher Payload wie die vorige Message des Topics) und Alter (Envelope-Timestamp
+minus Payload-ts/timestamp) als Histogramme zusammenführen und abschätzen, wie viele Bytes
+Varianten der Recorder-Retain-Policy (RETAINED_STARTUP_GRACE_SEC, RETAIN_ALWAYS_KEEP_TOPICS)
+einsparen würden. Basis sind die aufgezeichneten Logs – was die aktuelle Policy bereits
+verworfen hat, ist darin nicht mehr enthalten.
+
 Usage:
     python scripts/analyze_retain_in_logs.py
     python scripts/analyze_retain_in_logs.py data/osf-data/sessions/auftrag-blau_1.log
+    python scripts/analyze_retain_in_logs.py --corpus [--jobs 4] [--json data/osf-data/retain_corpus.json]
 """
 
 from __future__ import annotations
 
+import argparse
 import json
+import os
 import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from session_log_stream import SESSION_META_KIND, decode_payload, timestamp_to_epoch_ms  # noqa: E402
+
+from session_manager.utils.recording_retain_policy import (  # noqa: E402
+    RETAIN_ALWAYS_KEEP_TOPICS,
+    RETAINED_STARTUP_GRACE_SEC,
+    payload_ts_key,
+)
+
+# Histogramm-Grenzen in Sekunden (letzter Bucket: darüber)
+AGE_BUCKETS_SEC = (1, 2, 5, 10, 60, 600)
+# Grace-Varianten für die Einsparungs-Schätzung (inkl. aktuellem Default)
+GRACE_VARIANTS_SEC = tuple(sorted({0.0, 1.0, RETAINED_STARTUP_GRACE_SEC, 5.0, 10.0, 30.0}))
+TOP_TOPICS = 20
 
 
 def analyze_log(path: Path) -> dict:
@@ -70,9 +98,228 @@ def analyze_test_topic(path: Path) -> dict | None:
         return None
 
 
+AGE_BUCKET_LABELS = tuple(f"<{limit}s" for limit in AGE_BUCKETS_SEC) + (f">={AGE_BUCKETS_SEC[-1]}s",)
+
+
+def format_histogram(histogram: dict[str, int]) -> str:
+    return ", ".join(f"{label}:{histogram[label]}" for label in AGE_BUCKET_LABELS if histogram.get(label)) or "-"
+
+
+def age_bucket(seconds: float) -> str:
+    for limit in AGE_BUCKETS_SEC:
+        if seconds < limit:
+            return f"<{limit}s"
+    return f">={AGE_BUCKETS_SEC[-1]}s"
+
+
+def _payload_timestamp_ms(payload: Any) -> int | None:
+    if not isinstance(payload, dict):
+        return None
+    return timestamp_to_epoch_ms(payload.get("ts")) or timestamp_to_epoch_ms(payload.get("timestamp"))
+
+
+def policy_variants() -> list[str]:
+    names = []
+    for grace in GRACE_VARIANTS_SEC:
+        names.append(f"grace_{grace:g}s")
+        names.append(f"grace_{grace:g}s_without_keep_list")
+    names.extend(["dedupe_identical_retained", "ts_dedupe_all_topics", "drop_all_retained"])
+    return names
+
+
+def scan_retain_corpus_file(path_str: str) -> dict[str, Any]:
+    """
+    Scannt eine Session für den Korpus-Modus (läuft im Worker-Prozess, Ergebnis nur aus Basistypen).
+
+    Recording-Start = erster Envelope-Timestamp (session_meta-Zeiten sind lokale Zeit).
+    """
+    path = Path(path_str)
+    topics: dict[str, dict[str, Any]] = defaultdict(lambda: {"counts": Counter(), "age": Counter()})
+    since_start = Counter()
+    saved_messages = Counter()
+    saved_bytes = Counter()
+    total_messages = 0
+    total_bytes = 0
+    start_ms: int | None = None
+    last_payload: dict[str, str] = {}
+    seen_ts: dict[str, set[str]] = defaultdict(set)
+
+    with path.open("rb") as handle:
+        for raw_line in handle:
+            if not raw_line.strip():
+                continue
+            try:
+                data = json.loads(raw_line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if not isinstance(data, dict) or data.get("_kind") == SESSION_META_KIND or "topic" not in data:
+                continue
+            size = len(raw_line)
+            topic = data["topic"]
+            raw_payload = data.get("payload")
+            retain = data.get("retain")
+            envelope_ms = timestamp_to_epoch_ms(data.get("timestamp"))
+            if start_ms is None and envelope_ms is not None:
+                start_ms = envelope_ms
+            total_messages += 1
+            total_bytes += size
+
+            topic_stats = topics[topic]
+            counts = topic_stats["counts"]
+            counts["messages"] += 1
+            counts["bytes"] += size
+            duplicate = last_payload.get(topic) == raw_payload
+            last_payload[topic] = raw_payload
+            ts_key = payload_ts_key(raw_payload) if isinstance(raw_payload, str) and '"ts"' in raw_payload else None
+            ts_duplicate = ts_key is not None and ts_key in seen_ts[topic]
+            if ts_key is not None:
+                seen_ts[topic].add(ts_key)
+
+            drops: list[str] = []
+            if ts_duplicate:
+                drops.append("ts_dedupe_all_topics")
+            if retain is True:
+                counts["retained"] += 1
+                counts["retained_bytes"] += size
+                elapsed = (envelope_ms - start_ms) / 1000 if envelope_ms is not None and start_ms is not None else None
+                if elapsed is not None:
+                    since_start[age_bucket(elapsed)] += 1
+                payload_ms = _payload_timestamp_ms(decode_payload(raw_payload))
+                if payload_ms is not None and envelope_ms is not None:
+                    topic_stats["age"][age_bucket(max(0, envelope_ms - payload_ms) / 1000)] += 1
+                if duplicate:
+                    counts["retained_duplicates"] += 1
+                    drops.append("dedupe_identical_retained")
+                drops.append("drop_all_retained")
+                if elapsed is not None:
+                    for grace in GRACE_VARIANTS_SEC:
+                        if elapsed < grace:
+                            drops.append(f"grace_{grace:g}s_without_keep_list")
+                            if topic not in RETAIN_ALWAYS_KEEP_TOPICS:
+                                drops.append(f"grace_{grace:g}s")
+            elif retain is False:
+                counts["non_retained"] += 1
+            for variant in drops:
+                saved_messages[variant] += 1
+                saved_bytes[variant] += size
+
+    return {
+        "path": path.name,
+        "messages": total_messages,
+        "bytes": total_bytes,
+        "topics": {topic: {"counts": dict(t["counts"]), "age": dict(t["age"])} for topic, t in topics.items()},
+        "retained_since_start": dict(since_start),
+        "saved_messages": dict(saved_messages),
+        "saved_bytes": dict(saved_bytes),
+    }
+
+
+def merge_corpus_results(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Führt Ergebnisse einzelner Sessions zu Korpus-Histogrammen zusammen."""
+    topics: dict[str, dict[str, Counter]] = defaultdict(lambda: {"counts": Counter(), "age": Counter()})
+    since_start = Counter()
+    saved_messages = Counter()
+    saved_bytes = Counter()
+    for result in results:
+        for topic, stats in result["topics"].items():
+            topics[topic]["counts"].update(stats["counts"])
+            topics[topic]["age"].update(stats["age"])
+        since_start.update(result["retained_since_start"])
+        saved_messages.update(result["saved_messages"])
+        saved_bytes.update(result["saved_bytes"])
+    return {
+        "sessions": sorted(result["path"] for result in results),
+        "messages": sum(result["messages"] for result in results),
+        "bytes": sum(result["bytes"] for result in results),
+        "policy": {
+            "RETAINED_STARTUP_GRACE_SEC": RETAINED_STARTUP_GRACE_SEC,
+            "RETAIN_ALWAYS_KEEP_TOPICS": sorted(RETAIN_ALWAYS_KEEP_TOPICS),
+        },
+        "topics": {
+            topic: {"counts": dict(stats["counts"]), "age": dict(stats["age"])}
+            for topic, stats in sorted(topics.items(), key=lambda item: -item[1]["counts"]["retained"])
+        },
+        "retained_since_start": dict(since_start),
+        "variants": {
+            variant: {"messages": saved_messages.get(variant, 0), "bytes": saved_bytes.get(variant, 0)}
+            for variant in policy_variants()
+        },
+    }
+
+
+def analyze_corpus(paths: list[Path], jobs: int = 1) -> dict[str, Any]:
+    """Alle Sessions scannen (parallel bei jobs > 1) und zusammenführen."""
+    path_strs = [str(path) for path in paths]
+    if jobs > 1 and len(path_strs) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(path_strs))) as pool:
+            results = list(pool.map(scan_retain_corpus_file, path_strs))
+    else:
+        results = [scan_retain_corpus_file(path) for path in path_strs]
+    return merge_corpus_results(results)
+
+
+def print_corpus_report(corpus: dict[str, Any]) -> None:
+    total_bytes = corpus["bytes"] or 1
+    print(
+        f"\n📚 Retain-Korpus: {len(corpus['sessions'])} Sessions, {corpus['messages']} Messages, "
+        f"{corpus['bytes'] / 1_000_000:.1f} MB"
+    )
+    print(
+        f"   Policy: Grace {corpus['policy']['RETAINED_STARTUP_GRACE_SEC']:g}s, "
+        f"Keep-Liste {', '.join(corpus['policy']['RETAIN_ALWAYS_KEEP_TOPICS'])}"
+    )
+
+    retained_topics = [(t, s) for t, s in corpus["topics"].items() if s["counts"].get("retained")]
+    print(f"\n📌 Topics mit retained Messages ({min(TOP_TOPICS, len(retained_topics))} von {len(retained_topics)})")
+    for topic, stats in retained_topics[:TOP_TOPICS]:
+        counts = stats["counts"]
+        age = format_histogram(stats["age"])
+        print(
+            f"   {topic[:55]:<55} retained={counts.get('retained', 0):>5} "
+            f"dup={counts.get('retained_duplicates', 0):>4} non_retained={counts.get('non_retained', 0):>5}  Alter: {age}"
+        )
+
+    print(f"\n⏱️  Retained nach Recording-Start: {format_histogram(corpus['retained_since_start'])}")
+
+    print("\n💾 Geschätzte Einsparung je Policy-Variante")
+    for variant, saved in corpus["variants"].items():
+        print(
+            f"   {variant:<36} {saved['messages']:>7} Messages  {saved['bytes'] / 1000:>10.1f} kB "
+            f"({saved['bytes'] / total_bytes:.2%})"
+        )
+
+
+def main_corpus(args: argparse.Namespace) -> None:
+    paths = (
+        [Path(p) for p in args.paths] if args.paths else sorted((REPO_ROOT / "data/osf-data/sessions").glob("*.log"))
+    )
+    paths = [path for path in paths if path.suffix == ".log" and path.exists()]
+    if not paths:
+        print("Keine Session-Dateien gefunden.")
+        return
+    corpus = analyze_corpus(paths, jobs=args.jobs)
+    print_corpus_report(corpus)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as handle:
+            json.dump(corpus, handle, indent=2, ensure_ascii=False)
+        print(f"\n💾 Gespeichert: {args.json}")
+
+
 def main() -> None:
-    if len(sys.argv) > 1:
-        paths = [Path(p) for p in sys.argv[1:]]
+    parser = argparse.ArgumentParser(description="QoS/Retain-Verteilung in Session-Logs und test_topics")
+    parser.add_argument("paths", nargs="*", help="Session-Logs (.log) bzw. test_topic-JSONs")
+    parser.add_argument("--corpus", action="store_true", help="Korpus-Modus: alle Sessions zusammenführen")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallele Prozesse (--corpus)")
+    parser.add_argument("--json", type=Path, help="Korpus-Ergebnis zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    if args.corpus:
+        main_corpus(args)
+        return
+
+    if args.paths:
+        paths = [Path(p) for p in args.paths]
     else:
         sessions_dir = REPO_ROOT / "data/osf-data/sessions"
         test_topics_dir = REPO_ROOT / "data/osf-data/test_topics"
@@ -13,6 +13,10 @@ Diese sind entscheidend für Verifikation – bei weiteren Orders diktiert der O
 
 Session-Format: Jede Zeile JSON mit topic, payload (String mit JSON), timestamp.
 
+Ein Vorwärtsdurchlauf (FtsPositionTracker): letzte FTS-Position, Order-Queue und offene Auslöser
+werden mitgeführt – keine Vorwärtssuche pro Auslöser, daher auch für mehrstündige Schicht-Logs geeignet.
+Zusätzlich je Auslöser: FTS-Position zum Zeitpunkt des Auslösers und nächste Order (Queue oder neu).
+
 Usage:
     python scripts/analyze_session_fts_positions.py
     python scripts/analyze_session_fts_positions.py data/osf-data/sessions/mixed-sr-pr-prnok_20260305_121602.log
@@ -25,6 +29,7 @@ from __future__ import annotations
 
 import argparse
 import json
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -32,6 +37,8 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 SESSIONS_DIR = REPO_ROOT / "data/osf-data/sessions"
 DPS_SERIAL = "SVR4H73275"  # DPS-Modul
 HBW_SERIAL = "SVR3QA0022"  # HBW (Hochregallager)
+FTS_LOOKAHEAD_EVENTS = 500  # FTS-Positionen werden bis zu 500 Events nach dem Auslöser gesammelt
+MAX_FTS_POSITIONS = 10  # ... höchstens 10 pro Auslöser
 
 
 @dataclass
@@ -146,107 +153,191 @@ def extract_fts_position(payload: dict | list) -> tuple[str | None, str | None]:
     return last_mod, last_node
 
 
-def analyze_session(path: Path) -> dict:
-    """Analysiert eine Session-Datei."""
-    events: list[LogEvent] = []
-    for line in path.open(encoding="utf-8"):
-        ev = parse_log_line(line)
-        if ev:
-            events.append(ev)
-
-    result = {
-        "path": str(path.name),
-        "total_events": len(events),
-        "production_completion": [],
-        "quality_fail": [],
-    }
+def fts_position_entry(ev: LogEvent) -> dict | None:
+    """FTS-Position aus fts/v1/ff/+/state bzw. ccu/pairing/state als Report-Eintrag (sonst None)."""
+    if ev.topic.startswith("fts/v1/ff/") and ev.topic.endswith("/state"):
+        source = None
+    elif "ccu/pairing/state" in ev.topic:
+        source = "pairing"
+    else:
+        return None
+    mod, node = extract_fts_position(ev.payload)
+    if not (mod or node):
+        return None
+    entry: dict = {"timestamp": ev.timestamp}
+    if source:
+        entry["source"] = source
+    entry.update(
+        {
+            "lastModuleSerialNumber": mod,
+            "lastNodeId": node,
+            "at_dps": node == DPS_SERIAL or mod == DPS_SERIAL,
+            "at_hbw": node == HBW_SERIAL or mod == HBW_SERIAL,
+        }
+    )
+    return entry
+
+
+def order_ids(payload: dict | list | None) -> list[str]:
+    """orderIds aus ccu/order/* Payload (Objekt oder Liste), in Payload-Reihenfolge."""
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list):
+        return []
+    return [o["orderId"] for o in payload if isinstance(o, dict) and o.get("orderId")]
+
+
+def pending_order_ids(payload: dict | list | None) -> list[str]:
+    """orderIds der Orders in der Queue (ENQUEUED / IN_PROGRESS) aus ccu/order/active."""
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list):
+        return []
+    return [
+        o["orderId"]
+        for o in payload
+        if isinstance(o, dict) and o.get("orderId") and o.get("state") in ("ENQUEUED", "IN_PROGRESS")
+    ]
+
+
+@dataclass
+class _OpenTrigger:
+    """Offener Auslöser (Order FINISHED / Quality-Fail), der noch FTS-Positionen bzw. Folge-Order sammelt."""
+
+    index: int
+    record: dict
+    exclude_orders: frozenset[str]
+
+
+class FtsPositionTracker:
+    """
+    Zustandsautomat für einen einzigen Vorwärtsdurchlauf über die Events.
+
+    Hält die letzte bekannte FTS-Position, die Order-Queue aus ccu/order/active sowie offene
+    Auslöser. Jeder Auslöser sammelt die ersten MAX_FTS_POSITIONS FTS-Positionen innerhalb von
+    FTS_LOOKAHEAD_EVENTS Events danach (wie bisher die Vorwärtssuche) und die nächste Order:
+    zuerst aus der Queue zum Zeitpunkt des Auslösers, sonst die nächste neu auftauchende orderId.
+    """
+
+    def __init__(self) -> None:
+        self.latest_position: dict | None = None
+        self.last_active_orders: dict | list | None = None
+        self.pending_orders: list[str] = []
+        self.seen_orders: set[str] = set()
+        self.open_triggers: deque[_OpenTrigger] = deque()
+        self.awaiting_next_order: list[_OpenTrigger] = []
+        self.production_completion: list[dict] = []
+        self.quality_fail: list[dict] = []
+
+    def feed(self, index: int, ev: LogEvent) -> None:
+        self._expire(index)
+
+        position = fts_position_entry(ev)
+        if position is not None:
+            self.latest_position = position
+            self._add_position(position)
 
-    last_active_orders: dict | list | None = None
-    for i, ev in enumerate(events):
         if ev.topic == "ccu/order/active":
-            last_active_orders = ev.payload if isinstance(ev.payload, (dict, list)) else None
+            self.last_active_orders = ev.payload if isinstance(ev.payload, (dict, list)) else None
+            self.pending_orders = pending_order_ids(self.last_active_orders)
+            self._track_new_orders(ev)
+        elif ev.topic == "ccu/order/completed":
+            self.seen_orders.update(order_ids(ev.payload))
 
         # (1) CCU Order FINISHED
         if ev.topic in ("ccu/order/completed", "ccu/order/active") and has_finished_order(ev.payload):
-            # Sammle FTS-Positionen zeitlich danach
-            fts_positions_after = []
-            for j in range(i + 1, min(i + 500, len(events))):
-                nex = events[j]
-                if nex.topic.startswith("fts/v1/ff/") and nex.topic.endswith("/state"):
-                    mod, node = extract_fts_position(nex.payload)
-                    if mod or node:
-                        fts_positions_after.append(
-                            {
-                                "timestamp": nex.timestamp,
-                                "lastModuleSerialNumber": mod,
-                                "lastNodeId": node,
-                                "at_dps": node == DPS_SERIAL or mod == DPS_SERIAL,
-                                "at_hbw": node == HBW_SERIAL or mod == HBW_SERIAL,
-                            }
-                        )
-                elif "ccu/pairing/state" in nex.topic:
-                    mod, node = extract_fts_position(nex.payload)
-                    if mod or node:
-                        fts_positions_after.append(
-                            {
-                                "timestamp": nex.timestamp,
-                                "source": "pairing",
-                                "lastModuleSerialNumber": mod,
-                                "lastNodeId": node,
-                                "at_dps": node == DPS_SERIAL or mod == DPS_SERIAL,
-                                "at_hbw": node == HBW_SERIAL or mod == HBW_SERIAL,
-                            }
-                        )
-            single_order = is_single_order_scenario(ev.payload)
-            result["production_completion"].append(
-                {
-                    "order_timestamp": ev.timestamp,
-                    "single_order": single_order,
-                    "fts_positions_after": fts_positions_after[:10],
-                }
-            )
+            record = {
+                "order_timestamp": ev.timestamp,
+                "single_order": is_single_order_scenario(ev.payload),
+                "fts_positions_after": [],
+            }
+            self.production_completion.append(record)
+            self._open(index, record, frozenset(order_ids(ev.payload)))
 
         # (2) Module CHECK_QUALITY FAILED
         if "module/v1/ff/" in ev.topic and ev.topic.endswith("/state") and is_check_quality_failed(ev.payload):
-            fts_positions_after = []
-            for j in range(i + 1, min(i + 500, len(events))):
-                nex = events[j]
-                if nex.topic.startswith("fts/v1/ff/") and nex.topic.endswith("/state"):
-                    mod, node = extract_fts_position(nex.payload)
-                    if mod or node:
-                        fts_positions_after.append(
-                            {
-                                "timestamp": nex.timestamp,
-                                "lastModuleSerialNumber": mod,
-                                "lastNodeId": node,
-                                "at_dps": node == DPS_SERIAL or mod == DPS_SERIAL,
-                                "at_hbw": node == HBW_SERIAL or mod == HBW_SERIAL,
-                            }
-                        )
-                elif "ccu/pairing/state" in nex.topic:
-                    mod, node = extract_fts_position(nex.payload)
-                    if mod or node:
-                        fts_positions_after.append(
-                            {
-                                "timestamp": nex.timestamp,
-                                "source": "pairing",
-                                "lastModuleSerialNumber": mod,
-                                "lastNodeId": node,
-                                "at_dps": node == DPS_SERIAL or mod == DPS_SERIAL,
-                                "at_hbw": node == HBW_SERIAL or mod == HBW_SERIAL,
-                            }
-                        )
-            single_order = is_single_order_quality_fail(last_active_orders)
-            result["quality_fail"].append(
-                {
-                    "fail_timestamp": ev.timestamp,
-                    "module_topic": ev.topic,
-                    "single_order": single_order,
-                    "fts_positions_after": fts_positions_after[:10],
-                }
+            record = {
+                "fail_timestamp": ev.timestamp,
+                "module_topic": ev.topic,
+                "single_order": is_single_order_quality_fail(self.last_active_orders),
+                "fts_positions_after": [],
+            }
+            self.quality_fail.append(record)
+            failed_order = ev.payload.get("orderId") if isinstance(ev.payload, dict) else None
+            self._open(index, record, frozenset([failed_order] if failed_order else []))
+
+    def _open(self, index: int, record: dict, exclude_orders: frozenset[str]) -> None:
+        record["fts_position_at_event"] = self.latest_position
+        trigger = _OpenTrigger(index=index, record=record, exclude_orders=exclude_orders)
+        queued = next((oid for oid in self.pending_orders if oid not in exclude_orders), None)
+        if queued is not None:
+            # Bereits in der Queue: Folge-Order steht zum Zeitpunkt des Auslösers fest
+            record["next_order"] = {"orderId": queued, "timestamp": None, "source": "queue"}
+        else:
+            record["next_order"] = None
+            self.awaiting_next_order.append(trigger)
+        self.open_triggers.append(trigger)
+
+    def _expire(self, index: int) -> None:
+        while self.open_triggers and index - self.open_triggers[0].index >= FTS_LOOKAHEAD_EVENTS:
+            self.open_triggers.popleft()
+
+    def _add_position(self, position: dict) -> None:
+        filled = False
+        for trigger in self.open_triggers:
+            positions = trigger.record["fts_positions_after"]
+            positions.append(position)
+            filled = filled or len(positions) >= MAX_FTS_POSITIONS
+        if filled:
+            self.open_triggers = deque(
+                t for t in self.open_triggers if len(t.record["fts_positions_after"]) < MAX_FTS_POSITIONS
             )
 
-    return result
+    def _track_new_orders(self, ev: LogEvent) -> None:
+        new_orders = [oid for oid in order_ids(ev.payload) if oid not in self.seen_orders]
+        self.seen_orders.update(new_orders)
+        if not new_orders or not self.awaiting_next_order:
+            return
+        still_waiting = []
+        for trigger in self.awaiting_next_order:
+            candidate = next((oid for oid in new_orders if oid not in trigger.exclude_orders), None)
+            if candidate is None:
+                still_waiting.append(trigger)
+            else:
+                trigger.record["next_order"] = {"orderId": candidate, "timestamp": ev.timestamp, "source": "new"}
+        self.awaiting_next_order = still_waiting
+
+
+def analyze_session(path: Path) -> dict:
+    """Analysiert eine Session-Datei in einem Vorwärtsdurchlauf (siehe FtsPositionTracker)."""
+    tracker = FtsPositionTracker()
+    total_events = 0
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            ev = parse_log_line(line)
+            if ev:
+                tracker.feed(total_events, ev)
+                total_events += 1
+
+    return {
+        "path": str(path.name),
+        "total_events": total_events,
+        "production_completion": tracker.production_completion,
+        "quality_fail": tracker.quality_fail,
+    }
+
+
+def print_order_context(trigger: dict) -> None:
+    """Gibt FTS-Position zum Auslöser-Zeitpunkt und Folge-Order aus."""
+    at_event = trigger.get("fts_position_at_event")
+    if at_event:
+        mod = at_event.get("lastModuleSerialNumber") or "-"
+        node = at_event.get("lastNodeId") or "-"
+        print(f"    FTS zum Zeitpunkt: lastModuleSerialNumber={mod}, lastNodeId={node} (@ {at_event['timestamp']})")
+    next_order = trigger.get("next_order")
+    if next_order:
+        when = f" @ {next_order['timestamp']}" if next_order.get("timestamp") else ""
+        print(f"    Nächste Order: {next_order['orderId']} [{next_order['source']}]{when}")
 
 
 def print_report(analysis: dict, *, single_only: bool = False) -> None:
@@ -271,6 +362,7 @@ def print_report(analysis: dict, *, single_only: bool = False) -> None:
             so = pc.get("single_order", False)
             so_tag = " ★ Single-Order (empfohlen für Verifikation)" if so else ""
             print(f"  Order-FINISHED @ {pc['order_timestamp']}{so_tag}")
+            print_order_context(pc)
             for fp in pc["fts_positions_after"]:
                 mod = fp.get("lastModuleSerialNumber") or "-"
                 node = fp.get("lastNodeId") or "-"
@@ -295,6 +387,7 @@ def print_report(analysis: dict, *, single_only: bool = False) -> None:
             so_tag = " ★ Single-Order (empfohlen für Verifikation)" if so else ""
             print(f"  CHECK_QUALITY FAILED @ {qf['fail_timestamp']}{so_tag}")
             print(f"  Module: {qf['module_topic']}")
+            print_order_context(qf)
             for fp in qf["fts_positions_after"]:
                 mod = fp.get("lastModuleSerialNumber") or "-"
                 node = fp.get("lastNodeId") or "-"
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Stations-Auslastung und Engpass-Analyse über eine oder mehrere Sessions.
+
+Kennzahlen pro Station (Modul bzw. FTS):
+- busy / blocked / idle Anteil am Beobachtungszeitraum (Session-Dauer, über Sessions summiert)
+  - busy: Vereinigung der Action-Intervalle (actionState RUNNING → FINISHED/FAILED); FTS: NAVIGATION-Steps
+  - blocked: Modul ist mit dem Step fertig, das Werkstück wartet auf den Abtransport
+    (Ende MANUFACTURE-Step → Start des folgenden NAVIGATION-Steps ab dieser Station)
+  - idle: Rest
+- Zykluszeiten pro Station und Command (PICK, DROP, MILL, DRILL, CHECK_QUALITY, …): p50/p90/p99
+- FTS-Transportzeiten pro Strecke (NAVIGATION source → target): p50/p90/p99
+- Wartezeiten vor einem Step (Ende vorheriger Step → Start) pro Station: p50/p90/p99
+
+Engpass (Constraint): Station mit dem höchsten busy-Anteil.
+
+Datenbasis ist der gecachte Lebenszyklus-Index (scripts/session_lifecycle_index.py),
+d.h. jede Session wird höchstens einmal gelesen.
+
+Usage:
+    python scripts/analyze_station_utilisation.py                     # alle Sessions
+    python scripts/analyze_station_utilisation.py data/osf-data/sessions/storage-production-ml-bwr_20260804_130016.log
+    python scripts/analyze_station_utilisation.py --json data/osf-data/station_utilisation.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterable
+
+from session_lifecycle_index import load_index
+from session_log_stream import MODULE_SERIALS, list_session_files, percentile, timestamp_to_epoch_ms
+
+SERIAL_TO_STATION = {serial: name.upper() for name, serial in MODULE_SERIALS.items()}
+FTS_STATION = "FTS"
+PERCENTILES = (50, 90, 99)
+
+
+def distribution(values: Iterable[float]) -> dict[str, Any]:
+    ordered = sorted(values)
+    stats: dict[str, Any] = {"count": len(ordered)}
+    for q in PERCENTILES:
+        stats[f"p{q}"] = percentile(ordered, q)
+    stats["max"] = ordered[-1] if ordered else None
+    return stats
+
+
+def union_length_ms(intervals: list[tuple[int, int]]) -> int:
+    """Gesamtlänge der Vereinigung von [start, end]-Intervallen."""
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        elif end > current_end:
+            current_end = end
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def _interval(start: Any, end: Any) -> tuple[int, int] | None:
+    start_ms = timestamp_to_epoch_ms(start)
+    end_ms = timestamp_to_epoch_ms(end)
+    if start_ms is None or end_ms is None or end_ms < start_ms:
+        return None
+    return start_ms, end_ms
+
+
+class UtilisationAccumulator:
+    """Sammelt Intervalle und Dauern aus Lebenszyklus-Indizes mehrerer Sessions."""
+
+    def __init__(self) -> None:
+        self.window_ms = 0
+        self.busy_ms: dict[str, int] = defaultdict(int)
+        self.blocked_ms: dict[str, int] = defaultdict(int)
+        self.cycle_times: dict[tuple[str, str], list[float]] = defaultdict(list)
+        self.transport_times: dict[str, list[float]] = defaultdict(list)
+        self.wait_times: dict[str, list[float]] = defaultdict(list)
+        self.sessions: list[str] = []
+
+    def add(self, index: dict[str, Any]) -> None:
+        span = _interval(index["span"].get("start"), index["span"].get("end"))
+        if span is None:
+            return
+        self.sessions.append(index["session"])
+        self.window_ms += span[1] - span[0]
+
+        busy_intervals: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for action in index["actions"].values():
+            station = SERIAL_TO_STATION.get(action.get("serialNumber"))
+            interval = _interval(action.get("running_at"), action.get("ended_at"))
+            if station is None or station == FTS_STATION or interval is None:
+                continue
+            busy_intervals[station].append(interval)
+            self.cycle_times[(station, action.get("command") or "?")].append((interval[1] - interval[0]) / 1000)
+
+        # ccu/order/completed enthält auch Orders früherer Sessions → nur Steps, die in dieser Session starten
+        for order in index["orders"].values():
+            previous: dict[str, Any] | None = None
+            for step in order["steps"]:
+                started_ms = timestamp_to_epoch_ms(step.get("startedAt"))
+                if started_ms is None or not span[0] <= started_ms <= span[1]:
+                    previous = step
+                    continue
+                station = FTS_STATION if step.get("type") == "NAVIGATION" else step.get("moduleType")
+                if station and step.get("wait_s") is not None:
+                    self.wait_times[station].append(max(step["wait_s"], 0.0))
+                if step.get("type") == "NAVIGATION":
+                    interval = _interval(step.get("startedAt"), step.get("stoppedAt"))
+                    if interval is not None:
+                        busy_intervals[FTS_STATION].append((interval[0], min(interval[1], span[1])))
+                        route = f"{step.get('source')} → {step.get('target')}"
+                        self.transport_times[route].append((interval[1] - interval[0]) / 1000)
+                    if (
+                        previous
+                        and previous.get("type") == "MANUFACTURE"
+                        and previous.get("moduleType") == step.get("source")
+                    ):
+                        blocked = _interval(previous.get("stoppedAt"), step.get("startedAt"))
+                        if blocked is not None:
+                            self.blocked_ms[step["source"]] += blocked[1] - max(blocked[0], span[0])
+                previous = step
+
+        for station, intervals in busy_intervals.items():
+            self.busy_ms[station] += union_length_ms(intervals)
+
+    def report(self) -> dict[str, Any]:
+        stations = sorted(set(self.busy_ms) | set(self.blocked_ms))
+        utilisation: dict[str, dict[str, float]] = {}
+        for station in stations:
+            busy = self.busy_ms.get(station, 0) / self.window_ms if self.window_ms else 0.0
+            blocked = self.blocked_ms.get(station, 0) / self.window_ms if self.window_ms else 0.0
+            utilisation[station] = {
+                "busy": round(busy, 4),
+                "blocked": round(blocked, 4),
+                "idle": round(max(0.0, 1.0 - busy - blocked), 4),
+            }
+        constraint = max(utilisation, key=lambda s: utilisation[s]["busy"]) if utilisation else None
+        return {
+            "sessions": self.sessions,
+            "observed_s": round(self.window_ms / 1000, 3),
+            "utilisation": utilisation,
+            "constraint_station": constraint,
+            "cycle_times_s": {
+                f"{station}/{command}": distribution(values)
+                for (station, command), values in sorted(self.cycle_times.items())
+            },
+            "transport_times_s": {
+                route: distribution(values) for route, values in sorted(self.transport_times.items())
+            },
+            "wait_times_s": {station: distribution(values) for station, values in sorted(self.wait_times.items())},
+        }
+
+
+def _format_distribution(stats: dict[str, Any]) -> str:
+    return "  ".join(f"p{q}={stats[f'p{q}']}" for q in PERCENTILES) + f"  (n={stats['count']})"
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(f"\n📊 Stations-Auslastung – {len(report['sessions'])} Session(s), {report['observed_s']} s beobachtet")
+    print("-" * 70)
+    print(f"  {'Station':<8} {'busy':>8} {'blocked':>9} {'idle':>8}")
+    for station, ratios in report["utilisation"].items():
+        flag = "  ⚠️ Engpass" if station == report["constraint_station"] else ""
+        print(f"  {station:<8} {ratios['busy']:>8.1%} {ratios['blocked']:>9.1%} {ratios['idle']:>8.1%}{flag}")
+
+    print("\n⏱️  Zykluszeiten (s) pro Station/Command")
+    for key, stats in report["cycle_times_s"].items():
+        print(f"  {key:<22} {_format_distribution(stats)}")
+
+    print("\n🚚 FTS-Transportzeiten (s) pro Strecke")
+    for route, stats in report["transport_times_s"].items():
+        print(f"  {route:<22} {_format_distribution(stats)}")
+
+    print("\n⏳ Wartezeiten vor Steps (s) pro Station")
+    for station, stats in report["wait_times_s"].items():
+        print(f"  {station:<22} {_format_distribution(stats)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stations-Auslastung, Zykluszeit-Perzentile und Engpass")
+    parser.add_argument(
+        "paths", nargs="*", type=Path, help="Session-Dateien/-Verzeichnisse. Ohne Angabe: alle Sessions"
+    )
+    parser.add_argument("--json", type=Path, help="Ergebnis zusätzlich als JSON speichern")
+    parser.add_argument("--force", action="store_true", help="Lebenszyklus-Index neu bauen (Cache ignorieren)")
+    args = parser.parse_args()
+
+    paths = [path for path in list_session_files(args.paths) if path.exists()]
+    if not paths:
+        print("Keine Session-Dateien gefunden.")
+        return
+
+    accumulator = UtilisationAccumulator()
+    for path in paths:
+        index, _cached = load_index(path, force=args.force)
+        accumulator.add(index)
+
+    report = accumulator.report()
+    print_report(report)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        print(f"\n💾 Gespeichert: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
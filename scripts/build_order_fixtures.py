@@ -8,6 +8,8 @@ topics relevant to the UI, and writes trimmed fixture files under
 
 By default the script builds the predefined fixtures (white, blue, red, mixed)
 that combine order, module and optional FTS telemetry for deterministic replay.
+All selected fixtures are built in a single streaming pass per source session and
+written incrementally, so memory stays bounded regardless of session size.
 
 Usage examples:
 
@@ -43,6 +45,27 @@ def topic_matches(topic: str, patterns: Sequence[str]) -> bool:
     return False
 
 
+class TopicMatcher:
+    """
+    Precompiled form of `topic_matches` for a fixed pattern list.
+
+    Exact patterns go into a set, `prefix*` patterns into one tuple for `str.startswith`;
+    decisions are cached per topic (recorded sessions only use a few hundred topics).
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        self.exact = frozenset(pattern for pattern in patterns if not pattern.endswith("*"))
+        self.prefixes = tuple(pattern[:-1] for pattern in patterns if pattern.endswith("*"))
+        self._cache: dict[str, bool] = {}
+
+    def __call__(self, topic: str) -> bool:
+        decision = self._cache.get(topic)
+        if decision is None:
+            decision = topic in self.exact or (bool(self.prefixes) and topic.startswith(self.prefixes))
+            self._cache[topic] = decision
+        return decision
+
+
 def extract_order_ids(payload: object) -> set[str]:
     """Collect order ids from a decoded payload."""
     collected: set[str] = set()
@@ -83,6 +106,20 @@ def iter_messages(paths: Sequence[Path]) -> Iterator[dict]:
                     raise RuntimeError(f"Failed to parse line in {path}: {exc}") from exc
 
 
+def split_payload(topic: str, decoded_payload: object) -> list[object]:
+    """Split order arrays (ccu/order/active/completed) into one payload per order."""
+    if topic in {"ccu/order/active", "ccu/order/completed"} and isinstance(decoded_payload, list):
+        return list(decoded_payload)
+    return [decoded_payload]
+
+
+def encode_payload(payload_obj: object) -> object:
+    """Ensure payloads are JSON strings for dict/list payloads."""
+    if isinstance(payload_obj, (dict, list)):
+        return json.dumps(payload_obj, ensure_ascii=False)
+    return payload_obj
+
+
 def normalize_message(message: dict, decoded_payload: object) -> list[dict]:
     """
     Normalize a single MQTT message into one or multiple JSON objects.
@@ -90,22 +127,10 @@ def normalize_message(message: dict, decoded_payload: object) -> list[dict]:
     - Split order arrays (ccu/order/active/completed) into individual messages.
     - Ensure payloads are JSON strings for dict/list payloads.
     """
-
-    topic = message.get("topic", "")
     base = {key: value for key, value in message.items() if key != "payload"}
-
-    def encode_payload(payload_obj: object) -> object:
-        if isinstance(payload_obj, (dict, list)):
-            return json.dumps(payload_obj, ensure_ascii=False)
-        return payload_obj
-
-    if topic in {"ccu/order/active", "ccu/order/completed"} and isinstance(decoded_payload, list):
-        normalized: list[dict] = []
-        for entry in decoded_payload:
-            normalized.append({**base, "payload": encode_payload(entry)})
-        return normalized
-
-    return [{**base, "payload": encode_payload(decoded_payload)}]
+    return [
+        {**base, "payload": encode_payload(entry)} for entry in split_payload(message.get("topic", ""), decoded_payload)
+    ]
 
 
 @dataclass
@@ -124,51 +149,115 @@ class FixtureConfig:
         return self.output if self.output.is_absolute() else REPO_ROOT / self.output
 
 
-def build_fixture(config: FixtureConfig, dry_run: bool = False) -> int:
-    """Create a trimmed fixture file according to the config."""
-    resolved_sources = config.resolve_sources()
-    output_path = config.resolve_output()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    retained: list[str] = []
-
-    for message in iter_messages(resolved_sources):
-        topic = message.get("topic", "")
-        if not topic_matches(topic, config.topic_patterns):
-            continue
-
-        payload = decode_payload(message.get("payload"))
-        order_ids = extract_order_ids(payload)
-
-        keep = True
-        if config.order_ids:
-            keep = bool(order_ids & config.order_ids)
-            if not keep and topic_matches(topic, config.passthrough_patterns):
-                keep = True
-
-        if not keep:
-            continue
-
-        for normalized in normalize_message(message, payload):
-            if config.order_ids:
-                normalized_payload = decode_payload(normalized.get("payload"))
-                topic = normalized.get("topic", "")
-                if not (extract_order_ids(normalized_payload) & config.order_ids) and not any(
-                    topic_matches(topic, [pattern]) for pattern in config.passthrough_patterns
-                ):
+class _LazyLine:
+    """JSON line of a normalized message, serialized at most once across all fixtures."""
+
+    __slots__ = ("_base", "_payload", "_line")
+
+    def __init__(self, base: dict, payload: object) -> None:
+        self._base = base
+        self._payload = payload
+        self._line: str | None = None
+
+    def get(self) -> str:
+        if self._line is None:
+            self._line = json.dumps({**self._base, "payload": encode_payload(self._payload)}, ensure_ascii=False)
+        return self._line
+
+
+class FixtureWriter:
+    """
+    Evaluates one FixtureConfig against a message stream and writes matches incrementally.
+
+    Output goes to a temporary file next to the fixture and replaces it on `close`, so an
+    aborted run never leaves a truncated fixture behind.
+    """
+
+    def __init__(self, config: FixtureConfig, dry_run: bool = False) -> None:
+        self.config = config
+        self.dry_run = dry_run
+        self.sources = set(config.resolve_sources())
+        self.output_path = config.resolve_output()
+        self.matches_topic = TopicMatcher(config.topic_patterns)
+        self.passes_through = TopicMatcher(config.passthrough_patterns)
+        self.count = 0
+        self._handle = None
+        self._tmp_path = self.output_path.with_name(self.output_path.name + ".tmp")
+        if not dry_run:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = self._tmp_path.open("w", encoding="utf-8")
+
+    def wants_topic(self, topic: str) -> bool:
+        return self.matches_topic(topic)
+
+    def feed(self, topic: str, entries: list[tuple[set[str], _LazyLine]]) -> None:
+        """Write the normalized entries of one message that belong to this fixture."""
+        order_filter = self.config.order_ids
+        passthrough = bool(order_filter) and self.passes_through(topic)
+        for order_ids, line in entries:
+            if order_filter and not passthrough and not order_ids & order_filter:
+                continue
+            self.count += 1
+            if self._handle is not None:
+                self._handle.write(line.get())
+                self._handle.write("\n")
+
+    def close(self) -> int:
+        if self.dry_run:
+            print(f"[DRY-RUN] {self.config.name}: would write {self.count} messages to {self.output_path}")
+            return self.count
+        self._handle.close()
+        self._tmp_path.replace(self.output_path)
+        print(f"[OK] {self.config.name}: wrote {self.count} messages to {self.output_path}")
+        return self.count
+
+    def abort(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._tmp_path.unlink(missing_ok=True)
+
+
+def build_fixtures(configs: Sequence[FixtureConfig], dry_run: bool = False) -> dict[str, int]:
+    """
+    Build several fixtures in one pass per source session.
+
+    Every source file is read once (in order of first appearance across the configs) and each
+    message is offered to all fixtures using that source. Topics are checked with precompiled
+    matchers; the payload is decoded and split only if at least one fixture wants the topic.
+    """
+    writers = [FixtureWriter(config, dry_run=dry_run) for config in configs]
+    sources: list[Path] = []
+    for writer in writers:
+        for source in writer.config.resolve_sources():
+            if source not in sources:
+                sources.append(source)
+
+    try:
+        for source in sources:
+            source_writers = [writer for writer in writers if source in writer.sources]
+            for message in iter_messages([source]):
+                topic = message.get("topic", "")
+                interested = [writer for writer in source_writers if writer.wants_topic(topic)]
+                if not interested:
                     continue
-            retained.append(json.dumps(normalized, ensure_ascii=False))
+                base = {key: value for key, value in message.items() if key != "payload"}
+                entries = [
+                    (extract_order_ids(entry), _LazyLine(base, entry))
+                    for entry in split_payload(topic, decode_payload(message.get("payload")))
+                ]
+                for writer in interested:
+                    writer.feed(topic, entries)
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
 
-    if dry_run:
-        print(f"[DRY-RUN] {config.name}: would write {len(retained)} messages to {output_path}")
-        return len(retained)
+    return {writer.config.name: writer.close() for writer in writers}
 
-    with output_path.open("w", encoding="utf-8") as handle:
-        handle.write("\n".join(retained))
-        handle.write("\n")
 
-    print(f"[OK] {config.name}: wrote {len(retained)} messages to {output_path}")
-    return len(retained)
+def build_fixture(config: FixtureConfig, dry_run: bool = False) -> int:
+    """Create a trimmed fixture file according to the config."""
+    return build_fixtures([config], dry_run=dry_run)[config.name]
 
 
 def load_default_configs() -> list[FixtureConfig]:
@@ -331,9 +420,7 @@ def main() -> int:
     if args.only:
         configs = [cfg for cfg in configs if cfg.name == args.only]
 
-    total = 0
-    for config in configs:
-        total += build_fixture(config, dry_run=args.dry_run)
+    total = sum(build_fixtures(configs, dry_run=args.dry_run).values())
     return 0 if total else 1
 
 
@@ -4,29 +4,118 @@ Prüft Abgleich: *.log in data/osf-data/sessions vs. Einträge in INVENTORY.md.
 
 Liefert Exit 0 immer (Hinweis-Tool). Nutzung:
   python scripts/check_session_inventory.py
+  python scripts/check_session_inventory.py --no-cache   # alle Dateien neu lesen
+
+Pro Datei werden nur die session_meta-Zeile und ein begrenztes Dateiende (letzter Timestamp)
+gelesen. Die Zusammenfassungen werden nach Größe/mtime gecacht
+(data/osf-data/analysis-cache/session_inventory.json); unveränderte Dateien werden nicht geöffnet.
+Gegenüber dem letzten Lauf wird Drift gemeldet (neue, entfernte, geänderte Sessions).
 
 Pflege: Bei neuer Session Zeile in INVENTORY ergänzen; bei gelöschter Datei Zeile entfernen.
 """
 
 from __future__ import annotations
 
+import argparse
 import json
+import os
 import re
 import sys
 from pathlib import Path
+from typing import Any
 
-# Erste Tabellenspalte: typischer Session-Dateiname ohne .log
-_ROW_FIRST_COL = re.compile(r"^\|\s*([a-zA-Z0-9][a-zA-Z0-9_.-]*)\s*\|")
+from session_log_stream import REPO_ROOT, SESSIONS_DIR, read_session_meta
 
+CACHE_PATH = REPO_ROOT / "data" / "osf-data" / "analysis-cache" / "session_inventory.json"
+CACHE_VERSION = 1
+TAIL_BYTES = 64 * 1024  # Dateiende für den letzten Timestamp; wird bei sehr langen Zeilen verdoppelt
+MAX_TAIL_BYTES = 4 * 1024 * 1024
+LIST_LIMIT = 50
 
-def main() -> None:
-    root = Path(__file__).resolve().parent.parent
-    sessions_dir = root / "data" / "osf-data" / "sessions"
-    inventory = root / "data" / "osf-data" / "sessions" / "INVENTORY.md"
+# Erste Tabellenspalte: typischer Session-Dateiname ohne .log
+_ROW_FIRST_COL = re.compile(r"^\|\s*([a-zA-Z0-9][a-zA-Z0-9_.-]*)\s*\|")
 
-    log_files = sorted(sessions_dir.glob("*.log"))
-    stems = {p.stem for p in log_files}
 
+def read_last_timestamp(path: Path, size: int) -> str | None:
+    """Envelope-Timestamp der letzten gültigen Zeile aus einem begrenzten Dateiende."""
+    tail_bytes = TAIL_BYTES
+    with path.open("rb") as handle:
+        while True:
+            start = max(0, size - tail_bytes)
+            handle.seek(start)
+            lines = handle.read().splitlines()
+            if start > 0:
+                lines = lines[1:]  # erste Zeile ist ggf. abgeschnitten
+            for raw in reversed(lines):
+                try:
+                    obj = json.loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if isinstance(obj, dict) and obj.get("timestamp"):
+                    return obj["timestamp"]
+            if start == 0 or tail_bytes >= MAX_TAIL_BYTES:
+                return None
+            tail_bytes *= 2
+
+
+def summarize_log(path: Path, stat: os.stat_result) -> dict[str, Any]:
+    meta = read_session_meta(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "has_meta": meta is not None,
+        "ccu_version": str((meta or {}).get("ccuVersion", "") or "").strip(),
+        "last_timestamp": read_last_timestamp(path, stat.st_size),
+    }
+
+
+def load_cache(path: Path) -> dict[str, dict[str, Any]]:
+    try:
+        with path.open(encoding="utf-8") as handle:
+            cache = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def save_cache(path: Path, files: dict[str, dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump({"version": CACHE_VERSION, "files": files}, handle, indent=1, sort_keys=True)
+    tmp_path.replace(path)
+
+
+def scan_sessions(sessions_dir: Path, cached: dict[str, dict[str, Any]]) -> tuple[dict[str, dict[str, Any]], dict]:
+    """
+    Aktuelle Zusammenfassungen aller *.log; nur neue/geänderte Dateien werden gelesen.
+
+    Returns:
+        (summaries nach Dateiname, drift mit added/removed/changed/read)
+    """
+    summaries: dict[str, dict[str, Any]] = {}
+    drift: dict[str, list[str]] = {"added": [], "removed": [], "changed": [], "read": []}
+    with os.scandir(sessions_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".log") or not entry.is_file():
+                continue
+            stat = entry.stat()
+            previous = cached.get(entry.name)
+            if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+                summaries[entry.name] = previous
+                continue
+            summaries[entry.name] = summarize_log(Path(entry.path), stat)
+            drift["read"].append(entry.name)
+            drift["changed" if previous else "added"].append(entry.name)
+    drift["removed"] = [name for name in cached if name not in summaries]
+    for names in drift.values():
+        names.sort()
+    return summaries, drift
+
+
+def inventory_names(inventory: Path) -> set[str]:
     inv_text = inventory.read_text(encoding="utf-8") if inventory.exists() else ""
     # Nur Tabelle „Schnellübersicht“ (bis nächste ##-Sektion)
     section_match = re.search(
@@ -47,69 +136,62 @@ def main() -> None:
         if name.endswith(".log"):
             name = name[:-4]
         mentioned.add(name)
+    return mentioned
 
-    only_files = sorted(stems - mentioned)
-    only_inventory = sorted(mentioned - stems)
-    missing_ccu_version: list[str] = []
-    unknown_ccu_version: list[str] = []
 
-    for log_file in log_files:
-        try:
-            first_line = log_file.read_text(encoding="utf-8").splitlines()[0].strip()
-        except Exception:
-            continue
-        if not first_line:
-            continue
-        try:
-            first_obj = json.loads(first_line)
-        except json.JSONDecodeError:
-            continue
-        if first_obj.get("_kind") != "session_meta":
-            continue
+def print_list(title: str, names: list[str]) -> None:
+    if not names:
+        return
+    print(title)
+    for name in names[:LIST_LIMIT]:
+        print(f"  - {name}")
+    if len(names) > LIST_LIMIT:
+        print(f"  ... +{len(names) - LIST_LIMIT} weitere")
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session-Logs mit INVENTORY.md abgleichen")
+    parser.add_argument("--no-cache", action="store_true", help="Cache ignorieren und alle Dateien neu lesen")
+    args = parser.parse_args()
+
+    sessions_dir = SESSIONS_DIR
+    inventory = sessions_dir / "INVENTORY.md"
+
+    cached = {} if args.no_cache else load_cache(CACHE_PATH)
+    first_run = not cached
+    summaries, drift = scan_sessions(sessions_dir, cached)
+    if drift["read"] or drift["removed"] or args.no_cache:
+        save_cache(CACHE_PATH, summaries)
 
-        ccu_version = str(first_obj.get("ccuVersion", "") or "").strip()
-        if not ccu_version:
-            missing_ccu_version.append(log_file.name)
-        elif ccu_version == "unknown":
-            unknown_ccu_version.append(log_file.name)
+    stems = {name[:-4] for name in summaries}
+    mentioned = inventory_names(inventory)
+
+    only_files = sorted(stems - mentioned)
+    only_inventory = sorted(mentioned - stems)
+    missing_ccu_version = sorted(n for n, s in summaries.items() if s["has_meta"] and not s["ccu_version"])
+    unknown_ccu_version = sorted(n for n, s in summaries.items() if s["has_meta"] and s["ccu_version"] == "unknown")
 
     print("Session-Logs vs. INVENTORY.md")
     print(f"  Verzeichnis: {sessions_dir}")
-    print(f"  *.log Anzahl: {len(log_files)}")
+    print(
+        f"  *.log Anzahl: {len(summaries)} (gelesen: {len(drift['read'])}, aus Cache: {len(summaries) - len(drift['read'])})"
+    )
     print(f"  INVENTORY-Namen (heuristisch): {len(mentioned)}")
+    last_timestamps = [s["last_timestamp"] for s in summaries.values() if s.get("last_timestamp")]
+    if last_timestamps:
+        print(f"  Jüngste Message: {max(last_timestamps)}")
     print()
 
-    if only_files:
-        print(".log ohne passende INVENTORY-Zeile (bitte Tabelle ergänzen):")
-        for s in only_files[:50]:
-            print(f"  - {s}")
-        if len(only_files) > 50:
-            print(f"  ... +{len(only_files) - 50} weitere")
-        print()
-
-    if only_inventory:
-        print("INVENTORY-Einträge ohne .log (evtl. veraltet oder anderer Pfad):")
-        for s in only_inventory[:50]:
-            print(f"  - {s}")
-        if len(only_inventory) > 50:
-            print(f"  ... +{len(only_inventory) - 50} weitere")
-        print()
-
-    if missing_ccu_version:
-        print("Session-Logs mit session_meta, aber ohne ccuVersion:")
-        for name in missing_ccu_version[:50]:
-            print(f"  - {name}")
-        if len(missing_ccu_version) > 50:
-            print(f"  ... +{len(missing_ccu_version) - 50} weitere")
-        print()
-
-    if unknown_ccu_version:
-        print("Session-Logs mit ccuVersion=unknown (Version nicht erkannt):")
-        for name in unknown_ccu_version[:50]:
-            print(f"  - {name}")
-        if len(unknown_ccu_version) > 50:
-            print(f"  ... +{len(unknown_ccu_version) - 50} weitere")
-        print()
+    if not first_run:
+        print_list("Neu seit letztem Lauf:", drift["added"])
+        print_list("Entfernt seit letztem Lauf:", drift["removed"])
+        print_list("Geändert seit letztem Lauf (Größe/mtime):", drift["changed"])
+
+    print_list(".log ohne passende INVENTORY-Zeile (bitte Tabelle ergänzen):", only_files)
+    print_list("INVENTORY-Einträge ohne .log (evtl. veraltet oder anderer Pfad):", only_inventory)
+    print_list("Session-Logs mit session_meta, aber ohne ccuVersion:", missing_ccu_version)
+    print_list("Session-Logs mit ccuVersion=unknown (Version nicht erkannt):", unknown_ccu_version)
 
     if not only_files and not only_inventory:
         print("OK: keine offensichtlichen Lücken (Heuristik).")
@@ -2,11 +2,13 @@
 """
 Script to create Track & Trace fixtures from log files.
 Combines FTS state, CCU orders, and module state messages into fixture files.
+Session logs are streamed line by line and written incrementally (bounded memory).
 """
 
+import heapq
 import json
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 
 def load_json_file(file_path: Path) -> List[Dict[str, Any]]:
@@ -22,25 +24,82 @@ def load_json_file(file_path: Path) -> List[Dict[str, Any]]:
         return [data]
 
 
-def load_jsonl_file(file_path: Path) -> List[Dict[str, Any]]:
-    """Load JSONL file (one JSON object per line)."""
+def iter_jsonl_file(file_path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream a JSONL file (one JSON object per line) without loading it into memory."""
     if not file_path.exists():
         print(f"Warning: {file_path} does not exist")
-        return []
+        return
 
-    messages = []
     with open(file_path, encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                msg = json.loads(line)
-                messages.append(msg)
+                yield json.loads(line)
             except json.JSONDecodeError as e:
                 print(f"Warning: Failed to parse line in {file_path}: {e}")
 
-    return messages
+
+def load_jsonl_file(file_path: Path) -> List[Dict[str, Any]]:
+    """Load JSONL file (one JSON object per line)."""
+    return list(iter_jsonl_file(file_path))
+
+
+def _timestamp_key(message: Dict[str, Any]) -> str:
+    return message.get("timestamp", "")
+
+
+def _fixture_line(msg: Dict[str, Any]) -> str:
+    # Ensure payload is a string (if it's already a dict, stringify it)
+    if isinstance(msg.get("payload"), dict):
+        msg["payload"] = json.dumps(msg["payload"])
+    return json.dumps(msg, ensure_ascii=False) + "\n"
+
+
+def _has_fts_load(msg: Dict[str, Any]) -> bool:
+    payload = msg.get("payload")
+    return (
+        msg.get("topic", "").startswith("fts/v1/ff/")
+        and isinstance(payload, str)
+        and "loadId" in payload
+        and '"loadId":null' not in payload
+        and '"loadId": null' not in payload
+    )
+
+
+def write_fixture_stream(messages: Iterable[Dict[str, Any]], output_file: Path) -> Tuple[int, int, int]:
+    """
+    Write messages to a JSONL fixture while streaming; returns (messages, fts_with_load, unique_topics).
+
+    Input is expected in timestamp order (session logs are). Should a message arrive out of order,
+    the written file is sorted once afterwards (stable, by timestamp) so the result matches a full sort.
+    """
+    count = 0
+    fts_with_load = 0
+    topics = set()
+    in_order = True
+    last_timestamp = ""
+    with open(output_file, "w", encoding="utf-8") as f:
+        for msg in messages:
+            timestamp = _timestamp_key(msg)
+            if timestamp < last_timestamp:
+                in_order = False
+            last_timestamp = max(last_timestamp, timestamp)
+            # Count messages with loadId (for validation) before the payload is re-encoded
+            fts_with_load += _has_fts_load(msg)
+            topics.add(msg.get("topic", ""))
+            f.write(_fixture_line(msg))
+            count += 1
+
+    if not in_order:
+        with open(output_file, encoding="utf-8") as f:
+            lines = f.readlines()
+        lines.sort(key=lambda line: _timestamp_key(json.loads(line)))
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    return count, fts_with_load, len(topics)
 
 
 def create_fixture(
@@ -53,52 +112,27 @@ def create_fixture(
 ):
     """Create a fixture file by combining messages from multiple sources.
 
-    If log_file is provided, it will be used directly (JSONL format).
-    Otherwise, individual JSON files will be combined.
+    If log_file is provided, it will be streamed directly (JSONL format).
+    Otherwise, individual JSON files will be combined (merged by timestamp).
     """
-    messages: List[Dict[str, Any]] = []
-
     # If log_file is provided, use it directly
     if log_file and log_file.exists():
-        log_messages = load_jsonl_file(log_file)
-        messages.extend(log_messages)
-        print(f"[{name}] Loaded {len(log_messages)} messages from log file")
+        messages: Iterable[Dict[str, Any]] = iter_jsonl_file(log_file)
+        print(f"[{name}] Streaming messages from log file {log_file}")
     else:
-        # Load FTS state messages
-        if fts_state_file and fts_state_file.exists():
-            fts_messages = load_json_file(fts_state_file)
-            messages.extend(fts_messages)
-            print(f"[{name}] Loaded {len(fts_messages)} FTS state messages")
-
-        # Load CCU order messages
-        if ccu_order_file and ccu_order_file.exists():
-            ccu_messages = load_json_file(ccu_order_file)
-            messages.extend(ccu_messages)
-            print(f"[{name}] Loaded {len(ccu_messages)} CCU order messages")
-
-        # Load module state messages
-        if module_state_file and module_state_file.exists():
-            module_messages = load_json_file(module_state_file)
-            messages.extend(module_messages)
-            print(f"[{name}] Loaded {len(module_messages)} module state messages")
-
-    # Sort by timestamp
-    messages.sort(key=lambda x: x.get("timestamp", ""))
-
-    # Count messages with loadId (for validation)
-    fts_with_load = sum(
-        1
-        for m in messages
-        if m.get("topic", "").startswith("fts/v1/ff/")
-        and isinstance(m.get("payload"), str)
-        and "loadId" in m.get("payload", "")
-        and '"loadId":null' not in m.get("payload", "")
-        and '"loadId": null' not in m.get("payload", "")
-    )
-
-    print(f"[{name}] Total messages: {len(messages)}")
-    print(f"[{name}] FTS messages with loadId: {fts_with_load}")
-    print(f"[{name}] Unique topics: {len({m.get('topic', '') for m in messages})}")
+        sources: List[List[Dict[str, Any]]] = []
+        for label, source_file in (
+            ("FTS state", fts_state_file),
+            ("CCU order", ccu_order_file),
+            ("module state", module_state_file),
+        ):
+            if source_file and source_file.exists():
+                source_messages = load_json_file(source_file)
+                source_messages.sort(key=_timestamp_key)
+                sources.append(source_messages)
+                print(f"[{name}] Loaded {len(source_messages)} {label} messages")
+        # heapq.merge is stable across inputs – same order as sorting the concatenation
+        messages = heapq.merge(*sources, key=_timestamp_key)
 
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -106,13 +140,11 @@ def create_fixture(
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
     # Write JSONL format (one JSON object per line)
-    with open(output_file, "w", encoding="utf-8") as f:
-        for msg in messages:
-            # Ensure payload is a string (if it's already a dict, stringify it)
-            if isinstance(msg.get("payload"), dict):
-                msg["payload"] = json.dumps(msg["payload"])
-            f.write(json.dumps(msg, ensure_ascii=False) + "\n")
+    total, fts_with_load, unique_topics = write_fixture_stream(messages, output_file)
 
+    print(f"[{name}] Total messages: {total}")
+    print(f"[{name}] FTS messages with loadId: {fts_with_load}")
+    print(f"[{name}] Unique topics: {unique_topics}")
     print(f"[{name}] Created fixture: {output_file}")
     return output_file
 
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Exportiert Session-Logs (JSON-Zeilen) in ein spaltenorientiertes Format (Parquet / Arrow IPC).
+
+Spalten: session, line, timestamp, ts_ms, topic, qos, retain, payload (roh), payload_bytes
+sowie abgeflachte Felder: order_id, serial_number, action_command, action_state,
+workpiece_type, workpiece_id, fts_node_id.
+
+Damit laufen Modul-Analysen, FTS-Positionsauswertung und Statistik-Aggregation als
+vektorisierte Scans (pandas / pyarrow / DuckDB) statt als Python-Schleifen über
+JSON-Zeilen. Das Schreiben erfolgt in Batches (konstanter Speicherbedarf).
+
+Benötigt `pyarrow` (optional; `pip install pyarrow`).
+
+Usage:
+    python scripts/export_sessions_columnar.py
+    python scripts/export_sessions_columnar.py data/osf-data/sessions/ml-wrb-red-nok_20260807_130729.log
+    python scripts/export_sessions_columnar.py --combined            # alle Sessions in eine Datei
+    python scripts/export_sessions_columnar.py --format feather      # Arrow IPC statt Parquet
+
+Beispiel (pandas):
+    df = pd.read_parquet("data/osf-data/columnar/sessions.parquet",
+                         columns=["ts_ms", "serial_number", "action_command", "action_state"])
+    df[df.action_command == "PICK"].groupby("serial_number").size()
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from session_log_stream import (
+    REPO_ROOT,
+    decode_payload,
+    extract_common_fields,
+    iter_session_messages,
+    list_session_files,
+    timestamp_to_epoch_ms,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pq = None
+    feather = None
+
+DEFAULT_OUTPUT_DIR = REPO_ROOT / "data/osf-data/columnar"
+COMBINED_STEM = "sessions"
+DEFAULT_BATCH_ROWS = 50_000
+
+
+def build_schema() -> Any:
+    """Arrow-Schema; Strings mit wenigen Ausprägungen als Dictionary (kompakt, schnelle Filter)."""
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("session", dict_string),
+            ("line", pa.int32()),
+            ("timestamp", pa.string()),
+            ("ts_ms", pa.int64()),
+            ("topic", dict_string),
+            ("qos", pa.int8()),
+            ("retain", pa.bool_()),
+            ("payload", pa.large_string()),
+            ("payload_bytes", pa.int32()),
+            ("order_id", pa.string()),
+            ("serial_number", dict_string),
+            ("action_command", dict_string),
+            ("action_state", dict_string),
+            ("workpiece_type", dict_string),
+            ("workpiece_id", pa.string()),
+            ("fts_node_id", dict_string),
+        ]
+    )
+
+
+def _empty_columns(schema: Any) -> dict[str, list[Any]]:
+    return {name: [] for name in schema.names}
+
+
+def message_to_row(session: str, line_num: int, message: dict[str, Any]) -> dict[str, Any]:
+    """Eine Envelope-Message in eine flache Zeile überführen (Payload wird genau einmal dekodiert)."""
+    raw_payload = message.get("payload")
+    if isinstance(raw_payload, str):
+        payload_text = raw_payload
+    elif raw_payload is None:
+        payload_text = None
+    else:
+        payload_text = json.dumps(raw_payload, ensure_ascii=False)
+
+    qos = message.get("qos")
+    retain = message.get("retain")
+    row: dict[str, Any] = {
+        "session": session,
+        "line": line_num,
+        "timestamp": message.get("timestamp"),
+        "ts_ms": timestamp_to_epoch_ms(message.get("timestamp")),
+        "topic": message.get("topic", ""),
+        "qos": qos if isinstance(qos, int) else None,
+        "retain": retain if isinstance(retain, bool) else None,
+        "payload": payload_text,
+        "payload_bytes": len(payload_text.encode("utf-8")) if payload_text is not None else 0,
+    }
+    row.update(extract_common_fields(decode_payload(raw_payload)))
+    return row
+
+
+class ColumnarWriter:
+    """Schreibt Zeilen gepuffert als Record-Batches in eine Parquet- oder Feather-Datei."""
+
+    def __init__(self, output_path: Path, fmt: str, batch_rows: int = DEFAULT_BATCH_ROWS):
+        self.output_path = output_path
+        self.fmt = fmt
+        self.batch_rows = max(1, batch_rows)
+        self.schema = build_schema()
+        self.rows_written = 0
+        self._columns = _empty_columns(self.schema)
+        self._pending = 0
+        self._writer: Any = None
+        self._sink: Any = None
+
+    def append(self, row: dict[str, Any]) -> None:
+        for name, values in self._columns.items():
+            values.append(row.get(name))
+        self._pending += 1
+        if self._pending >= self.batch_rows:
+            self.flush()
+
+    def _open(self) -> None:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(self.output_path, self.schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(str(self.output_path), "wb")
+            options = pa.ipc.IpcWriteOptions(compression="zstd")
+            self._writer = pa.ipc.new_file(self._sink, self.schema, options=options)
+
+    def flush(self) -> None:
+        if self._pending == 0:
+            return
+        if self._writer is None:
+            self._open()
+        batch = pa.record_batch(
+            [pa.array(self._columns[field.name], type=field.type) for field in self.schema],
+            schema=self.schema,
+        )
+        self._writer.write_batch(batch)
+        self.rows_written += self._pending
+        self._columns = _empty_columns(self.schema)
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is None:
+            # Leere Session: trotzdem gültige (leere) Datei mit Schema schreiben
+            table = self.schema.empty_table()
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            if self.fmt == "parquet":
+                pq.write_table(table, self.output_path)
+            else:
+                feather.write_feather(table, self.output_path)
+            return
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+def export_session(path: Path, writer: ColumnarWriter) -> int:
+    """Streamt eine Session in den Writer; liefert Anzahl Zeilen."""
+    count = 0
+    session = path.stem
+    for line_num, message in iter_session_messages(path):
+        writer.append(message_to_row(session, line_num, message))
+        count += 1
+    return count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Session-Logs spaltenorientiert (Parquet/Arrow) exportieren")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="Session-Dateien (.log) oder Verzeichnisse. Ohne Angabe: alle in data/osf-data/sessions",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=DEFAULT_OUTPUT_DIR,
+        help="Ausgabeverzeichnis (Standard: data/osf-data/columnar)",
+    )
+    parser.add_argument("--format", choices=["parquet", "feather"], default="parquet", help="Ausgabeformat")
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help=f"Alle Sessions in eine Datei ({COMBINED_STEM}.<format>) statt einer Datei pro Session",
+    )
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS, help="Zeilen pro Record-Batch")
+    args = parser.parse_args()
+
+    if not PYARROW_AVAILABLE:
+        print("❌ pyarrow nicht installiert (pip install pyarrow)", file=sys.stderr)
+        return 1
+
+    paths = list_session_files(args.paths)
+    if not paths:
+        print("Keine Session-Dateien gefunden.")
+        return 1
+
+    suffix = ".parquet" if args.format == "parquet" else ".arrow"
+    total = 0
+
+    if args.combined:
+        output_path = args.output_dir / f"{COMBINED_STEM}{suffix}"
+        writer = ColumnarWriter(output_path, args.format, args.batch_rows)
+        try:
+            for path in paths:
+                if not path.exists():
+                    print(f"Überspringe (nicht gefunden): {path}")
+                    continue
+                count = export_session(path, writer)
+                total += count
+                print(f"📥 {path.name}: {count} Messages")
+        finally:
+            writer.close()
+        print(f"✅ {total} Messages → {output_path}")
+        return 0
+
+    for path in paths:
+        if not path.exists():
+            print(f"Überspringe (nicht gefunden): {path}")
+            continue
+        output_path = args.output_dir / f"{path.stem}{suffix}"
+        writer = ColumnarWriter(output_path, args.format, args.batch_rows)
+        try:
+            count = export_session(path, writer)
+        finally:
+            writer.close()
+        total += count
+        print(f"✅ {path.name}: {count} Messages → {output_path}")
+
+    print(f"\n📂 {total} Messages exportiert nach: {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Trainings-Labels aus Object-Detection-Capture-Sessions erzeugen.
+
+Pro Session-Ordner (``meta_min.jsonl``, optional ``events_full.log`` und ``sync_index.json``)
+entsteht ``labels.csv``: eine Zeile pro Anwesenheits-Intervall eines Werkstücks an DPS, AIQS oder FTS
+mit Video-Zeitfenster, NFC, Farbe und Order-ID — direkt nutzbar für einen Frame-Sampler.
+Logik: session_manager/utils/capture_labels.py (ein Durchlauf, begrenzter Speicher).
+
+Usage:
+    python scripts/extract_training_labels.py                                   # alle OD-Sessions
+    python scripts/extract_training_labels.py data/osf-data/sessions/object-detection/od_white-1
+    python scripts/extract_training_labels.py --min-duration 0.5 --max-gap 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from session_log_stream import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT))
+
+from session_manager.utils.capture_labels import (  # noqa: E402
+    DEFAULT_MAX_GAP_S,
+    LABELS_FILENAME,
+    META_FILENAME,
+    extract_labels,
+)
+
+CAPTURE_BASE_DIR = REPO_ROOT / "data/osf-data/sessions/object-detection"
+
+
+def list_capture_dirs(paths: list[Path]) -> list[Path]:
+    """Session-Ordner (mit ``meta_min.jsonl``) oder Basisordner auflösen; ohne Angabe: CAPTURE_BASE_DIR."""
+    candidates = paths or [CAPTURE_BASE_DIR]
+    resolved: list[Path] = []
+    for path in candidates:
+        if (path / META_FILENAME).exists():
+            resolved.append(path)
+        elif path.is_dir():
+            resolved.extend(sorted(p.parent for p in path.glob(f"*/{META_FILENAME}")))
+    return resolved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Label-Tabelle (labels.csv) aus OD-Capture-Sessions erzeugen")
+    parser.add_argument("paths", nargs="*", type=Path, help="Session- oder Basisordner. Ohne Angabe: alle OD-Sessions")
+    parser.add_argument(
+        "--max-gap",
+        type=float,
+        default=DEFAULT_MAX_GAP_S,
+        help=f"Intervall endet nach so vielen Sekunden ohne Meldung (Default: {DEFAULT_MAX_GAP_S:g})",
+    )
+    parser.add_argument("--min-duration", type=float, default=0.0, help="Kürzere Intervalle verwerfen (Sekunden)")
+    parser.add_argument("--output-dir", type=Path, help=f"Ziel für <session>.csv statt <session>/{LABELS_FILENAME}")
+    args = parser.parse_args()
+
+    session_dirs = list_capture_dirs(args.paths)
+    if not session_dirs:
+        print(f"Keine Capture-Sessions ({META_FILENAME}) gefunden.")
+        return
+    if args.output_dir:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"🏷️  Label-Extraktion für {len(session_dirs)} Session(s) ...")
+    for session_dir in session_dirs:
+        output = args.output_dir / f"{session_dir.name}.csv" if args.output_dir else None
+        started = time.perf_counter()
+        summary = extract_labels(session_dir, output, max_gap_s=args.max_gap, min_duration_s=args.min_duration)
+        print(
+            f"   {summary['session']}: {summary['rows']} Intervalle aus {summary['station_events']} Station-Events "
+            f"({summary['skipped']} verworfen, {time.perf_counter() - started:.2f}s) → {summary['output']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Payload-Schemas pro Topic aus dem Session-Korpus lernen und feldgezielte Decoder erzeugen.
+
+1. Durchlauf: pro Topic-Muster (Seriennummern → ``+``) Key-Pfade, Typen und Häufigkeit sammeln
+   (``SchemaInferrer`` aus session_manager/utils/payload_schema.py).
+2. Für Topic-Muster mit mindestens ``--min-messages`` Messages eine Decoder-Spezifikation bilden:
+   Pfade der Felder order_id / nfc_tag / phase (``MIN_FIELD_KEYS``) und die bekannten Keys aller
+   Container (Formprüfung, damit neue Keys auch abseits der Feld-Pfade auffallen).
+3. Prüfdurchlauf: jeder Decoder muss auf dem Korpus exakt dieselben Werte liefern wie die
+   generische Suche (``collect_key_values``); Topic-Muster mit Abweichung werden verworfen.
+
+Mit ``--write`` wird session_manager/utils/payload_decoders.py neu geschrieben
+(genutzt von Object-Detection-Capture). Nach neuen Sessions/Firmware erneut ausführen.
+
+Usage:
+    python scripts/infer_payload_schemas.py                       # Übersicht, keine Dateien
+    python scripts/infer_payload_schemas.py --write               # Decoder-Modul neu erzeugen
+    python scripts/infer_payload_schemas.py --json data/osf-data/payload_schemas.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from session_log_stream import REPO_ROOT, decode_payload, iter_session_messages, list_session_files
+
+sys.path.insert(0, str(REPO_ROOT))
+
+from session_manager.utils.payload_schema import (  # noqa: E402
+    MIN_FIELD_KEYS,
+    SchemaInferrer,
+    TargetedDecoder,
+    collect_key_values,
+    decoder_spec,
+    topic_pattern,
+)
+
+DECODERS_MODULE = REPO_ROOT / "session_manager" / "utils" / "payload_decoders.py"
+DEFAULT_MIN_MESSAGES = 50
+LINE_LENGTH = 120  # wie black in pyproject.toml
+
+_MODULE_TEMPLATE = '''"""
+Feldgezielte Payload-Decoder pro Topic-Muster.
+
+Automatisch erzeugt von ``scripts/infer_payload_schemas.py --write`` ({sessions} Sessions,
+{messages} Messages) – nicht manuell bearbeiten. Jeder Decoder wurde auf dem Korpus gegen die
+generische Suche (``collect_key_values``) geprüft.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+from .payload_schema import TargetedDecoder, topic_pattern
+
+DECODER_SPECS: dict[str, dict] = {specs}
+
+DECODERS = {{pattern: TargetedDecoder(pattern, spec) for pattern, spec in DECODER_SPECS.items()}}
+
+
+@lru_cache(maxsize=1024)
+def decoder_for_topic(topic: str) -> TargetedDecoder | None:
+    """Decoder für ein konkretes Topic (``None`` = generische Suche verwenden)."""
+    return DECODERS.get(topic_pattern(topic))
+'''
+
+
+def infer_schemas(paths: list[Path]) -> tuple[SchemaInferrer, int]:
+    inferrer = SchemaInferrer()
+    messages = 0
+    for path in paths:
+        for _line_num, message in iter_session_messages(path, warn=False):
+            inferrer.observe(str(message["topic"]), decode_payload(message["payload"]))
+            messages += 1
+    return inferrer, messages
+
+
+def _generic_fields(payload: Any) -> dict[str, list[str]]:
+    fields: dict[str, list[str]] = {}
+    for name, keys in MIN_FIELD_KEYS.items():
+        values: list[str] = []
+        collect_key_values(payload, keys, values)
+        fields[name] = values
+    return fields
+
+
+def verify_decoders(paths: list[Path], decoders: dict[str, TargetedDecoder]) -> dict[str, dict[str, int]]:
+    """Vergleicht jeden Decoder mit der generischen Suche; Zähler pro Topic-Muster."""
+    results = {pattern: {"checked": 0, "fallback": 0, "mismatch": 0} for pattern in decoders}
+    for path in paths:
+        for _line_num, message in iter_session_messages(path, warn=False):
+            pattern = topic_pattern(str(message["topic"]))
+            decoder = decoders.get(pattern)
+            if decoder is None:
+                continue
+            payload = decode_payload(message["payload"])
+            counters = results[pattern]
+            counters["checked"] += 1
+            decoded = decoder.decode(payload)
+            if decoded is None:
+                counters["fallback"] += 1
+                continue
+            expected = _generic_fields(payload)
+            if any(getattr(decoded, name) != values for name, values in expected.items()):
+                counters["mismatch"] += 1
+    return results
+
+
+def _format_list(prefix: str, values: list[str], indent: str) -> list[str]:
+    line = f"{indent}{prefix}{json.dumps(values, ensure_ascii=False)},"
+    if len(line) <= LINE_LENGTH:
+        return [line]
+    items = [f"{indent}    {json.dumps(value, ensure_ascii=False)}," for value in values]
+    return [f"{indent}{prefix}[", *items, f"{indent}],"]
+
+
+def _format_specs(specs: dict[str, dict[str, Any]]) -> str:
+    """Spezifikationen als Python-Literal (eine Zeile pro Pfad-/Key-Liste, umbrochen ab LINE_LENGTH)."""
+    lines = ["{"]
+    for pattern, spec in specs.items():
+        lines.append(f"    {json.dumps(pattern)}: {{")
+        for section in ("fields", "known"):
+            if not spec[section]:
+                lines.append(f"        {json.dumps(section)}: {{}},")
+                continue
+            lines.append(f"        {json.dumps(section)}: {{")
+            for name, values in spec[section].items():
+                lines.extend(_format_list(f"{json.dumps(name)}: ", values, " " * 12))
+            lines.append("        },")
+        lines.append("    },")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def render_module(specs: dict[str, dict[str, Any]], sessions: int, messages: int) -> str:
+    return _MODULE_TEMPLATE.format(sessions=sessions, messages=messages, specs=_format_specs(specs))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Payload-Schemas lernen und feldgezielte Decoder erzeugen")
+    parser.add_argument(
+        "paths", nargs="*", type=Path, help="Session-Dateien/-Verzeichnisse. Ohne Angabe: alle Sessions"
+    )
+    parser.add_argument(
+        "--min-messages",
+        type=int,
+        default=DEFAULT_MIN_MESSAGES,
+        help=f"Decoder nur für Topic-Muster mit mindestens so vielen Messages (Default: {DEFAULT_MIN_MESSAGES})",
+    )
+    parser.add_argument("--json", type=Path, help="Gelernte Schemas als JSON speichern")
+    parser.add_argument("--write", action="store_true", help=f"{DECODERS_MODULE.relative_to(REPO_ROOT)} neu schreiben")
+    args = parser.parse_args()
+
+    paths = [path for path in list_session_files(args.paths) if path.exists()]
+    if not paths:
+        print("Keine Session-Dateien gefunden.")
+        return
+
+    print(f"🔍 Schema-Inferenz über {len(paths)} Session(s) ...")
+    inferrer, messages = infer_schemas(paths)
+    schemas = inferrer.schemas()
+    print(f"   {messages} Messages, {len(schemas)} Topic-Muster")
+
+    specs = {
+        pattern: decoder_spec(schema, MIN_FIELD_KEYS)
+        for pattern, schema in schemas.items()
+        if schema["messages"] >= args.min_messages
+    }
+    decoders = {pattern: TargetedDecoder(pattern, spec) for pattern, spec in specs.items()}
+    results = verify_decoders(paths, decoders)
+
+    print(f"\n{'Topic-Muster':<52} {'Messages':>9} {'Pfade':>6} {'Felder':>7}  Prüfung")
+    print("-" * 96)
+    accepted: dict[str, dict[str, Any]] = {}
+    for pattern, schema in schemas.items():
+        spec = specs.get(pattern)
+        field_paths = sum(len(p) for p in spec["fields"].values()) if spec else 0
+        if spec is None:
+            verdict = "– (zu wenige Messages)"
+        else:
+            counters = results[pattern]
+            if counters["fallback"] or counters["mismatch"]:
+                verdict = f"❌ {counters['fallback']} Fallback, {counters['mismatch']} Abweichung(en)"
+            else:
+                verdict = "✅"
+                accepted[pattern] = spec
+        print(f"{pattern:<52} {schema['messages']:>9} {len(schema['paths']):>6} {field_paths:>7}  {verdict}")
+
+    print(f"\n{len(accepted)} Decoder geprüft und übernommen.")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as handle:
+            json.dump(schemas, handle, indent=1, ensure_ascii=False)
+        print(f"💾 Schemas gespeichert: {args.json}")
+
+    if args.write:
+        DECODERS_MODULE.write_text(render_module(accepted, len(paths), messages), encoding="utf-8")
+        print(f"💾 Decoder-Modul geschrieben: {DECODERS_MODULE.relative_to(REPO_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Session-Manager-Logs durchsuchen und verfolgen (``session_manager.jsonl`` inkl. Rotationen ``.1`` … ``.3``).
+
+Filtert nach Zeitraum, Mindest-Level, Logger-Präfix und Regex auf die Meldung; Treffer werden
+gestreamt ausgegeben (älteste zuerst). Über den Zeit-/Level-Index pro Datei (``<datei>.idx.json``,
+geschrieben beim Rotieren) werden nur passende Blöcke gelesen. ``--follow`` folgt der aktiven
+Datei auch über Rotationen hinweg.
+Logik: session_manager/utils/log_index.py
+
+Usage:
+    python scripts/log_query.py --level WARNING --since 15m
+    python scripts/log_query.py --logger session_manager.components.replay_station --grep "rc=\\d+"
+    python scripts/log_query.py --since "2026-10-19 08:00" --until "2026-10-19 09:30" --json
+    python scripts/log_query.py -f --level ERROR                                 # wie tail -F
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from session_log_stream import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT))
+
+from session_manager.utils.log_index import (  # noqa: E402
+    LogFilter,
+    follow_logs,
+    iter_formatted,
+    level_number,
+    query_logs,
+    rotated_files,
+)
+
+DEFAULT_LOG_DIRS = (REPO_ROOT / "logs/session_manager", REPO_ROOT / "logs")
+DEFAULT_LOG_FILE = "session_manager.jsonl"
+DEFAULT_FOLLOW_TAIL = 10
+
+_RELATIVE = re.compile(r"^-?(\d+(?:\.\d+)?)([smhd])$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_time(value: str) -> float:
+    """``15m``/``-2h``/``30s``/``1d`` (relativ zu jetzt) oder ISO-Zeit (lokal) → Epoch-Sekunden."""
+    match = _RELATIVE.match(value.strip())
+    if match:
+        return time.time() - float(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+    try:
+        return datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"Ungültige Zeitangabe: {value!r} (z.B. 15m, 2h, 2026-10-19 08:00)") from err
+
+
+def parse_level(value: str) -> int:
+    level = level_number(value)
+    if not level:
+        raise argparse.ArgumentTypeError(f"Unbekanntes Level: {value!r} (DEBUG, INFO, WARNING, ERROR, CRITICAL)")
+    return level
+
+
+def resolve_log_file(log_dir: Path | None, file_name: str) -> Path:
+    """Explizites Verzeichnis oder das erste Default-Verzeichnis, in dem die Log-Datei (oder eine Rotation) liegt."""
+    if log_dir is not None:
+        return log_dir / file_name
+    for candidate in DEFAULT_LOG_DIRS:
+        if rotated_files(candidate / file_name):
+            return candidate / file_name
+    return DEFAULT_LOG_DIRS[0] / file_name
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rotierte JSON-Logs des Session Managers durchsuchen und verfolgen")
+    parser.add_argument("--log-dir", type=Path, help="Log-Verzeichnis (Default: logs/session_manager, sonst logs)")
+    parser.add_argument(
+        "--file", default=DEFAULT_LOG_FILE, help=f"Name der aktiven Log-Datei (Default: {DEFAULT_LOG_FILE})"
+    )
+    parser.add_argument("--since", type=parse_time, help="Ab Zeitpunkt: relativ (15m, 2h, 1d) oder ISO (lokale Zeit)")
+    parser.add_argument("--until", type=parse_time, help="Bis Zeitpunkt: relativ oder ISO (lokale Zeit)")
+    parser.add_argument("--level", type=parse_level, default=0, help="Mindest-Level, z.B. WARNING")
+    parser.add_argument("--logger", help="Logger-Präfix, z.B. session_manager.components")
+    parser.add_argument("--grep", help="Regex auf die Meldung")
+    parser.add_argument("-n", "--tail", type=int, help="Nur die letzten N Treffer")
+    parser.add_argument(
+        "-f",
+        "--follow",
+        action="store_true",
+        help=f"Neue Treffer fortlaufend ausgeben (vorher die letzten {DEFAULT_FOLLOW_TAIL}, siehe -n)",
+    )
+    parser.add_argument("--json", action="store_true", help="Rohe JSON-Zeilen ausgeben")
+    args = parser.parse_args()
+
+    log_file = resolve_log_file(args.log_dir, args.file)
+    if not rotated_files(log_file) and not args.follow:
+        print(f"❌ Keine Log-Datei gefunden: {log_file}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        log_filter = LogFilter(args.since, args.until, args.level, args.logger, args.grep)
+    except re.error as e:
+        parser.error(f"Ungültiger Regex für --grep: {e}")
+
+    tail = args.tail if args.tail is not None else (DEFAULT_FOLLOW_TAIL if args.follow else None)
+    matches = query_logs(log_file, log_filter)
+    if tail is not None:
+        matches = deque(matches, maxlen=tail) if tail > 0 else ()
+    try:
+        for line in iter_formatted(matches, args.json):
+            print(line, flush=args.follow)
+        if args.follow:
+            print(f"👀 Folge {log_file} (Strg+C beendet)", file=sys.stderr)
+            for line in iter_formatted(follow_logs(log_file, log_filter), args.json):
+                print(line, flush=True)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:  # z.B. | head
+        sys.stderr.close()
+
+
+if __name__ == "__main__":
+    main()
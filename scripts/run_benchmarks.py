@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Benchmark-Suite für Recorder-, Replay-, Capture- und Analyse-Hot-Paths.
+
+Micro-Benchmarks (in-process, mehrere Runden):
+- recorder/topic_filter.*        Topic-Filter-Entscheidungen (should_write_message_to_session_log) pro Preset
+- recorder/on_message_received   MQTT-Callback des Session-Recorders (Aufnahme aktiv, Buffer je Runde geleert)
+- capture/extract_min_fields     Object-Detection-Capture: order_id/nfc_tag/phase aus Payloads
+- replay/load_session.*          Session laden mit/ohne Timeshift
+- replay/publish_max_speed       ReplayController mit Speed ∞ gegen einen In-Process-Fake-Client
+- bridge/intake_replay           Workpiece-Intake-Bridge: DPS-States aus dem Korpus mit Max-Speed
+                                 (osf-workpiece-intake-bridge/bench/replay_bench.py, inkl. Dedupe-Prüfung)
+
+Macro-Benchmarks (Subprozess, Wall-Clock):
+- analysis/<script>              Laufzeit von Analyse-Skripten auf den aufgezeichneten Sessions
+
+Ergebnisse werden im JSON-Format von pytest-benchmark unter data/osf-data/benchmarks/ gespeichert
+(<Zeitstempel>_<Commit>.json) und mit dem jüngsten vorherigen Ergebnis verglichen (Median);
+Abweichungen über ``--threshold`` werden als Regression/Verbesserung markiert.
+
+Usage:
+    python scripts/run_benchmarks.py                           # alle Benchmarks, speichern + vergleichen
+    python scripts/run_benchmarks.py -k recorder --rounds 3    # nur passende Namen
+    python scripts/run_benchmarks.py --no-macro --compare data/osf-data/benchmarks/<baseline>.json
+    python scripts/run_benchmarks.py --fail-on-regression      # Exit 1 bei Regression (CI)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from session_log_stream import REPO_ROOT, SESSIONS_DIR, iter_session_messages, list_session_files, timestamp_to_epoch_ms
+
+sys.path.insert(0, str(REPO_ROOT))
+
+from session_manager.components import session_recorder  # noqa: E402
+from session_manager.components.object_detection_capture import _extract_min_fields  # noqa: E402
+from session_manager.components.replay_station import ReplayController, load_session  # noqa: E402
+from session_manager.utils.recording_topic_filter import (  # noqa: E402
+    CUSTOM_FILTER_MODE_EXCLUDE,
+    EXCLUSION_PRESET_ANALYSIS,
+    EXCLUSION_PRESET_NO_CAM,
+    EXCLUSION_PRESET_NONE,
+    should_write_message_to_session_log,
+)
+
+BENCH_DIR = REPO_ROOT / "data" / "osf-data" / "benchmarks"
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+BRIDGE_BENCH_DIR = REPO_ROOT / "osf-workpiece-intake-bridge" / "bench"
+DEFAULT_ROUNDS = 7
+MACRO_ROUNDS = 3
+DEFAULT_THRESHOLD = 0.2
+STREAMLIT_CONTEXT_LOGGER = "streamlit.runtime.scriptrunner_utils.script_run_context"
+
+
+@dataclass
+class Benchmark:
+    """Eine vorbereitete Messung: ``fn`` wird pro Runde einmal aufgerufen und verarbeitet ``items`` Einheiten."""
+
+    fn: Callable[[], Any]
+    items: int
+    teardown: Callable[[], None] | None = None
+
+
+@dataclass
+class BenchmarkSpec:
+    name: str
+    group: str
+    setup: Callable[[BenchContext], Benchmark]
+    macro: bool = False
+
+
+class BenchContext:
+    """Gemeinsame Eingabedaten: alle Messages der Korpus-Sessions und eine große Einzel-Session."""
+
+    def __init__(self, session_paths: list[Path], replay_session: Path) -> None:
+        self.session_paths = session_paths
+        self.replay_session = replay_session
+        self.messages = [
+            message
+            for path in session_paths
+            for _line_num, message in iter_session_messages(path, warn=False)
+            if isinstance(message.get("payload"), str)
+        ]
+        self.topics = [str(message["topic"]) for message in self.messages]
+
+
+# ---------- Micro-Benchmarks ----------
+
+
+def _topic_filter(preset: str, **kwargs: Any) -> Callable[[BenchContext], Benchmark]:
+    def setup(ctx: BenchContext) -> Benchmark:
+        topics = ctx.topics
+
+        def run() -> int:
+            return sum(1 for topic in topics if should_write_message_to_session_log(topic, preset, **kwargs))
+
+        return Benchmark(run, len(topics))
+
+    return setup
+
+
+def _on_message_received(ctx: BenchContext) -> Benchmark:
+    msgs = [
+        SimpleNamespace(
+            topic=str(message["topic"]),
+            payload=message["payload"].encode("utf-8"),
+            qos=int(message.get("qos", 0) or 0),
+            retain=bool(message.get("retain", False)),
+        )
+        for message in ctx.messages
+    ]
+    state_names = ("_recording_active", "_recording_started_monotonic", "_recording_started_at_utc", "_seen_payload_ts")
+    saved = {name: getattr(session_recorder, name) for name in state_names}
+    session_recorder._recording_active = True
+    # Startup-Grace längst vorbei → Messages laufen den vollen Filter-/Schreibpfad
+    session_recorder._recording_started_monotonic = time.monotonic() - 3600
+
+    def run() -> None:
+        session_recorder._seen_payload_ts = set()
+        session_recorder.message_buffer.clear()
+        for msg in msgs:
+            session_recorder.on_message_received(None, None, msg)
+
+    def teardown() -> None:
+        session_recorder.message_buffer.clear()
+        for name, value in saved.items():
+            setattr(session_recorder, name, value)
+
+    return Benchmark(run, len(msgs), teardown)
+
+
+def _extract_capture_fields(ctx: BenchContext) -> Benchmark:
+    pairs = [(str(message["topic"]), message["payload"]) for message in ctx.messages]
+
+    def run() -> None:
+        for topic, payload in pairs:
+            _extract_min_fields(payload, topic)
+
+    return Benchmark(run, len(pairs))
+
+
+def _load_session(apply_timeshift: bool) -> Callable[[BenchContext], Benchmark]:
+    def setup(ctx: BenchContext) -> Benchmark:
+        ctrl = ReplayController("127.0.0.1", 1883)
+        load_session(ctx.replay_session, ctrl, apply_timeshift=apply_timeshift)
+        _idx, total = ctrl.progress()
+        return Benchmark(lambda: load_session(ctx.replay_session, ctrl, apply_timeshift=apply_timeshift), total)
+
+    return setup
+
+
+class _FakePublishClient:
+    """In-Process-Ersatz für SessionManagerMQTTClient: jeder Publish gelingt sofort."""
+
+    last_connect_rc = 0
+    last_disconnect_rc = 0
+
+    def __init__(self) -> None:
+        self.published = 0
+
+    def is_connected(self) -> bool:
+        return True
+
+    def ensure_connected(self, timeout_s: float = 5.0) -> bool:
+        return True
+
+    def publish_with_status(self, topic: str, payload: bytes, qos: int = 0, retain: bool = False) -> tuple[bool, int]:
+        self.published += 1
+        return True, 0
+
+    def disconnect(self) -> None:
+        pass
+
+
+def _publish_max_speed(ctx: BenchContext) -> Benchmark:
+    messages = [message for _line_num, message in iter_session_messages(ctx.replay_session, warn=False)]
+    t0 = timestamp_to_epoch_ms(messages[0]["timestamp"]) if messages else 0
+    items = [
+        (
+            max(0.0, ((timestamp_to_epoch_ms(message["timestamp"]) or t0) - t0) / 1000),
+            str(message["topic"]),
+            str(message["payload"]).encode("utf-8"),
+            int(message.get("qos", 1) or 0),
+            bool(message.get("retain", False)),
+        )
+        for message in messages
+    ]
+    ctrl = ReplayController("127.0.0.1", 1883)
+    ctrl._mqtt_client = _FakePublishClient()
+
+    def run() -> None:
+        ctrl.load(items)
+        ctrl.play(float("inf"))
+        while ctrl.progress()[0] < len(items) and ctrl._worker is not None and ctrl._worker.is_alive():
+            ctrl._worker.join(timeout=0.05)
+        stats = ctrl.get_publish_stats()
+        if stats["pub_ok"] != len(items):
+            raise RuntimeError(f"Replay unvollständig: {stats['pub_ok']}/{len(items)}")
+
+    return Benchmark(run, len(items), ctrl.stop)
+
+
+def _intake_bridge_replay(ctx: BenchContext) -> Benchmark:
+    # Bridge ist ein eigenständiger Container (src/ ohne Paket) → Harness erst hier importieren
+    sys.path.insert(0, str(BRIDGE_BENCH_DIR))
+    from replay_bench import load_sessions, run_replay
+
+    sessions = load_sessions(ctx.session_paths)
+    items = sum(len(session["messages"]) for session in sessions)
+
+    def run() -> None:
+        result = run_replay(sessions, repeat=1)
+        if result["mismatches"]:
+            raise RuntimeError(f"Intake-Bridge Dedupe-Abweichung: {result['mismatches'][:1]}")
+
+    return Benchmark(run, items)
+
+
+# ---------- Macro-Benchmarks ----------
+
+
+def _script(script: str, *args: str) -> Callable[[BenchContext], Benchmark]:
+    def setup(ctx: BenchContext) -> Benchmark:
+        command = [sys.executable, str(SCRIPTS_DIR / script), *args]
+
+        def run() -> None:
+            subprocess.run(command, cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        return Benchmark(run, len(ctx.messages))
+
+    return setup
+
+
+def _session_diff(ctx: BenchContext) -> Benchmark:
+    largest = sorted(ctx.session_paths, key=lambda p: p.stat().st_size)[-2:]
+    return _script("session_diff.py", *(str(p) for p in largest))(ctx)
+
+
+BENCHMARKS = [
+    BenchmarkSpec("recorder/topic_filter.none", "recorder", _topic_filter(EXCLUSION_PRESET_NONE)),
+    BenchmarkSpec("recorder/topic_filter.analysis", "recorder", _topic_filter(EXCLUSION_PRESET_ANALYSIS)),
+    BenchmarkSpec("recorder/topic_filter.no_cam", "recorder", _topic_filter(EXCLUSION_PRESET_NO_CAM)),
+    BenchmarkSpec(
+        "recorder/topic_filter.custom_exclude",
+        "recorder",
+        _topic_filter(
+            EXCLUSION_PRESET_NONE,
+            custom_filter_mode=CUSTOM_FILTER_MODE_EXCLUDE,
+            custom_filter_topics=["osf/arduino/#", "module/v1/ff/+/connection", "ccu/pairing/state"],
+        ),
+    ),
+    BenchmarkSpec("recorder/on_message_received", "recorder", _on_message_received),
+    BenchmarkSpec("capture/extract_min_fields", "capture", _extract_capture_fields),
+    BenchmarkSpec("replay/load_session.timeshift", "replay", _load_session(True)),
+    BenchmarkSpec("replay/load_session.raw", "replay", _load_session(False)),
+    BenchmarkSpec("replay/publish_max_speed", "replay", _publish_max_speed),
+    BenchmarkSpec("bridge/intake_replay", "bridge", _intake_bridge_replay),
+    BenchmarkSpec("analysis/infer_payload_schemas", "analysis", _script("infer_payload_schemas.py"), macro=True),
+    BenchmarkSpec("analysis/session_diff", "analysis", _session_diff, macro=True),
+    BenchmarkSpec(
+        "analysis/retain_corpus",
+        "analysis",
+        _script("analyze_retain_in_logs.py", "--corpus", "--jobs", "1"),
+        macro=True,
+    ),
+]
+
+
+# ---------- Messung / Ergebnisse ----------
+
+
+def measure(benchmark: Benchmark, rounds: int, warmup: int = 1) -> dict[str, Any]:
+    """Statistik wie pytest-benchmark (Sekunden pro Runde) plus Durchsatz in Einheiten/s."""
+    for _ in range(warmup):
+        benchmark.fn()
+    durations = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        benchmark.fn()
+        durations.append(time.perf_counter() - started)
+    mean = statistics.fmean(durations)
+    median = statistics.median(durations)
+    return {
+        "min": min(durations),
+        "max": max(durations),
+        "mean": mean,
+        "median": median,
+        "stddev": statistics.stdev(durations) if len(durations) > 1 else 0.0,
+        "rounds": rounds,
+        "iterations": 1,
+        "ops": 1 / mean if mean else 0.0,
+        "data": durations,
+    }
+
+
+def _git(*args: str) -> str:
+    try:
+        result = subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=False)
+    except OSError:
+        return ""
+    return result.stdout.strip()
+
+
+def commit_info() -> dict[str, Any]:
+    return {
+        "id": _git("rev-parse", "HEAD"),
+        "branch": _git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def machine_info() -> dict[str, Any]:
+    return {
+        "python_version": platform.python_version(),
+        "python_implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "processor": platform.processor(),
+    }
+
+
+def latest_result(directory: Path, exclude: Path | None = None) -> Path | None:
+    candidates = sorted(p for p in directory.glob("*.json") if p != exclude)
+    return candidates[-1] if candidates else None
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[dict[str, Any]]:
+    """Median-Vergleich pro Benchmark-Name; ratio > 1 = langsamer."""
+    previous = {bench["name"]: bench for bench in baseline.get("benchmarks", [])}
+    rows = []
+    for bench in current["benchmarks"]:
+        old = previous.get(bench["name"])
+        if old is None or not old["stats"].get("median"):
+            continue
+        ratio = bench["stats"]["median"] / old["stats"]["median"]
+        status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 - threshold else "ok"
+        rows.append({"name": bench["name"], "ratio": round(ratio, 3), "status": status})
+    return rows
+
+
+def print_results(results: dict[str, Any]) -> None:
+    print(f"\n{'Benchmark':<40} {'median':>10} {'min':>10} {'stddev':>9} {'Einheiten/s':>14}")
+    print("-" * 88)
+    for bench in results["benchmarks"]:
+        stats = bench["stats"]
+        rate = bench["extra_info"]["items_per_s"]
+        print(
+            f"{bench['name']:<40} {stats['median'] * 1000:>8.1f}ms {stats['min'] * 1000:>8.1f}ms "
+            f"{stats['stddev'] * 1000:>7.1f}ms {rate:>14,.0f}"
+        )
+
+
+def print_comparison(rows: list[dict[str, Any]], baseline_path: Path) -> None:
+    print(f"\n📈 Vergleich mit {baseline_path.name} (Median, Faktor > 1 = langsamer)")
+    icons = {"regression": "❌", "improvement": "✅", "ok": "  "}
+    for row in rows:
+        print(f"  {icons[row['status']]} {row['name']:<40} ×{row['ratio']:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks für Recorder, Replay, Capture und Analyse-Skripte")
+    parser.add_argument("-k", "--filter", default="", help="Nur Benchmarks, deren Name diesen Text enthält")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Runden pro Micro-Benchmark")
+    parser.add_argument("--no-macro", action="store_true", help="Analyse-Skripte (Subprozess) überspringen")
+    parser.add_argument("--sessions", nargs="*", type=Path, help="Korpus (Default: alle Sessions)")
+    parser.add_argument(
+        "--output", type=Path, help="Ergebnisdatei (Default: data/osf-data/benchmarks/<zeit>_<commit>.json)"
+    )
+    parser.add_argument("--no-save", action="store_true", help="Ergebnis nicht speichern")
+    parser.add_argument("--compare", type=Path, help="Baseline-Ergebnis (Default: jüngstes gespeichertes)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Relative Abweichung (Median)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit-Code 1 bei Regression")
+    args = parser.parse_args()
+
+    # load_session meldet sich per st.success/st.info – ohne Streamlit-Runtime warnt Streamlit pro Aufruf
+    # "missing ScriptRunContext". Filter statt Level: Streamlit setzt die Level seiner Logger beim
+    # Laden der Config zurück. Replay-Abschlussmeldungen pro Runde ausblenden
+    logging.getLogger(STREAMLIT_CONTEXT_LOGGER).addFilter(lambda record: record.levelno >= logging.ERROR)
+    logging.getLogger("session_manager").setLevel(logging.WARNING)
+
+    session_paths = [path for path in list_session_files(args.sessions) if path.exists()]
+    if not session_paths:
+        print(f"Keine Session-Dateien gefunden ({SESSIONS_DIR}).")
+        return
+    replay_session = max(session_paths, key=lambda p: p.stat().st_size)
+    ctx = BenchContext(session_paths, replay_session)
+    print(f"🏁 Benchmarks: {len(session_paths)} Session(s), {len(ctx.messages)} Messages")
+    print(f"   Replay-Session: {replay_session.name}")
+
+    benchmarks = []
+    for spec in BENCHMARKS:
+        if args.filter not in spec.name or (spec.macro and args.no_macro):
+            continue
+        print(f"   ▶ {spec.name}")
+        benchmark = spec.setup(ctx)
+        try:
+            stats = measure(benchmark, MACRO_ROUNDS if spec.macro else args.rounds, warmup=0 if spec.macro else 1)
+        finally:
+            if benchmark.teardown is not None:
+                benchmark.teardown()
+        benchmarks.append(
+            {
+                "name": spec.name,
+                "group": spec.group,
+                "stats": stats,
+                "extra_info": {
+                    "items": benchmark.items,
+                    "items_per_s": benchmark.items / stats["median"] if stats["median"] else 0.0,
+                },
+            }
+        )
+
+    results = {
+        "machine_info": machine_info(),
+        "commit_info": commit_info(),
+        "datetime": datetime.now().isoformat(timespec="seconds"),
+        "version": "run_benchmarks/1",
+        "corpus": {"sessions": [p.name for p in session_paths], "messages": len(ctx.messages)},
+        "benchmarks": benchmarks,
+    }
+    print_results(results)
+
+    output = None
+    if not args.no_save:
+        commit = results["commit_info"]["id"][:8] or "nogit"
+        output = args.output or BENCH_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{commit}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with output.open("w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"\n💾 Gespeichert: {output}")
+
+    baseline_path = args.compare or latest_result(BENCH_DIR, exclude=output)
+    if baseline_path is None or not baseline_path.exists():
+        return
+    with baseline_path.open(encoding="utf-8") as handle:
+        rows = compare(results, json.load(handle), args.threshold)
+    print_comparison(rows, baseline_path)
+    if args.fail_on_regression and any(row["status"] == "regression" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Vergleich zweier Session-Logs über Topic-Fingerprints (z.B. vor/nach CCU-Update).
+
+Pro Session ein Streaming-Durchlauf; pro Topic wird ein Fingerprint gebildet:
+- Anzahl und Rate (Messages/s über die Session-Dauer)
+- Payload-Größe (p50/p90/max; Perzentile aus einem Reservoir fester Größe)
+- Key-Pfade der JSON-Payloads (bis Tiefe 2, Listen-Elemente als `[]`)
+- Enum-Werte (String/Bool-Felder mit höchstens ENUM_MAX_VALUES verschiedenen Werten;
+  Felder mit Zeitstempeln, UUIDs, Hex-IDs oder langen Strings gelten nicht als Enum)
+- Inter-Arrival-Zeiten (p50/p90)
+
+Anschließend werden signifikante Abweichungen gemeldet: neue/fehlende Topics, Raten- und
+Größenänderungen über Schwellwert, neue/entfallene Keys und Enum-Werte, geänderte Taktung.
+
+Usage:
+    python scripts/session_diff.py data/osf-data/sessions/<alt>.log data/osf-data/sessions/<neu>.log
+    python scripts/session_diff.py A.log B.log --rate-ratio 1.3 --json data/osf-data/session_diff.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from session_log_stream import (
+    decode_payload,
+    iter_session_messages,
+    percentile,
+    read_session_meta,
+    timestamp_to_epoch_ms,
+)
+
+RESERVOIR_SIZE = 512
+ENUM_MAX_VALUES = 20
+ENUM_MAX_LENGTH = 64  # längere Strings (Bilder, Freitext) sind keine Enum-Werte
+KEY_DEPTH = 2
+MIN_MESSAGES = 5  # Raten-/Größen-/Taktvergleich erst ab so vielen Messages in einer der Sessions
+DEFAULT_RATE_RATIO = 1.5
+DEFAULT_SIZE_CHANGE = 0.25
+
+# Werte, die keine Enums sind: ISO-Zeitstempel, UUIDs, NFC-/Hex-IDs, reine Zahlen-Strings
+_IDENTIFIER_VALUE = re.compile(
+    r"^(\d{4}-\d{2}-\d{2}T.*|([\w-]*_)?[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-.*|[0-9a-fA-F]{10,}|\d+(\.\d+)?)$"
+)
+
+
+class Reservoir:
+    """Gleichverteilte Stichprobe fester Größe (Algorithm R) für Perzentile bei beliebig langen Sessions."""
+
+    def __init__(self, size: int = RESERVOIR_SIZE, seed: int = 0) -> None:
+        self.size = size
+        self.seen = 0
+        self.values: list[float] = []
+        self._random = random.Random(seed)
+
+    def add(self, value: float) -> None:
+        self.seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+            return
+        slot = self._random.randrange(self.seen)
+        if slot < self.size:
+            self.values[slot] = value
+
+    def percentiles(self) -> dict[str, float | None]:
+        ordered = sorted(self.values)
+        return {"p50": percentile(ordered, 50), "p90": percentile(ordered, 90)}
+
+
+def collect_paths(payload: Any, prefix: str, depth: int, keys: set[str], scalars: list[tuple[str, Any]]) -> None:
+    """Key-Pfade und skalare String/Bool-Werte eines dekodierten Payloads sammeln."""
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            path = f"{prefix}.{key}" if prefix else str(key)
+            keys.add(path)
+            if isinstance(value, (str, bool)):
+                scalars.append((path, value))
+            elif depth < KEY_DEPTH:
+                collect_paths(value, path, depth + 1, keys, scalars)
+    elif isinstance(payload, list):
+        path = f"{prefix}[]"
+        for item in payload:
+            if isinstance(item, (dict, list)):
+                collect_paths(item, path, depth, keys, scalars)
+
+
+@dataclass
+class TopicFingerprint:
+    count: int = 0
+    size_max: int = 0
+    sizes: Reservoir = field(default_factory=Reservoir)
+    gaps_ms: Reservoir = field(default_factory=Reservoir)
+    keys: set[str] = field(default_factory=set)
+    enums: dict[str, set[Any]] = field(default_factory=dict)
+    non_enum: set[str] = field(default_factory=set)
+    last_ms: int | None = None
+    last_payload: Any = None
+
+    def observe(self, raw_payload: Any, timestamp_ms: int | None) -> None:
+        self.count += 1
+        size = len(raw_payload) if isinstance(raw_payload, str) else len(json.dumps(raw_payload))
+        self.size_max = max(self.size_max, size)
+        self.sizes.add(size)
+        if timestamp_ms is not None:
+            if self.last_ms is not None:
+                self.gaps_ms.add(timestamp_ms - self.last_ms)
+            self.last_ms = timestamp_ms
+
+        # Wiederholte identische Payloads (State-Heartbeats) nicht erneut dekodieren
+        if raw_payload == self.last_payload:
+            return
+        self.last_payload = raw_payload
+        scalars: list[tuple[str, Any]] = []
+        collect_paths(decode_payload(raw_payload), "", 0, self.keys, scalars)
+        for path, value in scalars:
+            if path in self.non_enum:
+                continue
+            if isinstance(value, str) and (len(value) > ENUM_MAX_LENGTH or _IDENTIFIER_VALUE.match(value)):
+                self.enums.pop(path, None)
+                self.non_enum.add(path)
+                continue
+            values = self.enums.setdefault(path, set())
+            values.add(value)
+            if len(values) > ENUM_MAX_VALUES:
+                del self.enums[path]
+                self.non_enum.add(path)
+
+    def summary(self, duration_s: float) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "rate_per_s": round(self.count / duration_s, 4) if duration_s > 0 else None,
+            "size": {**self.sizes.percentiles(), "max": self.size_max},
+            "gap_ms": self.gaps_ms.percentiles(),
+            "keys": sorted(self.keys),
+            "enums": {path: sorted(values, key=str) for path, values in sorted(self.enums.items())},
+        }
+
+
+def fingerprint_session(path: Path) -> dict[str, Any]:
+    """Ein Streaming-Durchlauf: Fingerprint pro Topic plus Session-Metadaten."""
+    topics: dict[str, TopicFingerprint] = {}
+    first_ms = last_ms = None
+    for _line_num, message in iter_session_messages(path):
+        timestamp_ms = timestamp_to_epoch_ms(message.get("timestamp"))
+        if timestamp_ms is not None:
+            first_ms = timestamp_ms if first_ms is None else first_ms
+            last_ms = timestamp_ms
+        fingerprint = topics.get(message["topic"])
+        if fingerprint is None:
+            fingerprint = topics[message["topic"]] = TopicFingerprint()
+        fingerprint.observe(message.get("payload"), timestamp_ms)
+
+    duration_s = (last_ms - first_ms) / 1000 if first_ms is not None and last_ms is not None else 0.0
+    meta = read_session_meta(path) or {}
+    return {
+        "session": path.name,
+        "ccu_version": meta.get("ccuVersion"),
+        "duration_s": round(duration_s, 3),
+        "messages": sum(fp.count for fp in topics.values()),
+        "topics": {topic: fp.summary(duration_s) for topic, fp in sorted(topics.items())},
+    }
+
+
+def _ratio(a: float | None, b: float | None) -> float | None:
+    if not a or b is None:
+        return None
+    return b / a
+
+
+def diff_fingerprints(
+    a: dict[str, Any],
+    b: dict[str, Any],
+    *,
+    rate_ratio: float = DEFAULT_RATE_RATIO,
+    size_change: float = DEFAULT_SIZE_CHANGE,
+) -> dict[str, Any]:
+    """Signifikante Abweichungen zwischen zwei Session-Fingerprints."""
+    topics_a, topics_b = set(a["topics"]), set(b["topics"])
+    changes: dict[str, dict[str, Any]] = {}
+    for topic in sorted(topics_a & topics_b):
+        fa, fb = a["topics"][topic], b["topics"][topic]
+        delta: dict[str, Any] = {}
+        enough = max(fa["count"], fb["count"]) >= MIN_MESSAGES
+
+        ratio = _ratio(fa["rate_per_s"], fb["rate_per_s"])
+        if enough and ratio is not None and (ratio >= rate_ratio or ratio <= 1 / rate_ratio):
+            delta["rate_per_s"] = [fa["rate_per_s"], fb["rate_per_s"]]
+        size_ratio = _ratio(fa["size"]["p50"], fb["size"]["p50"])
+        if enough and size_ratio is not None and abs(size_ratio - 1) >= size_change:
+            delta["size_p50"] = [fa["size"]["p50"], fb["size"]["p50"]]
+        gap_ratio = _ratio(fa["gap_ms"]["p50"], fb["gap_ms"]["p50"])
+        if enough and gap_ratio is not None and (gap_ratio >= rate_ratio or gap_ratio <= 1 / rate_ratio):
+            delta["gap_ms_p50"] = [fa["gap_ms"]["p50"], fb["gap_ms"]["p50"]]
+
+        keys_a, keys_b = set(fa["keys"]), set(fb["keys"])
+        if keys_b - keys_a:
+            delta["keys_added"] = sorted(keys_b - keys_a)
+        if keys_a - keys_b:
+            delta["keys_removed"] = sorted(keys_a - keys_b)
+
+        enum_changes = {}
+        for path in sorted(set(fa["enums"]) & set(fb["enums"])):
+            values_a = {json.dumps(v) for v in fa["enums"][path]}
+            values_b = {json.dumps(v) for v in fb["enums"][path]}
+            if values_a != values_b:
+                enum_changes[path] = {
+                    "added": sorted((json.loads(v) for v in values_b - values_a), key=str),
+                    "removed": sorted((json.loads(v) for v in values_a - values_b), key=str),
+                }
+        if enum_changes:
+            delta["enums"] = enum_changes
+        if delta:
+            changes[topic] = delta
+
+    return {
+        "a": {key: a[key] for key in ("session", "ccu_version", "duration_s", "messages")},
+        "b": {key: b[key] for key in ("session", "ccu_version", "duration_s", "messages")},
+        "topics_only_in_a": sorted(topics_a - topics_b),
+        "topics_only_in_b": sorted(topics_b - topics_a),
+        "changed_topics": changes,
+    }
+
+
+def _enum_text(values: list[Any]) -> str:
+    return ", ".join(str(v) for v in values)
+
+
+def print_diff(diff: dict[str, Any]) -> None:
+    a, b = diff["a"], diff["b"]
+    print("\n🔍 Session-Diff")
+    print(f"   A: {a['session']}  (CCU {a['ccu_version'] or '-'}, {a['duration_s']} s, {a['messages']} Messages)")
+    print(f"   B: {b['session']}  (CCU {b['ccu_version'] or '-'}, {b['duration_s']} s, {b['messages']} Messages)")
+
+    if diff["topics_only_in_a"]:
+        print(f"\n➖ Nur in A ({len(diff['topics_only_in_a'])}):")
+        for topic in diff["topics_only_in_a"]:
+            print(f"   - {topic}")
+    if diff["topics_only_in_b"]:
+        print(f"\n➕ Nur in B ({len(diff['topics_only_in_b'])}):")
+        for topic in diff["topics_only_in_b"]:
+            print(f"   - {topic}")
+
+    if not diff["changed_topics"]:
+        print("\n✅ Keine signifikanten Abweichungen bei gemeinsamen Topics.")
+        return
+    print(f"\n⚠️  Abweichungen bei gemeinsamen Topics ({len(diff['changed_topics'])}):")
+    for topic, delta in diff["changed_topics"].items():
+        print(f"\n   📡 {topic}")
+        if "rate_per_s" in delta:
+            print(f"      Rate: {delta['rate_per_s'][0]} → {delta['rate_per_s'][1]} /s")
+        if "size_p50" in delta:
+            print(f"      Größe p50: {delta['size_p50'][0]} → {delta['size_p50'][1]} Zeichen")
+        if "gap_ms_p50" in delta:
+            print(f"      Abstand p50: {delta['gap_ms_p50'][0]} → {delta['gap_ms_p50'][1]} ms")
+        if "keys_added" in delta:
+            print(f"      Neue Keys: {', '.join(delta['keys_added'])}")
+        if "keys_removed" in delta:
+            print(f"      Entfallene Keys: {', '.join(delta['keys_removed'])}")
+        for path, values in delta.get("enums", {}).items():
+            parts = []
+            if values["added"]:
+                parts.append(f"+[{_enum_text(values['added'])}]")
+            if values["removed"]:
+                parts.append(f"-[{_enum_text(values['removed'])}]")
+            print(f"      Werte {path}: {' '.join(parts)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Zwei Session-Logs über Topic-Fingerprints vergleichen")
+    parser.add_argument("session_a", type=Path, help="Referenz-Session (.log)")
+    parser.add_argument("session_b", type=Path, help="Vergleichs-Session (.log)")
+    parser.add_argument(
+        "--rate-ratio",
+        type=float,
+        default=DEFAULT_RATE_RATIO,
+        help=f"Faktor für Raten-/Taktänderung (Default {DEFAULT_RATE_RATIO})",
+    )
+    parser.add_argument(
+        "--size-change",
+        type=float,
+        default=DEFAULT_SIZE_CHANGE,
+        help=f"Relative Änderung der Payload-Größe p50 (Default {DEFAULT_SIZE_CHANGE})",
+    )
+    parser.add_argument("--json", type=Path, help="Diff zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    for path in (args.session_a, args.session_b):
+        if not path.exists():
+            print(f"❌ Datei nicht gefunden: {path}")
+            return
+
+    diff = diff_fingerprints(
+        fingerprint_session(args.session_a),
+        fingerprint_session(args.session_b),
+        rate_ratio=args.rate_ratio,
+        size_change=args.size_change,
+    )
+    print_diff(diff)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as handle:
+            json.dump(diff, handle, indent=2, ensure_ascii=False)
+        print(f"\n💾 Gespeichert: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
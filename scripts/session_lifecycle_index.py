@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Lebenszyklus-Index für Orders und Werkstücke aus Session-Logs.
+
+Liest eine Session einmal (Streaming) und baut pro orderId eine kompakte Timeline:
+Production-Steps (MANUFACTURE / NAVIGATION) mit Start, Ende, Modul bzw. FTS-Transport,
+Dauer und Wartezeit vor dem Step, ergänzt um die vom Modul/FTS gemeldeten Action-Zeiten
+(actionState RUNNING → FINISHED/FAILED). Pro Werkstück (NFC workpieceId) werden die Orders
+verknüpft.
+
+Quellen:
+- ccu/order/active, ccu/order/completed: Order- und Step-Zustände (letzter Snapshot gewinnt)
+- module/v1/ff/+/state, fts/v1/ff/+/state: actionState(s); Action-ID = Production-Step-ID
+
+Der Index wird neben der Session als `<session>.lifecycle.json` gecacht (gültig solange
+Größe/mtime der `.log`-Datei und INDEX_VERSION übereinstimmen).
+
+Usage:
+    python scripts/session_lifecycle_index.py                       # alle Sessions: Index bauen/aktualisieren + Übersicht
+    python scripts/session_lifecycle_index.py data/osf-data/sessions/ml-wrb-red-nok_20260807_130729.log
+    python scripts/session_lifecycle_index.py --order <orderId>     # Timeline einer Order
+    python scripts/session_lifecycle_index.py --workpiece <workpieceId>
+    python scripts/session_lifecycle_index.py --force               # Cache ignorieren
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+from session_log_stream import decode_payload, iter_session_messages, list_session_files, timestamp_to_epoch_ms
+
+INDEX_VERSION = 2
+INDEX_SUFFIX = ".lifecycle.json"
+
+ORDER_TOPICS = ("ccu/order/active", "ccu/order/completed")
+ORDER_FIELDS = ("orderType", "type", "workpieceId", "state", "receivedAt", "startedAt", "stoppedAt")
+STEP_FIELDS = (
+    "type",
+    "command",
+    "moduleType",
+    "serialNumber",
+    "source",
+    "target",
+    "state",
+    "startedAt",
+    "stoppedAt",
+)
+ACTION_END_STATES = ("FINISHED", "FAILED")
+
+
+def index_path(session_path: Path) -> Path:
+    return session_path.with_name(session_path.stem + INDEX_SUFFIX)
+
+
+def _seconds_between(start: Any, end: Any) -> float | None:
+    start_ms = timestamp_to_epoch_ms(start)
+    end_ms = timestamp_to_epoch_ms(end)
+    if start_ms is None or end_ms is None:
+        return None
+    return round((end_ms - start_ms) / 1000, 3)
+
+
+def _is_state_topic(topic: str) -> bool:
+    return topic.endswith("/state") and (topic.startswith("module/v1/ff/") or topic.startswith("fts/v1/ff/"))
+
+
+class LifecycleCollector:
+    """Sammelt Order-Snapshots und Action-Beobachtungen in einem Vorwärtsdurchlauf."""
+
+    def __init__(self) -> None:
+        self.orders: dict[str, dict[str, Any]] = {}
+        self.steps: dict[str, dict[str, dict[str, Any]]] = {}
+        self.actions: dict[str, dict[str, Any]] = {}
+        self._last_raw: dict[str, Any] = {}
+        self.first_timestamp: str | None = None
+        self.last_timestamp: str | None = None
+
+    def feed(self, message: dict[str, Any]) -> None:
+        topic = message["topic"]
+        timestamp = message.get("timestamp")
+        if timestamp:
+            self.first_timestamp = self.first_timestamp or timestamp
+            self.last_timestamp = timestamp
+        if topic in ORDER_TOPICS:
+            raw = message.get("payload")
+            # ccu/order/active wird oft unverändert wiederholt – nicht erneut dekodieren
+            if raw == self._last_raw.get(topic):
+                return
+            self._last_raw[topic] = raw
+            self._observe_orders(decode_payload(raw))
+        elif _is_state_topic(topic):
+            self._observe_actions(decode_payload(message.get("payload")), message.get("timestamp"))
+
+    def _observe_orders(self, payload: Any) -> None:
+        if isinstance(payload, dict):
+            payload = [payload]
+        if not isinstance(payload, list):
+            return
+        for order in payload:
+            if not isinstance(order, dict) or not order.get("orderId"):
+                continue
+            order_id = order["orderId"]
+            record = self.orders.setdefault(order_id, {})
+            for field in ORDER_FIELDS:
+                if order.get(field) is not None:
+                    record[field] = order[field]
+            steps = self.steps.setdefault(order_id, {})
+            for step in order.get("productionSteps") or []:
+                if not isinstance(step, dict) or not step.get("id"):
+                    continue
+                step_record = steps.setdefault(step["id"], {})
+                for field in STEP_FIELDS:
+                    if step.get(field) is not None:
+                        step_record[field] = step[field]
+
+    def _observe_actions(self, payload: Any, timestamp: Any) -> None:
+        if not isinstance(payload, dict):
+            return
+        serial = payload.get("serialNumber")
+        entries = [payload.get("actionState")] + list(payload.get("actionStates") or [])
+        for entry in entries:
+            if not isinstance(entry, dict) or not entry.get("id"):
+                continue
+            observed = self.actions.setdefault(entry["id"], {})
+            if serial and "serialNumber" not in observed:
+                observed["serialNumber"] = serial
+            if entry.get("command") and "command" not in observed:
+                observed["command"] = entry["command"]
+            state = entry.get("state")
+            if state == "RUNNING" and "running_at" not in observed:
+                observed["running_at"] = timestamp
+            elif state in ACTION_END_STATES and "ended_at" not in observed:
+                observed["ended_at"] = timestamp
+                observed["end_state"] = state
+                if entry.get("result") is not None:
+                    observed["result"] = entry["result"]
+
+    def build(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        orders = {order_id: self._build_order(order_id, record) for order_id, record in self.orders.items()}
+        workpieces: dict[str, dict[str, Any]] = {}
+        for order_id, order in orders.items():
+            workpiece_id = order.get("workpieceId")
+            if not workpiece_id:
+                continue
+            entry = workpieces.setdefault(workpiece_id, {"orders": [], "type": order.get("type")})
+            entry["orders"].append(order_id)
+        for entry in workpieces.values():
+            entry["orders"].sort(key=lambda oid: orders[oid].get("startedAt") or orders[oid].get("receivedAt") or "")
+            first, last = orders[entry["orders"][0]], orders[entry["orders"][-1]]
+            entry["first_seen"] = first.get("receivedAt") or first.get("startedAt")
+            entry["last_seen"] = last.get("stoppedAt")
+        return orders, workpieces
+
+    def _build_order(self, order_id: str, record: dict[str, Any]) -> dict[str, Any]:
+        order = dict(record)
+        steps: list[dict[str, Any]] = []
+        previous_end = record.get("startedAt")
+        station_times: dict[str, float] = {}
+        transport_time = 0.0
+        wait_time = 0.0
+        for step_id, step_record in self.steps.get(order_id, {}).items():
+            step = {"id": step_id, **step_record}
+            step["duration_s"] = _seconds_between(step.get("startedAt"), step.get("stoppedAt"))
+            step["wait_s"] = _seconds_between(previous_end, step.get("startedAt"))
+            observed = self.actions.get(step_id)
+            if observed:
+                step["observed"] = observed
+            if step["duration_s"] is not None:
+                if step.get("type") == "NAVIGATION":
+                    transport_time += step["duration_s"]
+                elif step.get("moduleType"):
+                    station = step["moduleType"]
+                    station_times[station] = round(station_times.get(station, 0.0) + step["duration_s"], 3)
+            if step["wait_s"] is not None and step["wait_s"] > 0:
+                wait_time += step["wait_s"]
+            if step.get("stoppedAt"):
+                previous_end = step["stoppedAt"]
+            steps.append(step)
+        order["steps"] = steps
+        order["lead_time_s"] = _seconds_between(
+            record.get("receivedAt") or record.get("startedAt"), record.get("stoppedAt")
+        )
+        order["station_times_s"] = station_times
+        order["transport_time_s"] = round(transport_time, 3)
+        order["wait_time_s"] = round(wait_time, 3)
+        return order
+
+
+def build_index(session_path: Path) -> dict[str, Any]:
+    """Streamt die Session einmal und liefert den Lebenszyklus-Index (ohne Cache)."""
+    collector = LifecycleCollector()
+    for _line_num, message in iter_session_messages(session_path):
+        collector.feed(message)
+    orders, workpieces = collector.build()
+    stat = session_path.stat()
+    return {
+        "version": INDEX_VERSION,
+        "session": session_path.stem,
+        "source": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+        "span": {"start": collector.first_timestamp, "end": collector.last_timestamp},
+        "orders": orders,
+        "workpieces": workpieces,
+        # Alle beobachteten Modul-/FTS-Actions (auch ohne Order-Bezug, z.B. INPUT_RGB)
+        "actions": collector.actions,
+    }
+
+
+def load_index(session_path: Path, *, force: bool = False) -> tuple[dict[str, Any], bool]:
+    """
+    Index aus dem Cache neben der Session laden oder neu bauen und speichern.
+
+    Returns:
+        (index, aus_cache)
+    """
+    cache_path = index_path(session_path)
+    stat = session_path.stat()
+    if not force and cache_path.exists():
+        try:
+            with cache_path.open(encoding="utf-8") as handle:
+                cached = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            cached = None
+        if (
+            isinstance(cached, dict)
+            and cached.get("version") == INDEX_VERSION
+            and cached.get("source") == {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        ):
+            return cached, True
+
+    index = build_index(session_path)
+    with cache_path.open("w", encoding="utf-8") as handle:
+        json.dump(index, handle, ensure_ascii=False, separators=(",", ":"))
+    return index, False
+
+
+def print_order_timeline(session: str, order_id: str, order: dict[str, Any]) -> None:
+    print(f"\n📦 Order {order_id} ({order.get('orderType')}, {order.get('type')}) – Session {session}")
+    print(f"   Werkstück: {order.get('workpieceId') or '-'}  |  Status: {order.get('state')}")
+    print(
+        f"   Durchlaufzeit: {order.get('lead_time_s')} s  |  Transport: {order['transport_time_s']} s"
+        f"  |  Wartezeit: {order['wait_time_s']} s"
+    )
+    for step in order["steps"]:
+        if step.get("type") == "NAVIGATION":
+            label = f"🚚 {step.get('source')} → {step.get('target')}"
+        else:
+            label = f"🏭 {step.get('moduleType')} {step.get('command')}"
+        result = (step.get("observed") or {}).get("result")
+        result_text = f"  [{result}]" if result else ""
+        print(
+            f"   {label:<28} {step.get('startedAt') or '-':<26} {step.get('duration_s')} s"
+            f" (Wartezeit {step.get('wait_s')} s){result_text}"
+        )
+
+
+def print_summary(index: dict[str, Any]) -> None:
+    print(f"\n=== {index['session']} – {len(index['orders'])} Orders, {len(index['workpieces'])} Werkstücke ===")
+    for order_id, order in index["orders"].items():
+        stations = ", ".join(f"{station} {seconds}s" for station, seconds in order["station_times_s"].items())
+        print(
+            f"  {order_id[:8]}  {order.get('orderType') or '-':<10} {order.get('type') or '-':<6} "
+            f"{order.get('state') or '-':<11} Durchlauf {order.get('lead_time_s')} s  |  {stations}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Order-/Werkstück-Lebenszyklus aus Session-Logs indizieren")
+    parser.add_argument("paths", nargs="*", type=Path, help="Session-Dateien (.log). Ohne Angabe: alle Sessions")
+    parser.add_argument("--order", help="Timeline einer orderId ausgeben")
+    parser.add_argument("--workpiece", help="Timelines aller Orders eines Werkstücks (workpieceId) ausgeben")
+    parser.add_argument("--force", action="store_true", help="Index neu bauen (Cache ignorieren)")
+    args = parser.parse_args()
+
+    paths = list_session_files(args.paths)
+    if not paths:
+        print("Keine Session-Dateien gefunden.")
+        return
+
+    rebuilt = 0
+    for path in paths:
+        if not path.exists():
+            print(f"Überspringe (nicht gefunden): {path}")
+            continue
+        index, cached = load_index(path, force=args.force)
+        rebuilt += not cached
+        if args.order:
+            if args.order in index["orders"]:
+                print_order_timeline(index["session"], args.order, index["orders"][args.order])
+        elif args.workpiece:
+            workpiece = index["workpieces"].get(args.workpiece)
+            for order_id in (workpiece or {}).get("orders", []):
+                print_order_timeline(index["session"], order_id, index["orders"][order_id])
+        else:
+            print_summary(index)
+
+    print(f"\n✅ {len(paths)} Session(s), {rebuilt} Index(e) neu gebaut, {len(paths) - rebuilt} aus Cache")
+
+
+if __name__ == "__main__":
+    main()
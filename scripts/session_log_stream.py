@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Gemeinsame Streaming-Helfer für Session-Logs (JSON-Zeilen) in den Analyse-Skripten.
+
+Liest `.log`-Dateien zeilenweise (kein Voll-Laden), überspringt die `session_meta`-Zeile
+und stellt einheitliche Extraktion häufig genutzter Payload-Felder bereit
+(orderId, serialNumber, actionState.command/state, Werkstück-Typ, FTS-Node).
+
+Wird von anderen Skripten als Geschwister-Modul importiert:
+
+    from session_log_stream import iter_session_messages
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SESSIONS_DIR = REPO_ROOT / "data/osf-data/sessions"
+
+SESSION_META_KIND = "session_meta"
+
+# Modul-Kürzel → Serial (wie aggregate_module_statistics.MODULES)
+MODULE_SERIALS = {
+    "hbw": "SVR3QA0022",
+    "drill": "SVR4H76449",
+    "mill": "SVR3QA2098",
+    "dps": "SVR4H73275",
+    "aiqs": "SVR4H76530",
+    "fts": "5iO4",
+}
+
+
+def list_session_files(paths: list[Path] | None = None) -> list[Path]:
+    """Explizite Pfade (Dateien oder Verzeichnisse) auflösen; ohne Angabe alle *.log in SESSIONS_DIR."""
+    if not paths:
+        return sorted(SESSIONS_DIR.glob("*.log"))
+    resolved: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            resolved.extend(sorted(path.glob("*.log")))
+        else:
+            resolved.append(path)
+    return resolved
+
+
+def read_session_meta(path: Path) -> dict[str, Any] | None:
+    """Liest nur die erste Zeile; liefert das session_meta-Objekt oder None."""
+    try:
+        with path.open(encoding="utf-8") as handle:
+            first_line = handle.readline().strip()
+    except OSError:
+        return None
+    if not first_line:
+        return None
+    try:
+        obj = json.loads(first_line)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(obj, dict) and obj.get("_kind") == SESSION_META_KIND:
+        return obj
+    return None
+
+
+def iter_session_messages(path: Path, *, warn: bool = True) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Liefert (Zeilennummer, Message) für jede gültige MQTT-Zeile.
+
+    Message = Envelope-Dict mit topic/payload/timestamp (+ optional qos/retain); payload bleibt roh.
+    session_meta und ungültige Zeilen werden übersprungen.
+    """
+    with path.open(encoding="utf-8") as handle:
+        for line_num, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                if warn:
+                    print(f"⚠️  {path.name}:{line_num} konnte nicht geparst werden: {e}", file=sys.stderr)
+                continue
+            if not isinstance(data, dict):
+                continue
+            if "timestamp" in data and "topic" in data and "payload" in data:
+                yield line_num, data
+
+
+def decode_payload(raw_payload: Any) -> Any:
+    """JSON-String-Payload dekodieren; bei Fehler/anderen Typen Rohwert zurückgeben."""
+    if isinstance(raw_payload, str):
+        if not raw_payload:
+            return None
+        try:
+            return json.loads(raw_payload)
+        except json.JSONDecodeError:
+            return raw_payload
+    return raw_payload
+
+
+def timestamp_to_epoch_ms(timestamp: Any) -> int | None:
+    """Envelope-Timestamp (ISO-8601, UTC mit Z oder naiv) → Epoch-Millisekunden."""
+    if not isinstance(timestamp, str) or not timestamp:
+        return None
+    text = timestamp.strip()
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """Perzentil mit linearer Interpolation (wie numpy.percentile) auf sortierten Werten."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return round(sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction, 3)
+
+
+def _primary_action(payload: dict[str, Any]) -> dict[str, Any] | None:
+    """actionState (Modul-State), sonst letzter Eintrag aus actionStates (NodeRed/FTS), sonst action (Order)."""
+    action_state = payload.get("actionState")
+    if isinstance(action_state, dict):
+        return action_state
+    action_states = payload.get("actionStates")
+    if isinstance(action_states, list):
+        for entry in reversed(action_states):
+            if isinstance(entry, dict):
+                return entry
+    action = payload.get("action")
+    if isinstance(action, dict):
+        return action
+    return None
+
+
+def _str_or_none(value: Any) -> str | None:
+    return value if isinstance(value, str) and value else None
+
+
+def extract_common_fields(payload: Any) -> dict[str, str | None]:
+    """
+    Flacht die in den Analysen am häufigsten abgefragten Felder ab.
+
+    Listen-Payloads (ccu/order/active|completed) werden über das erste Dict-Element gelesen.
+    """
+    fields: dict[str, str | None] = {
+        "order_id": None,
+        "serial_number": None,
+        "action_command": None,
+        "action_state": None,
+        "workpiece_type": None,
+        "workpiece_id": None,
+        "fts_node_id": None,
+    }
+    if isinstance(payload, list):
+        payload = next((item for item in payload if isinstance(item, dict)), None)
+    if not isinstance(payload, dict):
+        return fields
+
+    fields["order_id"] = _str_or_none(payload.get("orderId"))
+    fields["serial_number"] = _str_or_none(payload.get("serialNumber"))
+    fields["fts_node_id"] = _str_or_none(payload.get("lastNodeId"))
+
+    action = _primary_action(payload)
+    metadata: dict[str, Any] = {}
+    if action is not None:
+        fields["action_command"] = _str_or_none(action.get("command"))
+        fields["action_state"] = _str_or_none(action.get("state"))
+        if isinstance(action.get("metadata"), dict):
+            metadata = action["metadata"]
+
+    # Modul-Action-Metadata (PICK/DROP/...) vor Order-Feldern (ccu/order/*: type, workpieceId)
+    fields["workpiece_type"] = _str_or_none(metadata.get("type")) or _str_or_none(payload.get("type"))
+    fields["workpiece_id"] = _str_or_none(metadata.get("workpieceId")) or _str_or_none(payload.get("workpieceId"))
+
+    if fields["workpiece_type"] is None:
+        loads = payload.get("loads") or payload.get("load")
+        if isinstance(loads, list):
+            for load in loads:
+                if isinstance(load, dict) and _str_or_none(load.get("loadType") or load.get("type")):
+                    fields["workpiece_type"] = load.get("loadType") or load.get("type")
+                    fields["workpiece_id"] = fields["workpiece_id"] or _str_or_none(load.get("loadId"))
+                    break
+    return fields
+
+
+def merge_index_windows(hit_indices: list[int], before: int, after: int, size: int) -> list[tuple[int, int]]:
+    """
+    Fenster [i - before, i + after) um jeden Treffer, auf [0, size) begrenzt und
+    überlappende/angrenzende Fenster zusammengefasst. hit_indices muss aufsteigend sein.
+    """
+    windows: list[tuple[int, int]] = []
+    for index in hit_indices:
+        start = max(0, index - before)
+        end = min(size, index + after)
+        if windows and start <= windows[-1][1]:
+            if end > windows[-1][1]:
+                windows[-1] = (windows[-1][0], end)
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def indices_in_windows(sorted_indices: list[int], windows: list[tuple[int, int]]) -> list[int]:
+    """Alle Indizes aus sorted_indices, die in einem der (disjunkten, sortierten) Fenster liegen."""
+    selected: list[int] = []
+    for start, end in windows:
+        lo = bisect_left(sorted_indices, start)
+        hi = bisect_left(sorted_indices, end, lo)
+        selected.extend(sorted_indices[lo:hi])
+    return selected
+
+
+def decode_message_payloads(messages: list[dict[str, Any]]) -> list[Any]:
+    """Payloads aller Messages genau einmal dekodieren (parallel zur Message-Liste)."""
+    return [decode_payload(message.get("payload")) for message in messages]
+
+
+def payload_has_command(payload: Any, commands: Any, *, include_action: bool = True) -> bool:
+    """
+    True, wenn ein Dict-Payload eines der Commands enthält: actionState, actionStates[],
+    productionSteps[] (ccu/order) und optional action (Modul-Order).
+    """
+    if not isinstance(payload, dict):
+        return False
+    action_state = payload.get("actionState")
+    if isinstance(action_state, dict) and action_state.get("command") in commands:
+        return True
+    for key in ("actionStates", "productionSteps"):
+        entries = payload.get(key)
+        if isinstance(entries, list) and any(
+            isinstance(entry, dict) and entry.get("command") in commands for entry in entries
+        ):
+            return True
+    if include_action:
+        action = payload.get("action")
+        if isinstance(action, dict) and action.get("command") in commands:
+            return True
+    return False
+
+
+def collect_window_context(
+    messages: list[dict[str, Any]],
+    hit_indices: list[int],
+    before: int,
+    after: int,
+    is_relevant: Any,
+    relevant_indices: list[int] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Relevante Messages in den Fenstern [i - before, i + after) um alle Treffer.
+
+    Fenster werden zusammengefasst, relevante Indizes per bisect ausgeschnitten; jede
+    Message wird höchstens einmal ausgegeben (Duplikate nach (topic, timestamp) entfernt).
+    ``relevant_indices`` (aufsteigend) ersetzt die Prüfung mit ``is_relevant``, falls bereits bekannt.
+    """
+    if relevant_indices is None:
+        relevant_indices = [i for i, message in enumerate(messages) if is_relevant(message["topic"])]
+    windows = merge_index_windows(hit_indices, before, after, len(messages))
+    seen: set[tuple[Any, Any]] = set()
+    context: list[dict[str, Any]] = []
+    for index in indices_in_windows(relevant_indices, windows):
+        message = messages[index]
+        msg_id = (message["topic"], message.get("timestamp", ""))
+        if msg_id not in seen:
+            seen.add(msg_id)
+            context.append(message)
+    return context
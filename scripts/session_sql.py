@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+SQL-Abfragen über aufgenommene Sessions (SQLite).
+
+`load` importiert Session-Logs (JSON-Zeilen) per Bulk-Insert in eine indizierte SQLite-Datenbank.
+Häufig genutzte Payload-Felder (orderId, serialNumber, actionState.*, workpieceId/type,
+FTS lastNodeId) stehen als generierte Spalten (json_extract) bereit – ohne Payload-Duplikat.
+Indizes: (topic, ts_ms), (order_id, ts_ms), (serial_number, action_id).
+Bereits geladene Sessions werden anhand Größe/mtime übersprungen bzw. bei Änderung neu geladen.
+
+`query` beantwortet typische Ad-hoc-Fragen, für die bisher ein neues analyze_*-Skript nötig war.
+
+Usage:
+    python scripts/session_sql.py load                              # alle Sessions in data/osf-data/sessions
+    python scripts/session_sql.py load data/osf-data/sessions/ml-wrb-red-nok_20260807_130729.log
+    python scripts/session_sql.py query sessions
+    python scripts/session_sql.py query orders --session ml-wrb-red-nok_20260807_130729
+    python scripts/session_sql.py query order-actions <orderId> --module hbw
+    python scripts/session_sql.py query durations --module drill
+    python scripts/session_sql.py query topics --session ml-wrb-red-nok_20260807_130729
+    python scripts/session_sql.py query sql "SELECT topic, COUNT(*) FROM messages GROUP BY topic"
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from session_log_stream import (
+    MODULE_SERIALS,
+    REPO_ROOT,
+    iter_session_messages,
+    list_session_files,
+    read_session_meta,
+    timestamp_to_epoch_ms,
+)
+
+DEFAULT_DB_PATH = REPO_ROOT / "data/osf-data/session_query.db"
+INSERT_BATCH_ROWS = 5_000
+SCHEMA_VERSION = 1
+
+
+def _json_col(*paths: str) -> str:
+    """Generierter Spaltenausdruck: erster Treffer aus den JSON-Pfaden; ungültiges JSON → NULL."""
+    extracts = ", ".join(f"json_extract(payload, '{p}')" for p in paths)
+    expr = f"COALESCE({extracts})" if len(paths) > 1 else extracts
+    return f"CASE WHEN json_valid(payload) THEN {expr} END"
+
+
+SCHEMA_SQL = f"""
+CREATE TABLE IF NOT EXISTS schema_info (version INTEGER NOT NULL);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    ccu_version TEXT,
+    meta TEXT
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    line INTEGER NOT NULL,
+    ts TEXT NOT NULL,
+    ts_ms INTEGER,
+    topic TEXT NOT NULL,
+    qos INTEGER,
+    retain INTEGER,
+    payload TEXT,
+    order_id TEXT GENERATED ALWAYS AS ({_json_col("$.orderId", "$[0].orderId")}) VIRTUAL,
+    serial_number TEXT GENERATED ALWAYS AS ({_json_col("$.serialNumber")}) VIRTUAL,
+    action_id TEXT GENERATED ALWAYS AS ({_json_col("$.actionState.id", "$.action.id")}) VIRTUAL,
+    action_command TEXT GENERATED ALWAYS AS ({_json_col("$.actionState.command", "$.action.command")}) VIRTUAL,
+    action_state TEXT GENERATED ALWAYS AS ({_json_col("$.actionState.state")}) VIRTUAL,
+    action_result TEXT GENERATED ALWAYS AS ({_json_col("$.actionState.result")}) VIRTUAL,
+    workpiece_id TEXT GENERATED ALWAYS AS (
+        {_json_col("$.actionState.metadata.workpieceId", "$.action.metadata.workpieceId", "$.workpieceId")}
+    ) VIRTUAL,
+    workpiece_type TEXT GENERATED ALWAYS AS (
+        {_json_col("$.actionState.metadata.type", "$.action.metadata.type", "$.type")}
+    ) VIRTUAL,
+    fts_node_id TEXT GENERATED ALWAYS AS ({_json_col("$.lastNodeId")}) VIRTUAL,
+    PRIMARY KEY (session_id, line)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_messages_topic_ts ON messages(topic, ts_ms);
+CREATE INDEX IF NOT EXISTS idx_messages_order_ts ON messages(order_id, ts_ms);
+CREATE INDEX IF NOT EXISTS idx_messages_serial_action ON messages(serial_number, action_id);
+"""
+
+# Modul-Kommandodauer: erster RUNNING → erster FINISHED je Action-ID (nur module/v1/ff/<serial>/state)
+DURATIONS_SQL = """
+WITH actions AS (
+    SELECT session_id, serial_number, action_id, action_command,
+           MIN(CASE WHEN action_state = 'RUNNING' THEN ts_ms END) AS started_ms,
+           MIN(CASE WHEN action_state = 'FINISHED' THEN ts_ms END) AS finished_ms
+    FROM messages
+    WHERE topic GLOB 'module/v1/ff/*/state' AND topic NOT GLOB 'module/v1/ff/NodeRed/*'
+      AND action_id IS NOT NULL {filters}
+    GROUP BY session_id, serial_number, action_id, action_command
+)
+SELECT serial_number, action_command, COUNT(*) AS n,
+       ROUND(AVG(finished_ms - started_ms) / 1000.0, 2) AS avg_s,
+       ROUND(MIN(finished_ms - started_ms) / 1000.0, 2) AS min_s,
+       ROUND(MAX(finished_ms - started_ms) / 1000.0, 2) AS max_s
+FROM actions
+WHERE started_ms IS NOT NULL AND finished_ms IS NOT NULL AND finished_ms >= started_ms
+GROUP BY serial_number, action_command
+ORDER BY serial_number, action_command
+"""
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(SCHEMA_SQL)
+    if conn.execute("SELECT COUNT(*) FROM schema_info").fetchone()[0] == 0:
+        conn.execute("INSERT INTO schema_info(version) VALUES (?)", (SCHEMA_VERSION,))
+    conn.commit()
+    return conn
+
+
+def _message_rows(session_id: int, path: Path) -> Iterable[tuple[Any, ...]]:
+    for line_num, message in iter_session_messages(path):
+        payload = message.get("payload")
+        if payload is not None and not isinstance(payload, str):
+            payload = json.dumps(payload, ensure_ascii=False)
+        retain = message.get("retain")
+        yield (
+            session_id,
+            line_num,
+            message.get("timestamp", ""),
+            timestamp_to_epoch_ms(message.get("timestamp")),
+            message.get("topic", ""),
+            message.get("qos"),
+            int(retain) if isinstance(retain, bool) else None,
+            payload,
+        )
+
+
+def load_session(conn: sqlite3.Connection, path: Path, *, force: bool = False) -> int | None:
+    """
+    Importiert eine Session. Unveränderte Sessions (Größe + mtime) werden übersprungen (→ None).
+
+    Returns:
+        Anzahl importierter Messages oder None, falls übersprungen.
+    """
+    stat = path.stat()
+    name = path.stem
+    existing = conn.execute("SELECT id, size, mtime_ns FROM sessions WHERE name = ?", (name,)).fetchone()
+    if existing and not force and existing[1] == stat.st_size and existing[2] == stat.st_mtime_ns:
+        return None
+
+    meta = read_session_meta(path)
+    with conn:
+        if existing:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (existing[0],))
+        cur = conn.execute(
+            "INSERT INTO sessions(name, path, size, mtime_ns, ccu_version, meta) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                name,
+                str(path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                (meta or {}).get("ccuVersion"),
+                json.dumps(meta, ensure_ascii=False) if meta else None,
+            ),
+        )
+        session_id = int(cur.lastrowid)
+
+        count = 0
+        batch: list[tuple[Any, ...]] = []
+        insert_sql = (
+            "INSERT INTO messages(session_id, line, ts, ts_ms, topic, qos, retain, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        for row in _message_rows(session_id, path):
+            batch.append(row)
+            if len(batch) >= INSERT_BATCH_ROWS:
+                conn.executemany(insert_sql, batch)
+                count += len(batch)
+                batch.clear()
+        if batch:
+            conn.executemany(insert_sql, batch)
+            count += len(batch)
+        conn.execute("UPDATE sessions SET message_count = ? WHERE id = ?", (count, session_id))
+    return count
+
+
+def print_rows(cursor: sqlite3.Cursor, *, max_width: int = 60) -> int:
+    """Einfache Tabellenausgabe (Spaltenbreite begrenzt)."""
+    headers = [d[0] for d in cursor.description or []]
+    rows = cursor.fetchall()
+
+    def cell(value: Any) -> str:
+        text = "" if value is None else str(value)
+        return text if len(text) <= max_width else text[: max_width - 1] + "…"
+
+    table = [[cell(v) for v in row] for row in rows]
+    widths = [max([len(h)] + [len(r[i]) for r in table]) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(widths[i]) for i, h in enumerate(headers)))
+    print("  ".join("-" * w for w in widths))
+    for r in table:
+        print("  ".join(v.ljust(widths[i]) for i, v in enumerate(r)))
+    print(f"({len(rows)} Zeilen)")
+    return len(rows)
+
+
+def _session_filter(session: str | None, params: list[Any]) -> str:
+    if not session:
+        return ""
+    params.append(session)
+    return " AND session_id = (SELECT id FROM sessions WHERE name = ?)"
+
+
+def _module_serial(module: str | None) -> str | None:
+    if not module:
+        return None
+    return MODULE_SERIALS.get(module.lower(), module)
+
+
+def run_query(conn: sqlite3.Connection, args: argparse.Namespace) -> int:
+    params: list[Any] = []
+    if args.kind == "sessions":
+        sql = "SELECT name, message_count, ccu_version, size FROM sessions ORDER BY name"
+    elif args.kind == "topics":
+        sql = "SELECT topic, COUNT(*) AS n, MIN(ts) AS first_ts, MAX(ts) AS last_ts FROM messages WHERE 1=1"
+        sql += _session_filter(args.session, params)
+        sql += " GROUP BY topic ORDER BY n DESC"
+    elif args.kind == "orders":
+        sql = (
+            "SELECT order_id, MIN(ts) AS first_ts, MAX(ts) AS last_ts, COUNT(*) AS n, "
+            "GROUP_CONCAT(DISTINCT serial_number) AS serials FROM messages "
+            "WHERE order_id IS NOT NULL AND order_id != '0'"
+        )
+        sql += _session_filter(args.session, params)
+        sql += " GROUP BY order_id ORDER BY first_ts"
+    elif args.kind == "order-actions":
+        if not args.arg:
+            print("❌ orderId fehlt: query order-actions <orderId>", file=sys.stderr)
+            return 2
+        sql = (
+            "SELECT ts, topic, action_command, action_state, action_result, workpiece_id, workpiece_type "
+            "FROM messages WHERE order_id = ? AND action_command IS NOT NULL"
+        )
+        params.append(args.arg)
+        serial = _module_serial(args.module)
+        if serial:
+            sql += " AND serial_number = ?"
+            params.append(serial)
+        sql += _session_filter(args.session, params)
+        sql += " ORDER BY ts_ms"
+    elif args.kind == "durations":
+        filters = ""
+        serial = _module_serial(args.module)
+        if serial:
+            filters += " AND serial_number = ?"
+            params.append(serial)
+        filters += _session_filter(args.session, params)
+        sql = DURATIONS_SQL.format(filters=filters)
+    else:  # sql
+        if not args.arg:
+            print('❌ SQL fehlt: query sql "SELECT ..."', file=sys.stderr)
+            return 2
+        sql = args.arg
+
+    print_rows(conn.execute(sql, params))
+    return 0
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Session-Logs in SQLite laden und abfragen")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="SQLite-Datei (Standard: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("load", help="Session-Logs importieren")
+    load.add_argument("paths", nargs="*", type=Path, help="Session-Dateien/Verzeichnisse (Standard: alle Sessions)")
+    load.add_argument("--force", action="store_true", help="Auch unveränderte Sessions neu laden")
+
+    query = sub.add_parser("query", help="Vordefinierte Abfragen oder freies SQL")
+    query.add_argument("kind", choices=["sessions", "topics", "orders", "order-actions", "durations", "sql"])
+    query.add_argument("arg", nargs="?", help="orderId (order-actions) bzw. SQL-Text (sql)")
+    query.add_argument("--session", help="Auf eine Session einschränken (Dateiname ohne .log)")
+    query.add_argument("--module", help=f"Modul ({', '.join(MODULE_SERIALS)}) oder Serial")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    conn = connect(args.db)
+    try:
+        if args.command == "load":
+            paths = list_session_files(args.paths)
+            if not paths:
+                print("Keine Session-Dateien gefunden.")
+                return 1
+            for path in paths:
+                if not path.exists():
+                    print(f"Überspringe (nicht gefunden): {path}")
+                    continue
+                count = load_session(conn, path, force=args.force)
+                if count is None:
+                    print(f"⏭️  {path.name}: unverändert")
+                else:
+                    print(f"✅ {path.name}: {count} Messages")
+            conn.execute("PRAGMA optimize")
+            print(f"📂 Datenbank: {args.db}")
+            return 0
+        return run_query(conn, args)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -21,7 +21,7 @@ import streamlit as st
 from session_manager.components.object_detection_capture import show_object_detection_capture
 from session_manager.components.replay_station import show_replay_station
 from session_manager.components.session_recorder import show_session_recorder
-from session_manager.components.settings_manager import SettingsManager
+from session_manager.components.settings_manager import get_settings_manager
 from session_manager.components.settings_ui import SettingsUI
 
 # Absolute imports for main script (entry point)
@@ -83,9 +83,8 @@ def main():
     st.title("🎙️ Session Manager")
     st.markdown("Verwaltung und Analyse von MQTT-Sessions für die ORBIS Smart-Factory")
 
-    # Settings Manager initialisieren
-    if "settings_manager" not in st.session_state:
-        st.session_state.settings_manager = SettingsManager()
+    # Settings Manager: prozessweit geteilt, lädt nur bei geänderter Datei neu
+    st.session_state.settings_manager = get_settings_manager()
 
     if "settings_ui" not in st.session_state:
         st.session_state.settings_ui = SettingsUI(st.session_state.settings_manager)
@@ -4,7 +4,7 @@ Session Manager Logs Component - Duplikat der OMF Dashboard Logs
 Zeigt Live-Logs für den Session Manager an.
 """
 
-import json
+from typing import Optional
 
 import streamlit as st
 
@@ -46,7 +46,7 @@ def show_logs():
             st.session_state.session_manager_log_buffer.clear()
             request_refresh()
 
-    # Logs anzeigen
+    # Logs anzeigen (Snapshot; Einträge sind bereits beim Loggen geparst, siehe RingBufferHandler)
     logs = list(st.session_state.session_manager_log_buffer)
 
     if not logs:
@@ -55,22 +55,7 @@ def show_logs():
 
     # Filter anwenden
     if level_filter != "ALL":
-        level_mapping = {"DEBUG": "DEBUG", "INFO": "INFO", "WARNING": "WARNING", "ERROR": "ERROR"}
-        target_level = level_mapping.get(level_filter, "INFO")
-        filtered_logs = []
-
-        for log_entry in logs:
-            try:
-                # Versuche JSON zu parsen
-                log_data = json.loads(log_entry)
-                if log_data.get("level") == target_level:
-                    filtered_logs.append(log_entry)
-            except json.JSONDecodeError:
-                # Fallback für nicht-JSON Logs
-                if target_level in log_entry:
-                    filtered_logs.append(log_entry)
-
-        logs = filtered_logs
+        logs = [entry for entry in logs if _entry_level(entry) == level_filter]
 
     # Logs in umgekehrter Reihenfolge anzeigen (neueste zuerst)
     logs.reverse()
@@ -79,32 +64,37 @@ def show_logs():
     st.markdown(f"**{len(logs)} Log-Einträge** (Level: {level_filter})")
 
     # Logs anzeigen
-    for _i, log_entry in enumerate(logs[:100]):  # Max 100 Einträge
-        try:
-            # Versuche JSON zu parsen
-            log_data = json.loads(log_entry)
-
-            # Log-Level bestimmen
-            level = log_data.get("level", "INFO")
-            message = log_data.get("msg", log_entry)
-            logger_name = log_data.get("logger", "unknown")
-            # timestamp = log_data.get("timestamp", "")  # Unused variable
-
-            # Farben basierend auf Level
-            if level == "ERROR":
-                st.error(f"🔴 **{level}** | {logger_name} | {message}")
-            elif level == "WARNING":
-                st.warning(f"🟡 **{level}** | {logger_name} | {message}")
-            elif level == "INFO":
-                st.info(f"🔵 **{level}** | {logger_name} | {message}")
-            elif level == "DEBUG":
-                st.text(f"⚪ **{level}** | {logger_name} | {message}")
-            else:
-                st.text(f"📝 **{level}** | {logger_name} | {message}")
-
-        except json.JSONDecodeError:
-            # Fallback für nicht-JSON Logs
+    for log_entry in logs[:100]:  # Max 100 Einträge
+        level = getattr(log_entry, "level", None)
+        if level is None:
+            # Fallback für Einträge ohne vorab extrahierte Felder
             st.text(f"📝 {log_entry}")
+            continue
+        message = log_entry.message
+        logger_name = log_entry.logger
+
+        # Farben basierend auf Level
+        if level == "ERROR":
+            st.error(f"🔴 **{level}** | {logger_name} | {message}")
+        elif level == "WARNING":
+            st.warning(f"🟡 **{level}** | {logger_name} | {message}")
+        elif level == "INFO":
+            st.info(f"🔵 **{level}** | {logger_name} | {message}")
+        elif level == "DEBUG":
+            st.text(f"⚪ **{level}** | {logger_name} | {message}")
+        else:
+            st.text(f"📝 **{level}** | {logger_name} | {message}")
 
     if len(logs) > 100:
         st.info(f"📄 Zeige die letzten 100 von {len(logs)} Log-Einträgen")
+
+
+def _entry_level(log_entry: str) -> Optional[str]:
+    """Level eines Buffer-Eintrags; reine Strings (ohne Felder) über das ``[LEVEL]``-Format."""
+    level = getattr(log_entry, "level", None)
+    if level is not None:
+        return level
+    for candidate in ("DEBUG", "INFO", "WARNING", "ERROR"):
+        if f"[{candidate}]" in log_entry:
+            return candidate
+    return None
@@ -22,10 +22,21 @@ from typing import Any
 
 import streamlit as st
 
+from ..utils.capture_sync_index import (
+    MARKER_CAPTURE_START,
+    MARKER_CAPTURE_STOP,
+    MARKER_VIDEO_START,
+    SYNC_INDEX_FILENAME,
+    SYNC_MARKER_TOPIC,
+    SyncIndexBuilder,
+)
+from ..utils.capture_writer import BatchedLineWriter
 from ..utils.logging_config import get_logger
 from ..utils.path_constants import PROJECT_ROOT
+from ..utils.payload_decoders import decoder_for_topic
+from ..utils.payload_schema import MIN_FIELD_KEYS, collect_key_values
 from ..utils.utc_iso_timestamp import utc_iso_timestamp_ms
-from .settings_manager import SettingsManager
+from .settings_manager import SettingsManager, get_settings_manager
 
 try:
     import paho.mqtt.client as mqtt
@@ -39,9 +50,9 @@ except ImportError:
 logger = get_logger("session_manager.object_detection_capture")
 
 _SESSION_NAME_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
-_ORDER_ID_KEYS = {"orderid", "order_id", "productionorderid", "transportorderid"}
-_NFC_TAG_KEYS = {"nfctag", "nfc_tag", "nfcid", "nfc_id", "tagid", "workpieceid", "loadid"}
-_PHASE_KEYS = {"phase", "step", "orderphase", "state"}
+_ORDER_ID_KEYS = MIN_FIELD_KEYS["order_id"]
+_NFC_TAG_KEYS = MIN_FIELD_KEYS["nfc_tag"]
+_PHASE_KEYS = MIN_FIELD_KEYS["phase"]
 
 _runtime_lock = threading.Lock()
 _runtime: dict[str, Any] = {
@@ -53,6 +64,9 @@ _runtime: dict[str, Any] = {
     "manifest_path": None,
     "meta_file": None,
     "full_file": None,
+    "writer": None,
+    "sync_index": None,
+    "publish_sync_markers": False,
     "topic_filters": ["#"],
     "save_full_events": False,
     "full_events_exclusion_preset": "none",
@@ -96,6 +110,7 @@ def _get_default_settings() -> dict[str, Any]:
             "save_full_events": False,
             "full_events_exclusion_preset": FULL_EVENTS_PRESET_NONE,
             "video_filename": "video.mp4",
+            "publish_sync_markers": False,
         },
     }
 
@@ -305,17 +320,6 @@ def _full_events_allowed(topic: str, preset: str) -> bool:
     return True
 
 
-def _extract_candidate_values(node: Any, keys: set[str], out: list[str]) -> None:
-    if isinstance(node, dict):
-        for k, v in node.items():
-            if str(k).strip().lower() in keys and v not in (None, ""):
-                out.append(str(v))
-            _extract_candidate_values(v, keys, out)
-    elif isinstance(node, list):
-        for item in node:
-            _extract_candidate_values(item, keys, out)
-
-
 def _looks_like_nfc_value(value: str) -> bool:
     normalized = (value or "").strip()
     if not normalized:
@@ -328,18 +332,25 @@ def _looks_like_nfc_value(value: str) -> bool:
     return len(normalized) >= 6
 
 
-def _extract_min_fields(payload_raw: str) -> tuple[str, str, str]:
+def _extract_min_fields(payload_raw: str, topic: str = "") -> tuple[str, str, str]:
     try:
         payload = json.loads(payload_raw)
     except Exception:
         return "", "", ""
 
-    order_values: list[str] = []
-    nfc_values: list[str] = []
-    phase_values: list[str] = []
-    _extract_candidate_values(payload, _ORDER_ID_KEYS, order_values)
-    _extract_candidate_values(payload, _NFC_TAG_KEYS, nfc_values)
-    _extract_candidate_values(payload, _PHASE_KEYS, phase_values)
+    # Known topics: read the wanted keys only at their schema paths, shape-check the rest
+    # (payload_decoders.py); unknown topics or payload shapes fall back to the full recursive search.
+    decoder = decoder_for_topic(topic) if topic else None
+    decoded = decoder.decode(payload) if decoder is not None else None
+    if decoded is not None:
+        order_values, nfc_values, phase_values = decoded.order_id, decoded.nfc_tag, decoded.phase
+    else:
+        order_values = []
+        nfc_values = []
+        phase_values = []
+        collect_key_values(payload, _ORDER_ID_KEYS, order_values)
+        collect_key_values(payload, _NFC_TAG_KEYS, nfc_values)
+        collect_key_values(payload, _PHASE_KEYS, phase_values)
 
     # Preferred NFC source: DPS RGB_NFC result once the read has finished.
     # This is the operational point where the NFC tag is effectively available.
@@ -394,7 +405,8 @@ def _build_manifest(session_name: str, session_dir: Path, settings: dict[str, An
         "full_events_exclusion_preset": _normalize_full_events_preset(
             str(settings["capture"].get("full_events_exclusion_preset", FULL_EVENTS_PRESET_NONE))
         ),
-        "counts": {"meta_min_events": 0, "full_events": 0},
+        "counts": {"meta_min_events": 0, "full_events": 0, "dropped_events": 0},
+        "sync_index": SYNC_INDEX_FILENAME,
         "latest": {"order_id": "", "nfc_tag": ""},
         "notes": "MVP workflow: OBS recording remains manual.",
     }
@@ -415,59 +427,154 @@ def _od_on_connect(client, userdata, flags, rc):
 
 
 def _od_on_message(client, userdata, msg):
-    ts = utc_iso_timestamp_ms()
-    topic = str(msg.topic)
-    try:
-        payload_raw = msg.payload.decode("utf-8")
-    except Exception:
-        payload_raw = msg.payload.decode("utf-8", errors="replace")
+    # Runs on the paho thread: only enqueue. Parsing and file I/O happen in the writer thread,
+    # so a slow disk or large payloads never stall MQTT intake (full queue → counted drop).
+    writer = _runtime.get("writer")
+    if writer is None or not _runtime["active"]:
+        return
+    writer.submit(
+        (
+            utc_iso_timestamp_ms(),
+            str(msg.topic),
+            msg.payload,
+            getattr(msg, "qos", 0),
+            getattr(msg, "retain", False),
+            time.monotonic(),
+        )
+    )
 
-    with _runtime_lock:
-        if not _runtime["active"]:
-            return
 
+def _make_capture_processor(
+    session_name: str,
+    topic_filters: list[str],
+    save_full_events: bool,
+    full_events_exclusion_preset: str,
+    latest: dict[str, str],
+    capture_start_mono: float,
+):
+    """
+    Builds the writer-thread callback turning one raw message into ``(file_key, line)`` pairs.
+
+    Every line carries ``capture_s`` (monotonic receive time relative to ``capture_start_mono``),
+    the same clock the sync index buckets by; ``ts`` stays wall clock.
+    """
+
+    def process(item: tuple[str, str, bytes, int, bool, float]) -> list[tuple[str, str]]:
+        ts, topic, payload, qos, retain, received_mono = item
+        capture_s = round(received_mono - capture_start_mono, 3)
+        try:
+            payload_raw = payload.decode("utf-8")
+        except Exception:
+            payload_raw = payload.decode("utf-8", errors="replace")
+
+        lines: list[tuple[str, str]] = []
         # Optional full events log for later QA correlation (kept separate from AI feed)
-        if (
-            _runtime["save_full_events"]
-            and _runtime["full_file"] is not None
-            and _full_events_allowed(topic, str(_runtime.get("full_events_exclusion_preset", FULL_EVENTS_PRESET_NONE)))
-        ):
+        if save_full_events and _full_events_allowed(topic, full_events_exclusion_preset):
             full_entry = {
                 "topic": topic,
                 "payload": payload_raw,
                 "timestamp": ts,
-                "qos": getattr(msg, "qos", 0),
-                "retain": getattr(msg, "retain", False),
+                "capture_s": capture_s,
+                "qos": qos,
+                "retain": retain,
             }
-            _runtime["full_file"].write(json.dumps(full_entry, ensure_ascii=False) + "\n")
-            _runtime["captured_full_events"] += 1
+            lines.append(("full", json.dumps(full_entry, ensure_ascii=False) + "\n"))
 
-        if not _topic_allowed(topic, _runtime["topic_filters"]):
-            return
+        if not _topic_allowed(topic, topic_filters):
+            return lines
 
-        order_id, nfc_tag, phase = _extract_min_fields(payload_raw)
+        order_id, nfc_tag, phase = _extract_min_fields(payload_raw, topic)
         if not order_id and not nfc_tag and not phase:
-            return
+            return lines
 
         if order_id:
-            _runtime["last_order_id"] = order_id
+            latest["order_id"] = order_id
         if nfc_tag:
-            _runtime["last_nfc_tag"] = nfc_tag
+            latest["nfc_tag"] = nfc_tag
 
         meta_entry = {
             "ts": ts,
-            "sequence_id": _runtime["session_name"],
+            "capture_s": capture_s,
+            "sequence_id": session_name,
             "topic": topic,
             "order_id": order_id,
             "nfc_tag": nfc_tag,
             "phase": phase,
         }
-        if _runtime["meta_file"] is not None:
-            _runtime["meta_file"].write(json.dumps(meta_entry, ensure_ascii=False) + "\n")
-            _runtime["captured_min_events"] += 1
+        lines.append(("meta", json.dumps(meta_entry, ensure_ascii=False) + "\n"))
+        return lines
+
+    return process
+
+
+def _make_batch_counter(latest: dict[str, str]):
+    """Writer-thread hook: publish counts and latest ids to ``_runtime`` once per written batch."""
+
+    def after_batch(written: dict[str, int]) -> None:
+        with _runtime_lock:
+            _runtime["captured_min_events"] += written.get("meta", 0)
+            _runtime["captured_full_events"] += written.get("full", 0)
+            _runtime["last_order_id"] = latest["order_id"]
+            _runtime["last_nfc_tag"] = latest["nfc_tag"]
+
+    return after_batch
+
+
+def _make_sync_line_hook(sync_index: SyncIndexBuilder):
+    """Writer-thread hook: per written line, register its byte offset under the receive second."""
+
+    def on_line(key: str, item: tuple, offset: int) -> None:
+        sync_index.add_line(key, item[5], offset)
+
+    return on_line
+
+
+def _mark_sync(kind: str) -> dict[str, Any] | None:
+    """Record a sync marker in the index and optionally publish it on ``SYNC_MARKER_TOPIC``."""
+    with _runtime_lock:
+        sync_index = _runtime.get("sync_index")
+        client = _runtime.get("client") if _runtime.get("publish_sync_markers") else None
+        connected = bool(_runtime.get("connected"))
+        session_name = str(_runtime.get("session_name", ""))
+    if sync_index is None:
+        return None
+    marker = sync_index.add_marker(kind, time.monotonic(), utc_iso_timestamp_ms())
+    if client is not None and connected:
+        try:
+            client.publish(SYNC_MARKER_TOPIC, json.dumps({**marker, "sequence_id": session_name}), qos=0)
+        except Exception as exc:
+            logger.warning("⚠️ Sync-Marker konnte nicht publiziert werden: %s", exc)
+    return marker
+
+
+def _write_sync_index(sync_index: SyncIndexBuilder | None, session_dir: Any) -> None:
+    if sync_index is None or not isinstance(session_dir, Path) or not session_dir.exists():
+        return
+    try:
+        sync_index.write(session_dir / SYNC_INDEX_FILENAME)
+    except Exception as exc:
+        logger.error("Sync-Index schreiben fehlgeschlagen: %s", exc)
+
 
+def _writer_stats() -> dict[str, Any]:
+    writer = _runtime.get("writer")
+    return writer.stats() if writer is not None else {}
 
-def _close_runtime_files() -> None:
+
+def _close_runtime_files() -> bool:
+    """Drain the writer and close the capture files; ``False`` if the writer thread is still running."""
+    # Drain the writer queue first so every accepted message reaches the files.
+    writer = _runtime.get("writer")
+    if writer is not None and not writer.stop():
+        # Closing under a running writer would fail its writes mid-line: leave the files to the
+        # (daemon) writer thread and only drop our references.
+        logger.error(
+            "❌ Capture-Writer läuft noch — meta_min.jsonl/events_full.log bleiben offen, Capture evtl. unvollständig"
+        )
+        _runtime["meta_file"] = None
+        _runtime["full_file"] = None
+        _runtime["writer"] = None
+        return False
     if _runtime["meta_file"] is not None:
         try:
             _runtime["meta_file"].close()
@@ -480,6 +587,8 @@ def _close_runtime_files() -> None:
             pass
     _runtime["meta_file"] = None
     _runtime["full_file"] = None
+    _runtime["writer"] = None
+    return True
 
 
 def _disconnect_runtime_client() -> None:
@@ -595,7 +704,10 @@ def _start_capture(session_name: str, settings: dict[str, Any]) -> tuple[bool, s
     manifest = _build_manifest(session_name, session_dir, settings)
     _write_manifest(manifest_path, manifest)
 
-    meta_file = open(meta_path, "w", encoding="utf-8", buffering=1)
+    # Block-buffered: the writer thread writes batches and flushes periodically.
+    # newline="\n": no "\r\n" translation on Windows, so the sync-index byte offsets
+    # (UTF-8 length of each written line) match the file.
+    meta_file = open(meta_path, "w", encoding="utf-8", newline="\n")
     meta_file.write(
         json.dumps(
             {
@@ -616,7 +728,7 @@ def _start_capture(session_name: str, settings: dict[str, Any]) -> tuple[bool, s
         str(settings["capture"].get("full_events_exclusion_preset", FULL_EVENTS_PRESET_NONE))
     )
     if save_full_events:
-        full_file = open(full_path, "w", encoding="utf-8", buffering=1)
+        full_file = open(full_path, "w", encoding="utf-8", newline="\n")
 
     try:
         assert mqtt is not None
@@ -636,6 +748,25 @@ def _start_capture(session_name: str, settings: dict[str, Any]) -> tuple[bool, s
             full_file.close()
         return False, f"MQTT-Verbindung fehlgeschlagen: {exc}"
 
+    topic_filters = [str(t).strip() for t in settings["capture"].get("topic_filters", ["#"]) if str(t).strip()]
+    latest = {"order_id": "", "nfc_tag": ""}
+    files = {"meta": meta_file}
+    file_names = {"meta": meta_path.name}
+    if full_file is not None:
+        files["full"] = full_file
+        file_names["full"] = full_path.name
+    sync_index = SyncIndexBuilder(session_name, utc_iso_timestamp_ms(), time.monotonic(), file_names)
+    writer = BatchedLineWriter(
+        files,
+        _make_capture_processor(
+            session_name, topic_filters, save_full_events, full_events_exclusion_preset, latest, sync_index.monotonic_s
+        ),
+        after_batch=_make_batch_counter(latest),
+        on_line=_make_sync_line_hook(sync_index),
+        name="od-capture-writer",
+    )
+    writer.start()
+
     with _runtime_lock:
         _runtime.update(
             {
@@ -647,9 +778,10 @@ def _start_capture(session_name: str, settings: dict[str, Any]) -> tuple[bool, s
                 "manifest_path": manifest_path,
                 "meta_file": meta_file,
                 "full_file": full_file,
-                "topic_filters": [
-                    str(t).strip() for t in settings["capture"].get("topic_filters", ["#"]) if str(t).strip()
-                ],
+                "writer": writer,
+                "sync_index": sync_index,
+                "publish_sync_markers": bool(settings["capture"].get("publish_sync_markers", False)),
+                "topic_filters": topic_filters,
                 "save_full_events": save_full_events,
                 "full_events_exclusion_preset": full_events_exclusion_preset,
                 "captured_min_events": 0,
@@ -662,8 +794,10 @@ def _start_capture(session_name: str, settings: dict[str, Any]) -> tuple[bool, s
 
     for _ in range(30):
         with _runtime_lock:
-            if _runtime["connected"]:
-                return True, f"OD-Session gestartet: {session_dir}"
+            connected = _runtime["connected"]
+        if connected:
+            _mark_sync(MARKER_CAPTURE_START)
+            return True, f"OD-Session gestartet: {session_dir}"
         time.sleep(0.1)
 
     _stop_capture(video_filename=settings["capture"].get("video_filename", "video.mp4"), aborted=True)
@@ -678,30 +812,49 @@ def _stop_capture(video_filename: str, aborted: bool = False) -> tuple[bool, str
             return False, "Keine aktive OD-Session."
 
         manifest_path = _runtime.get("manifest_path")
+        session_dir = _runtime.get("session_dir")
+        sync_index = _runtime.get("sync_index")
         started_at = _runtime.get("started_at")
-        min_count = int(_runtime.get("captured_min_events", 0))
-        full_count = int(_runtime.get("captured_full_events", 0))
-        latest_order = str(_runtime.get("last_order_id", ""))
-        latest_nfc = str(_runtime.get("last_nfc_tag", ""))
-
         client_to_disconnect = _runtime.get("client") is not None
         files_to_close = _runtime.get("meta_file") is not None or _runtime.get("full_file") is not None
         _runtime["active"] = False
 
+    # Stop marker while the client is still connected (optional publish).
+    _mark_sync(MARKER_CAPTURE_STOP)
     # Important: disconnect/close outside lock to avoid callback deadlocks on Windows.
     if client_to_disconnect:
         _disconnect_runtime_client()
+    writer_stats = _writer_stats()
+    writer_finished = True
     if files_to_close:
-        _close_runtime_files()
+        # Drains the writer queue; counts below include every accepted message.
+        writer_finished = _close_runtime_files()
+    if writer_finished:
+        # After the drain: the offset table covers every written line.
+        _write_sync_index(sync_index, session_dir)
+    else:
+        logger.error("❌ Sync-Index nicht geschrieben — Capture-Writer schreibt noch")
+
+    with _runtime_lock:
+        min_count = int(_runtime.get("captured_min_events", 0))
+        full_count = int(_runtime.get("captured_full_events", 0))
+        latest_order = str(_runtime.get("last_order_id", ""))
+        latest_nfc = str(_runtime.get("last_nfc_tag", ""))
 
     if isinstance(manifest_path, Path) and manifest_path.exists():
         try:
             manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
             manifest["capture_ended_at"] = utc_iso_timestamp_ms()
             manifest["video_file"] = video_filename or manifest.get("video_file", "video.mp4")
-            manifest["counts"] = {"meta_min_events": min_count, "full_events": full_count}
+            manifest["counts"] = {
+                "meta_min_events": min_count,
+                "full_events": full_count,
+                "dropped_events": int(writer_stats.get("dropped", 0)),
+            }
             manifest["latest"] = {"order_id": latest_order, "nfc_tag": latest_nfc}
             manifest["status"] = "aborted" if aborted else "finished"
+            if not writer_finished:
+                manifest["writer_incomplete"] = True
             manifest["capture_started_at"] = started_at
             _write_manifest(manifest_path, manifest)
         except Exception as exc:
@@ -714,6 +867,8 @@ def _stop_capture(video_filename: str, aborted: bool = False) -> tuple[bool, str
                 "session_name": "",
                 "session_dir": None,
                 "manifest_path": None,
+                "sync_index": None,
+                "publish_sync_markers": False,
                 "topic_filters": ["#"],
                 "save_full_events": False,
                 "full_events_exclusion_preset": FULL_EVENTS_PRESET_NONE,
@@ -722,6 +877,11 @@ def _stop_capture(video_filename: str, aborted: bool = False) -> tuple[bool, str
         )
     if aborted:
         return False, "OD-Session abgebrochen."
+    if not writer_finished:
+        return False, "OD-Session gestoppt, aber der Capture-Writer läuft noch – Dateien evtl. unvollständig."
+    dropped = int(writer_stats.get("dropped", 0))
+    if dropped:
+        return True, f"OD-Session gestoppt ({min_count} minimale Events, {dropped} verworfen – Queue voll)."
     return True, f"OD-Session gestoppt ({min_count} minimale Events)."
 
 
@@ -733,7 +893,7 @@ def show_object_detection_capture():
         "**minimales MQTT-Feed (`order_id`, `nfc_tag`) mitschreiben**, Video weiter manuell via OBS."
     )
 
-    settings_manager = SettingsManager()
+    settings_manager = get_settings_manager()
     settings = _load_settings(settings_manager)
 
     if "od_session_name" not in st.session_state:
@@ -748,6 +908,8 @@ def show_object_detection_capture():
         st.session_state.od_full_events_exclusion_preset = _normalize_full_events_preset(
             str(settings["capture"].get("full_events_exclusion_preset", FULL_EVENTS_PRESET_NONE))
         )
+    if "od_publish_sync_markers" not in st.session_state:
+        st.session_state.od_publish_sync_markers = bool(settings["capture"].get("publish_sync_markers", False))
     if "od_base_directory" not in st.session_state:
         st.session_state.od_base_directory = str(settings["base_directory"])
     if "od_mqtt_host" not in st.session_state:
@@ -788,6 +950,11 @@ def show_object_detection_capture():
             value=st.session_state.od_save_full_events,
             help="Nicht fuer AI-Feed, nur fuer spaetere QA-Korrelation.",
         )
+        st.session_state.od_publish_sync_markers = st.checkbox(
+            f"Sync-Marker per MQTT publizieren (`{SYNC_MARKER_TOPIC}`)",
+            value=st.session_state.od_publish_sync_markers,
+            help="Start-/Video-Start-/Stop-Marker zusaetzlich als MQTT-Message (landen so auch in anderen Logs).",
+        )
         st.caption("Topic-Filter (ein Muster pro Zeile; MQTT Wildcards `+` und `#` erlaubt)")
         st.session_state.od_topic_filters = st.text_area(
             "Topic-Filter",
@@ -886,6 +1053,7 @@ def show_object_detection_capture():
                     st.session_state.od_full_events_exclusion_preset
                 ),
                 "video_filename": st.session_state.od_video_filename.strip() or "video.mp4",
+                "publish_sync_markers": bool(st.session_state.od_publish_sync_markers),
             },
         }
         _save_settings(settings_manager, new_settings)
@@ -906,6 +1074,7 @@ def show_object_detection_capture():
                 st.session_state.od_full_events_exclusion_preset
             ),
             "video_filename": st.session_state.od_video_filename.strip() or "video.mp4",
+            "publish_sync_markers": bool(st.session_state.od_publish_sync_markers),
         },
     }
     checks = _preflight_checks(_sanitize_session_name(st.session_state.od_session_name), effective_settings)
@@ -942,6 +1111,7 @@ def show_object_detection_capture():
         min_events = int(_runtime["captured_min_events"])
         full_events = int(_runtime["captured_full_events"])
         current_dir = _runtime["session_dir"]
+    writer_stats = _writer_stats()
 
     st.markdown("---")
     st.subheader("Status")
@@ -949,6 +1119,13 @@ def show_object_detection_capture():
     st.write(f"- MQTT verbunden: {'ja' if current_connected else 'nein'}")
     st.write(f"- Minimale OD-Events: {min_events}")
     st.write(f"- Full-Events (optional): {full_events}")
+    if writer_stats:
+        st.write(
+            f"- Writer-Queue: {writer_stats['queue_depth']} / {writer_stats['max_queue']} "
+            f"(max. {writer_stats['max_depth']}), verworfen: {writer_stats['dropped']}"
+        )
+        if writer_stats["dropped"]:
+            st.warning("Writer-Queue lief über – Messages wurden verworfen (Datenträger zu langsam?).")
     if current_dir:
         st.write(f"- Aktueller Session-Ordner: `{current_dir}`")
 
@@ -962,3 +1139,11 @@ def show_object_detection_capture():
         "Tipp: In OBS den Dateinamen/Pfad im Ausgabemodus vor Start anpassen, "
         "damit kein manuelles Umbenennen mit Timestamp noetig ist."
     )
+    if st.button("🎬 Video-Start markieren", disabled=not current_active, key="od_mark_video_start_btn"):
+        marker = _mark_sync(MARKER_VIDEO_START)
+        if marker:
+            st.success(f"Video-Start markiert (Capture-Sekunde {marker['capture_s']}).")
+    st.caption(
+        f"Im gleichen Moment wie OBS-Recording klicken: `{SYNC_INDEX_FILENAME}` bildet damit Video-Sekunden "
+        "auf Events ab (ohne Marker gilt Capture-Start = Video-Start)."
+    )
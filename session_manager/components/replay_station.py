@@ -23,9 +23,10 @@ from typing import List, Optional, Protocol, Tuple
 import streamlit as st
 
 from ..mqtt.mqtt_client import SessionManagerMQTTClient, paho_rc_name
-from ..utils.logging_config import get_logger
+from ..utils.logging_config import LogSampler, get_logger
+from ..utils.metrics_ring import MetricsRing
 from ..utils.path_constants import PROJECT_ROOT
-from ..utils.ui_refresh import RerunController
+from ..utils.ui_refresh import RerunController, run_live_fragment
 from ..utils.utc_iso_timestamp import utc_iso_timestamp_ms
 
 # Logging konfigurieren - Verzeichnis sicherstellen
@@ -38,6 +39,9 @@ logging.basicConfig(
     handlers=[logging.FileHandler(log_dir / "session_manager.log"), logging.StreamHandler()],
 )
 logger = get_logger(__name__)
+# Publish-Fehler können pro Nachricht auftreten (Backpressure, Broker weg): erste 5, dann jede 100. je rc
+_publish_failed_log = LogSampler(logger, first=5, every=100)
+_publish_exception_log = LogSampler(logger, first=5, every=100)
 
 # Replay speed options (UI). Use string labels for Streamlit widget stability
 # (float("inf") as selectbox value is unreliable across reruns).
@@ -67,6 +71,14 @@ REPLAY_ABORT_AFTER_CONSECUTIVE_FAILS = 25
 REPLAY_SPEED_OPTIONS: list[float] = [value for _, value in REPLAY_SPEED_CHOICES]
 REPLAY_SPEED_DEFAULT_INDEX = REPLAY_SPEED_LABELS.index(REPLAY_SPEED_DEFAULT_LABEL)
 
+# Live-Dashboard: Zeitreihe (1 Hz) aus ReplayController.metrics
+REPLAY_METRIC_COUNTERS = ("published", "failed", "retries")
+REPLAY_METRIC_GAUGES = ("lag_s", "in_flight")
+REPLAY_LIVE_REFRESH_S = 1.0
+
+# Session-Verzeichnis → (mtime_ns, sortierte .log-Dateien), siehe get_session_files()
+_session_files_cache: dict[Path, tuple[int, list[Path]]] = {}
+
 
 def format_replay_speed(speed: float) -> str:
     """Human label for replay speed value."""
@@ -409,6 +421,8 @@ class ReplayController:
         self._abort_reason = ""
         self._aborted = False
         self._reconnect_attempts = 0
+        # 1-Hz-Zeitreihe für das Live-Dashboard (eigener Lock, wird vom Worker-Thread gefüttert)
+        self.metrics = MetricsRing(counters=REPLAY_METRIC_COUNTERS, gauges=REPLAY_METRIC_GAUGES)
 
     def _reset_publish_stats_locked(self) -> None:
         self._pub_ok = 0
@@ -427,6 +441,7 @@ class ReplayController:
         self._abort_reason = ""
         self._aborted = False
         self._reconnect_attempts = 0
+        self.metrics.reset()
 
     # ---------- öffentlich ----------
     def load(self, items: List[Tuple[float, str, bytes, int, bool]]) -> None:
@@ -629,6 +644,9 @@ class ReplayController:
     # ---------- intern ----------
     def _record_publish_locked(self, ok: bool, waited_s: float, retries: int, rc: int) -> None:
         self._last_publish_rc = int(rc)
+        self.metrics.incr("published" if ok else "failed")
+        if retries:
+            self.metrics.incr("retries", retries)
         if ok:
             self._pub_ok += 1
             self._window_ok += 1
@@ -645,6 +663,10 @@ class ReplayController:
             self._window_started_mono = now
             self._window_ok = 0
 
+    def _mqtt_in_flight(self) -> Optional[int]:
+        in_flight = getattr(self._mqtt_client, "in_flight", None)
+        return int(in_flight()) if callable(in_flight) else None
+
     def _abort_locked(self, reason: str) -> None:
         self._aborted = True
         self._abort_reason = reason
@@ -703,7 +725,7 @@ class ReplayController:
                     topic=item.topic, payload=payload_bytes, qos=qos, retain=item.retain
                 )
             except Exception as e:
-                logger.error(f"❌ MQTT-Publish Exception: {e}")
+                _publish_exception_log.error(type(e).__name__, "❌ MQTT-Publish Exception: %s", str(e))
                 ok = False
                 last_rc = -1
             waited += time.monotonic() - t0
@@ -718,7 +740,8 @@ class ReplayController:
             self._record_publish_locked(ok, waited, retries, last_rc)
             if ok:
                 return True
-            logger.warning(
+            _publish_failed_log.warning(
+                last_rc,
                 "⚠️ MQTT-Publish fehlgeschlagen: %s (qos=%s, retries=%s, rc=%s/%s)",
                 item.topic,
                 qos,
@@ -755,16 +778,23 @@ class ReplayController:
             due = start + due_offset
             now = time.monotonic()
             if due > now:
+                self.metrics.maybe_sample()
                 time.sleep(min(0.1, due - now))
                 continue
+            # Drift: wie weit der Publish hinter dem (skalierten) Session-Zeitplan liegt
+            self.metrics.set_gauge("lag_s", None if speed == float("inf") else round(now - due, 3))
             if not self._publish_item(item, speed):
                 break
+            self.metrics.set_gauge("in_flight", self._mqtt_in_flight())
             # Index vorrücken only when we attempted this item (success or counted fail)
             with self._lock:
                 if self._aborted:
                     break
                 self._idx += 1
 
+        # Am Run-Ende melden, wie viele Fehler-Logs das Sampling unterdrückt hat
+        _publish_exception_log.flush(logging.WARNING)
+        _publish_failed_log.flush(logging.WARNING)
         with self._lock:
             if self._run_finished_mono is None:
                 self._run_finished_mono = time.monotonic()
@@ -839,9 +869,9 @@ def show_replay_station():
     st.markdown("`🗂️ Quelle -> 🛡️ Broker-Check -> 🔀 Broker -> 📥 Empfänger (OSF-UI)`")
 
     # Konfiguration aus Settings laden
-    from .settings_manager import SettingsManager
+    from .settings_manager import get_settings_manager
 
-    settings_manager = SettingsManager()
+    settings_manager = get_settings_manager()
     mqtt_settings = settings_manager.get_mqtt_broker_settings()
     session_directory = settings_manager.get_session_directory()
     replay_host = str(mqtt_settings.get("host", "")).strip() or "localhost"
@@ -1415,9 +1445,12 @@ def get_preload_test_topic_files(preload_directory: str = "data/osf-data/test_to
 
 
 def get_session_files(session_directory: str = "data/osf-data/sessions"):
-    """Session-Dateien aus konfiguriertem Verzeichnis laden - nur .log Dateien (JSON-Zeilen-Format)"""
-    logger.debug(f"🔍 get_session_files: Suche in {session_directory}")
+    """
+    Session-Dateien aus konfiguriertem Verzeichnis laden - nur .log Dateien (JSON-Zeilen-Format)
 
+    Memoisiert pro Verzeichnis: neu gelistet wird nur, wenn sich die mtime des Verzeichnisses
+    ändert (Datei angelegt/gelöscht/umbenannt) – Auto-Refresh-Reruns kosten so ein stat().
+    """
     # Moderne Paket-Struktur - State of the Art
     if not Path(session_directory).is_absolute():
         # Projekt-Root-relative Pfade für Nutz-Daten verwenden
@@ -1426,23 +1459,22 @@ def get_session_files(session_directory: str = "data/osf-data/sessions"):
     else:
         session_dir = Path(session_directory)
 
-    logger.debug(f"📁 Verzeichnis existiert: {session_dir.exists()}")
-    logger.debug(f"📁 Absoluter Pfad: {session_dir.absolute()}")
-
-    if not session_dir.exists():
+    try:
+        dir_mtime = session_dir.stat().st_mtime_ns
+    except OSError:
+        _session_files_cache.pop(session_dir, None)
         logger.warning(f"❌ Verzeichnis existiert nicht: {session_dir.absolute()}")
         return []
 
-    # Nur Log-Dateien finden (Replay Station nutzt JSON-Zeilen-Format)
-    session_files = list(session_dir.glob("*.log"))
-
-    logger.debug(f"📊 Gefundene .log Dateien: {len(session_files)}")
+    cached = _session_files_cache.get(session_dir)
+    if cached is not None and cached[0] == dir_mtime:
+        return list(cached[1])
 
-    logger.debug(f"📁 Gesamt Session-Dateien: {len(session_files)}")
-    for f in session_files:
-        logger.debug(f"  - {f.name}")
-
-    return sorted(session_files, key=lambda x: x.name)
+    # Nur Log-Dateien finden (Replay Station nutzt JSON-Zeilen-Format)
+    session_files = sorted(session_dir.glob("*.log"), key=lambda x: x.name)
+    _session_files_cache[session_dir] = (dir_mtime, session_files)
+    logger.debug(f"📊 {session_dir}: {len(session_files)} .log Dateien (neu gelistet)")
+    return list(session_files)
 
 
 def filter_sessions(session_files, regex_filter):
@@ -1716,14 +1748,39 @@ def show_replay_controls(rerun_controller: RerunController):
         loop = st.checkbox("🔄 Loop", value=False)
         session["loop"] = loop
 
-    # Fortschritt visualisieren
+    # Fortschritt, Diagnose und Live-Charts: während des Replays als Fragment (1 Hz, ohne App-Rerun)
+    running = replay_ctrl.is_running()
+
+    def _render_live() -> None:
+        _render_replay_live(replay_ctrl, was_running=running)
+
+    run_live_fragment(_render_live, REPLAY_LIVE_REFRESH_S if running else None)
+
+    # Nach Ende weiter anzeigen (kein Auto-Refresh), solange Session geladen bleibt
+    stats = replay_ctrl.get_publish_stats()
+    if not running and stats["finished"]:
+        acceptance = replay_acceptance_message(stats)
+        if stats.get("valid_for_acceptance"):
+            st.success(
+                f"🏁 Replay fertig in {stats['elapsed_active_s']}s aktiv "
+                f"(Ø {stats['avg_rate_msgs_per_s']} msg/s bei {stats['speed_label']}). "
+                f"{acceptance}"
+            )
+        else:
+            st.error(
+                f"🏁 Replay ended with publish losses — do not use for Track & Trace SOLL checks. " f"{acceptance}"
+            )
+            st.info(
+                "Tip: Check MQTT broker (localhost:1883), unique client, and Diagnose last_rc. "
+                "At ≥5x / max, QoS0 is forced — prefer 1x–2x for acceptance."
+            )
+
+
+def _render_replay_live(replay_ctrl: ReplayController, was_running: bool) -> None:
+    """Fortschritt, Diagnose-Zeile und Live-Charts aus ``replay_ctrl.metrics`` (läuft als Fragment)."""
     idx, total = replay_ctrl.progress()
-    if total > 0:
-        st.progress(idx / total)
-        st.text(f"📊 Fortschritt: {idx}/{total}")
-    else:
-        st.progress(0.0)
-        st.text("📊 Fortschritt: 0/0")
+    st.progress(idx / total if total > 0 else 0.0)
+    st.text(f"📊 Fortschritt: {idx}/{total}")
 
     stats = replay_ctrl.get_publish_stats()
     status_tag = "fertig" if stats["finished"] else "läuft"
@@ -1742,27 +1799,22 @@ def show_replay_controls(rerun_controller: RerunController):
     if stats.get("aborted") and stats.get("abort_reason"):
         st.error(f"🛑 Replay abgebrochen: {stats['abort_reason']}")
 
-    # Nach Ende weiter anzeigen (kein Auto-Refresh), solange Session geladen bleibt
-    if replay_ctrl.is_running():
-        st.caption("🔄 Auto-Refresh aktiv (alle 2s).")
-        time.sleep(2)
-        st.rerun()
-    elif stats["finished"]:
-        acceptance = replay_acceptance_message(stats)
-        if stats.get("valid_for_acceptance"):
-            st.success(
-                f"🏁 Replay fertig in {stats['elapsed_active_s']}s aktiv "
-                f"(Ø {stats['avg_rate_msgs_per_s']} msg/s bei {stats['speed_label']}). "
-                f"{acceptance}"
-            )
+    series = replay_ctrl.metrics.columns()
+    if len(series["t_s"]) >= 2:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption("Durchsatz (msg/s)")
+            st.line_chart(series, x="t_s", y=["published_per_s", "failed_per_s", "retries_per_s"], height=180)
+        with col2:
+            st.caption("Drift zum Session-Zeitplan (s) · In-Flight")
+            st.line_chart(series, x="t_s", y=["lag_s", "in_flight"], height=180)
+
+    if was_running:
+        if replay_ctrl.is_running():
+            st.caption(f"🔄 Live-Ansicht aktiv (alle {REPLAY_LIVE_REFRESH_S:g}s, ohne Seiten-Rerun).")
         else:
-            st.error(
-                f"🏁 Replay ended with publish losses — do not use for Track & Trace SOLL checks. " f"{acceptance}"
-            )
-            st.info(
-                "Tip: Check MQTT broker (localhost:1883), unique client, and Diagnose last_rc. "
-                "At ≥5x / max, QoS0 is forced — prefer 1x–2x for acceptance."
-            )
+            # Ende/Pause/Abbruch: einmal die ganze Seite aktualisieren (Status, Abnahme-Meldung)
+            st.rerun()
 
 
 def start_replay():
@@ -14,7 +14,8 @@ from typing import Any, Dict, List, Set
 
 import streamlit as st
 
-from ..utils.logging_config import get_logger
+from ..utils.logging_config import LogSampler, get_logger
+from ..utils.metrics_ring import MetricsRing
 from ..utils.path_constants import PROJECT_ROOT
 from ..utils.recording_retain_policy import (
     RETAINED_STARTUP_GRACE_SEC,
@@ -35,10 +36,15 @@ from ..utils.session_meta_line import (
     detect_ccu_version_via_runtime_image,
     extract_ccu_version_from_messages,
 )
-from ..utils.ui_refresh import RerunController
+from ..utils.ui_refresh import RerunController, run_live_fragment
 from ..utils.utc_iso_timestamp import utc_iso_timestamp_ms
 
 logger = get_logger("omf.helper_apps.session_manager.components.session_recorder")
+# Pro-Nachricht-Logs im MQTT-Callback gesampelt (Retained-Dump beim Start kann hunderte Topics umfassen)
+_retained_skip_log = LogSampler(logger, first=20, every=200)
+_stale_skip_log = LogSampler(logger, first=3, every=50)
+_received_log = LogSampler(logger, first=50, every=1000)
+_message_error_log = LogSampler(logger, first=5, every=100)
 
 # Session Manager Logging-System verwenden (wie ursprünglich)
 # logger = logging.getLogger("session_manager.session_recorder")  # Duplikat entfernt
@@ -58,6 +64,11 @@ class ThreadSafeMessageBuffer:
         with self._lock:
             return self._messages.copy()
 
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """Letzte ``n`` Nachrichten (ohne den ganzen Buffer zu kopieren)."""
+        with self._lock:
+            return self._messages[-n:] if n > 0 else []
+
     def clear(self):
         with self._lock:
             self._messages.clear()
@@ -70,6 +81,12 @@ class ThreadSafeMessageBuffer:
 # Globale Nachrichten-Sammlung (thread-sicher)
 message_buffer = ThreadSafeMessageBuffer()
 
+# Live-Dashboard: 1-Hz-Zeitreihe, gefüttert aus dem MQTT-Callback (siehe on_message_received)
+RECORDING_METRIC_COUNTERS = ("received", "recorded", "skipped", "errors")
+RECORDING_METRIC_GAUGES = ("buffered",)
+RECORDING_LIVE_REFRESH_S = 1.0
+recording_metrics = MetricsRing(counters=RECORDING_METRIC_COUNTERS, gauges=RECORDING_METRIC_GAUGES)
+
 # Flags für on_message_received (Callback läuft im MQTT-Thread – kein st.session_state)
 _recording_active = False
 # Legacy checkbox: True = also keep broker retained dump at subscribe/start.
@@ -81,6 +98,14 @@ _seen_payload_ts: Set[str] = set()
 _recording_exclusion_preset = "none"
 _recording_custom_filter_mode = "none"
 _recording_custom_filter_topics: list[str] = []
+# Topic-Katalog für den Custom-Filter: {"key": (Pfad, Verzeichnis-mtimes...), "topics": [...]}
+_known_topics_cache: Dict[str, Any] = {}
+
+
+def _flush_sampled_logs() -> None:
+    """Unterdrückte Callback-Logs melden; Sampling beginnt pro Aufnahme neu."""
+    for sampler in (_retained_skip_log, _stale_skip_log, _received_log, _message_error_log):
+        sampler.flush()
 
 
 def _mark_recording_retain_grace_start() -> None:
@@ -170,17 +195,32 @@ def _mqtt_single_instance_preflight(host: str, port: int) -> tuple[bool, str]:
     return True, ""
 
 
+def _dir_mtime_ns(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
 def _collect_known_topics(settings_manager) -> list[str]:
     """
     Build a topic catalog for custom filter selection.
     Sources: existing session logs, test topic files, and preload topic files.
+    Memoised on the directory mtimes (files added/removed), so reruns do not re-read the logs.
     """
-    known: set[str] = set()
-
     session_dir = settings_manager.get_session_recorder_directory()
     session_path = Path(session_dir)
     if not session_path.is_absolute():
         session_path = PROJECT_ROOT / session_dir
+    topic_dirs = (
+        PROJECT_ROOT / "data/osf-data/test_topics",
+        PROJECT_ROOT / "data/osf-data/test_topics/preloads",
+    )
+    cache_key = (session_path, *(_dir_mtime_ns(path) for path in (session_path, *topic_dirs)))
+    if _known_topics_cache.get("key") == cache_key:
+        return list(_known_topics_cache["topics"])
+
+    known: set[str] = set()
     if session_path.exists():
         for log_file in sorted(session_path.glob("*.log"), reverse=True)[:30]:
             try:
@@ -201,10 +241,7 @@ def _collect_known_topics(settings_manager) -> list[str]:
             except Exception:
                 continue
 
-    for base_dir in (
-        PROJECT_ROOT / "data/osf-data/test_topics",
-        PROJECT_ROOT / "data/osf-data/test_topics/preloads",
-    ):
+    for base_dir in topic_dirs:
         if not base_dir.exists():
             continue
         for topic_file in sorted(base_dir.glob("*.json")):
@@ -217,7 +254,9 @@ def _collect_known_topics(settings_manager) -> list[str]:
             except Exception:
                 continue
 
-    return sorted(known)
+    topics = sorted(known)
+    _known_topics_cache.update(key=cache_key, topics=topics)
+    return list(topics)
 
 
 def show_session_recorder():
@@ -233,9 +272,9 @@ def show_session_recorder():
     st.markdown("`📡 Quelle -> 🛡️ Broker-Check -> 🎙️ Recorder -> 📁 Session-Log-Verzeichnis`")
 
     # Konfiguration aus Settings laden
-    from .settings_manager import SettingsManager
+    from .settings_manager import get_settings_manager
 
-    settings_manager = SettingsManager()
+    settings_manager = get_settings_manager()
     mqtt_settings = settings_manager.get_session_recorder_mqtt_settings()
     recorder_host = str(mqtt_settings.get("host", "")).strip() or "localhost"
     recorder_is_local = _is_local_mqtt_host(recorder_host)
@@ -534,35 +573,46 @@ def show_session_recorder():
         st.markdown("---")
         st.subheader("📊 Aufnahme-Status")
 
-        col1, col2, col3 = st.columns(3)
+        start_time = st.session_state.session_recorder["start_time"]
+        run_live_fragment(lambda: _render_recording_live(start_time), RECORDING_LIVE_REFRESH_S, fallback_sleep_s=10.0)
 
-        with col1:
-            message_count = message_buffer.count()
-            st.metric("Nachrichten", message_count, delta=None)
 
-        with col2:
-            if st.session_state.session_recorder["start_time"]:
-                duration = datetime.now() - st.session_state.session_recorder["start_time"]
-                minutes, seconds = divmod(duration.seconds, 60)
-                duration_str = f"{minutes:02d}:{seconds:02d}" if minutes > 0 else f"{seconds}s"
-                st.metric("Dauer", duration_str)
+def _render_recording_live(start_time: datetime | None) -> None:
+    """Zähler, Live-Charts aus ``recording_metrics`` und letzte Nachrichten (läuft als Fragment)."""
+    col1, col2, col3 = st.columns(3)
 
-        with col3:
-            st.metric("Status", "🔴 Aufnahme läuft")
+    with col1:
+        message_count = message_buffer.count()
+        st.metric("Nachrichten", message_count, delta=None)
+
+    with col2:
+        if start_time:
+            duration = datetime.now() - start_time
+            minutes, seconds = divmod(duration.seconds, 60)
+            duration_str = f"{minutes:02d}:{seconds:02d}" if minutes > 0 else f"{seconds}s"
+            st.metric("Dauer", duration_str)
+
+    with col3:
+        st.metric("Status", "🔴 Aufnahme läuft")
+
+    series = recording_metrics.columns()
+    if len(series["t_s"]) >= 2:
+        st.caption("Nachrichten/s (empfangen · aufgezeichnet · verworfen · Fehler)")
+        st.line_chart(
+            series, x="t_s", y=["received_per_s", "recorded_per_s", "skipped_per_s", "errors_per_s"], height=180
+        )
 
-        # Letzte Nachrichten anzeigen (große Payloads nur als Meta — kein base64-Spam in der UI)
-        messages = message_buffer.get_messages()
-        if messages:
-            st.markdown("**Letzte Nachrichten:**")
-            for msg in messages[-5:]:
-                payload = msg.get("payload") or ""
-                plen = len(payload) if isinstance(payload, str) else 0
-                preview = payload[:80].replace("\n", " ") if plen <= 200 else f"<{plen} bytes>"
-                st.code(f"{msg['topic']}: {preview}")
+    # Letzte Nachrichten anzeigen (große Payloads nur als Meta — kein base64-Spam in der UI)
+    messages = message_buffer.tail(5)
+    if messages:
+        st.markdown("**Letzte Nachrichten:**")
+        for msg in messages:
+            payload = msg.get("payload") or ""
+            plen = len(payload) if isinstance(payload, str) else 0
+            preview = payload[:80].replace("\n", " ") if plen <= 200 else f"<{plen} bytes>"
+            st.code(f"{msg['topic']}: {preview}")
 
-        st.caption("🔄 Auto-Refresh aktiv (alle 10s).")
-        time.sleep(10)
-        st.rerun()
+    st.caption(f"🔄 Live-Ansicht aktiv (alle {RECORDING_LIVE_REFRESH_S:g}s, ohne Seiten-Rerun).")
 
 
 def connect_to_broker(mqtt_settings: Dict[str, Any]) -> bool:
@@ -648,15 +698,17 @@ def start_recording(mqtt_settings=None, rerun_controller=None) -> bool:
 
         # Buffer immer leeren – nur neue Messages ab jetzt
         message_buffer.clear()
+        recording_metrics.reset()
+        _flush_sampled_logs()
 
         # Flags für Callback setzen (läuft im MQTT-Thread)
         _recording_active = True
         _include_retained = st.session_state.session_recorder.get("include_retained", False)
         _mark_recording_retain_grace_start()
         _reset_recording_session_filters(clear_seen=True)
-        from .settings_manager import SettingsManager
+        from .settings_manager import get_settings_manager
 
-        settings_manager = SettingsManager()
+        settings_manager = get_settings_manager()
         _recording_exclusion_preset = settings_manager.get_session_recorder_recording_exclusion_preset()
         _recording_custom_filter_mode = settings_manager.get_session_recorder_custom_filter_mode()
         _recording_custom_filter_topics = settings_manager.get_session_recorder_custom_filter_topics()
@@ -733,6 +785,7 @@ def stop_recording() -> bool:
     stopped_ok = True
     try:
         logger.info("⏹️ Session-Aufnahme wird gestoppt...")
+        _flush_sampled_logs()
 
         # Unsubscribe separat: Broker-Fehler darf Speichern + UI-Reset nicht verhindern
         if st.session_state.session_recorder["mqtt_client"]:
@@ -780,6 +833,7 @@ def on_message_received(client, userdata, msg):
     try:
         if not _recording_active:
             return
+        recording_metrics.incr("received")
         is_retain = getattr(msg, "retain", False)
         if should_skip_retained_message(
             is_retain,
@@ -787,11 +841,13 @@ def on_message_received(client, userdata, msg):
             include_startup_retained=_include_retained,
             topic=msg.topic,
         ):
-            logger.info(
+            _retained_skip_log.info(
+                "retained_grace",
                 "⏭️ Retained Dump übersprungen (Grace): %s (%s bytes)",
                 msg.topic,
                 len(msg.payload) if msg.payload is not None else 0,
             )
+            recording_metrics.incr("skipped")
             return
         if not should_write_message_to_session_log(
             msg.topic,
@@ -799,6 +855,7 @@ def on_message_received(client, userdata, msg):
             custom_filter_mode=_recording_custom_filter_mode,
             custom_filter_topics=_recording_custom_filter_topics,
         ):
+            recording_metrics.incr("skipped")
             return
 
         payload_text = msg.payload.decode("utf-8")
@@ -808,11 +865,13 @@ def on_message_received(client, userdata, msg):
             recording_started_at_utc=_recording_started_at_utc,
             seen_payload_ts=_seen_payload_ts,
         ):
-            logger.info(
+            _stale_skip_log.info(
+                msg.topic,
                 "⏭️ quality/aiqs übersprungen (stale ts oder Duplikat): %s (%s bytes)",
                 msg.topic,
                 len(payload_text),
             )
+            recording_metrics.incr("skipped")
             return
 
         message = {
@@ -823,10 +882,13 @@ def on_message_received(client, userdata, msg):
             "retain": is_retain,
         }
         message_buffer.add_message(message)
-        logger.debug(f"📨 Nachricht empfangen: {msg.topic} ({len(msg.payload)} bytes)")
+        recording_metrics.incr("recorded")
+        recording_metrics.set_gauge("buffered", message_buffer.count())
+        _received_log.debug("received", "📨 Nachricht empfangen: %s (%s bytes)", msg.topic, len(msg.payload))
 
     except Exception as e:
-        logger.error(f"❌ Nachricht Verarbeitung Fehler: {e}")
+        recording_metrics.incr("errors")
+        _message_error_log.error(type(e).__name__, "❌ Nachricht Verarbeitung Fehler: %s", str(e))
 
 
 def save_session():
@@ -834,9 +896,9 @@ def save_session():
     try:
         logger.info("💾 Session-Datei wird erstellt...")
 
-        from .settings_manager import SettingsManager
+        from .settings_manager import get_settings_manager
 
-        settings_manager = SettingsManager()
+        settings_manager = get_settings_manager()
         session_directory = settings_manager.get_session_recorder_directory()
         # recording_settings = settings_manager.get_setting("session_recorder", "recording", {})  # Unused for now
 
@@ -4,30 +4,49 @@ Zentrale Verwaltung aller Einstellungen für die verschiedenen Tabs
 """
 
 import json
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 from ..utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+DEFAULT_SETTINGS_FILE = "session_manager_settings.json"
+
+_instances: Dict[Path, "SettingsManager"] = {}
+_instances_lock = threading.Lock()
+
+
+def _resolve_settings_path(settings_file: str) -> Path:
+    # Moderne Paket-Struktur - State of the Art
+    if not Path(settings_file).is_absolute():
+        # Paket-relative Pfade verwenden
+        package_dir = Path(__file__).parent.parent
+        return package_dir / settings_file
+    return Path(settings_file)
+
 
 class SettingsManager:
     """Zentrale Verwaltung aller Session Manager Einstellungen"""
 
-    def __init__(self, settings_file: str = "session_manager_settings.json"):
-        # Moderne Paket-Struktur - State of the Art
-        if not Path(settings_file).is_absolute():
-            # Paket-relative Pfade verwenden
-            package_dir = Path(__file__).parent.parent
-            self.settings_file = package_dir / settings_file
-        else:
-            self.settings_file = Path(settings_file)
+    def __init__(self, settings_file: str = DEFAULT_SETTINGS_FILE):
+        self.settings_file = _resolve_settings_path(settings_file)
+        self._file_stamp: Optional[Tuple[int, int]] = None
         self.settings = self._load_settings()
 
+    def _stat_file(self) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) der Settings-Datei oder None, wenn sie fehlt"""
+        try:
+            stat = self.settings_file.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     def _load_settings(self) -> Dict[str, Any]:
         """Lädt die Einstellungen aus der JSON-Datei"""
         logger.debug("Lade Einstellungen aus: %s", self.settings_file)
+        self._file_stamp = self._stat_file()
         if self.settings_file.exists():
             try:
                 with open(self.settings_file, encoding="utf-8") as f:
@@ -43,6 +62,13 @@ class SettingsManager:
         self.settings = self._load_settings()
         return self.settings
 
+    def refresh_if_changed(self) -> bool:
+        """Lädt nur neu, wenn sich die Datei seit dem letzten Laden/Speichern geändert hat (ein stat())."""
+        if self._stat_file() == self._file_stamp:
+            return False
+        self.reload_settings()
+        return True
+
     def _get_default_settings(self) -> Dict[str, Any]:
         """Gibt die Standard-Einstellungen zurück"""
         return {
@@ -72,6 +98,7 @@ class SettingsManager:
         try:
             with open(self.settings_file, "w", encoding="utf-8") as f:
                 json.dump(self.settings, f, indent=2, ensure_ascii=False)
+            self._file_stamp = self._stat_file()
             logger.debug("Einstellungen gespeichert: %s", self.settings_file)
         except (OSError, TypeError, ValueError) as e:
             logger.error("Fehler beim Speichern der Einstellungen: %s", e)
@@ -210,3 +237,20 @@ class SettingsManager:
         """Setzt alle Einstellungen auf Standard zurück"""
         self.settings = self._get_default_settings()
         self.save_settings()
+
+
+def get_settings_manager(settings_file: str = DEFAULT_SETTINGS_FILE) -> SettingsManager:
+    """
+    Prozessweit geteilter SettingsManager pro Datei.
+
+    Streamlit-Reruns lesen das JSON so nicht bei jedem Durchlauf neu von der Platte; Änderungen
+    an der Datei (Editor, andere Prozesse) werden über mtime/Größe erkannt und nachgeladen.
+    """
+    path = _resolve_settings_path(settings_file)
+    with _instances_lock:
+        manager = _instances.get(path)
+        if manager is None:
+            manager = _instances[path] = SettingsManager(str(path))
+            return manager
+    manager.refresh_if_changed()
+    return manager
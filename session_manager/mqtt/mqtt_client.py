@@ -84,6 +84,9 @@ class SessionManagerMQTTClient:
         self._lock = threading.RLock()
         self._client: Any = None
         self._message_callbacks: list[Callable[[MQTTMessage], None]] = []
+        # Publishes an paho übergeben vs. von on_publish bestätigt (QoS0: gesendet, QoS1: PUBACK)
+        self._published_count = 0
+        self._completed_count = 0
 
     def connect(self) -> bool:
         """
@@ -108,6 +111,9 @@ class SessionManagerMQTTClient:
                 self._client.on_connect = self._on_connect
                 self._client.on_disconnect = self._on_disconnect
                 self._client.on_message = self._on_message
+                self._client.on_publish = self._on_publish
+                self._published_count = 0
+                self._completed_count = 0
                 # High-speed replay: avoid QoS1 inflight / outbound queue stalls
                 try:
                     self._client.max_inflight_messages_set(2000)
@@ -188,7 +194,10 @@ class SessionManagerMQTTClient:
             if mqtt is None:
                 return False, -1
             result = self._client.publish(topic, payload, qos, retain)
-            return result.rc == mqtt.MQTT_ERR_SUCCESS, int(result.rc)
+            ok = result.rc == mqtt.MQTT_ERR_SUCCESS
+            if ok:
+                self._published_count += 1
+            return ok, int(result.rc)
         except Exception:
             return False, -1
 
@@ -238,6 +247,14 @@ class SessionManagerMQTTClient:
         self.last_disconnect_rc = int(rc)
         self.connected = False
 
+    def _on_publish(self, client, userdata, mid):
+        """MQTT on_publish Callback (Netzwerk-Thread)"""
+        self._completed_count += 1
+
+    def in_flight(self) -> int:
+        """Publishes, die paho angenommen, aber noch nicht gesendet/bestätigt hat."""
+        return max(0, self._published_count - self._completed_count)
+
     def _on_message(self, client, userdata, msg):
         """MQTT on_message Callback"""
         message = MQTTMessage(topic=msg.topic, payload=msg.payload, qos=msg.qos, retain=msg.retain)
@@ -0,0 +1,116 @@
+"""Tests für die Label-Extraktion aus Object-Detection-Captures."""
+
+import csv
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from session_manager.utils.capture_labels import (
+    PresenceTracker,
+    color_hints,
+    extract_labels,
+    station_for_topic,
+)
+
+DPS = "module/v1/ff/NodeRed/SVR4H73275/state"
+AIQS = "module/v1/ff/SVR4H76530/state"
+FTS = "fts/v1/ff/5iO4/state"
+
+
+def _ts(second: int) -> str:
+    return f"2026-01-01T00:{second // 60:02d}:{second % 60:02d}.000Z"
+
+
+class TestPresenceTracker(unittest.TestCase):
+    def setUp(self):
+        self.closed = []
+        self.tracker = PresenceTracker(self.closed.append, max_gap_s=30)
+
+    def _spans(self):
+        return [(i.station, i.nfc_tag, i.start_ts, i.end_ts) for i in self.closed]
+
+    def test_station_change_closes_interval(self):
+        self.tracker.observe(_ts(0), "DPS", "wp-1", "order-1", "RUNNING")
+        self.tracker.observe(_ts(5), "DPS", "wp-1", "", "FINISHED")
+        self.tracker.observe(_ts(8), "FTS", "wp-1")
+        self.tracker.close_all()
+        self.assertEqual(self._spans(), [("DPS", "wp-1", _ts(0), _ts(5)), ("FTS", "wp-1", _ts(8), _ts(8))])
+        self.assertEqual(self.closed[0].order_id, "order-1")
+        self.assertEqual(self.closed[0].last_phase, "FINISHED")
+
+    def test_module_holds_one_workpiece_and_fts_empty_state(self):
+        self.tracker.observe(_ts(0), "AIQS", "wp-1")
+        self.tracker.observe(_ts(2), "AIQS", "wp-2")
+        self.tracker.observe(_ts(3), "FTS", "wp-3")
+        self.tracker.observe(_ts(4), "FTS", "")
+        self.assertEqual(self._spans(), [("AIQS", "wp-1", _ts(0), _ts(0)), ("FTS", "wp-3", _ts(3), _ts(3))])
+        # Modul-State ohne NFC verlängert das Intervall des aktuellen Werkstücks
+        self.tracker.observe(_ts(6), "AIQS", "", "order-2", "RUNNING")
+        self.tracker.close_all()
+        self.assertEqual(self._spans()[-1], ("AIQS", "wp-2", _ts(2), _ts(6)))
+
+    def test_gap_expires_interval(self):
+        self.tracker.observe(_ts(0), "DPS", "wp-1")
+        self.tracker.observe(_ts(100), "AIQS", "wp-2")
+        self.assertEqual(self._spans(), [("DPS", "wp-1", _ts(0), _ts(0))])
+        self.assertEqual(self.tracker.open_count, 1)
+
+
+class TestCaptureLabels(unittest.TestCase):
+    def test_station_for_topic(self):
+        self.assertEqual(station_for_topic(DPS), "DPS")
+        self.assertEqual(station_for_topic(FTS), "FTS")
+        self.assertIsNone(station_for_topic("fts/v1/ff/5iO4/order"))
+        self.assertIsNone(station_for_topic("module/v1/ff/SVR3QA0022/state"))
+
+    def test_color_hints(self):
+        dps = {
+            "actionState": {"command": "RGB_NFC", "state": "FINISHED", "result": "wp-1", "metadata": {"type": "white"}}
+        }
+        fts = {"load": [{"loadId": "wp-2", "loadType": "RED"}, {"loadId": None, "loadType": None}]}
+        self.assertEqual(color_hints(dps), [("wp-1", "WHITE")])
+        self.assertEqual(color_hints(fts), [("wp-2", "RED")])
+        self.assertEqual(color_hints([]), [])
+
+    def test_extract_labels_from_session_dir(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = Path(tmp)
+            meta = [
+                {"kind": "meta_header"},
+                {"ts": _ts(10), "topic": DPS, "order_id": "0", "nfc_tag": "wp-1", "phase": "FINISHED"},
+                {"ts": _ts(12), "topic": "fts/v1/ff/5iO4/order", "order_id": "o-1", "nfc_tag": "wp-1", "phase": ""},
+                {"ts": _ts(20), "topic": FTS, "order_id": "o-1", "nfc_tag": "wp-1", "phase": "RUNNING"},
+                {"ts": _ts(30), "topic": AIQS, "order_id": "o-1", "nfc_tag": "wp-1", "phase": "FINISHED"},
+            ]
+            full = {
+                "topic": DPS,
+                "timestamp": _ts(10),
+                "payload": json.dumps(
+                    {
+                        "actionState": {
+                            "command": "RGB_NFC",
+                            "state": "FINISHED",
+                            "result": "wp-1",
+                            "metadata": {"type": "BLUE"},
+                        }
+                    }
+                ),
+            }
+            (session_dir / "meta_min.jsonl").write_text("".join(json.dumps(m) + "\n" for m in meta), encoding="utf-8")
+            (session_dir / "events_full.log").write_text(json.dumps(full) + "\n", encoding="utf-8")
+            (session_dir / "manifest.json").write_text(json.dumps({"capture_started_at": _ts(5)}), encoding="utf-8")
+
+            summary = extract_labels(session_dir)
+            self.assertEqual(summary["rows"], 3)
+            with (session_dir / "labels.csv").open(encoding="utf-8") as handle:
+                rows = list(csv.DictReader(handle))
+        self.assertEqual([row["station"] for row in rows], ["DPS", "FTS", "AIQS"])
+        self.assertEqual({row["color"] for row in rows}, {"BLUE"})
+        self.assertEqual(rows[0]["start_video_s"], "5.000")
+        self.assertEqual(rows[0]["order_id"], "")
+        self.assertEqual(rows[2]["order_id"], "o-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Tests für den Zeit-Sync-Index (Video-Sekunde ↔ Capture-Events)."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from session_manager.utils.capture_sync_index import (
+    MARKER_VIDEO_START,
+    SYNC_INDEX_FILENAME,
+    SyncIndex,
+    SyncIndexBuilder,
+    iso_to_epoch_ms,
+)
+from session_manager.utils.capture_writer import BatchedLineWriter
+
+START_MONO = 1000.0
+
+
+def _ts(second: float) -> str:
+    return f"2026-01-01T00:00:{second:06.3f}Z"
+
+
+class TestSyncIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.session_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _capture(self, seconds, video_start_s=None, clock_offset_s=None):
+        """
+        Schreibt pro Capture-Sekunde ein Event über den Writer und liefert den geladenen Index.
+
+        Mit ``clock_offset_s`` tragen die Zeilen ``capture_s`` und einen um den Offset verschobenen
+        Wall-Clock-``ts`` (Uhrensprung während der Aufnahme); sonst nur ``ts`` (ältere Captures).
+        """
+
+        def process(item):
+            second, mono = item
+            if clock_offset_s is None:
+                return [("meta", json.dumps({"ts": _ts(second), "phase": "ä"}) + "\n")]
+            entry = {"ts": _ts(second + clock_offset_s), "capture_s": round(mono - START_MONO, 3), "phase": "ä"}
+            return [("meta", json.dumps(entry) + "\n")]
+
+        builder = SyncIndexBuilder("seq-1", _ts(0), START_MONO, {"meta": "meta_min.jsonl"})
+        with (self.session_dir / "meta_min.jsonl").open("w", encoding="utf-8") as meta:
+            meta.write('{"kind": "meta_header", "note": "äöü"}\n')
+            writer = BatchedLineWriter(
+                {"meta": meta},
+                process,
+                on_line=lambda key, item, offset: builder.add_line(key, item[1], offset),
+                batch_size=3,
+                flush_interval_s=60,
+            )
+            writer.start()
+            for second in seconds:
+                writer.submit((second, START_MONO + second))
+            writer.stop()
+        if video_start_s is not None:
+            builder.add_marker(MARKER_VIDEO_START, START_MONO + video_start_s, _ts(video_start_s))
+        builder.write(self.session_dir / SYNC_INDEX_FILENAME)
+        return SyncIndex.load(self.session_dir)
+
+    def test_offset_table_is_sparse_per_second(self):
+        index = self._capture([0.1, 0.5, 2.2, 2.3, 2.9, 7.0])
+        table = index.files["meta"]
+        self.assertEqual(table["second"], [0, 2, 7])
+        self.assertEqual(table["count"], [2, 3, 1])
+        raw = (self.session_dir / "meta_min.jsonl").read_bytes()
+        for offset in table["offset"]:
+            self.assertTrue(raw[offset:].startswith(b'{"ts"'))
+
+    def test_video_window_maps_to_events(self):
+        index = self._capture([0.5, 1.5, 3.2, 4.8, 5.1, 9.0], video_start_s=3.0)
+        self.assertEqual(index.video_start_s, 3.0)
+        events = index.events_for_video(0, 2)
+        self.assertEqual([e["ts"] for e in events], [_ts(3.2), _ts(4.8)])
+        self.assertEqual(events[0]["video_s"], 0.2)
+        self.assertEqual(index.events_for_video(10, 20), [])
+
+    def test_video_window_uses_capture_second_not_wall_clock(self):
+        index = self._capture([0.5, 1.5, 3.2, 4.8, 5.1, 9.0], video_start_s=3.0, clock_offset_s=2.5)
+        events = index.events_for_video(0, 2)
+        self.assertEqual([e["capture_s"] for e in events], [3.2, 4.8])
+        self.assertEqual(events[0]["video_s"], 0.2)
+
+    def test_timestamp_maps_to_video_second(self):
+        index = self._capture([1.0], video_start_s=2.5)
+        self.assertEqual(index.video_s_for_timestamp(_ts(4.0)), 1.5)
+        self.assertIsNone(index.video_s_for_timestamp("kein-timestamp"))
+
+    def test_byte_range_reads_only_window(self):
+        index = self._capture([0.1, 1.1, 2.1, 3.1])
+        start, end, count = index.byte_range("meta", 1, 3)
+        self.assertEqual(count, 2)
+        self.assertEqual(index.files["meta"]["offset"][1], start)
+        self.assertEqual(index.files["meta"]["offset"][3], end)
+        self.assertEqual(len(list(index.iter_lines("meta", 1, 3))), 2)
+
+    def test_iso_to_epoch_ms(self):
+        self.assertEqual(iso_to_epoch_ms("1970-01-01T00:00:01.250Z"), 1250)
+        self.assertIsNone(iso_to_epoch_ms(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
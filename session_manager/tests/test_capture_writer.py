@@ -0,0 +1,106 @@
+"""Tests für den entkoppelten Capture-Writer (Queue, Batches, Drop-Zähler)."""
+
+import io
+import json
+import threading
+import unittest
+
+from session_manager.components.object_detection_capture import _make_capture_processor
+from session_manager.utils.capture_writer import BatchedLineWriter
+
+
+class TestBatchedLineWriter(unittest.TestCase):
+    def test_writes_all_items_on_stop(self):
+        meta = io.StringIO()
+        batches = []
+        writer = BatchedLineWriter(
+            {"meta": meta},
+            lambda item: [("meta", f"{item}\n")],
+            after_batch=batches.append,
+            batch_size=10,
+            flush_interval_s=60,
+        )
+        writer.start()
+        for i in range(25):
+            self.assertTrue(writer.submit(i))
+        self.assertTrue(writer.stop())
+        self.assertEqual(meta.getvalue().splitlines(), [str(i) for i in range(25)])
+        self.assertEqual(sum(b["meta"] for b in batches), 25)
+        stats = writer.stats()
+        self.assertEqual(stats["processed"], 25)
+        self.assertEqual(stats["lines"], {"meta": 25})
+        self.assertEqual(stats["dropped"], 0)
+
+    def test_full_queue_drops_without_blocking(self):
+        release = threading.Event()
+
+        def slow(item):
+            release.wait(5)
+            return [("meta", f"{item}\n")]
+
+        meta = io.StringIO()
+        writer = BatchedLineWriter({"meta": meta}, slow, max_queue=3, batch_size=1, flush_interval_s=60)
+        writer.start()
+        accepted = [writer.submit(i) for i in range(20)]
+        self.assertGreater(writer.stats()["dropped"], 0)
+        self.assertEqual(accepted.count(False), writer.stats()["dropped"])
+        release.set()
+        writer.stop()
+        self.assertEqual(len(meta.getvalue().splitlines()), accepted.count(True))
+
+    def test_stop_reports_writer_still_running(self):
+        release = threading.Event()
+
+        def blocked(item):
+            release.wait(5)
+            return [("meta", f"{item}\n")]
+
+        meta = io.StringIO()
+        writer = BatchedLineWriter({"meta": meta}, blocked, flush_interval_s=60)
+        writer.start()
+        writer.submit(0)
+        self.assertFalse(writer.stop(timeout=0.05))
+        release.set()
+        self.assertTrue(writer.stop())
+        self.assertEqual(meta.getvalue().splitlines(), ["0"])
+
+    def test_process_errors_are_counted(self):
+        meta = io.StringIO()
+
+        def process(item):
+            if item == 1:
+                raise ValueError("boom")
+            return [("meta", f"{item}\n")]
+
+        writer = BatchedLineWriter({"meta": meta}, process, flush_interval_s=60)
+        writer.start()
+        for i in range(3):
+            writer.submit(i)
+        writer.stop()
+        self.assertEqual(meta.getvalue().splitlines(), ["0", "2"])
+        self.assertEqual(writer.stats()["errors"], 1)
+
+
+class TestCaptureProcessor(unittest.TestCase):
+    def test_meta_and_full_lines(self):
+        latest = {"order_id": "", "nfc_tag": ""}
+        process = _make_capture_processor("seq-1", ["module/#"], True, "none", latest, 100.0)
+        payload = json.dumps({"orderId": "order-1", "actionState": {"state": "RUNNING"}}).encode()
+
+        lines = process(("2026-01-01T00:00:00.000Z", "module/v1/ff/SVR3QA0022/state", payload, 1, False, 102.5))
+        keys = [key for key, _line in lines]
+        self.assertEqual(keys, ["full", "meta"])
+        meta = json.loads(lines[1][1])
+        self.assertEqual(meta["order_id"], "order-1")
+        self.assertEqual(meta["capture_s"], 2.5)
+        self.assertEqual(json.loads(lines[0][1])["capture_s"], 2.5)
+        self.assertEqual(meta["phase"], "RUNNING")
+        self.assertEqual(latest["order_id"], "order-1")
+
+        # Topic-Filter greift nur für den minimalen Feed
+        lines = process(("2026-01-01T00:00:01.000Z", "ccu/order/active", b"[]", 0, False, 1.0))
+        self.assertEqual([key for key, _line in lines], ["full"])
+
+
+if __name__ == "__main__":
+    unittest.main()
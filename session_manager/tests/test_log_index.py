@@ -0,0 +1,148 @@
+"""
+Tests für den Zeit-/Level-Index der rotierten JSON-Logs
+
+Testet:
+- IndexedRotatingFileHandler: Index-Dateien werden beim Rotieren geschrieben und mitverschoben
+- query_logs: Filter nach Zeit, Level, Logger-Präfix, Regex über alle Rotationen; Block-Vorauswahl
+- follow_logs: neue Zeilen und Wechsel auf die neue Datei nach einer Rotation
+"""
+
+import json
+import logging
+import time
+
+from session_manager.utils import log_index
+from session_manager.utils.log_index import (
+    IndexedRotatingFileHandler,
+    LogFilter,
+    build_index,
+    follow_logs,
+    index_path,
+    query_logs,
+    rotated_files,
+)
+from session_manager.utils.logging_config import JsonLineFormatter
+
+
+def _record(name, level, msg, created):
+    record = logging.LogRecord(name, level, __file__, 1, msg, (), None)
+    record.created = created
+    record.msecs = 0.0
+    return record
+
+
+def _handler(log_file, max_bytes=2000, block_bytes=256):
+    handler = IndexedRotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=3, encoding="utf-8", block_bytes=block_bytes
+    )
+    handler.setFormatter(JsonLineFormatter("session_manager"))
+    return handler
+
+
+def _write_history(log_file, count=60, start=1_700_000_000.0):
+    handler = _handler(log_file)
+    for i in range(count):
+        level = logging.ERROR if i % 20 == 7 else logging.INFO
+        name = "sm.replay" if i % 2 else "sm.recorder.buffer"
+        handler.emit(_record(name, level, f"Meldung {i:03d}", start + i))
+    handler.close()
+    return start
+
+
+def test_handler_rotates_and_writes_matching_indexes(tmp_path) -> None:
+    log_file = tmp_path / "session_manager.jsonl"
+    _write_history(log_file)
+
+    files = rotated_files(log_file)
+    assert [f.name for f in files] == [
+        "session_manager.jsonl.3",
+        "session_manager.jsonl.2",
+        "session_manager.jsonl.1",
+        "session_manager.jsonl",
+    ]
+    for path in files[:-1]:
+        stored = json.loads(index_path(path).read_text(encoding="utf-8"))
+        # Beim Schreiben gesammelter Index == Index aus einem Scan der Datei (bis auf ms-Rundung)
+        scanned = build_index(path, block_bytes=256)
+        assert stored["size"] == path.stat().st_size
+        assert [b["offset"] for b in stored["blocks"]] == [b["offset"] for b in scanned["blocks"]]
+        assert stored["records"] == scanned["records"]
+        assert stored["loggers"] == scanned["loggers"]
+    assert not index_path(log_file).exists()
+
+    lines = [json.loads(line)["msg"] for path in files for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines == sorted(lines)
+    assert lines[-1] == "Meldung 059"
+
+
+def test_query_filters_across_rotations(tmp_path) -> None:
+    log_file = tmp_path / "session_manager.jsonl"
+    start = _write_history(log_file)
+    oldest = int(json.loads(rotated_files(log_file)[0].read_text(encoding="utf-8").splitlines()[0])["msg"][-3:])
+
+    errors = [record["msg"] for _, record in query_logs(log_file, LogFilter(min_level=logging.ERROR))]
+    assert errors == [f"Meldung {i:03d}" for i in (7, 27, 47) if i >= oldest]
+
+    window = LogFilter(since=start + 40, until=start + 44, logger_prefix="sm.replay")
+    assert [record["msg"] for _, record in query_logs(log_file, window)] == ["Meldung 041", "Meldung 043"]
+
+    # Präfix nur an Punkt-Grenzen; Regex auf die Meldung
+    assert not list(query_logs(log_file, LogFilter(logger_prefix="sm.rec")))
+    buffered = LogFilter(logger_prefix="sm.recorder", pattern=r"05\d$")
+    expected = [f"Meldung 05{i}" for i in (0, 2, 4, 6, 8)]
+    assert [record["msg"] for _, record in query_logs(log_file, buffered)] == expected
+
+
+def test_query_reads_only_candidate_blocks(tmp_path, monkeypatch) -> None:
+    log_file = tmp_path / "session_manager.jsonl"
+    start = _write_history(log_file)
+    total_lines = sum(1 for path in rotated_files(log_file) for _ in path.open(encoding="utf-8"))
+    list(query_logs(log_file, LogFilter()))  # Indizes der rotierten Dateien vorhanden
+
+    parsed = []
+    original_loads = json.loads
+
+    def counting_loads(raw, *args, **kwargs):
+        parsed.append(raw)
+        return original_loads(raw, *args, **kwargs)
+
+    monkeypatch.setattr(log_index.json, "loads", counting_loads)
+    index_reads = len(rotated_files(log_file)) - 1
+
+    # Zeitraum nach dem letzten Eintrag: nur Index-Dateien + Scan der aktiven Datei
+    active_lines = sum(1 for _ in log_file.open(encoding="utf-8"))
+    assert not list(query_logs(log_file, LogFilter(since=start + 1e6)))
+    assert len(parsed) == index_reads + active_lines
+
+    # ERROR kommt nur in wenigen Blöcken vor
+    parsed.clear()
+    assert list(query_logs(log_file, LogFilter(min_level=logging.ERROR)))
+    assert len(parsed) < (index_reads + active_lines + total_lines) // 2
+
+
+def test_follow_switches_to_new_file_after_rotation(tmp_path) -> None:
+    log_file = tmp_path / "session_manager.jsonl"
+    handler = _handler(log_file, max_bytes=600)
+    handler.emit(_record("sm.replay", logging.INFO, "alt", time.time()))
+
+    seen = []
+    steps = iter(range(40))
+
+    def write_between_polls(_seconds):
+        i = next(steps)
+        if i < 12:
+            handler.emit(_record("sm.replay", logging.WARNING, f"neu {i}", time.time()))
+
+    matches = follow_logs(
+        log_file,
+        LogFilter(min_level=logging.WARNING),
+        poll_s=0,
+        should_stop=lambda: len(seen) >= 12,
+        sleep=write_between_polls,
+    )
+    for _, record in matches:
+        seen.append(record["msg"])
+    handler.close()
+
+    assert seen == [f"neu {i}" for i in range(12)]
+    assert len(rotated_files(log_file)) > 1
@@ -0,0 +1,125 @@
+"""
+Tests für den Logging-Fast-Path
+
+Testet:
+- JsonLineFormatter: identische Ausgabe wie json.dumps, ``_json``-Durchreichung
+- DeferredFormatQueueHandler: Formatierung nur bei primitiven Argumenten aufgeschoben
+- LogSampler: erste N, jede K-te, Intervall, Unterdrückungs-Zähler, flush
+"""
+
+import json
+import logging
+import queue
+import unittest
+
+from session_manager.utils.logging_config import DeferredFormatQueueHandler, JsonLineFormatter, LogSampler
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _record(msg, args=(), level=logging.INFO):
+    return logging.LogRecord("sm.test", level, __file__, 1, msg, args, None)
+
+
+class TestJsonLineFormatter(unittest.TestCase):
+    def test_output_matches_json_dumps(self):
+        formatter = JsonLineFormatter("session_manager")
+        record = _record('Wert "%s" ü\n\t%d', ("x\\y", 5), logging.WARNING)
+        expected = json.dumps(
+            {
+                "app": "session_manager",
+                "level": "WARNING",
+                "logger": "sm.test",
+                "msg": record.getMessage(),
+                "timestamp": logging.Formatter().formatTime(record),
+            },
+            ensure_ascii=False,
+        )
+        self.assertEqual(formatter.format(record), expected)
+        # Zweiter Aufruf nutzt die Caches
+        self.assertEqual(formatter.format(record), expected)
+
+    def test_prebuilt_json_line_passes_through(self):
+        record = _record("ignoriert")
+        record._json = '{"custom": true}'
+        self.assertEqual(JsonLineFormatter("app").format(record), '{"custom": true}')
+
+
+class TestDeferredFormatQueueHandler(unittest.TestCase):
+    def test_primitive_args_are_not_formatted_in_caller(self):
+        handler = DeferredFormatQueueHandler(queue.Queue())
+        prepared = handler.prepare(_record("publish %s rc=%s", ("topic", 4)))
+        self.assertEqual(prepared.msg, "publish %s rc=%s")
+        self.assertEqual(prepared.args, ("topic", 4))
+        self.assertEqual(prepared.getMessage(), "publish topic rc=4")
+
+    def test_mutable_args_are_formatted_eagerly(self):
+        handler = DeferredFormatQueueHandler(queue.Queue())
+        payload = {"a": 1}
+        prepared = handler.prepare(_record("payload %s", (payload,)))
+        payload["a"] = 2
+        self.assertIsNone(prepared.args)
+        self.assertEqual(prepared.getMessage(), "payload {'a': 1}")
+
+    def test_full_queue_counts_drops_and_reports_them(self):
+        q = queue.Queue(maxsize=1)
+        handler = DeferredFormatQueueHandler(q)
+        for i in range(3):
+            handler.emit(_record("msg %s", (i,)))
+        self.assertEqual(handler.dropped, 2)
+
+        q.get_nowait()
+        q.maxsize = 2
+        handler.emit(_record("msg %s", (3,)))
+        records = [q.get_nowait().getMessage() for _ in range(q.qsize())]
+        self.assertEqual(records, ["msg 3", "⚠️ 2 Log-Record(s) verworfen (Logging-Queue voll)"])
+
+
+class TestLogSampler(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("sm.test.sampler")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.handler = _ListHandler()
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+
+    def test_first_then_every_kth_with_suppression_counts(self):
+        sampler = LogSampler(self.logger, first=2, every=3)
+        emitted = [sampler.warning("rc4", "fail %s", i) for i in range(10)]
+        self.assertEqual(emitted.count(True), 4)
+        self.assertEqual(
+            self.handler.messages,
+            ["fail 0", "fail 1", "fail 4 (+2 unterdrückt)", "fail 7 (+2 unterdrückt)"],
+        )
+        self.assertEqual(sampler.flush(), 2)
+        self.assertEqual(self.handler.messages[-1], "rc4: 2 weitere Meldung(en) unterdrückt")
+        # Nach flush beginnt das Sampling neu
+        self.assertTrue(sampler.warning("rc4", "fail %s", 10))
+
+    def test_interval_and_disabled_level(self):
+        now = [0.0]
+        sampler = LogSampler(self.logger, first=1, interval_s=5.0, clock=lambda: now[0])
+        self.assertTrue(sampler.info("k", "a"))
+        now[0] = 1.0
+        self.assertFalse(sampler.info("k", "b"))
+        now[0] = 6.0
+        self.assertTrue(sampler.info("k", "c"))
+        self.assertEqual(self.handler.messages, ["a", "c (+1 unterdrückt)"])
+
+        self.logger.setLevel(logging.INFO)
+        self.assertFalse(sampler.debug("k", "nie %s", object()))
+        self.assertEqual(sampler.flush(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests für den Metrik-Ring des Live-Dashboards
+
+Testet:
+- Raten pro Sekunde aus kumulativen Countern, Gauges, feste Kapazität
+- Leerlauf erscheint als Rate 0 (Sample beim Lesen)
+- ReplayController füttert den Ring beim Publish
+"""
+
+from session_manager.components.replay_station import ReplayController
+from session_manager.utils.metrics_ring import MetricsRing
+
+
+def test_rates_gauges_and_capacity() -> None:
+    now = [100.0]
+    ring = MetricsRing(counters=("published",), gauges=("lag_s",), capacity=3, clock=lambda: now[0])
+
+    for _ in range(10):
+        ring.incr("published")
+    ring.set_gauge("lag_s", 0.25)
+    assert ring.samples() == []
+
+    now[0] = 102.0
+    ring.incr("published", 2)
+    assert ring.samples() == [{"t_s": 2.0, "published_per_s": 6.0, "lag_s": 0.25}]
+
+    # Kein Zählen mehr: Lesen nach dem Intervall liefert Rate 0
+    now[0] = 103.0
+    assert ring.latest() == {"t_s": 3.0, "published_per_s": 0.0, "lag_s": 0.25}
+
+    for step in (104.0, 105.0):
+        now[0] = step
+        ring.maybe_sample()
+    columns = ring.columns()
+    assert columns["t_s"] == [3.0, 4.0, 5.0]
+    assert list(columns) == ["t_s", "published_per_s", "lag_s"]
+
+    ring.reset()
+    assert ring.columns() == {"t_s": []}
+
+
+def test_replay_controller_feeds_metrics_ring() -> None:
+    ctrl = ReplayController("localhost", 1883)
+    now = [0.0]
+    ctrl.metrics = MetricsRing(counters=("published", "failed", "retries"), clock=lambda: now[0])
+
+    with ctrl._lock:
+        ctrl._record_publish_locked(True, 0.0, 0, 0)
+        ctrl._record_publish_locked(True, 0.0, 2, 0)
+        ctrl._record_publish_locked(False, 0.0, 3, 4)
+    now[0] = 1.0
+
+    assert ctrl.metrics.latest() == {"t_s": 1.0, "published_per_s": 2.0, "failed_per_s": 1.0, "retries_per_s": 5.0}
+    assert ctrl.get_publish_stats()["pub_ok"] == 2
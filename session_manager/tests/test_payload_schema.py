@@ -0,0 +1,134 @@
+"""Tests für Schema-Inferenz und feldgezielte Payload-Decoder."""
+
+import unittest
+
+from session_manager.utils.payload_decoders import DECODER_SPECS, decoder_for_topic
+from session_manager.utils.payload_schema import (
+    LIST_SEGMENT,
+    MIN_FIELD_KEYS,
+    SchemaInferrer,
+    TargetedDecoder,
+    collect_key_values,
+    decoder_spec,
+    split_path,
+    topic_pattern,
+)
+
+MODULE_STATE = {
+    "headerId": 7,
+    "orderId": "order-1",
+    "actionState": {
+        "id": "a-1",
+        "command": "RGB_NFC",
+        "state": "FINISHED",
+        "metadata": {"workpieceId": "04a1b2c3d4e5f6"},
+    },
+    "actionStates": [{"id": "a-0", "state": "RUNNING"}, {"id": "a-1", "state": "FINISHED"}],
+    "loads": [{"loadId": "04a1b2c3d4e5f6", "loadType": "WHITE"}],
+    "information": [{"infoType": "x", "infoReferences": [{"referenceKey": "k"}]}],
+}
+
+
+def _generic(payload):
+    result = {}
+    for name, keys in MIN_FIELD_KEYS.items():
+        values = []
+        collect_key_values(payload, keys, values)
+        result[name] = values
+    return result
+
+
+def _decoded(decoded):
+    return {name: getattr(decoded, name) for name in MIN_FIELD_KEYS}
+
+
+def _payload_from_spec(spec):
+    """Dict-Payload, der jeden Feld-Pfad der Spezifikation mit einem eigenen Wert belegt."""
+    payload = {}
+    for field_paths in spec["fields"].values():
+        for path in field_paths:
+            segments = split_path(path)
+            node = payload
+            for segment, following in zip(segments, segments[1:]):
+                if segment == LIST_SEGMENT:
+                    if not node:
+                        node.append([] if following == LIST_SEGMENT else {})
+                    node = node[0]
+                else:
+                    node = node.setdefault(segment, [] if following == LIST_SEGMENT else {})
+            node[segments[-1]] = f"value:{path}"
+    return payload
+
+
+class TestPayloadSchema(unittest.TestCase):
+    def test_topic_pattern_replaces_serial(self):
+        self.assertEqual(topic_pattern("module/v1/ff/SVR3QA0022/state"), "module/v1/ff/+/state")
+        self.assertEqual(topic_pattern("module/v1/ff/NodeRed/SVR4H73275/state"), "module/v1/ff/NodeRed/+/state")
+        self.assertEqual(topic_pattern("fts/v1/ff/5iO4/state"), "fts/v1/ff/+/state")
+        self.assertEqual(topic_pattern("ccu/order/active"), "ccu/order/active")
+
+    def test_split_path(self):
+        self.assertEqual(split_path("actionStates[].state"), ["actionStates", "[]", "state"])
+        self.assertEqual(split_path("[].productionSteps[].id"), ["[]", "productionSteps", "[]", "id"])
+
+    def test_inferrer_records_paths_and_types(self):
+        inferrer = SchemaInferrer()
+        inferrer.observe("module/v1/ff/SVR3QA0022/state", MODULE_STATE)
+        inferrer.observe("module/v1/ff/SVR4H76449/state", {"orderId": None})
+        schema = inferrer.schemas()["module/v1/ff/+/state"]
+        self.assertEqual(schema["messages"], 2)
+        self.assertEqual(schema["paths"]["orderId"]["types"], {"string": 1, "null": 1})
+        self.assertEqual(schema["paths"]["loads[].loadId"]["count"], 1)
+
+    def test_decoder_matches_generic_search(self):
+        inferrer = SchemaInferrer()
+        inferrer.observe("module/v1/ff/SVR3QA0022/state", MODULE_STATE)
+        spec = decoder_spec(inferrer.schemas()["module/v1/ff/+/state"], MIN_FIELD_KEYS)
+        # Auch Container ohne gesuchte Felder werden formgeprüft
+        self.assertEqual(spec["known"]["information[]"], ["infoType", "infoReferences"])
+        decoder = TargetedDecoder("module/v1/ff/+/state", spec)
+        self.assertEqual(_decoded(decoder.decode(MODULE_STATE)), _generic(MODULE_STATE))
+
+    def test_decoder_reports_unknown_shape(self):
+        inferrer = SchemaInferrer()
+        inferrer.observe("module/v1/ff/SVR3QA0022/state", MODULE_STATE)
+        decoder = TargetedDecoder(
+            "module/v1/ff/+/state", decoder_spec(inferrer.schemas()["module/v1/ff/+/state"], MIN_FIELD_KEYS)
+        )
+        self.assertIsNone(decoder.decode({**MODULE_STATE, "newField": {"orderId": "x"}}))
+        self.assertIsNone(decoder.decode([MODULE_STATE]))
+        # Neuer Key in einem Container ohne gesuchte Felder
+        info = [{"infoType": "x", "infoReferences": [{"referenceKey": "k", "orderId": "ord-9"}]}]
+        self.assertIsNone(decoder.decode({**MODULE_STATE, "information": info}))
+        # Container an einer bisher skalaren Stelle
+        self.assertIsNone(decoder.decode({**MODULE_STATE, "headerId": {"orderId": "ord-9"}}))
+
+    def test_generated_decoders(self):
+        self.assertIsNone(decoder_for_topic("some/unknown/topic"))
+        decoder = decoder_for_topic("module/v1/ff/SVR3QA0022/state")
+        self.assertIsNotNone(decoder)
+        payload = _payload_from_spec(DECODER_SPECS["module/v1/ff/+/state"])
+        decoded = decoder.decode(payload)
+        self.assertIsNotNone(decoded)
+        self.assertEqual(_decoded(decoded), _generic(payload))
+        self.assertTrue(all(_decoded(decoded).values()))
+
+    def test_generated_decoder_falls_back_on_unlearned_error_references(self):
+        # NodeRed-States tragen errors[].errorReferences[].orderId; bei anderen Modulen ist errors
+        # im Korpus leer – ein Treffer dort darf nicht verloren gehen.
+        payload = {
+            "orderId": "",
+            "errors": [{"errorType": "x", "errorReferences": [{"orderId": "ord-42"}]}],
+            "actionState": {"state": "RUNNING", "command": "PICK"},
+        }
+        self.assertEqual(_generic(payload)["order_id"], ["ord-42"])
+        self.assertIsNone(decoder_for_topic("module/v1/ff/SVR3QA0022/state").decode(payload))
+
+        nodered = decoder_for_topic("module/v1/ff/NodeRed/SVR4H73275/state")
+        decoded = nodered.decode(payload)
+        self.assertIsNotNone(decoded)
+        self.assertEqual(_decoded(decoded), _generic(payload))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Tests für die Rerun-Caches der Streamlit-UI
+
+Testet:
+- SettingsManager: geteilte Instanz, Nachladen nur bei geänderter Datei
+- get_session_files: Memo pro Verzeichnis, Invalidierung bei neuen Dateien
+- RingBufferHandler: Einträge mit vorab extrahierten Feldern
+"""
+
+import json
+import logging
+import os
+from collections import deque
+
+from session_manager.components import replay_station
+from session_manager.components.settings_manager import get_settings_manager
+from session_manager.utils.streamlit_log_buffer import LogEntry, RingBufferHandler
+
+
+def test_settings_manager_is_shared_and_reloads_on_change(tmp_path) -> None:
+    settings_file = tmp_path / "settings.json"
+    settings_file.write_text(json.dumps({"replay_station": {"session_directory": "a"}}), encoding="utf-8")
+
+    manager = get_settings_manager(str(settings_file))
+    assert get_settings_manager(str(settings_file)) is manager
+    assert manager.get_session_directory() == "a"
+    assert not manager.refresh_if_changed()
+
+    # Eigene Speicherungen lösen kein Nachladen aus
+    manager.update_session_directory("b")
+    assert not manager.refresh_if_changed()
+
+    # Externe Änderung (anderer Prozess/Editor) wird erkannt
+    settings_file.write_text(json.dumps({"replay_station": {"session_directory": "external"}}), encoding="utf-8")
+    stat = settings_file.stat()
+    os.utime(settings_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert get_settings_manager(str(settings_file)).get_session_directory() == "external"
+
+
+def test_get_session_files_memoised_until_directory_changes(tmp_path, monkeypatch) -> None:
+    (tmp_path / "b.log").write_text("", encoding="utf-8")
+    (tmp_path / "a.log").write_text("", encoding="utf-8")
+    (tmp_path / "ignored.json").write_text("", encoding="utf-8")
+
+    globs = []
+    original_glob = type(tmp_path).glob
+
+    def counting_glob(self, pattern):
+        globs.append(pattern)
+        return original_glob(self, pattern)
+
+    monkeypatch.setattr(type(tmp_path), "glob", counting_glob)
+
+    assert [f.name for f in replay_station.get_session_files(str(tmp_path))] == ["a.log", "b.log"]
+    assert [f.name for f in replay_station.get_session_files(str(tmp_path))] == ["a.log", "b.log"]
+    assert len(globs) == 1
+
+    (tmp_path / "c.log").write_text("", encoding="utf-8")
+    stat = tmp_path.stat()
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert [f.name for f in replay_station.get_session_files(str(tmp_path))] == ["a.log", "b.log", "c.log"]
+    assert len(globs) == 2
+
+    assert replay_station.get_session_files(str(tmp_path / "missing")) == []
+
+
+def test_ring_buffer_stores_parsed_entries() -> None:
+    buffer: deque = deque(maxlen=10)
+    handler = RingBufferHandler(buffer, level=logging.DEBUG)
+    handler.setFormatter(logging.Formatter("[%(levelname)s] %(name)s: %(message)s"))
+    record = logging.LogRecord("sm.test", logging.WARNING, __file__, 1, "Wert %s", ("x",), None)
+
+    handler.emit(record)
+
+    entry = buffer[0]
+    assert isinstance(entry, LogEntry)
+    assert entry == "[WARNING] sm.test: Wert x"
+    assert (entry.level, entry.logger, entry.message) == ("WARNING", "sm.test", "Wert x")
+    assert "\n".join(buffer) == "[WARNING] sm.test: Wert x"
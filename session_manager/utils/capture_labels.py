@@ -0,0 +1,334 @@
+"""
+Label-Tabelle aus Object-Detection-Captures (Trainingsdaten für einen Video-Frame-Sampler).
+
+Ein Durchlauf über ``meta_min.jsonl`` (optional zeitlich gemischt mit ``events_full.log`` für die
+Werkstück-Farbe) baut pro Werkstück (NFC) Anwesenheits-Intervalle an DPS, AIQS und FTS:
+
+- nur ``…/state``-Topics zählen (Order/InstantAction nennen Werkstücke, bevor sie da sind)
+- Modul-Stationen halten ein Werkstück: ein neues NFC schließt das Intervall des vorherigen
+- FTS: State ohne NFC bedeutet leer und schließt alle FTS-Intervalle
+- taucht das Werkstück an einer anderen Station auf oder bleibt länger als ``max_gap_s`` ungemeldet,
+  endet das Intervall beim letzten Sichtkontakt
+
+Abgeschlossene Intervalle werden sofort geschrieben; im Speicher bleiben nur offene Intervalle und ein
+begrenzter NFC → Farbe-Cache. Video-Sekunden kommen aus ``sync_index.json`` (sonst Capture-Start = 0).
+"""
+
+from __future__ import annotations
+
+import csv
+import heapq
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterator, TextIO
+
+from .capture_sync_index import SYNC_INDEX_FILENAME, SyncIndex, iso_to_epoch_ms
+
+META_FILENAME = "meta_min.jsonl"
+FULL_EVENTS_FILENAME = "events_full.log"
+LABELS_FILENAME = "labels.csv"
+
+STATION_SERIALS = {
+    "SVR4H73275": "DPS",
+    "SVR4H76530": "AIQS",
+}
+FTS_STATION = "FTS"
+DEFAULT_MAX_GAP_S = 120.0
+COLOR_CACHE_SIZE = 4096
+
+LABEL_COLUMNS = [
+    "start_video_s",
+    "end_video_s",
+    "station",
+    "nfc_tag",
+    "color",
+    "order_id",
+    "start_ts",
+    "end_ts",
+    "events",
+    "last_phase",
+]
+
+
+def station_for_topic(topic: str) -> str | None:
+    """``module/v1/ff/[NodeRed/]<serial>/state`` bzw. ``fts/v1/ff/<serial>/state`` → Stationsname."""
+    if not topic.endswith("/state"):
+        return None
+    if topic.startswith("fts/"):
+        return FTS_STATION
+    for part in topic.split("/"):
+        station = STATION_SERIALS.get(part)
+        if station:
+            return station
+    return None
+
+
+def color_hints(payload: Any) -> list[tuple[str, str]]:
+    """``(nfc, farbe)``-Paare aus einem DPS/AIQS/FTS-State (Action-Metadaten bzw. Ladungen)."""
+    if not isinstance(payload, dict):
+        return []
+    hints: list[tuple[str, str]] = []
+    actions = [payload.get("actionState")] + list(payload.get("actionStates") or [])
+    for action in actions:
+        if not isinstance(action, dict) or not isinstance(action.get("metadata"), dict):
+            continue
+        color = action["metadata"].get("type")
+        nfc = action["metadata"].get("workpieceId")
+        if not nfc and action.get("command") == "RGB_NFC" and action.get("state") == "FINISHED":
+            nfc = action.get("result")
+        if nfc and color:
+            hints.append((str(nfc), str(color).upper()))
+    for key in ("load", "loads"):
+        for load in payload.get(key) or []:
+            if isinstance(load, dict) and load.get("loadId") and (load.get("loadType") or load.get("type")):
+                hints.append((str(load["loadId"]), str(load.get("loadType") or load.get("type")).upper()))
+    return hints
+
+
+class LabelInterval:
+    """Anwesenheit eines Werkstücks an einer Station."""
+
+    __slots__ = ("station", "nfc_tag", "order_id", "start_ts", "end_ts", "end_ms", "events", "last_phase")
+
+    def __init__(self, station: str, nfc_tag: str, ts: str, ts_ms: int) -> None:
+        self.station = station
+        self.nfc_tag = nfc_tag
+        self.order_id = ""
+        self.start_ts = ts
+        self.end_ts = ts
+        self.end_ms = ts_ms
+        self.events = 0
+        self.last_phase = ""
+
+    def touch(self, ts: str, ts_ms: int, order_id: str, phase: str) -> None:
+        self.end_ts = ts
+        self.end_ms = ts_ms
+        self.events += 1
+        if order_id and order_id != "0":
+            self.order_id = order_id
+        if phase:
+            self.last_phase = phase
+
+
+class PresenceTracker:
+    """
+    Zustandsautomat über Station-Events (zeitlich sortiert).
+
+    Args:
+        on_close: Wird mit jedem abgeschlossenen ``LabelInterval`` aufgerufen.
+        max_gap_s: Ohne neue Meldung länger als das → Intervall endet beim letzten Sichtkontakt.
+    """
+
+    def __init__(self, on_close: Callable[[LabelInterval], None], max_gap_s: float = DEFAULT_MAX_GAP_S) -> None:
+        self._on_close = on_close
+        self._max_gap_ms = int(max_gap_s * 1000)
+        self._open: dict[str, LabelInterval] = {}
+        self._occupant: dict[str, str] = {}
+        self.closed = 0
+
+    @property
+    def open_count(self) -> int:
+        return len(self._open)
+
+    def observe(self, ts: str, station: str, nfc_tag: str, order_id: str = "", phase: str = "") -> None:
+        ts_ms = iso_to_epoch_ms(ts)
+        if ts_ms is None:
+            return
+        self.expire(ts_ms)
+        if not nfc_tag:
+            if station == FTS_STATION:
+                for interval in [i for i in self._open.values() if i.station == FTS_STATION]:
+                    self._close(interval)
+            else:
+                occupant = self._open.get(self._occupant.get(station, ""))
+                if occupant is not None and occupant.station == station:
+                    occupant.touch(ts, ts_ms, order_id, phase)
+            return
+
+        interval = self._open.get(nfc_tag)
+        if interval is not None and interval.station != station:
+            self._close(interval)
+            interval = None
+        if interval is None:
+            if station != FTS_STATION:
+                previous = self._open.get(self._occupant.get(station, ""))
+                if previous is not None and previous.station == station:
+                    self._close(previous)
+                self._occupant[station] = nfc_tag
+            interval = LabelInterval(station, nfc_tag, ts, ts_ms)
+            self._open[nfc_tag] = interval
+        interval.touch(ts, ts_ms, order_id, phase)
+
+    def expire(self, now_ms: int) -> None:
+        for interval in [i for i in self._open.values() if now_ms - i.end_ms > self._max_gap_ms]:
+            self._close(interval)
+
+    def close_all(self) -> None:
+        for interval in list(self._open.values()):
+            self._close(interval)
+
+    def _close(self, interval: LabelInterval) -> None:
+        del self._open[interval.nfc_tag]
+        if self._occupant.get(interval.station) == interval.nfc_tag:
+            del self._occupant[interval.station]
+        self.closed += 1
+        self._on_close(interval)
+
+
+def _iter_meta(path: Path) -> Iterator[tuple[str, int, dict[str, Any]]]:
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if '/state"' not in line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            ts = entry.get("ts")
+            if isinstance(ts, str) and station_for_topic(str(entry.get("topic", ""))):
+                yield ts, 0, entry
+
+
+def _iter_full_colors(path: Path) -> Iterator[tuple[str, int, dict[str, Any]]]:
+    markers = ('"fts/', *STATION_SERIALS)
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            # Vorfilter ohne JSON-Parse: nur Station-States können Farb-Hinweise tragen
+            if "/state" not in line or not any(marker in line for marker in markers):
+                continue
+            try:
+                entry = json.loads(line)
+                payload = json.loads(entry.get("payload") or "null")
+            except (json.JSONDecodeError, TypeError):
+                continue
+            ts = entry.get("timestamp")
+            hints = color_hints(payload) if station_for_topic(str(entry.get("topic", ""))) else []
+            if isinstance(ts, str) and hints:
+                # Rang -1: bei gleichem Timestamp zuerst die Farbe, dann das Meta-Event
+                yield ts, -1, {"colors": hints}
+
+
+def iter_capture_records(session_dir: Path) -> Iterator[dict[str, Any]]:
+    """Station-Events aus ``meta_min.jsonl`` und Farb-Hinweise aus ``events_full.log``, nach Zeit gemischt."""
+    streams = [_iter_meta(session_dir / META_FILENAME)]
+    full_path = session_dir / FULL_EVENTS_FILENAME
+    if full_path.exists():
+        streams.append(_iter_full_colors(full_path))
+    for _ts, _rank, record in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+        yield record
+
+
+def _video_clock(session_dir: Path) -> Callable[[str], float | None]:
+    """Event-Timestamp → Video-Sekunde (Sync-Index; sonst relativ zum Capture-Start laut Manifest)."""
+    if (session_dir / SYNC_INDEX_FILENAME).exists():
+        return SyncIndex.load(session_dir).video_s_for_timestamp
+    origin_ms = None
+    manifest_path = session_dir / "manifest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        origin_ms = iso_to_epoch_ms(str(manifest.get("capture_started_at") or ""))
+
+    def video_s(timestamp: str) -> float | None:
+        nonlocal origin_ms
+        epoch_ms = iso_to_epoch_ms(timestamp)
+        if epoch_ms is None:
+            return None
+        if origin_ms is None:
+            origin_ms = epoch_ms
+        return (epoch_ms - origin_ms) / 1000
+
+    return video_s
+
+
+class LabelTableWriter:
+    """Schreibt abgeschlossene Intervalle als CSV-Zeile (Reihenfolge = Abschlusszeitpunkt)."""
+
+    def __init__(
+        self,
+        handle: TextIO,
+        video_s: Callable[[str], float | None],
+        colors: OrderedDict[str, str],
+        min_duration_s: float = 0.0,
+    ) -> None:
+        self._writer = csv.writer(handle, lineterminator="\n")
+        self._writer.writerow(LABEL_COLUMNS)
+        self._video_s = video_s
+        self._colors = colors
+        self._min_duration_s = min_duration_s
+        self.rows = 0
+        self.skipped = 0
+
+    def __call__(self, interval: LabelInterval) -> None:
+        start_s = self._video_s(interval.start_ts)
+        end_s = self._video_s(interval.end_ts)
+        if start_s is None or end_s is None or end_s - start_s < self._min_duration_s:
+            self.skipped += 1
+            return
+        self._writer.writerow(
+            [
+                f"{start_s:.3f}",
+                f"{end_s:.3f}",
+                interval.station,
+                interval.nfc_tag,
+                self._colors.get(interval.nfc_tag, ""),
+                interval.order_id,
+                interval.start_ts,
+                interval.end_ts,
+                interval.events,
+                interval.last_phase,
+            ]
+        )
+        self.rows += 1
+
+
+def extract_labels(
+    session_dir: Path,
+    output_path: Path | None = None,
+    *,
+    max_gap_s: float = DEFAULT_MAX_GAP_S,
+    min_duration_s: float = 0.0,
+) -> dict[str, Any]:
+    """
+    Label-Tabelle für eine Capture-Session schreiben (Default: ``<session>/labels.csv``).
+
+    Returns:
+        Zusammenfassung (Zeilen, verworfene Intervalle, Event-Anzahl, max. gleichzeitig offene Intervalle).
+    """
+    if not (session_dir / META_FILENAME).exists():
+        raise FileNotFoundError(f"{META_FILENAME} fehlt in {session_dir}")
+    output_path = output_path or session_dir / LABELS_FILENAME
+    colors: OrderedDict[str, str] = OrderedDict()
+    events = 0
+    max_open = 0
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        table = LabelTableWriter(handle, _video_clock(session_dir), colors, min_duration_s)
+        tracker = PresenceTracker(table, max_gap_s=max_gap_s)
+        for record in iter_capture_records(session_dir):
+            if "colors" in record:
+                for nfc, color in record["colors"]:
+                    colors[nfc] = color
+                    colors.move_to_end(nfc)
+                while len(colors) > COLOR_CACHE_SIZE:
+                    colors.popitem(last=False)
+                continue
+            events += 1
+            tracker.observe(
+                record["ts"],
+                station_for_topic(record["topic"]) or "",
+                str(record.get("nfc_tag") or ""),
+                str(record.get("order_id") or ""),
+                str(record.get("phase") or ""),
+            )
+            max_open = max(max_open, tracker.open_count)
+        tracker.close_all()
+    tmp_path.replace(output_path)
+    return {
+        "session": session_dir.name,
+        "output": str(output_path),
+        "station_events": events,
+        "rows": table.rows,
+        "skipped": table.skipped,
+        "max_open_intervals": max_open,
+    }
@@ -0,0 +1,221 @@
+"""
+Zeit-Sync-Index zwischen OBS-Video und Object-Detection-Capture.
+
+Pro Capture-Session (``sync_index.json`` im Session-Ordner):
+- Anker: Wall-Clock (UTC ISO + Epoch-ms) und ``time.monotonic()`` beim Start
+- Marker: ``capture_start``, ``video_start`` (Operator klickt beim OBS-Start), ``capture_stop``;
+  optional zusätzlich per MQTT auf ``SYNC_MARKER_TOPIC`` publiziert
+- pro Datei (``meta``/``full``) eine dünn besetzte Sekunden-Tabelle: Capture-Sekunde → Byte-Offset
+  der ersten Zeile und Anzahl Zeilen
+
+Damit lässt sich eine Video-Sekunde per Binärsuche auf ihre Events abbilden (nur der passende
+Dateiausschnitt wird gelesen) und umgekehrt ein Event-Timestamp auf eine Video-Sekunde.
+
+Zeitachsen: ``capture_s`` = Sekunden seit Capture-Start (monotonic, steht auch in jeder Zeile);
+``video_s`` = ``capture_s`` − ``video_start``-Marker (ohne Marker: Capture-Start = Video-Start).
+Gefiltert wird über ``capture_s`` der Zeile, nicht über den Wall-Clock-``ts``: NTP-Slew oder ein
+Uhrensprung während einer langen Aufnahme verschieben ``ts`` gegenüber der monotonen Uhr.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+SYNC_INDEX_FILENAME = "sync_index.json"
+SYNC_INDEX_KIND = "object_detection_sync_index"
+SYNC_INDEX_VERSION = 1
+SYNC_MARKER_TOPIC = "osf/object-detection/sync"
+
+MARKER_CAPTURE_START = "capture_start"
+MARKER_VIDEO_START = "video_start"
+MARKER_CAPTURE_STOP = "capture_stop"
+
+# Nur für ältere Captures ohne ``capture_s`` pro Zeile: Sekunden-Buckets (monotonic) und
+# Event-Timestamps (Wall-Clock) können an Grenzen leicht abweichen
+_BUCKET_SLACK_S = 1
+
+
+def iso_to_epoch_ms(timestamp: str) -> int | None:
+    text = (timestamp or "").strip()
+    if not text:
+        return None
+    try:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+class SyncIndexBuilder:
+    """
+    Baut den Index während der Aufnahme.
+
+    ``add_line`` ruft nur der Writer-Thread auf (Zeilen in Dateireihenfolge); Marker können aus
+    UI-/MQTT-Threads kommen.
+    """
+
+    def __init__(self, session_name: str, wall_clock_utc: str, monotonic_s: float, files: dict[str, str]) -> None:
+        self.session_name = session_name
+        self.wall_clock_utc = wall_clock_utc
+        self.epoch_ms = iso_to_epoch_ms(wall_clock_utc)
+        self.monotonic_s = float(monotonic_s)
+        self.files = dict(files)
+        self._tables: dict[str, dict[str, list[int]]] = {
+            key: {"second": [], "offset": [], "count": []} for key in files
+        }
+        self._markers: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def capture_seconds(self, monotonic_s: float) -> float:
+        return monotonic_s - self.monotonic_s
+
+    def add_marker(self, kind: str, monotonic_s: float, wall_clock_utc: str) -> dict[str, Any]:
+        marker = {
+            "kind": kind,
+            "capture_s": round(self.capture_seconds(monotonic_s), 3),
+            "wall_clock_utc": wall_clock_utc,
+        }
+        with self._lock:
+            self._markers.append(marker)
+        return marker
+
+    def add_line(self, key: str, monotonic_s: float, offset: int) -> None:
+        table = self._tables.get(key)
+        if table is None:
+            return
+        second = max(0, int(self.capture_seconds(monotonic_s)))
+        seconds = table["second"]
+        if seconds and seconds[-1] >= second:
+            table["count"][-1] += 1
+            return
+        seconds.append(second)
+        table["offset"].append(int(offset))
+        table["count"].append(1)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            markers = list(self._markers)
+        return {
+            "kind": SYNC_INDEX_KIND,
+            "version": SYNC_INDEX_VERSION,
+            "session_name": self.session_name,
+            "anchors": {
+                "wall_clock_utc": self.wall_clock_utc,
+                "epoch_ms": self.epoch_ms,
+                "monotonic_s": self.monotonic_s,
+            },
+            "markers": markers,
+            "files": {key: {"name": name, **self._tables[key]} for key, name in self.files.items()},
+        }
+
+    def write(self, path: Path) -> None:
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), separators=(",", ":")) + "\n", encoding="utf-8")
+        tmp_path.replace(path)
+
+
+class SyncIndex:
+    """Gelesener Sync-Index mit Abbildung Video-Sekunde ↔ Events."""
+
+    def __init__(self, data: dict[str, Any], session_dir: Path) -> None:
+        if data.get("kind") != SYNC_INDEX_KIND:
+            raise ValueError(f"Kein Sync-Index: {data.get('kind')!r}")
+        self.data = data
+        self.session_dir = session_dir
+        self.epoch_ms: int | None = data["anchors"].get("epoch_ms")
+        self.markers: list[dict[str, Any]] = data.get("markers", [])
+        self.files: dict[str, dict[str, Any]] = data.get("files", {})
+
+    @classmethod
+    def load(cls, session_dir: Path) -> SyncIndex:
+        path = session_dir / SYNC_INDEX_FILENAME
+        return cls(json.loads(path.read_text(encoding="utf-8")), session_dir)
+
+    def marker(self, kind: str) -> dict[str, Any] | None:
+        for marker in self.markers:
+            if marker.get("kind") == kind:
+                return marker
+        return None
+
+    @property
+    def video_start_s(self) -> float:
+        """Capture-Sekunde, zu der das Video begann (``video_start``-Marker, sonst 0)."""
+        marker = self.marker(MARKER_VIDEO_START)
+        return float(marker["capture_s"]) if marker else 0.0
+
+    def capture_s_for_video(self, video_s: float) -> float:
+        return video_s + self.video_start_s
+
+    def video_s_for_capture(self, capture_s: float) -> float:
+        return capture_s - self.video_start_s
+
+    def video_s_for_timestamp(self, timestamp: str) -> float | None:
+        """Wall-Clock-Timestamp eines Events (``ts``) → Video-Sekunde."""
+        epoch_ms = iso_to_epoch_ms(timestamp)
+        if epoch_ms is None or self.epoch_ms is None:
+            return None
+        return self.video_s_for_capture((epoch_ms - self.epoch_ms) / 1000)
+
+    def capture_s_for_event(self, event: dict[str, Any]) -> float | None:
+        """Capture-Sekunde einer Zeile: ``capture_s`` (monotonic); ältere Captures über den Wall-Clock-``ts``."""
+        capture_s = event.get("capture_s")
+        if isinstance(capture_s, (int, float)) and not isinstance(capture_s, bool):
+            return float(capture_s)
+        epoch_ms = iso_to_epoch_ms(str(event.get("ts") or event.get("timestamp") or ""))
+        if epoch_ms is None or self.epoch_ms is None:
+            return None
+        return (epoch_ms - self.epoch_ms) / 1000
+
+    def byte_range(self, key: str, start_capture_s: float, end_capture_s: float) -> tuple[int, int | None, int]:
+        """
+        Byte-Bereich der Zeilen in ``[start, end)`` (Capture-Sekunden, auf ganze Sekunden erweitert).
+
+        Returns:
+            (start_offset, end_offset oder None = Dateiende, Anzahl Zeilen)
+        """
+        table = self.files[key]
+        seconds: list[int] = table["second"]
+        first = bisect_left(seconds, math.floor(start_capture_s))
+        last = bisect_left(seconds, math.ceil(end_capture_s))
+        if first >= len(seconds) or first >= last:
+            return 0, 0, 0
+        end_offset = table["offset"][last] if last < len(seconds) else None
+        return table["offset"][first], end_offset, sum(table["count"][first:last])
+
+    def iter_lines(self, key: str, start_capture_s: float, end_capture_s: float) -> Iterator[str]:
+        """Rohzeilen der Datei ``key`` aus dem Sekunden-Bereich (liest nur diesen Ausschnitt)."""
+        start_offset, end_offset, count = self.byte_range(key, start_capture_s, end_capture_s)
+        if not count:
+            return
+        with (self.session_dir / self.files[key]["name"]).open("rb") as handle:
+            handle.seek(start_offset)
+            chunk = handle.read() if end_offset is None else handle.read(end_offset - start_offset)
+        for raw in chunk.splitlines():
+            if raw.strip():
+                yield raw.decode("utf-8", errors="replace")
+
+    def events_for_video(self, start_video_s: float, end_video_s: float, key: str = "meta") -> list[dict[str, Any]]:
+        """Events mit Video-Zeit in ``[start, end)``; exakt über die Capture-Sekunde der Zeile gefiltert."""
+        start_capture = self.capture_s_for_video(start_video_s)
+        end_capture = self.capture_s_for_video(end_video_s)
+        events = []
+        for line in self.iter_lines(key, start_capture - _BUCKET_SLACK_S, end_capture + _BUCKET_SLACK_S):
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            capture_s = self.capture_s_for_event(event)
+            if capture_s is None:
+                continue
+            video_s = self.video_s_for_capture(capture_s)
+            if start_video_s <= video_s < end_video_s:
+                events.append({**event, "video_s": round(video_s, 3)})
+        return events
@@ -0,0 +1,210 @@
+"""
+Entkoppelter Datei-Schreiber für MQTT-Captures.
+
+Der MQTT-Callback übergibt Roh-Messages nur an eine begrenzte Queue (``submit`` blockiert nie);
+ein eigener Writer-Thread verarbeitet sie in Batches, schreibt pro Datei einen Block und
+flusht periodisch. Ist die Queue voll, wird die Message verworfen und gezählt — die
+MQTT-Annahme wird nie durch Dateisystem oder Payload-Parsing gebremst.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, TextIO
+
+from .logging_config import LogSampler, get_logger
+
+logger = get_logger("session_manager.capture_writer")
+# Fehler treten pro Message/Zeile auf – gesampelt, damit ein kaputter Feed den Writer nicht ausbremst
+_error_log = LogSampler(logger, first=5, every=500)
+
+DEFAULT_MAX_QUEUE = 20000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL_S = 1.0
+
+_STOP = object()
+
+
+class BatchedLineWriter:
+    """
+    Writer-Thread mit begrenzter Queue.
+
+    Args:
+        files: Ziel-Dateien nach Schlüssel (z. B. ``{"meta": f, "full": f}``); werden nicht geschlossen.
+        process: Wandelt ein Queue-Element in ``(datei_schlüssel, zeile)``-Paare um (läuft im Writer-Thread).
+        after_batch: Optional, nach jedem geschriebenen Batch mit den Zeilen pro Datei aufgerufen.
+        on_line: Optional, pro geschriebener Zeile mit ``(datei_schlüssel, element, byte_offset)`` aufgerufen
+            (Offset der Zeile in der Datei, UTF-8; z. B. für einen Sync-Index). Dateien dafür mit
+            ``newline="\n"`` öffnen – sonst verschiebt ``\r\n`` unter Windows jeden Offset.
+    """
+
+    def __init__(
+        self,
+        files: dict[str, TextIO],
+        process: Callable[[Any], Iterable[tuple[str, str]]],
+        *,
+        after_batch: Callable[[dict[str, int]], None] | None = None,
+        on_line: Callable[[str, Any, int], None] | None = None,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S,
+        name: str = "capture-writer",
+    ) -> None:
+        self._files = files
+        self._process = process
+        self._after_batch = after_batch
+        self._on_line = on_line
+        self._offsets: dict[str, int] = {key: _initial_offset(handle) for key, handle in files.items()}
+        self.max_queue = int(max_queue)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_s = float(flush_interval_s)
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=self.max_queue)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._last_flush_mono = time.monotonic()
+        # Zähler: submitted/dropped schreibt nur der MQTT-Thread, der Rest nur der Writer-Thread
+        self.submitted = 0
+        self.dropped = 0
+        self.processed = 0
+        self.errors = 0
+        self.batches = 0
+        self.flushes = 0
+        self.max_depth = 0
+        self.lines: dict[str, int] = dict.fromkeys(files, 0)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def submit(self, item: Any) -> bool:
+        """Element einreihen; ``False`` (und gezählt), wenn die Queue voll ist."""
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            _error_log.warning("queue_full", "⚠️ Capture-Queue voll (%s) — Messages werden verworfen", self.max_queue)
+            return False
+        self.submitted += 1
+        return True
+
+    def stop(self, timeout: float | None = 10.0) -> bool:
+        """
+        Restliche Queue abarbeiten, schreiben, flushen und Thread beenden.
+
+        Returns:
+            ``True``, wenn der Writer-Thread beendet ist. ``False``, wenn das Stop-Signal nicht
+            zustellbar war oder der Thread nach ``timeout`` noch läuft – er schreibt dann weiter in
+            die Dateien, der Aufrufer darf sie nicht schließen.
+        """
+        if not self._thread.is_alive():
+            return True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.error("❌ Capture-Writer reagiert nicht — Stop-Signal nicht zustellbar")
+            return False
+        self._thread.join(timeout=timeout)
+        _error_log.flush(logging.WARNING)
+        if self._thread.is_alive():
+            logger.error(
+                "❌ Capture-Writer nach %ss nicht beendet — %s Messages noch in der Queue", timeout, self._queue.qsize()
+            )
+            return False
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "errors": self.errors,
+            "batches": self.batches,
+            "flushes": self.flushes,
+            "lines": dict(self.lines),
+        }
+
+    # ---------- Writer-Thread ----------
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval_s)
+            except queue.Empty:
+                self._flush()
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.max_depth = max(self.max_depth, len(batch) + self._queue.qsize())
+            if any(item is _STOP for item in batch):
+                stopping = True
+                batch = [item for item in batch if item is not _STOP]
+            self._write_batch(batch)
+            if stopping or time.monotonic() - self._last_flush_mono >= self.flush_interval_s:
+                self._flush()
+
+    def _write_batch(self, batch: list[Any]) -> None:
+        pending: dict[str, list[str]] = {}
+        sources: dict[str, list[Any]] = {}
+        for item in batch:
+            try:
+                for key, line in self._process(item):
+                    pending.setdefault(key, []).append(line)
+                    sources.setdefault(key, []).append(item)
+            except Exception as exc:
+                self.errors += 1
+                _error_log.error("process", "❌ Capture-Message konnte nicht verarbeitet werden: %s", str(exc))
+        self.processed += len(batch)
+        written: dict[str, int] = {}
+        for key, lines in pending.items():
+            handle = self._files.get(key)
+            if handle is None:
+                continue
+            try:
+                handle.write("".join(lines))
+            except Exception as exc:
+                self.errors += 1
+                logger.error("❌ Capture-Datei %s nicht beschreibbar: %s", key, exc)
+                continue
+            written[key] = len(lines)
+            self.lines[key] = self.lines.get(key, 0) + len(lines)
+            if self._on_line is not None:
+                self._report_lines(key, lines, sources[key])
+        self.batches += 1
+        if self._after_batch is not None and written:
+            self._after_batch(written)
+
+    def _report_lines(self, key: str, lines: list[str], items: list[Any]) -> None:
+        offset = self._offsets.get(key, 0)
+        for line, item in zip(lines, items):
+            try:
+                self._on_line(key, item, offset)
+            except Exception as exc:
+                self.errors += 1
+                _error_log.error("on_line", "❌ Capture-Zeilen-Hook fehlgeschlagen: %s", str(exc))
+            offset += len(line.encode("utf-8"))
+        self._offsets[key] = offset
+
+    def _flush(self) -> None:
+        for handle in self._files.values():
+            try:
+                handle.flush()
+            except Exception as exc:
+                logger.error("❌ Capture-Datei flush fehlgeschlagen: %s", exc)
+        self.flushes += 1
+        self._last_flush_mono = time.monotonic()
+
+
+def _initial_offset(handle: TextIO) -> int:
+    """Byte-Position am Dateiende (Append-Modus); 0, falls nicht ermittelbar."""
+    try:
+        return int(handle.tell())
+    except (OSError, ValueError):
+        return 0
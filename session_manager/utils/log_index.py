@@ -0,0 +1,374 @@
+"""
+Zeit-/Level-Index für rotierte JSON-Logs (``session_manager.jsonl``, ``.1`` … ``.N``).
+
+Schreibseite: ``IndexedRotatingFileHandler`` merkt sich beim Schreiben pro Block (~64 KB) den
+Byte-Offset, Zeitraum, das höchste Level und die Logger – ohne eine Zeile erneut zu parsen. Bei
+der Rotation werden die Index-Dateien (``<datei>.idx.json``) mitverschoben und der Index der gerade
+abgeschlossenen Datei geschrieben.
+
+Leseseite: ``query_logs`` liest nur Blöcke, die Zeitraum, Mindest-Level und Logger-Präfix treffen
+können, und filtert deren Zeilen exakt. Dateien ohne (gültigen) Index werden einmal gescannt;
+rotierte Dateien ändern sich nicht mehr, ihr Index wird dabei gespeichert. ``follow_logs`` folgt
+der aktiven Datei über Rotationen hinweg (wie ``tail -F``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx.json"
+DEFAULT_BLOCK_BYTES = 64 * 1024
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"  # logging.Formatter.formatTime (lokale Zeit)
+
+_BACKUP_SUFFIX = re.compile(r"\.(\d+)$")
+
+
+def index_path(log_file: str | Path) -> Path:
+    return Path(f"{log_file}{INDEX_SUFFIX}")
+
+
+def parse_log_timestamp(value: Any) -> float | None:
+    """``"2026-10-19 03:11:47,879"`` (lokale Zeit) → Epoch-Sekunden; ``None`` wenn nicht lesbar."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def level_number(name: Any) -> int:
+    value = logging.getLevelName(str(name).upper()) if name is not None else 0
+    return value if isinstance(value, int) else 0
+
+
+class LogIndexBuilder:
+    """Sammelt Block-Einträge für eine Log-Datei; ``add`` pro geschriebener Zeile (Offset = Zeilenanfang)."""
+
+    def __init__(self, block_bytes: int = DEFAULT_BLOCK_BYTES):
+        self.block_bytes = block_bytes
+        self.blocks: list[dict[str, Any]] = []
+        self.loggers: dict[str, int] = {}
+        self.levels: dict[str, int] = {}
+        self.records = 0
+
+    def add(self, offset: int, created: float | None, levelno: int, logger_name: str) -> None:
+        block = self.blocks[-1] if self.blocks else None
+        if block is None or offset - block["offset"] >= self.block_bytes:
+            block = {"offset": offset, "first_ts": None, "last_ts": None, "max_level": 0, "count": 0, "loggers": []}
+            self.blocks.append(block)
+        if created is not None:
+            if block["first_ts"] is None or created < block["first_ts"]:
+                block["first_ts"] = created
+            if block["last_ts"] is None or created > block["last_ts"]:
+                block["last_ts"] = created
+        if levelno > block["max_level"]:
+            block["max_level"] = levelno
+        block["count"] += 1
+        logger_id = self.loggers.get(logger_name)
+        if logger_id is None:
+            logger_id = self.loggers[logger_name] = len(self.loggers)
+        if logger_id not in block["loggers"]:
+            block["loggers"].append(logger_id)
+        level_name = logging.getLevelName(levelno)
+        self.levels[level_name] = self.levels.get(level_name, 0) + 1
+        self.records += 1
+
+    def to_dict(self, size: int) -> dict[str, Any]:
+        stamps = [b[key] for b in self.blocks for key in ("first_ts", "last_ts") if b[key] is not None]
+        return {
+            "version": INDEX_VERSION,
+            "size": size,
+            "records": self.records,
+            "first_ts": min(stamps) if stamps else None,
+            "last_ts": max(stamps) if stamps else None,
+            "levels": self.levels,
+            "loggers": list(self.loggers),
+            "block_bytes": self.block_bytes,
+            "blocks": self.blocks,
+        }
+
+
+def write_index(log_file: str | Path, index: dict[str, Any]) -> Path:
+    """Index atomar neben die Log-Datei schreiben."""
+    target = index_path(log_file)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, target)
+    return target
+
+
+def build_index(log_file: str | Path, block_bytes: int = DEFAULT_BLOCK_BYTES) -> dict[str, Any]:
+    """Index durch einmaliges Scannen einer vorhandenen Datei (ältere Logs, aktive Datei)."""
+    builder = LogIndexBuilder(block_bytes)
+    offset = 0
+    with open(log_file, "rb") as handle:
+        for raw in handle:
+            record = _parse_line(raw)
+            if record is not None:
+                builder.add(
+                    offset,
+                    parse_log_timestamp(record.get("timestamp")),
+                    level_number(record.get("level")),
+                    str(record.get("logger", "")),
+                )
+            offset += len(raw)
+    return builder.to_dict(offset)
+
+
+def load_index(log_file: str | Path, *, persist: bool = False) -> dict[str, Any]:
+    """Gespeicherten Index verwenden, wenn er zur Dateigröße passt; sonst neu bauen (optional speichern)."""
+    size = os.path.getsize(log_file)
+    try:
+        index = json.loads(index_path(log_file).read_text(encoding="utf-8"))
+        if index.get("version") == INDEX_VERSION and index.get("size") == size:
+            return index
+    except (OSError, ValueError):
+        pass
+    index = build_index(log_file)
+    if persist:
+        try:
+            write_index(log_file, index)
+        except OSError:
+            pass
+    return index
+
+
+class IndexedRotatingFileHandler(RotatingFileHandler):
+    """
+    ``RotatingFileHandler`` mit Block-Index pro Datei.
+
+    Formatiert jeden Record genau einmal (der Standard-Handler formatiert für die Rotationsprüfung
+    ein zweites Mal) und ergänzt den Index mit Offset, ``record.created``, Level und Logger.
+    """
+
+    def __init__(self, filename: str | Path, *args: Any, block_bytes: int = DEFAULT_BLOCK_BYTES, **kwargs: Any):
+        super().__init__(filename, *args, **kwargs)
+        self.block_bytes = block_bytes
+        self._builder = self._builder_for_existing_file()
+
+    def _builder_for_existing_file(self) -> LogIndexBuilder:
+        builder = LogIndexBuilder(self.block_bytes)
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename):
+            # Angehängt wird an eine bestehende Datei: deren Blöcke übernehmen
+            existing = build_index(self.baseFilename, self.block_bytes)
+            builder.blocks = existing["blocks"]
+            builder.loggers = {name: i for i, name in enumerate(existing["loggers"])}
+            builder.levels = dict(existing["levels"])
+            builder.records = existing["records"]
+        return builder
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            offset = self.stream.tell()
+            if self.maxBytes > 0 and offset and offset + len(line) >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+                offset = self.stream.tell()
+            self.stream.write(line)
+            self.flush()
+            self._builder.add(offset, record.created, record.levelno, record.name)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self) -> None:  # noqa: N802 (logging API)
+        size = self.stream.tell() if self.stream else 0
+        if self.backupCount > 0:
+            # Index-Dateien wie die Logs verschieben: .1 → .2, …
+            for i in range(self.backupCount - 1, 0, -1):
+                source = index_path(self.rotation_filename(f"{self.baseFilename}.{i}"))
+                if source.exists():
+                    os.replace(source, index_path(self.rotation_filename(f"{self.baseFilename}.{i + 1}")))
+        super().doRollover()
+        if self.backupCount > 0 and self._builder.records:
+            try:
+                write_index(self.rotation_filename(f"{self.baseFilename}.1"), self._builder.to_dict(size))
+            except OSError:
+                pass
+        self._builder = LogIndexBuilder(self.block_bytes)
+
+
+def rotated_files(log_file: str | Path) -> list[Path]:
+    """``<datei>.N`` … ``<datei>.1``, ``<datei>`` – älteste zuerst, nur existierende."""
+    base = Path(log_file)
+    backups = []
+    for path in base.parent.glob(f"{base.name}.*"):
+        match = _BACKUP_SUFFIX.search(path.name[len(base.name) :])
+        if match and path.name == f"{base.name}.{match.group(1)}":
+            backups.append((int(match.group(1)), path))
+    files = [path for _, path in sorted(backups, reverse=True)]
+    if base.exists():
+        files.append(base)
+    return files
+
+
+class LogFilter:
+    """Exakte Zeilen-Filter plus Block-Vorauswahl über den Index."""
+
+    def __init__(
+        self,
+        since: float | None = None,
+        until: float | None = None,
+        min_level: int = 0,
+        logger_prefix: str | None = None,
+        pattern: str | None = None,
+    ):
+        self.since = since
+        self.until = until
+        self.min_level = min_level
+        self.logger_prefix = logger_prefix
+        self.pattern = re.compile(pattern) if pattern else None
+
+    def _logger_ok(self, name: str) -> bool:
+        prefix = self.logger_prefix
+        return not prefix or name == prefix or name.startswith(prefix + ".")
+
+    def file_may_match(self, index: dict[str, Any]) -> bool:
+        first, last = index.get("first_ts"), index.get("last_ts")
+        if self.since is not None and last is not None and last < self.since:
+            return False
+        if self.until is not None and first is not None and first > self.until:
+            return False
+        return not self.logger_prefix or any(self._logger_ok(name) for name in index.get("loggers", []))
+
+    def block_may_match(self, block: dict[str, Any], loggers: list[str]) -> bool:
+        if block["max_level"] < self.min_level:
+            return False
+        if self.since is not None and block["last_ts"] is not None and block["last_ts"] < self.since:
+            return False
+        if self.until is not None and block["first_ts"] is not None and block["first_ts"] > self.until:
+            return False
+        return not self.logger_prefix or any(self._logger_ok(loggers[i]) for i in block["loggers"])
+
+    def matches(self, record: dict[str, Any]) -> bool:
+        if self.min_level and level_number(record.get("level")) < self.min_level:
+            return False
+        if self.since is not None or self.until is not None:
+            ts = parse_log_timestamp(record.get("timestamp"))
+            if ts is None:
+                return False
+            # Zeilen-Zeitstempel sind auf ms gekürzt
+            if self.since is not None and ts < self.since - 0.001:
+                return False
+            if self.until is not None and ts > self.until:
+                return False
+        if self.logger_prefix and not self._logger_ok(str(record.get("logger", ""))):
+            return False
+        return not self.pattern or bool(self.pattern.search(str(record.get("msg", ""))))
+
+
+def _parse_line(raw: bytes) -> dict[str, Any] | None:
+    try:
+        record = json.loads(raw)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def iter_file(path: Path, log_filter: LogFilter, index: dict[str, Any] | None = None) -> Iterator[tuple[str, dict]]:
+    """Treffer ``(zeile, record)`` einer Datei; liest nur die Blöcke, die der Index zulässt."""
+    if index is None:
+        index = load_index(path)
+    if not log_filter.file_may_match(index):
+        return
+    blocks = index["blocks"]
+    loggers = index.get("loggers", [])
+    with open(path, "rb") as handle:
+        for i, block in enumerate(blocks):
+            if not log_filter.block_may_match(block, loggers):
+                continue
+            end = blocks[i + 1]["offset"] if i + 1 < len(blocks) else index["size"]
+            handle.seek(block["offset"])
+            for raw in handle.read(end - block["offset"]).splitlines():
+                record = _parse_line(raw)
+                if record is not None and log_filter.matches(record):
+                    yield raw.decode("utf-8", errors="replace"), record
+
+
+def query_logs(log_file: str | Path, log_filter: LogFilter) -> Iterator[tuple[str, dict]]:
+    """Treffer über alle Rotationen, älteste zuerst (gestreamt)."""
+    files = rotated_files(log_file)
+    for path in files:
+        is_active = path == Path(log_file)
+        try:
+            index = load_index(path, persist=not is_active)
+        except OSError:
+            continue  # währenddessen rotiert/gelöscht
+        yield from iter_file(path, log_filter, index)
+
+
+def follow_logs(
+    log_file: str | Path,
+    log_filter: LogFilter,
+    *,
+    poll_s: float = 0.5,
+    start_at_end: bool = True,
+    should_stop: Callable[[], bool] = lambda: False,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Iterator[tuple[str, dict]]:
+    """
+    Neue Treffer der aktiven Datei, auch über Rotationen: wird die Datei ersetzt (andere Inode)
+    oder kürzer, wird die alte bis zum Ende gelesen und die neue von vorn.
+    """
+    path = Path(log_file)
+    handle = None
+    inode = None
+    pending = b""
+    while not should_stop():
+        if handle is None:
+            try:
+                handle = open(path, "rb")
+            except OSError:
+                sleep(poll_s)
+                continue
+            inode = os.fstat(handle.fileno()).st_ino
+            if start_at_end:
+                handle.seek(0, os.SEEK_END)
+            start_at_end = False
+        chunk = handle.read()
+        if chunk:
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for raw in lines:
+                record = _parse_line(raw)
+                if record is not None and log_filter.matches(record):
+                    yield raw.decode("utf-8", errors="replace"), record
+            continue
+        try:
+            stat = os.stat(path)
+            rotated = stat.st_ino != inode or stat.st_size < handle.tell()
+        except OSError:
+            rotated = False  # kurz zwischen Umbenennen und Neuanlage
+        if rotated:
+            handle.close()
+            handle = None
+            pending = b""
+            continue
+        sleep(poll_s)
+    if handle is not None:
+        handle.close()
+
+
+def format_record(record: dict[str, Any]) -> str:
+    level = record.get("level", "?")
+    return f"{record.get('timestamp', '?')} {level:<7} {record.get('logger', '?')}: {record.get('msg', '')}"
+
+
+def iter_formatted(matches: Iterable[tuple[str, dict]], raw: bool) -> Iterator[str]:
+    for line, record in matches:
+        yield line if raw else format_record(record)
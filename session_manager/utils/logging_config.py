@@ -8,14 +8,20 @@ Isolierte Version ohne OMF-Dependencies
 from __future__ import annotations
 
 import atexit
-import json
+import copy
 import logging
 import logging.config
 import queue
 import sys
+import threading
+import time
 from collections import deque
-from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from json.encoder import encode_basestring as _json_str
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Callable
+
+from .log_index import IndexedRotatingFileHandler
 
 try:
     from rich.logging import RichHandler  # optional dev-Dependency
@@ -24,6 +30,186 @@ try:
 except ImportError:
     _HAS_RICH = False
 
+# Argument-Typen, die unverändert in den Listener-Thread gereicht werden können (siehe DeferredFormatQueueHandler)
+_DEFERRABLE_ARG_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    Eine JSON-Zeile pro Record (``app``, ``level``, ``logger``, ``msg``, ``timestamp``).
+
+    Ausgabe identisch zu ``json.dumps(record_dict, ensure_ascii=False)``, aber die statischen Teile
+    (App, Level- und Logger-Name) werden einmal pro Kombination serialisiert und der Zeitstempel
+    einmal pro Sekunde formatiert; pro Record wird nur die Nachricht kodiert.
+    Records mit fertiger JSON-Zeile im Attribut ``_json`` werden unverändert durchgereicht.
+    """
+
+    def __init__(self, app_name: str):
+        super().__init__()
+        self._app_prefix = '{"app": ' + _json_str(app_name) + ', "level": '
+        self._heads: dict[tuple[str, str], str] = {}
+        self._second: tuple[int, str] = (-1, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:  # noqa: N802
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, text = self._second
+        if cached_second != second:
+            text = time.strftime(self.default_time_format, self.converter(record.created))
+            self._second = (second, text)
+        return self.default_msec_format % (text, record.msecs)
+
+    def format(self, record: logging.LogRecord) -> str:
+        json_line = getattr(record, "_json", None)
+        if isinstance(json_line, str):
+            return json_line
+        key = (record.levelname, record.name)
+        head = self._heads.get(key)
+        if head is None:
+            head = f'{self._app_prefix}{_json_str(record.levelname)}, "logger": {_json_str(record.name)}, "msg": '
+            self._heads[key] = head
+        return f'{head}{_json_str(record.getMessage())}, "timestamp": "{self.formatTime(record)}"}}'
+
+
+class DeferredFormatQueueHandler(QueueHandler):
+    """
+    QueueHandler, der die Nachricht nicht im aufrufenden Thread formatiert.
+
+    ``QueueHandler.prepare()`` rendert ``msg % args`` sofort – also im Replay-Worker bzw.
+    MQTT-Callback. Sind ``msg`` ein String und alle Argumente unveränderliche Primitive, genügt
+    eine flache Kopie des Records; formatiert wird erst im Listener-Thread. Records mit
+    Exception-/Stack-Info oder anderen Argumenten laufen über den Standardpfad.
+
+    Ist die Queue voll, wird der Record nur gezählt (statt pro Record einen Traceback nach stderr
+    zu schreiben); sobald wieder Platz ist, folgt eine Warnung mit der Anzahl verworfener Records.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+        self._dropped_reported = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        dropped = self.dropped
+        if dropped != self._dropped_reported:
+            notice = logging.LogRecord(
+                __name__,
+                logging.WARNING,
+                __file__,
+                0,
+                "⚠️ %d Log-Record(s) verworfen (Logging-Queue voll)",
+                (dropped - self._dropped_reported,),
+                None,
+            )
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                return
+            self._dropped_reported = dropped
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if (
+            record.exc_info
+            or record.stack_info
+            or not isinstance(record.msg, str)
+            or (args and (not isinstance(args, tuple) or any(type(a) not in _DEFERRABLE_ARG_TYPES for a in args)))
+        ):
+            return super().prepare(record)
+        return copy.copy(record)
+
+
+class LogSampler:
+    """
+    Gesampeltes Logging für hochfrequente Ereignisse (pro Schlüssel, thread-sicher).
+
+    Geloggt werden die ersten ``first`` Ereignisse, danach jedes ``every``-te und/oder höchstens
+    eines pro ``interval_s``. Dazwischen wird nur gezählt; die Anzahl hängt als
+    ``(+N unterdrückt)`` an der nächsten ausgegebenen Zeile, ``flush()`` meldet den Rest.
+    Ist das Level deaktiviert, kostet ein Aufruf nur ``isEnabledFor`` (keine Formatierung).
+
+    Beispiel::
+
+        _publish_fail_log = LogSampler(logger, first=5, every=100)
+        _publish_fail_log.warning(topic, "Publish fehlgeschlagen: %s (rc=%s)", topic, rc)
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        first: int = 5,
+        every: int = 0,
+        interval_s: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._logger = logger
+        self.first = first
+        self.every = every
+        self.interval_s = interval_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> [gesehen, unterdrückt seit letzter Ausgabe, Zeitpunkt letzter Ausgabe]
+        self._state: dict[object, list] = {}
+
+    def log(self, level: int, key: object, msg: str, *args: object) -> bool:
+        """Loggt ``msg % args``, wenn das Sampling es für ``key`` zulässt; ``True`` wenn ausgegeben."""
+        return self._log(level, key, msg, args)
+
+    def debug(self, key: object, msg: str, *args: object) -> bool:
+        return self._log(logging.DEBUG, key, msg, args)
+
+    def info(self, key: object, msg: str, *args: object) -> bool:
+        return self._log(logging.INFO, key, msg, args)
+
+    def warning(self, key: object, msg: str, *args: object) -> bool:
+        return self._log(logging.WARNING, key, msg, args)
+
+    def error(self, key: object, msg: str, *args: object) -> bool:
+        return self._log(logging.ERROR, key, msg, args)
+
+    def _log(self, level: int, key: object, msg: str, args: tuple) -> bool:
+        if not self._logger.isEnabledFor(level):
+            return False
+        now = self._clock() if self.interval_s is not None else 0.0
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                state = self._state[key] = [0, 0, now]
+            state[0] += 1
+            seen = state[0]
+            emit = (
+                seen <= self.first
+                or (self.every > 0 and (seen - self.first) % self.every == 0)
+                or (self.interval_s is not None and now - state[2] >= self.interval_s)
+            )
+            if not emit:
+                state[1] += 1
+                return False
+            suppressed = state[1]
+            state[1] = 0
+            state[2] = now
+        # stacklevel 3: Zeile des Aufrufers von log()/warning()/... statt dieser Methode
+        if suppressed:
+            self._logger.log(level, msg + " (+%d unterdrückt)", *args, suppressed, stacklevel=3)
+        else:
+            self._logger.log(level, msg, *args, stacklevel=3)
+        return True
+
+    def flush(self, level: int = logging.INFO) -> int:
+        """Meldet pro Schlüssel die seit der letzten Ausgabe unterdrückten Ereignisse; setzt alles zurück."""
+        with self._lock:
+            pending = [(key, state[1]) for key, state in self._state.items() if state[1]]
+            self._state.clear()
+        for key, suppressed in pending:
+            self._logger.log(level, "%s: %d weitere Meldung(en) unterdrückt", key, suppressed)
+        return sum(count for _, count in pending)
+
 
 def cleanup_old_logs(log_dir: Path, pattern: str = "session_manager.jsonl*"):
     """
@@ -81,9 +267,10 @@ def configure_logging(
         cleanup_old_logs(log_dir, f"{json_file}*")
 
     # 1) Ziel-Handler (werden am Listener betrieben)
-    file_json = RotatingFileHandler(log_dir / json_file, maxBytes=5_000_000, backupCount=3, encoding="utf-8")
+    # Rotierend mit Zeit-/Level-Index pro Datei (scripts/log_query.py)
+    file_json = IndexedRotatingFileHandler(log_dir / json_file, maxBytes=5_000_000, backupCount=3, encoding="utf-8")
     file_json.setLevel(level)
-    file_json.setFormatter(logging.Formatter("%(message)s"))  # wir schreiben bereits JSON-Strings
+    file_json.setFormatter(JsonLineFormatter(app_name))
 
     handlers: list[tuple[str, logging.Handler]] = [("file_json", file_json)]
 
@@ -108,7 +295,8 @@ def configure_logging(
 
     # 2) Queue + Listener
     q: queue.Queue = queue.Queue(maxsize=10000)
-    qh = QueueHandler(q)
+    # Formatierung erst im Listener-Thread, nicht im Replay-/MQTT-Thread
+    qh = DeferredFormatQueueHandler(q)
     qh.setLevel(level)
 
     root = logging.getLogger()
@@ -123,25 +311,6 @@ def configure_logging(
     listener.start()
     atexit.register(listener.stop)
 
-    # JSON-Formatter für file_json Handler
-    class JsonFormatter(logging.Formatter):
-        def format(self, record):
-            json_line = getattr(record, "_json", None)
-            if isinstance(json_line, str):
-                return json_line
-            else:
-                # Fallback für normale Logs
-                record_dict = {
-                    "app": app_name,
-                    "level": record.levelname,
-                    "logger": record.name,
-                    "msg": record.getMessage(),
-                    "timestamp": self.formatTime(record),
-                }
-                return json.dumps(record_dict, ensure_ascii=False)
-
-    file_json.setFormatter(JsonFormatter())
-
     # Störende Logger auf WARNING setzen
     logging.getLogger("PIL.PngImagePlugin").setLevel(logging.WARNING)
     logging.getLogger("PIL").setLevel(logging.WARNING)
@@ -0,0 +1,108 @@
+"""
+Metrik-Ring für Live-Dashboards (Replay / Recorder).
+
+Worker-Threads zählen kumulative Counter hoch und setzen Gauges; höchstens einmal pro
+``interval_s`` wird daraus ein Sample (Raten pro Sekunde + aktuelle Gauges) in einen Ringpuffer
+fester Größe geschrieben. Das UI liest nur diese Zeitreihe – ohne den Controller-Zustand pro
+Rerun neu zu berechnen. Gesampelt wird beim Zählen und beim Lesen, ein eigener Thread ist
+nicht nötig; Leerlaufphasen erscheinen so als Rate 0.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Iterable
+
+DEFAULT_CAPACITY = 300  # 5 Minuten bei 1 Hz
+DEFAULT_INTERVAL_S = 1.0
+
+
+class MetricsRing:
+    """
+    Zeitreihe fester Länge aus Counter-Raten und Gauges, thread-sicher.
+
+    Args:
+        counters: Namen kumulativer Zähler; im Sample als ``<name>_per_s``.
+        gauges: Namen von Momentanwerten (letzter gesetzter Wert, ``None`` = unbekannt).
+        capacity: Anzahl gehaltener Samples.
+        interval_s: Mindestabstand zwischen zwei Samples.
+        clock: Monotone Uhr (Tests).
+    """
+
+    def __init__(
+        self,
+        counters: Iterable[str] = (),
+        gauges: Iterable[str] = (),
+        *,
+        capacity: int = DEFAULT_CAPACITY,
+        interval_s: float = DEFAULT_INTERVAL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.counter_names = tuple(counters)
+        self.gauge_names = tuple(gauges)
+        self.interval_s = interval_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._samples: deque[dict[str, Any]] = deque(maxlen=capacity)
+        self.reset()
+
+    def reset(self) -> None:
+        """Verwirft alle Samples; Zeitachse beginnt neu bei 0."""
+        now = self._clock()
+        with self._lock:
+            self._samples.clear()
+            self._counts = dict.fromkeys(self.counter_names, 0)
+            self._gauges: dict[str, float | None] = dict.fromkeys(self.gauge_names)
+            self._started = now
+            self._last_t = now
+            self._last_counts = dict(self._counts)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        now = self._clock()
+        with self._lock:
+            self._counts[name] += amount
+            self._maybe_sample_locked(now)
+
+    def set_gauge(self, name: str, value: float | None) -> None:
+        now = self._clock()
+        with self._lock:
+            self._gauges[name] = value
+            self._maybe_sample_locked(now)
+
+    def maybe_sample(self) -> bool:
+        """Nimmt ein Sample, wenn ``interval_s`` seit dem letzten verstrichen ist."""
+        now = self._clock()
+        with self._lock:
+            return self._maybe_sample_locked(now)
+
+    def samples(self) -> list[dict[str, Any]]:
+        """Alle Samples (älteste zuerst), inkl. eines fälligen Samples für die Gegenwart."""
+        self.maybe_sample()
+        with self._lock:
+            return list(self._samples)
+
+    def columns(self, names: Iterable[str] | None = None) -> dict[str, list[Any]]:
+        """Spaltenform für ``st.line_chart(..., x="t_s")``: ``{"t_s": [...], name: [...]}``."""
+        rows = self.samples()
+        if names is None:
+            names = [key for key in rows[0] if key != "t_s"] if rows else []
+        return {key: [row.get(key) for row in rows] for key in ("t_s", *names)}
+
+    def latest(self) -> dict[str, Any] | None:
+        rows = self.samples()
+        return rows[-1] if rows else None
+
+    def _maybe_sample_locked(self, now: float) -> bool:
+        elapsed = now - self._last_t
+        if elapsed < self.interval_s:
+            return False
+        sample: dict[str, Any] = {"t_s": round(now - self._started, 1)}
+        for name, count in self._counts.items():
+            sample[f"{name}_per_s"] = round((count - self._last_counts[name]) / elapsed, 2)
+        sample.update(self._gauges)
+        self._samples.append(sample)
+        self._last_t = now
+        self._last_counts = dict(self._counts)
+        return True
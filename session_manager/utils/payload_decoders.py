@@ -0,0 +1,407 @@
+"""
+Feldgezielte Payload-Decoder pro Topic-Muster.
+
+Automatisch erzeugt von ``scripts/infer_payload_schemas.py --write`` (17 Sessions,
+37353 Messages) – nicht manuell bearbeiten. Jeder Decoder wurde auf dem Korpus gegen die
+generische Suche (``collect_key_values``) geprüft.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+from .payload_schema import TargetedDecoder, topic_pattern
+
+DECODER_SPECS: dict[str, dict] = {
+    "/j1/txt/1/f/i/order": {
+        "fields": {
+            "phase": ["state"],
+        },
+        "known": {
+            "": ["ts", "type", "state"],
+        },
+    },
+    "/j1/txt/1/f/i/stock": {
+        "fields": {
+            "phase": ["stockItems[].workpiece.state"],
+        },
+        "known": {
+            "": ["ts", "stockItems"],
+            "stockItems": ["[]"],
+            "stockItems[]": ["workpiece", "location", "hbw"],
+            "stockItems[].workpiece": ["id", "type", "state"],
+        },
+    },
+    "/j1/txt/1/i/bme680": {
+        "fields": {},
+        "known": {
+            "": ["ts", "t", "rt", "h", "rh", "p", "iaq", "aq", "gr"],
+        },
+    },
+    "/j1/txt/1/i/ldr": {
+        "fields": {},
+        "known": {
+            "": ["ts", "br", "ldr"],
+        },
+    },
+    "ccu/order/active": {
+        "fields": {
+            "order_id": ["[].orderId"],
+            "nfc_tag": ["[].workpieceId"],
+            "phase": ["[].productionSteps[].state", "[].state"],
+        },
+        "known": {
+            "": ["[]"],
+            "[]": [
+                "orderType",
+                "type",
+                "timestamp",
+                "orderId",
+                "productionSteps",
+                "receivedAt",
+                "state",
+                "workpieceId",
+                "startedAt",
+                "requestId",
+            ],
+            "[].productionSteps": ["[]"],
+            "[].productionSteps[]": [
+                "id",
+                "type",
+                "state",
+                "source",
+                "target",
+                "startedAt",
+                "dependentActionId",
+                "command",
+                "moduleType",
+                "stoppedAt",
+                "serialNumber",
+            ],
+        },
+    },
+    "ccu/order/request": {
+        "fields": {
+            "nfc_tag": ["workpieceId"],
+        },
+        "known": {
+            "": ["timestamp", "orderType", "type", "workpieceId", "requestId"],
+        },
+    },
+    "ccu/order/response": {
+        "fields": {
+            "order_id": ["orderId"],
+            "nfc_tag": ["workpieceId"],
+            "phase": ["productionSteps[].state", "state"],
+        },
+        "known": {
+            "": [
+                "orderType",
+                "type",
+                "timestamp",
+                "orderId",
+                "productionSteps",
+                "receivedAt",
+                "state",
+                "workpieceId",
+                "startedAt",
+                "requestId",
+            ],
+            "productionSteps": ["[]"],
+            "productionSteps[]": [
+                "id",
+                "type",
+                "state",
+                "source",
+                "target",
+                "startedAt",
+                "dependentActionId",
+                "command",
+                "moduleType",
+            ],
+        },
+    },
+    "ccu/pairing/state": {
+        "fields": {},
+        "known": {
+            "": ["modules", "transports"],
+            "modules": ["[]"],
+            "modules[]": [
+                "serialNumber",
+                "type",
+                "connected",
+                "available",
+                "subType",
+                "pairedSince",
+                "assigned",
+                "ip",
+                "version",
+                "lastSeen",
+                "hasCalibration",
+                "productionDuration",
+            ],
+            "transports": ["[]"],
+            "transports[]": [
+                "serialNumber",
+                "type",
+                "connected",
+                "available",
+                "ip",
+                "version",
+                "lastSeen",
+                "charging",
+                "batteryVoltage",
+                "batteryPercentage",
+                "lastNodeId",
+                "pairedSince",
+                "lastModuleSerialNumber",
+                "lastLoadPosition",
+            ],
+        },
+    },
+    "ccu/state/stock": {
+        "fields": {
+            "phase": ["stockItems[].workpiece.state"],
+        },
+        "known": {
+            "": ["ts", "stockItems"],
+            "stockItems": ["[]"],
+            "stockItems[]": ["workpiece", "location", "hbw"],
+            "stockItems[].workpiece": ["id", "type", "state"],
+        },
+    },
+    "fts/v1/ff/+/instantAction": {
+        "fields": {
+            "nfc_tag": ["actions[].metadata.loadId"],
+        },
+        "known": {
+            "": ["serialNumber", "timestamp", "actions"],
+            "actions": ["[]"],
+            "actions[]": ["actionId", "actionType", "metadata"],
+            "actions[].metadata": ["loadDropped", "loadType", "loadId", "loadPosition", "nodeId"],
+        },
+    },
+    "fts/v1/ff/+/order": {
+        "fields": {
+            "order_id": ["orderId"],
+            "nfc_tag": ["nodes[].action.metadata.loadId"],
+        },
+        "known": {
+            "": ["timestamp", "orderId", "orderUpdateId", "nodes", "edges", "serialNumber"],
+            "edges": ["[]"],
+            "edges[]": ["id", "length", "linkedNodes"],
+            "edges[].linkedNodes": ["[]"],
+            "nodes": ["[]"],
+            "nodes[]": ["id", "linkedEdges", "action"],
+            "nodes[].action": ["id", "type", "metadata"],
+            "nodes[].action.metadata": ["loadId", "loadType", "loadPosition", "direction", "noLoadChange", "charge"],
+            "nodes[].linkedEdges": ["[]"],
+        },
+    },
+    "fts/v1/ff/+/state": {
+        "fields": {
+            "order_id": ["orderId"],
+            "nfc_tag": ["load[].loadId"],
+            "phase": ["actionState.state", "actionStates[].state"],
+        },
+        "known": {
+            "": [
+                "lastCode",
+                "lastNodeId",
+                "errors",
+                "edgeStates",
+                "actionStates",
+                "driving",
+                "orderUpdateId",
+                "orderId",
+                "load",
+                "lastNodeSequenceId",
+                "serialNumber",
+                "timestamp",
+                "waitingForLoadHandling",
+                "headerId",
+                "batteryState",
+                "paused",
+                "actionState",
+                "nodeStates",
+            ],
+            "actionState": ["command", "id", "timestamp", "state"],
+            "actionStates": ["[]"],
+            "actionStates[]": ["command", "id", "timestamp", "state"],
+            "batteryState": ["currentVoltage", "percentage", "charging", "minVolt", "maxVolt"],
+            "edgeStates": [],
+            "errors": ["[]"],
+            "errors[]": ["errorLevel", "errorType", "errorReferences"],
+            "errors[].errorReferences": ["[]"],
+            "errors[].errorReferences[]": ["referenceKey", "referenceValue"],
+            "load": ["[]"],
+            "load[]": ["loadPosition", "loadId", "loadType"],
+            "nodeStates": [],
+        },
+    },
+    "module/v1/ff/+/connection": {
+        "fields": {},
+        "known": {
+            "": ["headerId", "timestamp", "ip", "version", "manufacturer", "serialNumber", "connectionState"],
+        },
+    },
+    "module/v1/ff/+/instantAction": {
+        "fields": {
+            "order_id": ["actions[].metadata.orderId"],
+        },
+        "known": {
+            "": ["serialNumber", "timestamp", "actions"],
+            "actions": ["[]"],
+            "actions[]": ["actionId", "actionType", "metadata"],
+            "actions[].metadata": ["green", "red", "yellow", "orderId", "type"],
+        },
+    },
+    "module/v1/ff/+/order": {
+        "fields": {
+            "order_id": ["orderId"],
+            "nfc_tag": ["action.metadata.workpiece.workpieceId", "action.metadata.workpieceId"],
+            "phase": ["action.metadata.workpiece.state"],
+        },
+        "known": {
+            "": ["timestamp", "serialNumber", "orderId", "orderUpdateId", "action"],
+            "action": ["id", "command", "metadata"],
+            "action.metadata": ["workpiece", "type", "workpieceId", "duration"],
+            "action.metadata.workpiece": ["workpieceId", "type", "history", "state"],
+            "action.metadata.workpiece.history": ["[]"],
+            "action.metadata.workpiece.history[]": ["ts", "code"],
+        },
+    },
+    "module/v1/ff/+/state": {
+        "fields": {
+            "order_id": ["orderId"],
+            "nfc_tag": [
+                "actionState.metadata.workpieceId",
+                "actionStates[].metadata.workpiece.workpieceId",
+                "loads[].loadId",
+            ],
+            "phase": ["actionState.state", "actionStates[].metadata.workpiece.state", "actionStates[].state"],
+        },
+        "known": {
+            "": [
+                "headerId",
+                "loads",
+                "actionState",
+                "serialNumber",
+                "timestamp",
+                "errors",
+                "orderUpdateId",
+                "orderId",
+                "paused",
+                "metadata",
+                "actionStates",
+                "information",
+                "batteryState",
+                "operatingMode",
+            ],
+            "actionState": ["metadata", "timestamp", "command", "id", "result", "state", "duration"],
+            "actionState.metadata": ["type", "workpieceId"],
+            "actionStates": ["[]"],
+            "actionStates[]": ["command", "state", "id", "metadata", "timestamp", "result"],
+            "actionStates[].metadata": ["workpiece"],
+            "actionStates[].metadata.workpiece": ["state", "workpieceId", "history", "type"],
+            "actionStates[].metadata.workpiece.history": ["[]"],
+            "actionStates[].metadata.workpiece.history[]": ["ts", "code"],
+            "batteryState": [],
+            "errors": ["[]"],
+            "errors[]": [],
+            "information": [],
+            "loads": ["[]"],
+            "loads[]": ["type", "loadType", "loadId", "loadPosition", "loadTimestamp", "duration"],
+            "metadata": ["opcuaState"],
+        },
+    },
+    "module/v1/ff/NodeRed/+/order": {
+        "fields": {
+            "order_id": ["orderId"],
+            "nfc_tag": ["action.metadata.workpiece.workpieceId", "action.metadata.workpieceId"],
+            "phase": ["action.metadata.workpiece.state"],
+        },
+        "known": {
+            "": ["timestamp", "orderId", "orderUpdateId", "action", "serialNumber"],
+            "action": ["id", "command", "metadata"],
+            "action.metadata": ["type", "workpiece", "workpieceId"],
+            "action.metadata.workpiece": ["workpieceId", "type", "history", "state"],
+            "action.metadata.workpiece.history": ["[]"],
+            "action.metadata.workpiece.history[]": ["ts", "code"],
+        },
+    },
+    "module/v1/ff/NodeRed/+/state": {
+        "fields": {
+            "order_id": ["errors[].errorReferences[].orderId", "orderId"],
+            "nfc_tag": ["actionStates[].metadata.workpiece.workpieceId"],
+            "phase": ["actionState.state", "actionStates[].metadata.workpiece.state", "actionStates[].state"],
+        },
+        "known": {
+            "": [
+                "actionStates",
+                "timestamp",
+                "information",
+                "serialNumber",
+                "batteryState",
+                "headerId",
+                "operatingMode",
+                "paused",
+                "actionState",
+                "orderUpdateId",
+                "orderId",
+                "errors",
+            ],
+            "actionState": ["command", "state", "result", "id", "timestamp"],
+            "actionStates": ["[]"],
+            "actionStates[]": ["metadata", "timestamp", "command", "id", "result", "state", "warning"],
+            "actionStates[].metadata": ["type", "workpiece"],
+            "actionStates[].metadata.workpiece": ["state", "workpieceId", "history", "type"],
+            "actionStates[].metadata.workpiece.history": ["[]"],
+            "actionStates[].metadata.workpiece.history[]": ["ts", "code"],
+            "batteryState": [],
+            "errors": ["[]"],
+            "errors[]": ["errorLevel", "errorType", "errorReferences"],
+            "errors[].errorReferences": ["[]"],
+            "errors[].errorReferences[]": ["orderId"],
+            "information": [],
+        },
+    },
+    "osf/arduino/flame/flame-1/state": {
+        "fields": {},
+        "known": {
+            "": ["flameDetected", "rawValue", "timestamp", "reason"],
+        },
+    },
+    "osf/arduino/gas/mq2-1/state": {
+        "fields": {},
+        "known": {
+            "": ["gasDetected", "gasLevel", "rawValue", "timestamp", "reason"],
+        },
+    },
+    "osf/arduino/temperature/dht11-1/state": {
+        "fields": {},
+        "known": {
+            "": ["temperature", "humidity", "temperatureUnit", "humidityUnit", "timestamp", "reason"],
+        },
+    },
+    "osf/arduino/vibration/mpu6050-1/state": {
+        "fields": {},
+        "known": {
+            "": ["vibrationLevel", "vibrationDetected", "impulseCount", "magnitude", "timestamp", "reason"],
+        },
+    },
+    "osf/arduino/vibration/sw420-1/state": {
+        "fields": {},
+        "known": {
+            "": ["vibrationDetected", "impulseCount", "timestamp", "reason"],
+        },
+    },
+}
+
+DECODERS = {pattern: TargetedDecoder(pattern, spec) for pattern, spec in DECODER_SPECS.items()}
+
+
+@lru_cache(maxsize=1024)
+def decoder_for_topic(topic: str) -> TargetedDecoder | None:
+    """Decoder für ein konkretes Topic (``None`` = generische Suche verwenden)."""
+    return DECODERS.get(topic_pattern(topic))
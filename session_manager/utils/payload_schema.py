@@ -0,0 +1,271 @@
+"""
+Payload-Schemas pro Topic und feldgezielte Decoder.
+
+- ``SchemaInferrer`` lernt aus Session-Logs pro Topic-Muster die JSON-Form
+  (Key-Pfade, Typen, Häufigkeit); Seriennummern werden zu ``+`` normalisiert.
+- ``TargetedDecoder`` liest die gesuchten Keys nur an den Pfaden, an denen sie laut Schema
+  vorkommen, statt an jedem Key die Schreibweise zu normalisieren. Alle übrigen Container
+  werden nur auf ihre Form geprüft: trifft der Decoder auf einen Key, den das Schema an dieser
+  Stelle nicht kennt (oder auf einen Container, wo bisher nur Skalare standen), meldet er
+  ``None`` — der Aufrufer fällt dann auf die generische Suche zurück.
+
+Die Decoder-Spezifikationen werden von ``scripts/infer_payload_schemas.py`` aus dem
+Session-Korpus erzeugt (``payload_decoders.py``).
+
+Reine Funktionen/Klassen — sicher im MQTT-Callback-Thread nutzbar (kein Streamlit-State).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+# Keys (klein geschrieben), nach denen Object-Detection-Capture Payloads durchsucht
+MIN_FIELD_KEYS: dict[str, frozenset[str]] = {
+    "order_id": frozenset({"orderid", "order_id", "productionorderid", "transportorderid"}),
+    "nfc_tag": frozenset({"nfctag", "nfc_tag", "nfcid", "nfc_id", "tagid", "workpieceid", "loadid"}),
+    "phase": frozenset({"phase", "step", "orderphase", "state"}),
+}
+
+LIST_SEGMENT = "[]"
+MAX_SCHEMA_DEPTH = 8
+
+_SERIAL_TOPIC_PREFIXES = ("module/v1/ff/", "fts/v1/ff/")
+
+
+def topic_pattern(topic: str) -> str:
+    """Seriennummer in Modul-/FTS-Topics durch ``+`` ersetzen (auch ``module/v1/ff/NodeRed/<serial>/…``)."""
+    if not topic.startswith(_SERIAL_TOPIC_PREFIXES):
+        return topic
+    parts = topic.split("/")
+    index = 4 if len(parts) > 5 and parts[3] == "NodeRed" else 3
+    if len(parts) > index + 1:
+        parts[index] = "+"
+    return "/".join(parts)
+
+
+def collect_key_values(node: Any, keys: frozenset[str] | set[str], out: list[str]) -> None:
+    """Generische Suche: Werte aller Keys aus ``keys`` (Tiefensuche, Payload-Reihenfolge)."""
+    if isinstance(node, dict):
+        for k, v in node.items():
+            if str(k).strip().lower() in keys and v not in (None, ""):
+                out.append(str(v))
+            collect_key_values(v, keys, out)
+    elif isinstance(node, list):
+        for item in node:
+            collect_key_values(item, keys, out)
+
+
+def _json_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+
+def join_path(prefix: str, segment: str) -> str:
+    if not prefix:
+        return segment
+    if segment == LIST_SEGMENT:
+        return prefix + LIST_SEGMENT
+    return f"{prefix}.{segment}"
+
+
+def split_path(path: str) -> list[str]:
+    """``actionStates[].metadata.workpieceId`` → ``["actionStates", "[]", "metadata", "workpieceId"]``."""
+    segments: list[str] = []
+    for part in path.split("."):
+        key = part.replace(LIST_SEGMENT, "")
+        if key:
+            segments.append(key)
+        segments.extend([LIST_SEGMENT] * part.count(LIST_SEGMENT))
+    return segments
+
+
+class SchemaInferrer:
+    """Sammelt pro Topic-Muster Key-Pfade (mit Typen und Anzahl) über viele Payloads."""
+
+    def __init__(self, max_depth: int = MAX_SCHEMA_DEPTH) -> None:
+        self.max_depth = max_depth
+        self._topics: dict[str, dict[str, Any]] = {}
+
+    def observe(self, topic: str, payload: Any) -> None:
+        schema = self._topics.setdefault(topic_pattern(topic), {"messages": 0, "root": {}, "paths": {}})
+        schema["messages"] += 1
+        root_types = schema["root"]
+        root_type = _json_type(payload)
+        root_types[root_type] = root_types.get(root_type, 0) + 1
+        self._walk(payload, "", 0, schema["paths"])
+
+    def _walk(self, node: Any, prefix: str, depth: int, paths: dict[str, dict[str, Any]]) -> None:
+        if depth >= self.max_depth:
+            return
+        if isinstance(node, dict):
+            for key, value in node.items():
+                self._record(join_path(prefix, str(key)), value, depth, paths)
+        elif isinstance(node, list):
+            for item in node:
+                self._record(join_path(prefix, LIST_SEGMENT), item, depth, paths)
+
+    def _record(self, path: str, value: Any, depth: int, paths: dict[str, dict[str, Any]]) -> None:
+        entry = paths.get(path)
+        if entry is None:
+            entry = paths[path] = {"count": 0, "types": {}}
+        entry["count"] += 1
+        value_type = _json_type(value)
+        entry["types"][value_type] = entry["types"].get(value_type, 0) + 1
+        if value_type in ("object", "array"):
+            self._walk(value, path, depth + 1, paths)
+
+    def schemas(self) -> dict[str, dict[str, Any]]:
+        return dict(sorted(self._topics.items()))
+
+
+def decoder_spec(schema: dict[str, Any], field_keys: dict[str, frozenset[str]]) -> dict[str, Any]:
+    """
+    Decoder-Spezifikation aus einem Topic-Schema.
+
+    Returns:
+        {"fields": {feld: [pfade]}, "known": {container-pfad: [keys]}} – ``known`` enthält jeden
+        Container des Schemas ("" = Wurzel), damit neue Keys auch abseits der Feld-Pfade auffallen.
+    """
+    paths = list(schema["paths"])
+    fields: dict[str, list[str]] = {name: [] for name in field_keys}
+    for path in paths:
+        last = split_path(path)[-1]
+        for name, keys in field_keys.items():
+            if last.strip().lower() in keys:
+                fields[name].append(path)
+
+    containers = {""}
+    containers.update(path for path, entry in schema["paths"].items() if {"object", "array"} & set(entry["types"]))
+    known: dict[str, list[str]] = {container: [] for container in sorted(containers)}
+    for path in paths:
+        segments = split_path(path)
+        container = _path_from_segments(segments[:-1])
+        if container in known and segments[-1] not in known[container]:
+            known[container].append(segments[-1])
+    return {"fields": {name: sorted(p) for name, p in fields.items() if p}, "known": known}
+
+
+def _path_from_segments(segments: list[str]) -> str:
+    path = ""
+    for segment in segments:
+        path = join_path(path, segment)
+    return path
+
+
+class DecodedFields:
+    """Ergebnis eines ``TargetedDecoder``: gefundene Werte pro Feld (Payload-Reihenfolge)."""
+
+    __slots__ = ("order_id", "nfc_tag", "phase")
+
+    def __init__(self) -> None:
+        self.order_id: list[str] = []
+        self.nfc_tag: list[str] = []
+        self.phase: list[str] = []
+
+
+class _Node:
+    __slots__ = ("children", "known", "items")
+
+    def __init__(self) -> None:
+        # key → (Felder, die dieser Key füllt, Kind-Knoten oder None)
+        self.children: dict[str, tuple[tuple[str, ...], _Node | None]] = {}
+        self.known: frozenset[str] = frozenset()
+        self.items: _Node | None = None
+
+
+class _ShapeMismatch(Exception):
+    pass
+
+
+class TargetedDecoder:
+    """
+    Feldgezielter Decoder für ein Topic-Muster.
+
+    Jeder Container des Schemas ist ein Knoten mit seinen bekannten Keys; Werte werden nur an den
+    Feld-Pfaden übernommen, in Payload-Reihenfolge (gleiche Reihenfolge wie ``collect_key_values``).
+    Ein unbekannter Key oder ein nicht leerer Container an einer bisher skalaren Stelle ergibt
+    ``None`` – sonst könnte ein neues Feld dort unbemerkt fehlen.
+    """
+
+    __slots__ = ("topic_pattern", "_root")
+
+    def __init__(self, topic_pattern: str, spec: dict[str, Any]) -> None:
+        self.topic_pattern = topic_pattern
+        self._root = _Node()
+        nodes: dict[str, _Node] = {"": self._root}
+        for container in sorted(spec["known"], key=lambda p: len(split_path(p))):
+            node = self._node_for(nodes, container)
+            keys = spec["known"][container]
+            node.known = frozenset(k for k in keys if k != LIST_SEGMENT)
+            if LIST_SEGMENT in keys:
+                # Listen mit skalaren Einträgen: Knoten ohne Keys (nimmt nur Skalare an)
+                self._node_for(nodes, join_path(container, LIST_SEGMENT))
+        for name, field_paths in spec["fields"].items():
+            for path in field_paths:
+                segments = split_path(path)
+                parent = self._node_for(nodes, _path_from_segments(segments[:-1]))
+                key = segments[-1]
+                names, child = parent.children.get(key, ((), None))
+                parent.children[key] = (names + (name,), child)
+
+    def _node_for(self, nodes: dict[str, _Node], path: str) -> _Node:
+        node = nodes.get(path)
+        if node is not None:
+            return node
+        segments = split_path(path)
+        parent = self._node_for(nodes, _path_from_segments(segments[:-1]))
+        node = nodes[path] = _Node()
+        if segments[-1] == LIST_SEGMENT:
+            parent.items = node
+        else:
+            names, _child = parent.children.get(segments[-1], ((), None))
+            parent.children[segments[-1]] = (names, node)
+        return node
+
+    def decode(self, payload: Any) -> DecodedFields | None:
+        """Felder aus einem bereits geparsten Payload; ``None`` bei unbekannter Payload-Form."""
+        fields = DecodedFields()
+        try:
+            self._visit(self._root, payload, fields)
+        except _ShapeMismatch:
+            return None
+        return fields
+
+    def _visit(self, node: _Node, value: Any, fields: DecodedFields) -> None:
+        if isinstance(value, dict):
+            children = node.children
+            known = node.known
+            for key, child_value in value.items():
+                entry = children.get(key)
+                if entry is None:
+                    if key not in known or (child_value and isinstance(child_value, (dict, list))):
+                        raise _ShapeMismatch(key)
+                    continue
+                names, child = entry
+                if names and child_value not in (None, ""):
+                    text = str(child_value)
+                    for name in names:
+                        getattr(fields, name).append(text)
+                if child is not None:
+                    self._visit(child, child_value, fields)
+                elif child_value and isinstance(child_value, (dict, list)):
+                    raise _ShapeMismatch(key)
+        elif isinstance(value, list):
+            items = node.items
+            if items is None:
+                if value:
+                    raise _ShapeMismatch(LIST_SEGMENT)
+                return
+            for item in value:
+                self._visit(items, item, fields)
@@ -8,6 +8,28 @@ import logging
 from collections import deque
 
 
+class LogEntry(str):
+    """
+    Formatierte Log-Zeile mit vorab extrahierten Feldern.
+
+    Verhält sich wie der bisherige String-Eintrag (``"\\n".join(buffer)`` funktioniert weiter),
+    das UI filtert/rendert aber über ``level``/``logger``/``message`` ohne erneutes Parsen.
+    """
+
+    level: str
+    logger: str
+    message: str
+    created: float
+
+    def __new__(cls, text: str, *, level: str, logger: str, message: str, created: float) -> "LogEntry":
+        entry = super().__new__(cls, text)
+        entry.level = level
+        entry.logger = logger
+        entry.message = message
+        entry.created = created
+        return entry
+
+
 class RingBufferHandler(logging.Handler):
     """
     Logging-Handler, der Logs in einen Ringpuffer schreibt.
@@ -15,7 +37,7 @@ class RingBufferHandler(logging.Handler):
     Thread-sicher für MQTT-Callbacks und Streamlit-UI.
     """
 
-    def __init__(self, buf: deque[str], level: int = logging.INFO):
+    def __init__(self, buf: deque[LogEntry], level: int = logging.INFO):
         """
         Initialisiert den Ring-Buffer-Handler.
 
@@ -28,20 +50,26 @@ class RingBufferHandler(logging.Handler):
 
     def emit(self, record: logging.LogRecord):
         """
-        Schreibt Log-Record in den Ringpuffer.
+        Schreibt Log-Record als ``LogEntry`` in den Ringpuffer (Felder werden einmalig hier extrahiert).
 
         Args:
             record: Log-Record
         """
         try:
-            msg = self.format(record)
-            self.buf.append(msg)
+            text = self.format(record)
+            # Formatter.format() hat record.message bereits gesetzt
+            message = getattr(record, "message", None)
+            if message is None:
+                message = record.getMessage()
+            self.buf.append(
+                LogEntry(text, level=record.levelname, logger=record.name, message=message, created=record.created)
+            )
         except Exception:
             # Ignoriere Fehler beim Logging
             pass
 
 
-def create_log_buffer(maxlen: int = 1000) -> deque[str]:
+def create_log_buffer(maxlen: int = 1000) -> deque[LogEntry]:
     """
     Erstellt einen neuen Log-Buffer.
 
@@ -54,7 +82,7 @@ def create_log_buffer(maxlen: int = 1000) -> deque[str]:
     return deque(maxlen=maxlen)
 
 
-def add_buffer_handler(logger: logging.Logger, buffer: deque[str], level: int = logging.INFO):
+def add_buffer_handler(logger: logging.Logger, buffer: deque[LogEntry], level: int = logging.INFO):
     """
     Fügt einen Ring-Buffer-Handler zu einem Logger hinzu.
 
@@ -68,7 +96,7 @@ def add_buffer_handler(logger: logging.Logger, buffer: deque[str], level: int =
     logger.addHandler(handler)
 
 
-def render_logs_panel(buffer: deque[str], max_lines: int = 200) -> str:
+def render_logs_panel(buffer: deque[LogEntry], max_lines: int = 200) -> str:
     """
     Rendert Logs für Streamlit-UI.
 
@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import threading
 import time
+from typing import Callable
 
 import streamlit as st
 
@@ -90,3 +91,21 @@ def request_rerun_safe(force: bool = False) -> bool:
     """
     controller = get_rerun_controller()
     return controller.request_rerun(force)
+
+
+def run_live_fragment(render: Callable[[], None], run_every_s: float | None, *, fallback_sleep_s: float = 2.0) -> None:
+    """
+    Rendert ``render`` als Streamlit-Fragment, das sich alle ``run_every_s`` Sekunden selbst neu
+    zeichnet – nur dieser Block, kein kompletter App-Rerun. ``run_every_s=None`` rendert einmalig.
+
+    Ohne ``st.fragment`` (Streamlit < 1.37) Fallback auf das bisherige Verhalten:
+    einmal rendern, ``fallback_sleep_s`` schlafen, voller Rerun.
+    """
+    fragment = getattr(st, "fragment", None)
+    if fragment is not None:
+        fragment(run_every=run_every_s)(render)()
+        return
+    render()
+    if run_every_s:
+        time.sleep(fallback_sleep_s)
+        st.rerun()